@@ -4,13 +4,20 @@ Raspberry Pi 監視システム - モジュラー版
 ネットワーク監視・録音・Google Drive連携機能をモジュール化
 """
 
-from flask import Flask, render_template, jsonify, request, send_file
+import logging
 import threading
-import time
 import os
+import re
 from datetime import datetime
 from pathlib import Path
 
+# 起動時間計測（他のモジュールより先に開始）
+from utils.startup import StartupProfiler
+startup_profiler = StartupProfiler()
+
+with startup_profiler.phase('flask_import'):
+    from flask import Flask, Response, render_template, jsonify, request, send_file, stream_with_context
+
 # 作業ディレクトリとパスの初期化
 script_dir = Path(__file__).parent.absolute()
 project_root = script_dir.parent  # raspi-remote-monitoring
@@ -20,52 +27,116 @@ data_dir = project_root / "data"
 os.makedirs(data_dir / "recordings", exist_ok=True)
 os.makedirs(data_dir / "credentials", exist_ok=True)
 
-print(f"📁 プロジェクトルート: {project_root}")
-print(f"📁 データディレクトリ: {data_dir}")
-
 # モジュールインポート
-from config import settings
-print(f"📝 設定情報: {settings._config.keys() if hasattr(settings, '_config') else '設定未読み込み'}")
-print(f"🔍 ネットワーク設定: {settings.network}")
+with startup_profiler.phase('config'):
+    from config import settings
+
+# ログ出力（各スレッドはキューに積むだけにし、書き込みは専用スレッドで行う）
+from utils import setup_logging, stop_logging, get_logging_stats
+setup_logging(settings.get('logging', {}))
+logger = logging.getLogger('app')
+
+logger.info("プロジェクトルート: %s / データディレクトリ: %s", project_root, data_dir)
+logger.debug("設定ファイル: %s (キー: %s)", settings.config_path, list(settings._config.keys()))
+logger.debug("ネットワーク設定: %s", settings.network)
 
-from modules.network import NetworkMonitor
-from modules.recording import AudioRecorder
-from modules.gdrive import GDriveManager, DataSource  # Google Drive連携機能
+with startup_profiler.phase('module_import'):
+    from modules.network import NetworkMonitor
+    from modules.recording import AudioRecorder
+    # Google Drive連携機能（Google APIクライアントは初回使用時に読み込まれる）
+    from modules.gdrive import GDriveManager, DataSource, TelemetryBatcher, RecordingSync, RecordingArchiver
+    from modules.gdrive import google_client
+    from modules.system import SystemCollectors
+    from utils import RefreshingCache, EventBus, HttpCache, serve
+    from utils import Gauge, ProcessMetrics, REGISTRY, RequestTimer, JobManager, Scheduler
+    from utils import SingleFlight, get_singleflight_stats
+    from utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
 
 # Flaskアプリ初期化
 app = Flask(__name__)
 
+# 応答の圧縮・ETag（304）・静的ファイルの長期キャッシュ
+http_cache = HttpCache(app, settings.get('http', {}))
+
+# ルート別の処理時間・低速リクエストの計測（/api/timing、/metrics）
+timing_config = settings.get('timing', {})
+request_timer = RequestTimer(app, timing_config) if timing_config.get('enabled', True) else None
+
+# 状態変更の配信（/api/events）。JSONは変更時に1回だけ作り全クライアントで共有する
+event_bus = EventBus(encoder=app.json.dumps)
+
+# トピックごとの変更判定で無視するキー（取得時刻・キャッシュ経過時間だけの変化は変更としない）
+EVENT_IGNORE_KEYS = {
+    'network': ('timestamp', 'last_check'),
+    'recording': ('timestamp',),
+    'gdrive': ('last_check', 'cache_age', 'stale', 'token'),
+    'crontab': ('last_check', 'cache_age', 'stale'),
+    'tailscale': ('last_check', 'logs', 'cache_age', 'stale'),
+    'devices': ('timestamp', 'cache_age', 'stale'),
+    'jobs': ()
+}
+
+def snapshot_response(topic: str, data: dict):
+    """状態APIの応答（内容のバージョンをETagにし、前回から変わっていなければ304）"""
+    entry = event_bus.publish_entry(topic, data, ignore=EVENT_IGNORE_KEYS[topic])
+    response = jsonify(data)
+    response.set_etag(f"{topic}-{event_bus.event_id(entry['version'])}", weak=True)
+    response.last_modified = entry['updated_at']
+    response.cache_control.no_cache = True
+    return response
+
+# 速度テスト・Pingテストのジョブ実行（リクエストの処理スレッドを塞がないよう固定数のワーカーで実行）
+job_manager = JobManager(
+    settings.get('jobs', {}),
+    on_update=lambda job: event_bus.publish('jobs', {'jobs': {j['id']: j for j in job_manager.list()}},
+                                            ignore=EVENT_IGNORE_KEYS['jobs'])
+)
+
+# 定期処理のスケジューラー（1本のスレッドのイベントループで全タスクの予定を管理する）
+scheduler = Scheduler(settings.get('scheduler', {}))
+
 # モジュールインスタンス
-network_monitor = NetworkMonitor()
-audio_recorder = AudioRecorder(str(data_dir / "recordings"))
+with startup_profiler.phase('network_monitor'):
+    network_monitor = NetworkMonitor(
+        speed_test_ttl=settings.network.get('speed_test_ttl', 5),
+        ping_ttl=settings.network.get('ping_ttl', 0),
+        ping_host=settings.network.get('ping_host', '8.8.8.8')
+    )
+with startup_profiler.phase('audio_recorder'):
+    audio_recorder = AudioRecorder(
+        str(data_dir / "recordings"),
+        fast_hash=settings.recording.get('fast_hash'),
+        devices_ttl=settings.recording.get('devices_ttl', 5)
+    )
+
+# APIから呼ぶデータ取得の同時呼び出しの集約（同じ引数の取得が実行中ならその結果を共有）
+api_flight = SingleFlight('api')
 
 # Google Drive初期化（絶対パスで初期化）
 try:
-    # Google Drive用の設定を絶対パスで作成
+    # Google Drive用の設定を絶対パスで作成（設定辞書を直接渡す）
     gdrive_config = {
         'gdrive': {
             'folder_name': os.getenv('GDRIVE_FOLDER_NAME', 'RaspberryPi-Records'),  # 環境変数でカスタマイズ可能
             'credentials_file': str(data_dir / "credentials" / "credentials.json"),
-            'token_file': str(data_dir / "credentials" / "token.json")
+            'token_file': str(data_dir / "credentials" / "token.json"),
+            'discovery_cache_file': str(data_dir / "cache" / "drive_v3_discovery.json"),
+            'upload_throttle': settings.gdrive.get('upload_throttle', {}),
+            'max_upload_workers': settings.gdrive.get('max_upload_workers', 4),
+            'token_refresh_margin': settings.gdrive.get('token_refresh_margin', 600),
+            'status_result_ttl': settings.gdrive.get('status_result_ttl', 2)
         }
     }
     
-    # 一時的に設定ファイルを作成
-    import tempfile
-    import yaml
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-        yaml.dump(gdrive_config, f)
-        temp_config_path = f.name
-    
-    gdrive_manager = GDriveManager(temp_config_path)
+    with startup_profiler.phase('gdrive_manager'):
+        gdrive_manager = GDriveManager(gdrive_config)
     
-    # 一時ファイルを削除
-    os.unlink(temp_config_path)
+    # ネットワークテスト中はアップロードを一時停止（テスト結果の汚染防止）
+    network_monitor.add_test_listener(gdrive_manager.throttle.on_network_test)
     
-    print("Google Drive manager initialized with absolute paths")
+    logger.info("Google Drive manager initialized with absolute paths")
 except Exception as e:
-    print(f"Google Drive initialization failed: {e}")
-    print("Google Drive機能を無効化します")
+    logger.warning("Google Drive initialization failed, Google Drive機能を無効化します: %s", e)
     gdrive_manager = None
 
 # Google Drive用グローバル変数（互換性のため維持）
@@ -77,6 +148,81 @@ gdrive_data = {
     'message': '未設定'
 }
 
+# テレメトリのバッチ送信（ネットワーク監視データをまとめてgzip圧縮NDJSONでアップロード）
+telemetry_batcher = None
+telemetry_config = settings.gdrive.get('telemetry', {})
+if gdrive_manager and telemetry_config.get('enabled', False):
+    telemetry_batcher = TelemetryBatcher(
+        gdrive_manager,
+        str(data_dir / "telemetry"),
+        max_records=telemetry_config.get('max_records', 500),
+        max_bytes=telemetry_config.get('max_bytes', 256 * 1024),
+        max_age=telemetry_config.get('max_age', 600)
+    )
+
+# 録音ディレクトリとDriveフォルダの増分同期
+sync_config = settings.gdrive.get('sync', {})
+recording_sync = None
+if gdrive_manager:
+    recording_sync = RecordingSync(
+        gdrive_manager,
+        str(data_dir / "recordings"),
+        str(data_dir / "sync" / "recordings_manifest.json"),
+        delete_remote=sync_config.get('delete_remote', False),
+        concurrency=sync_config.get('concurrency', 2),
+        checksum_provider=audio_recorder.get_checksum,
+        active_file_provider=audio_recorder.get_active_file
+    )
+
+# 録音アーカイブ（期間内の録音を1つのtarにまとめてストリーミングアップロード）
+archive_config = settings.gdrive.get('archive', {})
+recording_archiver = None
+if gdrive_manager:
+    recording_archiver = RecordingArchiver(
+        gdrive_manager,
+        str(data_dir / "recordings"),
+        str(data_dir / "archive" / "archive_index.json"),
+        settle_seconds=archive_config.get('settle_seconds', 10)
+    )
+
+# Google Drive接続状態キャッシュ（バックグラウンド更新、リクエストはスナップショットを読むだけ）
+gdrive_status_cache = None
+if gdrive_manager:
+    gdrive_status_cache = RefreshingCache(
+        loader=gdrive_manager.get_status,
+        ttl=settings.gdrive.get('status_ttl', 60),
+        max_stale=settings.gdrive.get('status_max_stale', 600),
+        default={
+            'status': 'checking',
+            'message': '接続状態を確認中です'
+        },
+        name='gdrive-status'
+    )
+
+# crontab・Tailscale・USBデバイスの定期収集（外部コマンドはバックグラウンドでのみ実行し、結果をイベント配信）
+system_collectors = SystemCollectors(
+    settings.get('collectors', {}),
+    on_update=lambda name, result: event_bus.publish(name, result, ignore=EVENT_IGNORE_KEYS[name]),
+    is_active=event_bus.is_active
+)
+
+def on_usb_event(event: dict) -> None:
+    """USBデバイスの接続・切断（録音中のマイクが外れたら録音の停止を予約し、録音監視をすぐに実行する）"""
+    if audio_recorder.on_usb_event(event):
+        scheduler.trigger('recording')
+
+def poll_recording() -> None:
+    """録音監視（録音を止めた場合は状態を即時配信）"""
+    if audio_recorder.poll_recording():
+        scheduler.trigger('recording-events')
+
+system_collectors.usb.add_listener(on_usb_event)
+
+# /metrics 用のプロセス・イベント配信の値（各モジュールのメトリクスは計測時に集計済み）
+metrics_config = settings.get('metrics', {})
+process_metrics = ProcessMetrics(interval=metrics_config.get('process_interval', 5))
+Gauge('monitoring_event_subscribers', 'イベント配信の接続数').set_function(lambda: event_bus.subscribers)
+
 # ========================================
 # メインページ
 # ========================================
@@ -123,102 +269,81 @@ def network_page():
 @app.route('/api/network-status')
 def network_status():
     """ネットワーク状態API"""
-    return jsonify(network_monitor.get_data())
+    return snapshot_response('network', network_monitor.get_data())
 
-@app.route('/api/ping-test')
-def api_ping_test():
-    """オンデマンドPingテスト"""
-    host = request.args.get('host', settings.network['ping_host'])
+# Pingの宛先として受け付けるホスト名・IPアドレス（オプションと解釈される '-' 始まりは除く）
+PING_HOST_PATTERN = re.compile(r'^[A-Za-z0-9.:][A-Za-z0-9.:-]{0,252}$')
+
+def run_ping_test(host: str) -> dict:
+    """Pingテスト（ジョブとして実行）"""
     latency = network_monitor.ping_test(host, settings.network['ping_count'])
-    return jsonify({
+    return {
         'host': host,
         'latency': latency,
         'status': 'success' if latency else 'failed',
         'timestamp': datetime.now().strftime('%H:%M:%S')
-    })
+    }
 
-@app.route('/api/speed-test')
-def api_speed_test():
-    """オンデマンド速度テスト"""
+def run_speed_test() -> dict:
+    """速度テスト（ジョブとして実行）"""
     speed = network_monitor.internet_speed_test()
-    return jsonify({
+    return {
         'speed_mbps': speed,
         'status': 'success' if speed else 'failed',
         'timestamp': datetime.now().strftime('%H:%M:%S')
+    }
+
+def job_response(submitted):
+    """ジョブ開始APIの応答（202、実行待ちが上限に達していれば503）"""
+    job, created = submitted
+    if job is None:
+        return jsonify({
+            'success': False,
+            'message': '実行待ちのテストが多すぎます。しばらくしてから再度お試しください'
+        }), 503
+    return jsonify({'success': True, 'created': created, 'job': job}), 202
+
+@app.route('/api/ping-test', methods=['POST'])
+def api_ping_test():
+    """Pingテストのジョブ開始（同じ宛先のテストが実行中ならそのジョブを返す）"""
+    body = request.get_json(silent=True) or {}
+    host = body.get('host') or request.args.get('host') or settings.network['ping_host']
+    if not PING_HOST_PATTERN.match(host):
+        return jsonify({'success': False, 'message': f'無効なホストです: {host}'}), 400
+    return job_response(job_manager.submit('ping', run_ping_test, host, key=host))
+
+@app.route('/api/speed-test', methods=['POST'])
+def api_speed_test():
+    """速度テストのジョブ開始（実行中ならそのジョブを返す）"""
+    return job_response(job_manager.submit('speed', run_speed_test))
+
+@app.route('/api/jobs')
+def api_jobs():
+    """保持しているジョブ一覧（?kind=speed で絞り込み）と実行状況"""
+    return jsonify({
+        'jobs': job_manager.list(request.args.get('kind')),
+        'stats': job_manager.get_stats()
     })
 
+@app.route('/api/jobs/<job_id>')
+def api_job(job_id):
+    """ジョブの状態・結果"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'message': 'ジョブが見つかりません（保持期間切れの可能性があります）'}), 404
+    return jsonify({'success': True, 'job': job})
+
 # ========================================
 # デバイススキャンAPI
 # ========================================
 
 @app.route('/api/device-scan')
 def api_device_scan():
-    """簡易USBデバイススキャン（ラズパイ対応）"""
-    try:
-        import subprocess
-        import re
-        
-        devices = []
-        
-        # lsusbコマンドでUSBデバイスを取得
-        try:
-            result = subprocess.run(['lsusb'], capture_output=True, text=True, timeout=10)
-            if result.returncode == 0:
-                for line in result.stdout.strip().split('\n'):
-                    if line.strip():
-                        # lsusbの出力を解析
-                        match = re.search(r'Bus\s+(\d+)\s+Device\s+(\d+):\s+ID\s+([0-9a-f:]+)\s+(.+)', line)
-                        if match:
-                            bus, device_num, device_id, description = match.groups()
-                            
-                            # デバイスタイプを推定
-                            device_type = 'その他'
-                            desc_lower = description.lower()
-                            if ('audio' in desc_lower or 'sound' in desc_lower or 
-                                'microphone' in desc_lower or 'mic' in desc_lower or
-                                'speaker' in desc_lower or 'headphone' in desc_lower):
-                                device_type = 'オーディオ'
-                            elif 'camera' in desc_lower or 'webcam' in desc_lower:
-                                device_type = 'カメラ'
-                            elif 'storage' in desc_lower or 'disk' in desc_lower:
-                                device_type = 'ストレージ'
-                            elif 'keyboard' in desc_lower or 'mouse' in desc_lower:
-                                device_type = '入力デバイス'
-                            elif 'hub' in desc_lower:
-                                device_type = 'USBハブ'
-                            elif 'serial' in desc_lower or 'uart' in desc_lower:
-                                device_type = 'シリアル通信'
-                            elif 'root hub' in desc_lower:
-                                continue  # ルートハブは表示をスキップ
-                            
-                            devices.append({
-                                'name': description,
-                                'type': device_type,
-                                'bus': bus,
-                                'device': device_num,
-                                'id': device_id
-                            })
-        except subprocess.TimeoutExpired:
-            print("lsusb command timed out")
-        except FileNotFoundError:
-            print("lsusb command not found")
-        
-        return jsonify({
-            'devices': devices,
-            'count': len(devices),
-            'timestamp': datetime.now().strftime('%H:%M:%S'),
-            'status': 'success' if devices else 'no_devices_found'
-        })
-        
-    except Exception as e:
-        print(f"Device scan error: {e}")
-        return jsonify({
-            'devices': [],
-            'count': 0,
-            'timestamp': datetime.now().strftime('%H:%M:%S'),
-            'status': 'error',
-            'error': str(e)
-        }), 500
+    """簡易USBデバイススキャン（ラズパイ対応、キャッシュ済みの結果を返す、?refresh=1で再スキャン）"""
+    result = system_collectors.get('devices', refresh=request.args.get('refresh') == '1')
+    if result['status'] == 'error':
+        return jsonify(result), 500
+    return snapshot_response('devices', result)
 
 # ========================================
 # Crontab管理API
@@ -226,115 +351,19 @@ def api_device_scan():
 
 @app.route('/api/crontab-status')
 def api_crontab_status():
-    """Crontab状態確認API（systemd対応版）"""
-    try:
-        import subprocess
-        import os
-        
-        # systemdサービス実行時の環境変数設定
-        env = os.environ.copy()
-        env.update({
-            'PATH': '/usr/local/bin:/usr/bin:/bin:/usr/local/sbin:/usr/sbin:/sbin',
-            'USER': os.environ.get('USER', 'administrator'),
-            'HOME': os.environ.get('HOME', '/home/administrator'),
-            'LOGNAME': os.environ.get('USER', 'administrator')
-        })
-        
-        # crontab -l コマンドで現在のジョブ一覧を取得
-        result = subprocess.run(
-            ['crontab', '-l'], 
-            capture_output=True, 
-            text=True, 
-            timeout=10,
-            env=env
-        )
-        
-        if result.returncode == 0:
-            # 成功時の処理
-            all_lines = result.stdout.split('\n')
-            cron_lines = []
-            
-            for line in all_lines:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue  # 空行やコメントをスキップ
-                
-                # 基本的なフィールド数チェック
-                fields = line.split()
-                if len(fields) >= 6:
-                    cron_lines.append(line)
-            
-            active_jobs = len(cron_lines)
-            
-            return jsonify({
-                'status': 'active' if active_jobs > 0 else 'inactive',
-                'active_jobs': active_jobs,
-                'jobs': cron_lines[:10],  # 最初の10個のジョブを表示
-                'last_check': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'message': f'{active_jobs}個のアクティブジョブ' if active_jobs > 0 else 'アクティブなジョブなし',
-                'user': env.get('USER'),
-                'home': env.get('HOME')
-            })
-        else:
-            # エラー時の処理
-            error_message = 'crontabコマンドの実行に失敗しました'
-            
-            # よくあるエラーパターンの判定
-            stderr_text = result.stderr.strip() if result.stderr else ''
-            stderr_lower = stderr_text.lower()
-            
-            if 'no crontab' in stderr_lower:
-                error_message = 'このユーザーにはcrontabが設定されていません（正常状態）'
-                status = 'inactive'
-            elif 'permission denied' in stderr_lower:
-                error_message = 'crontabへのアクセス権限がありません'
-                status = 'permission_error'
-            elif 'not found' in stderr_lower:
-                error_message = 'crontabコマンドが見つかりません'
-                status = 'command_not_found'
-            else:
-                error_message = f'crontabエラー: {stderr_text}' if stderr_text else 'crontabコマンドの実行に失敗しました'
-                status = 'error'
-            
-            return jsonify({
-                'status': status,
-                'active_jobs': 0,
-                'jobs': [],
-                'last_check': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'message': error_message,
-                'debug_info': {
-                    'returncode': result.returncode,
-                    'stderr': stderr_text,
-                    'user': env.get('USER'),
-                    'home': env.get('HOME'),
-                    'path': env.get('PATH')
-                }
-            })
-            
-    except subprocess.TimeoutExpired:
-        return jsonify({
-            'status': 'timeout',
-            'active_jobs': 0,
-            'jobs': [],
-            'last_check': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'message': 'crontabコマンドがタイムアウトしました'
-        })
-    except FileNotFoundError:
-        return jsonify({
-            'status': 'command_not_found',
-            'active_jobs': 0,
-            'jobs': [],
-            'last_check': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'message': 'crontabコマンドが見つかりません（システムにインストールされていない可能性）'
-        })
-    except Exception as e:
-        return jsonify({
-            'status': 'error',
-            'active_jobs': 0,
-            'jobs': [],
-            'last_check': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'message': f'システムエラー: {str(e)}'
-        })
+    """Crontab状態確認API（キャッシュ済みの結果を返す、?refresh=1で再取得）"""
+    return snapshot_response('crontab', system_collectors.get('crontab', refresh=request.args.get('refresh') == '1'))
+
+@app.route('/api/crontab/upcoming')
+def api_crontab_upcoming():
+    """指定秒数以内（?within=、既定3600秒）に実行されるジョブAPI（次回実行の索引から返す）"""
+    system_collectors.get('crontab')
+    within = system_collectors.crontab.clamp_within(request.args.get('within', 3600, type=float))
+    return jsonify({
+        'within': within,
+        'upcoming': system_collectors.crontab.upcoming(within),
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    })
 
 # ========================================
 # Tailscale管理API
@@ -342,110 +371,20 @@ def api_crontab_status():
 
 @app.route('/api/tailscale-status')
 def api_tailscale_status():
-    """Tailscale状態確認API"""
-    try:
-        import subprocess
-        result = subprocess.run(['tailscale', 'status'], capture_output=True, text=True, timeout=10)
-        
-        if result.returncode == 0:
-            status_lines = result.stdout.strip().split('\n')
-            connected = 'offline' not in result.stdout.lower()
-            
-            # IP アドレスを抽出
-            tailscale_ip = None
-            devices_data = []
-            
-            for line in status_lines:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                    
-                parts = line.split()
-                if len(parts) >= 2:
-                    ip = parts[0] if parts[0].startswith('100.') else None
-                    name = parts[1] if len(parts) > 1 else 'Unknown'
-                    
-                    # 自分のデバイスかチェック
-                    if 'self' in line.lower() or line.endswith('(self)'):
-                        tailscale_ip = ip
-                        name = name.replace('(self)', '').strip()
-                        devices_data.append({
-                            'name': f'{name} (このデバイス)',
-                            'ip': ip,
-                            'status': 'online'
-                        })
-                    elif ip:
-                        devices_data.append({
-                            'name': name,
-                            'ip': ip,
-                            'status': 'online'
-                        })
-            
-            # 接続品質の簡易判定
-            connection_quality = 'good' if connected and tailscale_ip else 'poor'
-            
-            # システムログの模擬データ
-            logs = [
-                f'{datetime.now().strftime("%H:%M:%S")} Tailscale status check completed',
-                f'{datetime.now().strftime("%H:%M:%S")} Found {len(devices_data)} connected devices',
-                f'{datetime.now().strftime("%H:%M:%S")} VPN IP: {tailscale_ip or "N/A"}'
-            ]
-            
-            return jsonify({
-                'status': 'connected' if connected else 'disconnected',
-                'ip': tailscale_ip,
-                'ip_address': tailscale_ip,  # 互換性のため両方提供
-                'device_count': len(devices_data),
-                'devices': devices_data,
-                'connection_quality': connection_quality,
-                'logs': logs,
-                'last_check': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'message': 'Tailscale接続中' if connected else 'Tailscale切断中'
-            })
-        else:
-            return jsonify({
-                'status': 'error',
-                'ip': None,
-                'ip_address': None,
-                'device_count': 0,
-                'devices': [],
-                'connection_quality': 'poor',
-                'logs': [
-                    f'{datetime.now().strftime("%H:%M:%S")} ERROR: Tailscale command failed',
-                    f'{datetime.now().strftime("%H:%M:%S")} {result.stderr.strip() if result.stderr else "Unknown error"}'
-                ],
-                'last_check': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'message': 'Tailscaleコマンドの実行に失敗しました（未インストールの可能性）'
-            })
-            
-    except subprocess.TimeoutExpired:
-        return jsonify({
-            'status': 'timeout',
-            'ip': None,
-            'ip_address': None,
-            'device_count': 0,
-            'devices': [],
-            'connection_quality': 'poor',
-            'logs': [
-                f'{datetime.now().strftime("%H:%M:%S")} ERROR: Tailscale command timed out'
-            ],
-            'last_check': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'message': 'Tailscaleコマンドがタイムアウトしました'
-        })
-    except Exception as e:
-        return jsonify({
-            'status': 'error',
-            'ip': None,
-            'ip_address': None,
-            'device_count': 0,
-            'devices': [],
-            'connection_quality': 'poor',
-            'logs': [
-                f'{datetime.now().strftime("%H:%M:%S")} ERROR: {str(e)}'
-            ],
-            'last_check': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'message': f'エラー: {str(e)}'
-        })
+    """Tailscale状態確認API（キャッシュ済みの結果を返す、?refresh=1で再取得）"""
+    return snapshot_response('tailscale', system_collectors.get('tailscale', refresh=request.args.get('refresh') == '1'))
+
+@app.route('/api/tailscale/history')
+def api_tailscale_history():
+    """ピアごとの通信量・経路（直接/リレー）・ping応答時間の履歴API（?peer=名前・IPで絞り込み）"""
+    return jsonify(system_collectors.tailscale.get_history(request.args.get('peer')))
+
+@app.route('/api/tailscale/ping', methods=['POST'])
+def api_tailscale_ping():
+    """ピアへのtailscale pingを次の予定を待たずに実行するAPI"""
+    if not scheduler.trigger('tailscale-ping'):
+        return jsonify({'success': False, 'message': 'tailscale pingは無効になっています'}), 400
+    return jsonify({'success': True, 'message': 'tailscale pingを開始しました'})
 
 # ========================================
 # 録音機能API
@@ -483,6 +422,7 @@ def api_recording_start():
             sample_rate=sample_rate,
             channels=channels
         )
+        scheduler.trigger('recording-events')
         
         return jsonify(result)
         
@@ -497,6 +437,7 @@ def api_recording_stop():
     """録音停止API"""
     try:
         result = audio_recorder.stop_recording()
+        scheduler.trigger('recording-events')
         return jsonify(result)
     except Exception as e:
         return jsonify({
@@ -509,7 +450,7 @@ def api_recording_status():
     """録音状態取得API"""
     try:
         status = audio_recorder.get_status()
-        return jsonify(status)
+        return snapshot_response('recording', status)
     except Exception as e:
         return jsonify({
             'error': f'状態取得エラー: {str(e)}',
@@ -566,27 +507,27 @@ def gdrive_dashboard():
 
 @app.route('/api/gdrive-status')
 def api_gdrive_status():
-    """Google Drive状態API"""
+    """Google Drive状態API（キャッシュ済みスナップショットを返す、?refresh=1で再取得）"""
+    return snapshot_response('gdrive', gdrive_status_snapshot(refresh=request.args.get('refresh') == '1'))
+
+def gdrive_status_snapshot(refresh: bool = False) -> dict:
+    """Google Drive状態（キャッシュ済みスナップショット、refresh=Trueで再取得）"""
     global gdrive_data
     
-    if gdrive_manager:
+    if gdrive_status_cache:
         try:
-            if not gdrive_manager._authenticated:
-                print("Attempting Google Drive authentication...")
-                auth_success = gdrive_manager.authenticate()
-                if not auth_success:
-                    gdrive_data.update({
-                        'status': 'authentication_failed',
-                        'message': '認証に失敗しました。credentials.jsonを確認してください。',
-                        'last_check': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    })
-                    return jsonify(gdrive_data)
-            
-            status = gdrive_manager.check_connection()
+            if refresh:
+                status = gdrive_status_cache.refresh(timeout=gdrive_status_cache.wait_timeout)
+            else:
+                status = gdrive_status_cache.get()
             gdrive_data.update(status)
+            gdrive_data['cache_age'] = gdrive_status_cache.age()
+            gdrive_data['stale'] = gdrive_status_cache.is_stale()
+            # トークン情報はスナップショットではなく現在値（有効期限までの秒数が古くならないように）
+            gdrive_data['token'] = gdrive_manager.credentials.get_status()
             
         except Exception as e:
-            print(f"Google Drive API error: {e}")
+            logger.error("Google Drive API error: %s", e)
             gdrive_data.update({
                 'status': 'error',
                 'message': f'エラー: {str(e)}',
@@ -598,7 +539,7 @@ def api_gdrive_status():
             'message': 'Google Drive機能が無効です'
         })
     
-    return jsonify(gdrive_data)
+    return gdrive_data.copy()
 
 @app.route('/api/gdrive/test-upload', methods=['POST'])
 def api_gdrive_test_upload():
@@ -644,7 +585,8 @@ def api_gdrive_test_upload():
         # Google Driveにアップロード
         upload_result = gdrive_manager.upload_file(
             file_path=latest_file['filepath'],
-            filename=f"raspi_recording_{latest_file['filename']}"
+            filename=f"raspi_recording_{latest_file['filename']}",
+            md5=audio_recorder.get_checksum(latest_file['filename'])
         )
         
         if upload_result['success']:
@@ -672,7 +614,7 @@ def api_gdrive_test_upload():
             }), 500
             
     except Exception as e:
-        print(f"Google Drive test upload error: {e}")
+        logger.error("Google Drive test upload error: %s", e)
         return jsonify({
             'success': False,
             'message': f'テストアップロードエラー: {str(e)}'
@@ -714,7 +656,7 @@ def api_gdrive_recording_files():
         })
         
     except Exception as e:
-        print(f"Recording files list error: {e}")
+        logger.error("Recording files list error: %s", e)
         return jsonify({
             'files': [],
             'count': 0,
@@ -722,6 +664,231 @@ def api_gdrive_recording_files():
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }), 500
 
+@app.route('/api/gdrive/upload-files', methods=['POST'])
+def api_gdrive_upload_files():
+    """Google Drive複数ファイル並列アップロードAPI（{"filenames": [...], "concurrency": N}）"""
+    if not gdrive_manager:
+        return jsonify({
+            'success': False,
+            'message': 'Google Drive機能が無効です'
+        }), 500
+    
+    try:
+        data = request.get_json() or {}
+        filenames = data.get('filenames') or []
+        concurrency = int(data.get('concurrency', 2))
+        
+        if not filenames:
+            return jsonify({
+                'success': False,
+                'message': 'ファイル名が指定されていません'
+            }), 400
+        
+        recordings_dir = data_dir / "recordings"
+        paths = []
+        for filename in filenames:
+            filepath = os.path.join(recordings_dir, os.path.basename(filename))
+            if not os.path.exists(filepath):
+                return jsonify({
+                    'success': False,
+                    'message': f'ファイルが見つかりません: {filename}'
+                }), 404
+            paths.append(filepath)
+        
+        result = gdrive_manager.upload_files(
+            paths,
+            concurrency=concurrency,
+            filenames=[f"raspi_recording_{os.path.basename(path)}" for path in paths],
+            md5s=[audio_recorder.get_checksum(os.path.basename(path)) for path in paths]
+        )
+        
+        uploaded = [r for r in result['results'] if r['success']]
+        if uploaded:
+            # 最終アップロード情報を更新
+            global gdrive_data
+            last = uploaded[-1]
+            gdrive_data['last_upload'] = {
+                'filename': last['filename'],
+                'data_type': 'audio/wav',
+                'upload_time': last['upload_time'],
+                'web_link': last.get('web_link'),
+                'file_size': last.get('file_size'),
+                'original_file': os.path.basename(last['file_path'])
+            }
+        
+        return jsonify(result), (200 if result['success'] else 500)
+        
+    except Exception as e:
+        logger.error("Google Drive bulk upload error: %s", e)
+        return jsonify({
+            'success': False,
+            'message': f'一括アップロードエラー: {str(e)}'
+        }), 500
+
+@app.route('/api/gdrive/sync', methods=['GET', 'POST'])
+def api_gdrive_sync():
+    """録音ディレクトリ同期API（GET: 状態、POST: 同期実行 {"dry_run": true} で差分のみ計算）"""
+    if not recording_sync:
+        return jsonify({
+            'success': False,
+            'message': 'Google Drive機能が無効です'
+        }), 500
+    
+    if request.method == 'GET':
+        return jsonify(recording_sync.get_status())
+    
+    data = request.get_json(silent=True) or {}
+    result = recording_sync.sync(
+        dry_run=bool(data.get('dry_run', False)),
+        concurrency=data.get('concurrency')
+    )
+    return jsonify(result), (200 if result['success'] else 500)
+
+@app.route('/api/gdrive/archive', methods=['POST'])
+def api_gdrive_archive():
+    """録音アーカイブ作成API（{"start": "...", "end": "...", "compress": false}）"""
+    if not recording_archiver:
+        return jsonify({
+            'success': False,
+            'message': 'Google Drive機能が無効です'
+        }), 500
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        result = recording_archiver.create_archive(
+            start=data.get('start'),
+            end=data.get('end'),
+            compress=bool(data.get('compress', archive_config.get('compress', False)))
+        )
+        return jsonify(result), (200 if result['success'] else 500)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': f'期間の指定が不正です: {str(e)}'
+        }), 400
+
+@app.route('/api/gdrive/archives')
+def api_gdrive_archives():
+    """録音アーカイブ一覧API"""
+    if not recording_archiver:
+        return jsonify({
+            'success': False,
+            'message': 'Google Drive機能が無効です'
+        }), 500
+    
+    archives = recording_archiver.list_archives()
+    return jsonify({
+        'success': True,
+        'archives': archives,
+        'count': len(archives)
+    })
+
+@app.route('/api/gdrive/archives/<file_id>/<filename>')
+def api_gdrive_archive_member(file_id, filename):
+    """アーカイブ内の録音1件を範囲指定ダウンロードで取り出してダウンロード"""
+    if not recording_archiver:
+        return jsonify({
+            'error': 'Google Drive機能が無効です'
+        }), 500
+    
+    filename = os.path.basename(filename)
+    dest_path = str(data_dir / "archive" / "restored" / filename)
+    result = recording_archiver.fetch_member(file_id, filename, dest_path)
+    if not result['success']:
+        return jsonify({
+            'error': result['message']
+        }), 404
+    
+    return send_file(
+        dest_path,
+        as_attachment=True,
+        download_name=filename,
+        mimetype='audio/wav'
+    )
+
+@app.route('/api/gdrive/upload-rate')
+def api_gdrive_upload_rate():
+    """アップロード帯域制御状態API（現在の速度・上限・一時停止状態）"""
+    if not gdrive_manager:
+        return jsonify({
+            'enabled': False,
+            'message': 'Google Drive機能が無効です'
+        })
+    
+    return jsonify(gdrive_manager.throttle.get_stats())
+
+@app.route('/api/gdrive/telemetry')
+def api_gdrive_telemetry():
+    """テレメトリバッチ送信状態API"""
+    if not telemetry_batcher:
+        return jsonify({
+            'enabled': False,
+            'message': 'テレメトリ送信は無効です（gdrive.telemetry.enabled）'
+        })
+    
+    status = telemetry_batcher.get_status()
+    status['enabled'] = True
+    return jsonify(status)
+
+@app.route('/api/gdrive/telemetry/batches')
+def api_gdrive_telemetry_batches():
+    """指定時間範囲（?start=&end=、ISO形式）を含むテレメトリバッチ検索API"""
+    if not telemetry_batcher:
+        return jsonify({
+            'batches': [],
+            'count': 0,
+            'message': 'テレメトリ送信は無効です（gdrive.telemetry.enabled）'
+        })
+    
+    try:
+        batches = telemetry_batcher.find_batches(request.args.get('start'), request.args.get('end'))
+    except ValueError as e:
+        return jsonify({
+            'batches': [],
+            'count': 0,
+            'message': f'時刻の形式が不正です: {str(e)}'
+        }), 400
+    
+    return jsonify({
+        'batches': batches,
+        'count': len(batches),
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    })
+
+@app.route('/api/gdrive/telemetry/flush', methods=['POST'])
+def api_gdrive_telemetry_flush():
+    """テレメトリ即時送信API"""
+    if not telemetry_batcher:
+        return jsonify({
+            'success': False,
+            'message': 'テレメトリ送信は無効です（gdrive.telemetry.enabled）'
+        }), 400
+    
+    result = telemetry_batcher.flush()
+    return jsonify(result), (200 if result['success'] else 500)
+
+@app.route('/api/gdrive/files')
+def api_gdrive_files():
+    """Google Drive上のファイル一覧API（ページ単位、next_page_tokenで続きを取得）"""
+    if not gdrive_manager:
+        return jsonify({
+            'success': False,
+            'message': 'Google Drive機能が無効です'
+        }), 500
+    
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 1000)
+    except ValueError:
+        limit = 20
+    
+    result = list_drive_files(limit, request.args.get('page_token'))
+    return jsonify(result), (200 if result['success'] else 500)
+
+@api_flight.wrap(key=lambda limit, page_token: ('gdrive-files', limit, page_token))
+def list_drive_files(limit: int, page_token: str) -> dict:
+    """Google Drive上のファイル一覧（同じページの取得が実行中ならその結果を共有）"""
+    return gdrive_manager.list_files(limit=limit, page_token=page_token)
+
 @app.route('/api/gdrive/upload-file', methods=['POST'])
 def api_gdrive_upload_file():
     """Google Drive指定ファイルアップロードAPI"""
@@ -753,7 +920,8 @@ def api_gdrive_upload_file():
         # Google Driveにアップロード
         upload_result = gdrive_manager.upload_file(
             file_path=filepath,
-            filename=f"raspi_recording_{filename}"
+            filename=f"raspi_recording_{filename}",
+            md5=audio_recorder.get_checksum(filename)
         )
         
         if upload_result['success']:
@@ -780,71 +948,264 @@ def api_gdrive_upload_file():
             }), 500
             
     except Exception as e:
-        print(f"Google Drive file upload error: {e}")
+        logger.error("Google Drive file upload error: %s", e)
         return jsonify({
             'success': False,
             'message': f'ファイルアップロードエラー: {str(e)}'
         }), 500
 
+# ========================================
+# イベント配信API（Server-Sent Events）
+# ========================================
+
+@app.route('/api/events')
+def api_events():
+    """状態変更のプッシュ配信（?topics=network,recording で購読トピックを指定）"""
+    topics = [t for t in request.args.get('topics', '').split(',') if t] or None
+    # IDは起動ごとのトークン付き（再起動前のIDなら全件を送り直す）
+    since = event_bus.parse_id(request.headers.get('Last-Event-ID') or request.args.get('since'))
+    
+    # 配信中の接続はワーカースレッドを1つ占有するため、同時接続数を制限する（超過時はポーリングに切り替わる）
+    if event_bus.subscribers >= settings.get('events.max_subscribers', 4):
+        return jsonify({
+            'error': 'イベント配信の同時接続数が上限に達しています'
+        }), 503, {'Retry-After': '30'}
+    
+    def stream():
+        version = since
+        with event_bus.subscription():
+            # 再接続までの待ち時間（ミリ秒）
+            yield 'retry: 5000\n\n'
+            while not event_bus.closed:
+                version, changes = event_bus.wait(version, topics, timeout=15)
+                if not changes:
+                    # 無通信で切断されないよう定期的にコメント行を送る
+                    yield ': keepalive\n\n'
+                    continue
+                for topic, entry in changes:
+                    yield f"id: {event_bus.event_id(entry['version'])}\nevent: {topic}\ndata: {entry['json']}\n\n"
+    
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/dashboard')
+def api_dashboard():
+    """
+    全体状態のスナップショット（メモリ上の最新状態から1回で返す）
+    ?fields=network,recording.is_recording でトピック・キーを選択、?since=<version> で変更分のみ
+    """
+    fields = {}
+    for field in request.args.get('fields', '').split(','):
+        topic, _, key = field.strip().partition('.')
+        if not topic:
+            continue
+        if key:
+            if fields.get(topic, []) is not None:
+                fields.setdefault(topic, []).append(key)
+        else:
+            fields[topic] = None
+    version, full, parts = event_bus.snapshot(event_bus.parse_id(request.args.get('since')), fields or None)
+    
+    # 各トピックは配信用に作成済みのJSONを連結する（トピックごとの再エンコードを避ける）
+    body = '{"version": %s, "full": %s, "timestamp": %s, "data": {%s}}' % (
+        app.json.dumps(event_bus.event_id(version)),
+        'true' if full else 'false',
+        app.json.dumps(datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
+        ', '.join(f'{app.json.dumps(topic)}: {data}' for topic, data in parts.items())
+    )
+    response = Response(body, mimetype='application/json', headers={'Cache-Control': 'no-cache'})
+    # 同じURL（fields / since）で状態のバージョンが変わっていなければ304
+    response.set_etag(f"dashboard-{event_bus.event_id(version)}", weak=True)
+    return response
+
+@app.route('/api/events/stats')
+def api_events_stats():
+    """イベント配信状態API"""
+    return jsonify(event_bus.get_stats())
+
+# ========================================
+# システム情報API
+# ========================================
+
+@app.route('/api/startup-report')
+def api_startup_report():
+    """起動時間・メモリ使用量レポート"""
+    report = startup_profiler.report()
+    # Google APIクライアントは遅延読み込みのため、読み込み済みかどうかと所要時間を別に表示
+    report['google_client'] = dict(google_client.stats)
+    # ログの書き込みキュー（滞留数・破棄数）
+    report['logging'] = get_logging_stats()
+    return jsonify(report)
+
+@app.route('/api/http-stats')
+def api_http_stats():
+    """応答圧縮・条件付きGETの統計API"""
+    return jsonify(http_cache.get_stats())
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus形式のメトリクス（集計済みの値を出力するだけで外部コマンド・APIは呼ばない）"""
+    if not metrics_config.get('enabled', True):
+        return jsonify({'success': False, 'message': 'メトリクスは無効です'}), 404
+    response = Response(REGISTRY.render(), content_type=METRICS_CONTENT_TYPE)
+    response.cache_control.no_store = True
+    return response
+
+@app.route('/api/timing')
+def api_timing():
+    """ルート別の処理時間（件数・平均・分位点・最大）・処理中のリクエスト・低速リクエストログAPI"""
+    if request_timer is None:
+        return jsonify({'success': False, 'message': '処理時間の計測は無効です'}), 404
+    return jsonify(request_timer.get_stats(include_slow=request.args.get('slow', '1') != '0'))
+
+@app.route('/api/scheduler')
+def api_scheduler():
+    """定期処理のタスクごとの実行回数・実行時間・予定時刻からの遅れ（ラグ）API"""
+    return jsonify(scheduler.get_stats())
+
+@app.route('/api/singleflight')
+def api_singleflight():
+    """同時呼び出しの集約状況API（グループごとの実行数・共有数・再利用数・集約率）"""
+    return jsonify(get_singleflight_stats())
+
+@app.route('/api/system/collectors')
+def api_system_collectors():
+    """crontab・Tailscale・USBデバイス収集の状態API（キャッシュ経過時間・取得回数）"""
+    return jsonify(system_collectors.get_stats())
+
 # ========================================
 # バックグラウンド処理
 # ========================================
 
-def network_monitor_loop():
-    """ネットワーク監視ループ"""
-    while True:
-        try:
-            network_monitor.update_data()
-            time.sleep(settings.network['update_interval'])
-        except Exception as e:
-            print(f"Network monitor loop error: {e}")
-            time.sleep(5)
+def update_network() -> None:
+    """ネットワーク状態の更新と配信（network.update_interval 秒ごと）"""
+    network_monitor.update_data()
+    event_bus.publish('network', network_monitor.get_data(), ignore=EVENT_IGNORE_KEYS['network'])
+    if telemetry_batcher:
+        telemetry_batcher.add(DataSource.create_network_data(network_monitor.get_data()))
+        telemetry_batcher.flush_if_due()
+
+def sync_recordings() -> None:
+    """録音ディレクトリの定期同期（gdrive.sync.interval 秒ごと）"""
+    if gdrive_manager._authenticated:
+        result = recording_sync.sync()
+        logger.info("Recording sync: %s", result.get('message'))
 
-def recording_monitor_loop():
-    """録音監視ループ"""
-    audio_recorder.monitor_recording()
+def publish_recording_status() -> None:
+    """録音状態の配信（変わった時だけ購読者に送る）"""
+    event_bus.publish('recording', audio_recorder.get_status(), ignore=EVENT_IGNORE_KEYS['recording'])
+
+def publish_gdrive_status() -> None:
+    """Google Drive状態の配信（初回はキャッシュの取得完了を待つためブロッキングタスクとして実行）"""
+    event_bus.publish('gdrive', gdrive_status_snapshot(), ignore=EVENT_IGNORE_KEYS['gdrive'])
+
+def schedule_background_tasks() -> None:
+    """定期処理をスケジューラーに登録（外部コマンド・通信を伴う処理はワーカースレッドで実行）"""
+    events_config = settings.get('events', {})
+    
+    scheduler.add_periodic('network', update_network, settings.network['update_interval'], timeout=60)
+    scheduler.add_periodic('recording', poll_recording, 1, timeout=30)
+    # 録音状態は録音の開始・停止時にも trigger('recording-events') で即時配信する
+    scheduler.add_periodic('recording-events', publish_recording_status,
+                           events_config.get('recording_interval', 1), blocking=False)
+    scheduler.add_periodic('gdrive-events', publish_gdrive_status, events_config.get('gdrive_interval', 5))
+    
+    # crontab・Tailscale・USBデバイスはSystemCollectorsが取得時に配信する
+    system_collectors.schedule(scheduler)
+    if gdrive_status_cache:
+        gdrive_status_cache.schedule(scheduler)
+    
+    if recording_sync and sync_config.get('enabled', False):
+        interval = sync_config.get('interval', 900)
+        scheduler.add_periodic('gdrive-sync', sync_recordings, interval, timeout=interval)
+
+_background_lock = threading.Lock()
+_background_started = False
+
+def start_background_tasks() -> bool:
+    """バックグラウンド処理開始（2回目以降の呼び出しでは何もしない）"""
+    global _background_started
+    
+    with _background_lock:
+        if _background_started:
+            return False
+        _background_started = True
+    
+    logger.info("バックグラウンド処理を開始")
+    
+    schedule_background_tasks()
+    scheduler.start()
+    
+    return True
+
+def stop_background_tasks() -> None:
+    """バックグラウンド処理停止（録音中なら停止してファイルを確定し、配信中のストリームを終了する）"""
+    logger.info("バックグラウンド処理を停止")
+    scheduler.stop()
+    event_bus.close()
+    if request_timer:
+        request_timer.stop()
+    job_manager.shutdown()
+    system_collectors.stop()
+    
+    if gdrive_manager:
+        gdrive_manager.credentials.stop()
+    
+    if audio_recorder.data['is_recording']:
+        result = audio_recorder.stop_recording()
+        logger.info("録音を停止しました: %s", result.get('message'))
+    
+    if telemetry_batcher:
+        result = telemetry_batcher.flush()
+        logger.info("Telemetry flush: %s", result.get('message'))
+    
+    # キューに残ったログを書き出してから書き込みスレッドを止める（最後に行う）
+    stop_logging()
 
 # ========================================
 # アプリケーション起動
 # ========================================
 
 if __name__ == '__main__':
-    print("=" * 50)
-    print("🚀 Raspberry Pi モニタリングシステム (モジュラー版)")
-    print("=" * 50)
-    
     # 設定情報表示
-    print(f"📊 設定情報:")
-    print(f"  - ネットワーク更新間隔: {settings.network['update_interval']}秒")
-    print(f"  - 録音保存先: {audio_recorder.save_directory}")
-    print(f"  - Google Drive: {'有効' if gdrive_manager else '無効'}")
+    logger.info(
+        "Raspberry Pi モニタリングシステム (モジュラー版) - ネットワーク更新間隔: %s秒, 録音保存先: %s, Google Drive: %s",
+        settings.network['update_interval'], audio_recorder.save_directory, '有効' if gdrive_manager else '無効'
+    )
     
-    # バックグラウンド処理開始
-    print("🔄 バックグラウンド処理を開始...")
+    server_mode = settings.app.get('server', 'production')
+    debug = settings.app.get('debug', False)
+    use_reloader = server_mode == 'development' and settings.app.get('reloader', debug)
     
-    network_thread = threading.Thread(target=network_monitor_loop, daemon=True)
-    network_thread.start()
+    # リローダー使用時は親プロセス（ファイル監視のみ）ではバックグラウンド処理を開始しない
+    if not use_reloader or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_tasks()
     
-    recording_thread = threading.Thread(target=recording_monitor_loop, daemon=True)
-    recording_thread.start()
+    startup_profiler.mark_ready()
+    startup_profiler.log_report()
     
     # アクセス情報表示
-    print("🌐 アクセス情報:")
-    print(f"  - メインページ（ダッシュボード）: http://localhost:{settings.app['port']}/")
-    print(f"  - ネットワークテスト: http://localhost:{settings.app['port']}/network")
-    print(f"  - 録音機能: http://localhost:{settings.app['port']}/recording")
-    if gdrive_manager:
-        print(f"  - Google Drive: http://localhost:{settings.app['port']}/gdrive")
-    print("📝 その他の管理ページ:")
-    print(f"  - 詳細監視（レガシー）: http://localhost:{settings.app['port']}/network-monitor")
-    print(f"  - Tailscale管理: http://localhost:{settings.app['port']}/tailscale")
-    print(f"  - Crontab管理: http://localhost:{settings.app['port']}/crontab")
-    print(f"  - デバイス管理: http://localhost:{settings.app['port']}/devices")
-    print("=" * 50)
-    
-    # Flaskアプリ開始
-    app.run(
-        host=settings.app['host'],
-        port=settings.app['port'],
-        debug=settings.app['debug']
-    )
+    pages = ['/', '/network', '/recording'] + (['/gdrive'] if gdrive_manager else []) + \
+        ['/network-monitor', '/tailscale', '/crontab', '/devices']
+    logger.info("アクセス情報: %s", ', '.join(f"http://localhost:{settings.app['port']}{page}" for page in pages))
+    
+    if server_mode == 'development':
+        # Flask開発サーバー（デバッガ・リローダー付き、本番では使わない）
+        app.run(
+            host=settings.app['host'],
+            port=settings.app['port'],
+            debug=debug,
+            use_reloader=use_reloader
+        )
+        stop_background_tasks()
+    else:
+        serve(
+            app,
+            settings.app['host'],
+            settings.app['port'],
+            settings.app,
+            on_shutdown=[stop_background_tasks]
+        )
@@ -3,10 +3,13 @@
 アプリケーション全体の設定を一元管理
 """
 
+import logging
 import os
 import yaml
 from typing import Dict, Any, Optional
 
+logger = logging.getLogger(__name__)
+
 class Settings:
     """設定管理クラス"""
     
@@ -23,50 +26,173 @@ class Settings:
     def _load_config(self) -> Dict[str, Any]:
         """設定ファイル読み込み"""
         if not self.config_path:
-            print("設定ファイルパスが未指定 - デフォルト設定を使用")
+            logger.info("設定ファイルパスが未指定 - デフォルト設定を使用")
             return self._get_default_config()
             
         try:
             if not os.path.exists(self.config_path):
-                print(f"設定ファイルが見つかりません: {self.config_path}")
-                print("デフォルト設定を使用します")
+                logger.warning("設定ファイルが見つかりません: %s (デフォルト設定を使用します)", self.config_path)
                 return self._get_default_config()
                 
             with open(self.config_path, 'r', encoding='utf-8') as f:
                 config = yaml.safe_load(f) or {}
-                print(f"設定ファイル読み込み成功: {self.config_path}")
-                print(f"読み込んだキー: {list(config.keys())}")
+                logger.info("設定ファイル読み込み成功: %s (キー: %s)", self.config_path, list(config.keys()))
                 return config
         except Exception as e:
-            print(f"設定ファイル読み込みエラー: {e}")
-            print("デフォルト設定を使用します")
+            logger.error("設定ファイル読み込みエラー: %s (デフォルト設定を使用します)", e)
             return self._get_default_config()
     
     def _get_default_config(self) -> Dict[str, Any]:
         """デフォルト設定"""
         return {
             'app': {
-                'debug': True,
+                'debug': False,
                 'host': '0.0.0.0',
-                'port': 5000
+                'port': 5000,
+                'server': 'production',
+                'threads': 8,
+                'backlog': 32,
+                'keep_alive': True,
+                'keepalive_timeout': 5,
+                'request_timeout': 30,
+                'shutdown_timeout': 5
             },
             'network': {
                 'update_interval': 10,
                 'device_scan_interval': 60,
                 'ping_host': '8.8.8.8',
-                'ping_count': 3
+                'ping_count': 3,
+                'speed_test_ttl': 5,
+                'ping_ttl': 0
             },
             'recording': {
                 'default_duration': 10,
                 'default_sample_rate': 44100,
                 'default_channels': 2,
-                'save_directory': '../data/recordings'
+                'save_directory': '../data/recordings',
+                'fast_hash': None,
+                'devices_ttl': 5
             },
             'gdrive': {
                 'folder_name': 'raspi-monitoring',
                 'credentials_file': '../data/credentials/credentials.json',
                 'token_file': '../data/credentials/token.json',
-                'auto_upload': False
+                'auto_upload': False,
+                'status_ttl': 60,
+                'status_max_stale': 600,
+                'status_result_ttl': 2,
+                'max_upload_workers': 4,
+                'token_refresh_margin': 600,
+                'client_options': None,
+                'upload_throttle': {
+                    'enabled': False,
+                    'rate_kbps': 0,
+                    'burst_kb': 512,
+                    'link_share': 0.5,
+                    'pause_during_tests': True,
+                    'schedule': []
+                },
+                'telemetry': {
+                    'enabled': False,
+                    'max_records': 500,
+                    'max_bytes': 262144,
+                    'max_age': 600
+                },
+                'sync': {
+                    'enabled': False,
+                    'interval': 900,
+                    'delete_remote': False,
+                    'concurrency': 2
+                },
+                'archive': {
+                    'compress': False,
+                    'settle_seconds': 10
+                }
+            },
+            'events': {
+                'recording_interval': 1,
+                'gdrive_interval': 5,
+                'max_subscribers': 4
+            },
+            'http': {
+                'compression': True,
+                'compress_min_size': 512,
+                'compress_level': 6,
+                'brotli_quality': 5,
+                'static_max_age': 31536000
+            },
+            'collectors': {
+                'crontab': {
+                    'interval': 15,
+                    'user': None,
+                    'spool_dir': '/var/spool/cron/crontabs',
+                    'system_files': [],
+                    'fallback_interval': 300,
+                    'index_horizon': 86400,
+                    'max_occurrences': 1440,
+                    'log_interval': 60,
+                    'logs': {
+                        'enabled': True,
+                        'syslog_files': ['/var/log/syslog', '/var/log/cron.log'],
+                        'journal': True,
+                        'lookback': 86400,
+                        'history_size': 10
+                    }
+                },
+                'tailscale': {
+                    'interval': 30,
+                    'binary': 'tailscale',
+                    'timeout': 10,
+                    'history_size': 120,
+                    'max_peers': 64,
+                    'ping': {
+                        'enabled': True,
+                        'interval': 60,
+                        'timeout': 5,
+                        'max_peers': 8
+                    }
+                },
+                'devices': {
+                    'interval': 30,
+                    'sysfs_root': '/sys/bus/usb/devices',
+                    'hotplug': True,
+                    'event_history': 50
+                },
+                'max_stale': 600,
+                'wait_timeout': 10
+            },
+            'metrics': {
+                'enabled': True,
+                'process_interval': 5
+            },
+            'timing': {
+                'enabled': True,
+                'slow_threshold': 1.0,
+                'slow_log_size': 50,
+                'max_samples': 5,
+                'sample_interval': 0.2,
+                'stack_depth': 12,
+                'exclude_paths': ['/api/events']
+            },
+            'jobs': {
+                'max_workers': 2,
+                'max_pending': 8,
+                'retention': 600,
+                'max_finished': 50
+            },
+            'scheduler': {
+                'max_workers': None,
+                'default_timeout': 60
+            },
+            'logging': {
+                'level': 'INFO',
+                'format': 'text',
+                'file': None,
+                'max_bytes': 5242880,
+                'backup_count': 3,
+                'queue_size': 10000,
+                'levels': {'werkzeug': 'WARNING'},
+                'rate_limit': {'enabled': True, 'interval': 60, 'burst': 5}
             }
         }
     
@@ -102,7 +228,7 @@ class Settings:
                 yaml.dump(self._config, f, default_flow_style=False, allow_unicode=True)
             return True
         except Exception as e:
-            print(f"設定ファイル保存エラー: {e}")
+            logger.error("設定ファイル保存エラー: %s", e)
             return False
     
     @property
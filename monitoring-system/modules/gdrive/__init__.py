@@ -5,5 +5,10 @@ Google Drive連携機能を提供
 
 from .manager import GDriveManager
 from .data_sources import DataSource, IoTDataSource, RecordingDataSource
+from .telemetry import TelemetryBatcher
+from .sync import RecordingSync
+from .credentials import CredentialManager
+from .archive import RecordingArchiver, StreamingUpload
 
-__all__ = ['GDriveManager', 'DataSource', 'IoTDataSource', 'RecordingDataSource']
+__all__ = ['GDriveManager', 'DataSource', 'IoTDataSource', 'RecordingDataSource', 'TelemetryBatcher', 'RecordingSync',
+           'CredentialManager', 'RecordingArchiver', 'StreamingUpload']
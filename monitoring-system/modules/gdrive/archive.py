@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+録音アーカイブモジュール
+指定期間の録音をtar（任意でgzip）にまとめ、ディスクに書き出さずにレジューム可能アップロードへ直接流し込む。
+各メンバーのオフセットをマニフェストに記録し、1ファイルだけを範囲指定ダウンロードで取り出せるようにする。
+"""
+
+import json
+import logging
+import os
+import tarfile
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+
+from .metrics import API_LATENCY, API_RETRIES
+
+logger = logging.getLogger(__name__)
+
+# レジューム可能アップロードの途中チャンクは256KBの倍数である必要がある
+CHUNK_ALIGN = 256 * 1024
+
+# 範囲指定ダウンロードの1回あたりのサイズ
+FETCH_PIECE_SIZE = 8 * 1024 * 1024
+
+class StreamingUpload:
+    """サイズ未定のデータを順次送信するレジューム可能アップロード（Content-Range の総サイズは最後まで * ）"""
+
+    def __init__(self, gdrive_manager: Any, filename: str, mimetype: str,
+                 chunk_size: Optional[int] = None, max_retries: int = 5):
+        self.manager = gdrive_manager
+        self.filename = filename
+        self.upload_id = uuid.uuid4().hex[:12]
+        chunk_size = chunk_size or gdrive_manager.chunk_size
+        self.chunk_size = max(CHUNK_ALIGN, chunk_size // CHUNK_ALIGN * CHUNK_ALIGN)
+        self.max_retries = max_retries
+
+        self.http = gdrive_manager._authorized_http()
+        self.session_url = gdrive_manager.start_upload_session(filename, mimetype, self.http)
+        self._buffer = bytearray()
+        self.sent = 0
+        self.retries = 0
+        self.result = None
+
+    def write(self, data: bytes) -> None:
+        """データ追加（チャンクサイズに達した分を送信）"""
+        self._buffer.extend(data)
+        while len(self._buffer) >= self.chunk_size:
+            chunk = bytes(self._buffer[:self.chunk_size])
+            del self._buffer[:self.chunk_size]
+            self._send(chunk, final=False)
+
+    def finish(self) -> Dict[str, Any]:
+        """残りを送信して総サイズを確定し、作成されたファイル情報を返す"""
+        chunk = bytes(self._buffer)
+        self._buffer.clear()
+        self._send(chunk, final=True)
+        self.manager.throttle.set_current_upload(self.upload_id, None)
+        return self.result
+
+    def abort(self) -> None:
+        """送信中止（進行中アップロード表示から削除）"""
+        self.manager.throttle.set_current_upload(self.upload_id, None)
+
+    def _send(self, data: bytes, final: bool) -> None:
+        """1チャンク送信（途中までしか受理されなかった分は送り直し、通信エラーは受信済み位置を確認して再送）"""
+        throttle = self.manager.throttle
+        total = self.sent + len(data) if final else None
+        throttle.acquire(len(data))
+        started = time.monotonic()
+        first_offset = self.sent
+        attempt = 0
+
+        while True:
+            resp, content = self._put(data, total)
+            if resp is None or resp.status >= 500 or resp.status == 429:
+                if attempt >= self.max_retries:
+                    raise RuntimeError(f"アップロード失敗: {self._describe(resp, content)}")
+                attempt += 1
+                self.retries += 1
+                API_RETRIES.labels('resumable').inc()
+                time.sleep(min(2 ** attempt, 30))
+                # 受信済み位置を問い合わせ、その続きから送り直す
+                resp, content = self._put(b'', total, status_query=True)
+                if resp is None or resp.status >= 500 or resp.status == 429:
+                    continue
+
+            if resp.status in (200, 201):
+                self.sent = total
+                self.result = json.loads(content)
+                break
+            if resp.status != 308:
+                raise RuntimeError(f"アップロード失敗: {self._describe(resp, content)}")
+
+            committed = self._committed(resp)
+            data = data[committed - self.sent:]
+            self.sent = committed
+            if not data and not final:
+                break
+
+        throttle.record_sent(self.sent - first_offset, time.monotonic() - started)
+        throttle.set_current_upload(self.upload_id, {
+            'filename': self.filename,
+            'bytes_sent': self.sent,
+            'total_bytes': total
+        })
+
+    def _put(self, data: bytes, total: Optional[int], status_query: bool = False) -> tuple:
+        """PUTリクエスト（通信エラー時は (None, 例外メッセージ) ）"""
+        size = '*' if total is None else str(total)
+        if data and not status_query:
+            content_range = f"bytes {self.sent}-{self.sent + len(data) - 1}/{size}"
+        else:
+            content_range = f"bytes */{size}"
+            data = b''
+        try:
+            with API_LATENCY.time('upload_chunk'):
+                return self.http.request(self.session_url, 'PUT', body=data, headers={
+                    'Content-Length': str(len(data)),
+                    'Content-Range': content_range
+                })
+        except Exception as e:
+            return None, str(e).encode('utf-8')
+
+    @staticmethod
+    def _committed(resp: Any) -> int:
+        """308レスポンスのRangeヘッダーから受信済みバイト数を取得"""
+        range_header = resp.get('range')
+        if not range_header:
+            return 0
+        return int(range_header.rsplit('-', 1)[1]) + 1
+
+    @staticmethod
+    def _describe(resp: Any, content: bytes) -> str:
+        """エラー内容の表示用文字列"""
+        message = content.decode('utf-8', 'replace')[:200] if content else ''
+        return f"HTTP {resp.status} {message}" if resp is not None else message
+
+class _ArchiveStream:
+    """tarfileの出力先（非圧縮での位置を数え、圧縮時はtarメンバーごとに独立したgzipメンバーにする）"""
+
+    def __init__(self, upload: StreamingUpload, compress: bool):
+        self.upload = upload
+        self.compress = compress
+        self.position = 0   # 非圧縮tarでの位置
+        self.written = 0    # アップロードしたオブジェクトでの位置
+        self._compressor = None
+
+    def tell(self) -> int:
+        return self.position
+
+    def write(self, data: bytes) -> int:
+        size = len(data)
+        self.position += size
+        if self.compress:
+            if self._compressor is None:
+                self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+            data = self._compressor.compress(data)
+        self._emit(data)
+        return size
+
+    def end_member(self) -> None:
+        """gzipメンバーを閉じる（連結したgzipは1つの .tar.gz として展開できる）"""
+        if self._compressor is not None:
+            self._emit(self._compressor.flush())
+            self._compressor = None
+
+    def _emit(self, data: bytes) -> None:
+        if data:
+            self.upload.write(data)
+            self.written += len(data)
+
+class RecordingArchiver:
+    """期間内の録音を1つのアーカイブとしてGoogle Driveへストリーミングアップロード"""
+
+    def __init__(self, gdrive_manager: Any, recordings_dir: str, index_file: str,
+                 extensions: tuple = ('.wav',), remote_prefix: str = 'raspi_archive_',
+                 settle_seconds: float = 10):
+        """settle_seconds: 更新からこの秒数以内のファイル（録音中の可能性がある）は対象外"""
+        self.gdrive_manager = gdrive_manager
+        self.recordings_dir = os.path.abspath(recordings_dir)
+        self.index_file = index_file
+        self.extensions = extensions
+        self.remote_prefix = remote_prefix
+        self.settle_seconds = settle_seconds
+
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    # ---------- 作成 ----------
+
+    def select(self, start: Union[str, datetime, None] = None,
+               end: Union[str, datetime, None] = None) -> List[Dict[str, Any]]:
+        """更新時刻が期間内の録音ファイル（古い順）"""
+        start_ts = self._to_datetime(start).timestamp() if start else None
+        end_ts = self._to_datetime(end).timestamp() if end else None
+        settled = time.time() - self.settle_seconds
+
+        files = []
+        if not os.path.isdir(self.recordings_dir):
+            return files
+        with os.scandir(self.recordings_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.endswith(self.extensions):
+                    continue
+                stat = entry.stat()
+                if stat.st_mtime > settled:
+                    continue
+                if (start_ts and stat.st_mtime < start_ts) or (end_ts and stat.st_mtime > end_ts):
+                    continue
+                files.append({'filename': entry.name, 'path': entry.path,
+                              'size': stat.st_size, 'mtime': stat.st_mtime})
+        files.sort(key=lambda f: (f['mtime'], f['filename']))
+        return files
+
+    def create_archive(self, start: Union[str, datetime, None] = None,
+                       end: Union[str, datetime, None] = None,
+                       compress: bool = False) -> Dict[str, Any]:
+        """期間内の録音をアーカイブしてアップロード"""
+        if not self.gdrive_manager._authenticated:
+            return {'success': False, 'message': '認証が必要です'}
+        if not self._lock.acquire(blocking=False):
+            return {'success': False, 'message': 'アーカイブ作成中です'}
+
+        upload = None
+        started = time.monotonic()
+        try:
+            files = self.select(start, end)
+            if not files:
+                return {'success': False, 'message': '対象の録音ファイルがありません'}
+
+            first = datetime.fromtimestamp(files[0]['mtime'])
+            last = datetime.fromtimestamp(files[-1]['mtime'])
+            filename = (f"{self.remote_prefix}{first.strftime('%Y%m%d_%H%M%S')}_"
+                        f"{last.strftime('%Y%m%d_%H%M%S')}.tar" + ('.gz' if compress else ''))
+            mimetype = 'application/gzip' if compress else 'application/x-tar'
+
+            upload = StreamingUpload(self.gdrive_manager, filename, mimetype)
+            stream = _ArchiveStream(upload, compress)
+            members = []
+
+            with tarfile.open(fileobj=stream, mode='w', format=tarfile.PAX_FORMAT) as tar:
+                for file in files:
+                    header_offset = stream.position
+                    gzip_start = stream.written
+                    info = tar.gettarinfo(file['path'], arcname=file['filename'])
+                    with open(file['path'], 'rb') as f:
+                        tar.addfile(info, f)
+                    stream.end_member()
+
+                    padded = -(-info.size // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+                    member = {
+                        'name': file['filename'],
+                        'size': info.size,
+                        'mtime': datetime.fromtimestamp(file['mtime']).isoformat(),
+                        'header_offset': header_offset,
+                        'data_offset': tar.offset - padded
+                    }
+                    if compress:
+                        member['gzip_start'] = gzip_start
+                        member['gzip_end'] = stream.written
+                    members.append(member)
+            # 終端ブロック（tarfileのclose時に書き込まれる）
+            stream.end_member()
+
+            file = upload.finish()
+            manifest = {
+                'file_id': file['id'],
+                'filename': file.get('name', filename),
+                'compress': compress,
+                'start': members[0]['mtime'],
+                'end': members[-1]['mtime'],
+                'member_count': len(members),
+                'raw_bytes': stream.position,
+                'archive_bytes': stream.written,
+                'md5Checksum': file.get('md5Checksum'),
+                'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'members': members
+            }
+
+            # マニフェストをアーカイブと並べて保存（ローカルの索引が失われても取り出せるように）
+            manifest_upload = self.gdrive_manager.upload_data(manifest, f"{manifest['filename']}.manifest.json")
+            manifest['manifest_file_id'] = manifest_upload.get('file_id')
+
+            self._index.append(manifest)
+            self._save_index()
+
+            elapsed = time.monotonic() - started
+            logger.info("録音アーカイブ送信: %s (%d件, %d→%d bytes, %.1f秒)",
+                        manifest['filename'], len(members), stream.position, stream.written, elapsed)
+            return {
+                'success': True,
+                'file_id': manifest['file_id'],
+                'filename': manifest['filename'],
+                'member_count': len(members),
+                'raw_bytes': manifest['raw_bytes'],
+                'archive_bytes': manifest['archive_bytes'],
+                'retries': upload.retries,
+                'elapsed_seconds': round(elapsed, 2),
+                'manifest_file_id': manifest['manifest_file_id'],
+                'message': f'{len(members)}件の録音をアーカイブしました'
+            }
+
+        except Exception as e:
+            if upload:
+                upload.abort()
+            logger.error("Recording archive error: %s", e)
+            return {'success': False, 'message': f'アーカイブエラー: {str(e)}'}
+        finally:
+            self._lock.release()
+
+    # ---------- 取り出し ----------
+
+    def fetch_member(self, file_id: str, member_name: str, dest_path: str) -> Dict[str, Any]:
+        """アーカイブから1ファイルだけを範囲指定ダウンロードで取り出す"""
+        try:
+            manifest = self.get_manifest(file_id)
+            if not manifest:
+                return {'success': False, 'message': f'アーカイブが見つかりません: {file_id}'}
+            member = next((m for m in manifest['members'] if m['name'] == member_name), None)
+            if not member:
+                return {'success': False, 'message': f'アーカイブ内にファイルがありません: {member_name}'}
+
+            os.makedirs(os.path.dirname(os.path.abspath(dest_path)), exist_ok=True)
+            tmp_path = f"{dest_path}.part"
+            with open(tmp_path, 'wb') as out:
+                if manifest['compress']:
+                    self._fetch_compressed(file_id, member, out)
+                else:
+                    self._fetch_plain(file_id, member, out)
+            os.replace(tmp_path, dest_path)
+
+            return {
+                'success': True,
+                'path': dest_path,
+                'filename': member_name,
+                'size': member['size'],
+                'message': '取り出し成功'
+            }
+        except Exception as e:
+            return {'success': False, 'message': f'取り出しエラー: {str(e)}'}
+
+    def _fetch_plain(self, file_id: str, member: Dict[str, Any], out: Any) -> None:
+        """非圧縮アーカイブ：メンバーのデータ範囲だけをダウンロード"""
+        position = member['data_offset']
+        end = member['data_offset'] + member['size']
+        while position < end:
+            piece_end = min(position + FETCH_PIECE_SIZE, end)
+            out.write(self.gdrive_manager.download_range(file_id, position, piece_end - 1))
+            position = piece_end
+
+    def _fetch_compressed(self, file_id: str, member: Dict[str, Any], out: Any) -> None:
+        """圧縮アーカイブ：メンバーのgzip範囲をダウンロードして展開し、tarヘッダーを除いて書き出す"""
+        decompressor = zlib.decompressobj(31)
+        skip = member['data_offset'] - member['header_offset']
+        remaining = member['size']
+        position = member['gzip_start']
+
+        while position < member['gzip_end'] and remaining > 0:
+            piece_end = min(position + FETCH_PIECE_SIZE, member['gzip_end'])
+            data = decompressor.decompress(self.gdrive_manager.download_range(file_id, position, piece_end - 1))
+            position = piece_end
+
+            if skip:
+                dropped = min(skip, len(data))
+                data = data[dropped:]
+                skip -= dropped
+            data = data[:remaining]
+            out.write(data)
+            remaining -= len(data)
+
+        if remaining:
+            raise ValueError('展開したデータがマニフェストのサイズより短いです')
+
+    # ---------- 索引 ----------
+
+    def list_archives(self) -> List[Dict[str, Any]]:
+        """アーカイブ一覧（メンバー詳細は名前のみ）"""
+        return [
+            dict({k: v for k, v in manifest.items() if k != 'members'},
+                 members=[m['name'] for m in manifest['members']])
+            for manifest in reversed(self._index)
+        ]
+
+    def get_manifest(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """アーカイブのマニフェスト"""
+        return next((m for m in self._index if m['file_id'] == file_id), None)
+
+    def _load_index(self) -> List[Dict[str, Any]]:
+        """索引読み込み"""
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            return index if isinstance(index, list) else []
+        except (OSError, ValueError):
+            return []
+
+    def _save_index(self) -> None:
+        """索引保存（一時ファイル経由で置き換え）"""
+        os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+        tmp_path = f"{self.index_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_file)
+
+    @staticmethod
+    def _to_datetime(value: Union[str, datetime]) -> datetime:
+        """期間指定をdatetimeに変換"""
+        return value if isinstance(value, datetime) else datetime.fromisoformat(value)
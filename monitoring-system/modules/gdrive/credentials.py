@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+OAuth認証情報管理モジュール
+有効期限前にバックグラウンドでトークンを更新し、リクエスト処理中にOAuthの往復が発生しないようにする
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from . import google_client
+
+logger = logging.getLogger(__name__)
+
+class CredentialManager:
+    """OAuth認証情報の共有・事前更新・保存"""
+
+    def __init__(self, token_file: str, scopes: List[str], refresh_margin: float = 600,
+                 retry_interval: float = 30, max_retry_interval: float = 600):
+        """
+        refresh_margin: 有効期限のこの秒数前にバックグラウンドで更新する
+        retry_interval / max_retry_interval: 更新失敗時の再試行間隔（失敗ごとに倍増）
+        """
+        self.token_file = token_file
+        self.scopes = scopes
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+
+        self.credentials = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.stats = {
+            'refreshes': 0,
+            'refresh_failures': 0,
+            'foreground_refreshes': 0,
+            'last_refresh': None,
+            'last_refresh_seconds': None,
+            'max_refresh_seconds': None,
+            'last_error': None
+        }
+
+    # ---------- 読み込み・保存 ----------
+
+    def load(self) -> Optional[Any]:
+        """トークンファイルから認証情報を読み込む（空・破損ファイルは削除）"""
+        if not os.path.exists(self.token_file):
+            return None
+
+        try:
+            # ファイルサイズが0でないことを確認
+            if os.path.getsize(self.token_file) == 0:
+                logger.warning("空のトークンファイルを検出: %s", self.token_file)
+                os.remove(self.token_file)
+                return None
+            creds = google_client.load().Credentials.from_authorized_user_file(self.token_file, self.scopes)
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.warning("破損したトークンファイルを削除: %s (%s)", self.token_file, e)
+            os.remove(self.token_file)
+            return None
+
+        with self._lock:
+            self.credentials = creds
+        return creds
+
+    def set_credentials(self, creds: Any) -> None:
+        """新しい認証情報を設定して保存"""
+        with self._lock:
+            self.credentials = creds
+            self._save_locked()
+        self._wakeup.set()
+
+    def _save_locked(self) -> None:
+        """トークン保存（一時ファイル経由で置き換え、他のスレッドが読みかけのファイルを壊さない）"""
+        tmp_path = f"{self.token_file}.tmp"
+        with open(tmp_path, 'w') as token:
+            token.write(self.credentials.to_json())
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, self.token_file)
+
+    # ---------- 更新 ----------
+
+    def time_to_expiry(self) -> Optional[float]:
+        """有効期限までの秒数（期限情報が無い場合はNone）"""
+        creds = self.credentials
+        if creds is None or creds.expiry is None:
+            return None
+        # google-authのexpiryはタイムゾーン無しのUTC
+        return (creds.expiry - datetime.utcnow()).total_seconds()
+
+    def needs_refresh(self, margin: Optional[float] = None) -> bool:
+        """更新が必要か（期限切れ、または期限までmargin秒未満）"""
+        creds = self.credentials
+        if creds is None or not creds.refresh_token:
+            return False
+        if not creds.valid:
+            return True
+        remaining = self.time_to_expiry()
+        return remaining is not None and remaining < (self.refresh_margin if margin is None else margin)
+
+    def refresh(self, force: bool = False) -> bool:
+        """トークン更新（同時に呼ばれても更新は1回だけ行う）"""
+        with self._lock:
+            # ロック待ちの間に他のスレッドが更新済みなら何もしない
+            if self.credentials is None or (not force and not self.needs_refresh()):
+                return self.credentials is not None
+
+            started = time.perf_counter()
+            try:
+                self.credentials.refresh(google_client.load().Request())
+                self._save_locked()
+            except Exception as e:
+                self.stats['refresh_failures'] += 1
+                self.stats['last_error'] = str(e)
+                logger.error("トークン更新エラー: %s", e)
+                return False
+
+            elapsed = round(time.perf_counter() - started, 3)
+            self.stats['refreshes'] += 1
+            self.stats['last_refresh'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self.stats['last_refresh_seconds'] = elapsed
+            self.stats['max_refresh_seconds'] = max(self.stats['max_refresh_seconds'] or 0, elapsed)
+            self.stats['last_error'] = None
+            logger.info("Google Driveトークンを更新しました (%s秒)", elapsed)
+            return True
+
+    def ensure_valid(self) -> Optional[Any]:
+        """有効な認証情報を返す（通常はバックグラウンド更新済み。期限切れの場合のみその場で更新）"""
+        creds = self.credentials
+        if creds is not None and not creds.valid and creds.refresh_token:
+            self.stats['foreground_refreshes'] += 1
+            self.refresh()
+        return self.credentials
+
+    # ---------- バックグラウンド更新 ----------
+
+    def start(self) -> None:
+        """バックグラウンド更新スレッド開始（起動済みなら何もしない）"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, name='gdrive-token-refresh', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """バックグラウンド更新停止"""
+        self._stop_event.set()
+        self._wakeup.set()
+
+    def _refresh_loop(self) -> None:
+        """有効期限のrefresh_margin秒前まで待って更新"""
+        retry = self.retry_interval
+        while not self._stop_event.is_set():
+            if self.needs_refresh():
+                if self.refresh():
+                    retry = self.retry_interval
+                    continue
+                wait = retry
+                retry = min(retry * 2, self.max_retry_interval)
+            else:
+                creds = self.credentials
+                remaining = self.time_to_expiry()
+                # 期限情報・refresh_tokenが無い（更新できない）場合は新しい認証情報が設定されるまで待つ
+                if creds is None or not creds.refresh_token or remaining is None:
+                    wait = None
+                else:
+                    wait = max(remaining - self.refresh_margin, 1)
+
+            self._wakeup.wait(wait)
+            self._wakeup.clear()
+
+    def get_status(self) -> Dict[str, Any]:
+        """認証情報の状態・更新メトリクス"""
+        creds = self.credentials
+        remaining = self.time_to_expiry()
+        return {
+            'has_credentials': creds is not None,
+            'valid': bool(creds and creds.valid),
+            'expiry': creds.expiry.isoformat() + 'Z' if creds is not None and creds.expiry else None,
+            'time_to_expiry_seconds': round(remaining) if remaining is not None else None,
+            'refresh_margin': self.refresh_margin,
+            'background_refresh': bool(self._thread and self._thread.is_alive()),
+            'stats': self.stats.copy()
+        }
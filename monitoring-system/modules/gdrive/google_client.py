@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Google APIクライアントの遅延読み込み
+googleapiclient / google-auth は読み込みだけで数秒・数十MBかかるため、Drive機能を初めて使う時点まで読み込まない。
+Drive APIのディスカバリ文書はローカルにキャッシュし、クライアント構築ごとの取得・解析を避ける。
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_modules: Optional[SimpleNamespace] = None
+_discovery_doc: Optional[Dict[str, Any]] = None
+
+stats = {
+    'loaded': False,
+    'load_seconds': None,
+    'discovery_source': None,
+    'discovery_seconds': None
+}
+
+def load() -> SimpleNamespace:
+    """Google関連モジュールを読み込む（初回のみ）"""
+    global _modules
+    if _modules is not None:
+        return _modules
+
+    with _lock:
+        if _modules is None:
+            started = time.perf_counter()
+
+            import httplib2
+            from google.auth.transport.requests import Request
+            from google.oauth2.credentials import Credentials
+            from google_auth_httplib2 import AuthorizedHttp
+            from google_auth_oauthlib.flow import InstalledAppFlow
+            from googleapiclient.discovery import build, build_from_document
+            from googleapiclient.errors import HttpError
+            from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
+
+            _modules = SimpleNamespace(
+                httplib2=httplib2,
+                Request=Request,
+                Credentials=Credentials,
+                AuthorizedHttp=AuthorizedHttp,
+                InstalledAppFlow=InstalledAppFlow,
+                build=build,
+                build_from_document=build_from_document,
+                HttpError=HttpError,
+                MediaFileUpload=MediaFileUpload,
+                MediaIoBaseUpload=MediaIoBaseUpload
+            )
+            # 自動再試行は例外にならずログにだけ出るため、ログから回数を数える
+            from .metrics import install_retry_counter
+            install_retry_counter()
+            stats['loaded'] = True
+            stats['load_seconds'] = round(time.perf_counter() - started, 3)
+            logger.info("Google APIクライアント読み込み: %s秒", stats['load_seconds'])
+
+    return _modules
+
+def is_loaded() -> bool:
+    """読み込み済みか"""
+    return _modules is not None
+
+def _discovery_document(cache_file: Optional[str]) -> Optional[Dict[str, Any]]:
+    """ディスカバリ文書（メモリ → キャッシュファイルの順に参照）"""
+    global _discovery_doc
+    if _discovery_doc is not None:
+        return _discovery_doc
+
+    if cache_file and os.path.exists(cache_file):
+        started = time.perf_counter()
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                _discovery_doc = json.load(f)
+            stats['discovery_source'] = 'cache_file'
+            stats['discovery_seconds'] = round(time.perf_counter() - started, 3)
+        except (OSError, ValueError) as e:
+            logger.warning("ディスカバリ文書キャッシュ読み込みエラー: %s", e)
+    return _discovery_doc
+
+def _save_discovery_document(service: Any, cache_file: Optional[str]) -> None:
+    """構築済みサービスのディスカバリ文書をキャッシュ"""
+    global _discovery_doc
+    document = getattr(service, '_rootDesc', None)
+    if not document:
+        return
+    _discovery_doc = document
+
+    if not cache_file:
+        return
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp_path = f"{cache_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(document, f)
+        os.replace(tmp_path, cache_file)
+    except OSError as e:
+        logger.warning("ディスカバリ文書キャッシュ保存エラー: %s", e)
+
+def build_drive_service(credentials: Any = None, http: Any = None,
+                        cache_file: Optional[str] = None,
+                        client_options: Optional[Dict[str, Any]] = None) -> Any:
+    """Drive v3 クライアント構築（ディスカバリ文書はキャッシュを使用しネットワーク取得しない）"""
+    google = load()
+    document = _discovery_document(cache_file)
+
+    if document is not None:
+        return google.build_from_document(
+            document, credentials=credentials, http=http, client_options=client_options
+        )
+
+    # 初回はライブラリ同梱の文書から構築してキャッシュに保存
+    started = time.perf_counter()
+    service = google.build(
+        'drive', 'v3', credentials=credentials, http=http,
+        static_discovery=True, cache_discovery=False, client_options=client_options
+    )
+    stats['discovery_source'] = 'static'
+    stats['discovery_seconds'] = round(time.perf_counter() - started, 3)
+    _save_discovery_document(service, cache_file)
+    return service
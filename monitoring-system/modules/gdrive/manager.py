@@ -4,31 +4,77 @@ Google Drive連携機能
 Google Drive APIを使ったファイルアップロード・管理を担当
 """
 
+import logging
 import os
 import json
+import threading
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any
-
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload, MediaIoBaseUpload
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 import io
+import time
+import uuid
+from urllib.parse import quote, urljoin
+
+from utils import SingleFlight
+
+# Google APIクライアントは重いため google_client 経由で初回使用時に読み込む
+from . import google_client
+from .credentials import CredentialManager
+from .metrics import API_LATENCY, API_RETRIES, UPLOADS
+from .throttle import UploadThrottle
+
+logger = logging.getLogger(__name__)
 
 # Google Drive API のスコープ
 SCOPES = ['https://www.googleapis.com/auth/drive.file']
 
+FOLDER_MIMETYPE = 'application/vnd.google-apps.folder'
+
+# レジューム可能アップロードのチャンクサイズ（256KBの倍数である必要がある）
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# 並列アップロードの最大スレッド数
+DEFAULT_MAX_UPLOAD_WORKERS = 4
+
+# ファイル一覧で取得するフィールド（レスポンスを小さく保つためのフィールドマスク）
+FILE_FIELDS = 'id,name,mimeType,size,createdTime,webViewLink'
+
 class GDriveManager:
     """Google Drive管理クラス"""
     
-    def __init__(self, config_path: str = 'config.yaml'):
-        """初期化"""
-        self.config = self._load_config(config_path)
+    def __init__(self, config: Union[str, Dict[str, Any]] = 'config.yaml'):
+        """初期化（設定ファイルのパス、または {'gdrive': {...}} 形式の設定辞書）"""
+        self.config = config if isinstance(config, dict) else self._load_config(config)
         self.service = None
         self.folder_id = None
         self._authenticated = False
+        self._folder_cache_file = self.config['gdrive'].get(
+            'folder_cache_file',
+            os.path.join(os.path.dirname(self.config['gdrive']['token_file']), 'folder_cache.json')
+        )
+        self.chunk_size = self.config['gdrive'].get('upload_chunk_size', DEFAULT_CHUNK_SIZE)
+        self.throttle = UploadThrottle(self.config['gdrive'].get('upload_throttle', {}))
+        self.discovery_cache_file = self.config['gdrive'].get(
+            'discovery_cache_file',
+            os.path.join(os.path.dirname(self.config['gdrive']['token_file']), 'drive_v3_discovery.json')
+        )
+        
+        # httplib2はスレッドセーフではないため、APIはスレッドごとのクライアント（_thread_service）で呼ぶ
+        self.client_options = self.config['gdrive'].get('client_options')
+        self.max_upload_workers = self.config['gdrive'].get('max_upload_workers', DEFAULT_MAX_UPLOAD_WORKERS)
+        self.credentials = CredentialManager(
+            self.config['gdrive']['token_file'], SCOPES,
+            refresh_margin=self.config['gdrive'].get('token_refresh_margin', 600)
+        )
+        self._thread_local = threading.local()
+        self._upload_executor = None
+        self._executor_lock = threading.Lock()
+        self._folder_lock = threading.Lock()
+        
+        # 状態確認は同時に呼ばれても1回だけAPIを呼び、結果をstatus_result_ttl秒再利用する
+        self._status_flight = SingleFlight('gdrive-connection', ttl=self.config['gdrive'].get('status_result_ttl', 2))
     
     def _load_config(self, config_path: str) -> Dict[str, Any]:
         """設定ファイル読み込み"""
@@ -36,7 +82,7 @@ class GDriveManager:
             with open(config_path, 'r', encoding='utf-8') as f:
                 return yaml.safe_load(f)
         except Exception as e:
-            print(f"設定ファイル読み込みエラー: {e}")
+            logger.warning("設定ファイル読み込みエラー: %s", e)
             return {
                 'gdrive': {
                     'folder_name': 'raspi-monitoring',
@@ -45,48 +91,41 @@ class GDriveManager:
                 }
             }
     
-    def authenticate(self) -> bool:
-        """Google Drive認証"""
+    def authenticate(self, interactive: bool = True) -> bool:
+        """Google Drive認証（interactive=Falseの場合はブラウザ/コンソール認証を行わない）"""
         try:
-            creds = None
-            token_file = self.config['gdrive']['token_file']
+            google = google_client.load()
             credentials_file = self.config['gdrive']['credentials_file']
             
             # 既存のトークンをチェック
-            if os.path.exists(token_file):
-                try:
-                    # ファイルサイズが0でないことを確認
-                    if os.path.getsize(token_file) > 0:
-                        creds = Credentials.from_authorized_user_file(token_file, SCOPES)
-                    else:
-                        print(f"空のトークンファイルを検出: {token_file}")
-                        os.remove(token_file)  # 空のファイルを削除
-                        creds = None
-                except (json.JSONDecodeError, ValueError) as e:
-                    print(f"トークンファイルの読み込みエラー: {e}")
-                    print(f"破損したトークンファイルを削除: {token_file}")
-                    os.remove(token_file)
-                    creds = None
+            creds = self.credentials.load()
             
             # トークンが無効または存在しない場合は新規認証
             if not creds or not creds.valid:
                 if creds and creds.expired and creds.refresh_token:
-                    print("Refreshing expired Google Drive token...")
-                    creds.refresh(Request())
+                    logger.info("Refreshing expired Google Drive token")
+                    if not self.credentials.refresh(force=True):
+                        return False
                 else:
+                    if not interactive:
+                        logger.info("有効なトークンがないため非対話モードでの認証をスキップします")
+                        return False
+                    
                     if not os.path.exists(credentials_file):
-                        print(f"認証ファイルが見つかりません: {credentials_file}")
-                        print("Google Cloud Consoleから credentials.json をダウンロードして配置してください")
+                        logger.error("認証ファイルが見つかりません: %s "
+                                     "(Google Cloud Consoleから credentials.json をダウンロードして配置してください)",
+                                     credentials_file)
                         return False
                     
-                    print("Starting Google Drive authentication flow...")
-                    flow = InstalledAppFlow.from_client_secrets_file(credentials_file, SCOPES)
+                    logger.info("Starting Google Drive authentication flow")
+                    flow = google.InstalledAppFlow.from_client_secrets_file(credentials_file, SCOPES)
                     
                     # 環境検出とWSL2対応
                     is_wsl2 = self._is_wsl2_environment()
                     
                     if is_wsl2:
-                        print("WSL2環境を検出 - コンソール認証を使用します")
+                        logger.info("WSL2環境を検出 - コンソール認証を使用します")
+                        # 認証手順はコンソールで操作する利用者向けのためログではなく直接表示する
                         print("\n=== Google Drive認証手順 ===")
                         print("1. 以下のURLをWindowsブラウザでアクセス")
                         print("2. Googleアカウントでログイン")
@@ -97,29 +136,34 @@ class GDriveManager:
                     else:
                         # WSL2以外の環境ではローカルサーバー認証を試行
                         try:
-                            print("ブラウザ認証を試行中...")
+                            logger.info("ブラウザ認証を試行中")
                             creds = flow.run_local_server(port=0, open_browser=True)
                         except Exception as e:
-                            print(f"ブラウザ認証失敗: {e}")
-                            print("コンソール認証に切り替えます...")
+                            logger.warning("ブラウザ認証失敗、コンソール認証に切り替えます: %s", e)
                             creds = flow.run_console()
-                
-                # トークンを保存
-                with open(token_file, 'w') as token:
-                    token.write(creds.to_json())
-                print(f"認証トークンを保存: {token_file}")
+                    
+                    # トークンを保存
+                    self.credentials.set_credentials(creds)
+                    logger.info("認証トークンを保存: %s", self.credentials.token_file)
             
             # Google Drive APIサービス構築
-            self.service = build('drive', 'v3', credentials=creds)
+            self.service = google_client.build_drive_service(
+                credentials=creds, cache_file=self.discovery_cache_file, client_options=self.client_options
+            )
+            # 認証したスレッドはこのクライアントをそのまま使う
+            self._thread_local.service, self._thread_local.credentials = self.service, creds
             self._authenticated = True
             
+            # 有効期限前にバックグラウンドでトークンを更新
+            self.credentials.start()
+            
             # 監視用フォルダを作成または取得
             self._setup_monitoring_folder()
             
             return True
             
         except Exception as e:
-            print(f"認証エラー: {e}")
+            logger.error("認証エラー: %s", e)
             self._authenticated = False
             return False
     
@@ -135,34 +179,121 @@ class GDriveManager:
             return False
     
     def _setup_monitoring_folder(self) -> None:
-        """監視用フォルダの作成または取得"""
+        """監視用フォルダの作成または取得（キャッシュ済みIDがあればAPIを呼ばない）"""
+        folder_name = self.config['gdrive']['folder_name']
+        cached_id = self._load_folder_cache().get(folder_name)
+        
+        if cached_id:
+            # IDの有効性は実際に使用した時点で確認する（404なら再解決）
+            self.folder_id = cached_id
+            logger.debug("キャッシュ済みフォルダIDを使用: %s", folder_name)
+            return
+        
+        self._resolve_monitoring_folder()
+    
+    def _resolve_monitoring_folder(self) -> None:
+        """監視用フォルダをAPIで検索・作成してキャッシュに保存"""
         try:
             folder_name = self.config['gdrive']['folder_name']
-            
-            # 既存フォルダを検索
-            query = f"name='{folder_name}' and mimeType='application/vnd.google-apps.folder'"
-            results = self.service.files().list(q=query, fields="files(id, name)").execute()
+            service = self._thread_service()
+            
+            # 既存フォルダを検索（ゴミ箱内のフォルダは除外）
+            query = (f"name='{self._escape_query(folder_name)}' "
+                     f"and mimeType='{FOLDER_MIMETYPE}' and trashed=false")
+            with API_LATENCY.time('folder'):
+                results = service.files().list(
+                    q=query, spaces='drive', pageSize=1, fields="files(id)"
+                ).execute()
             folders = results.get('files', [])
             
             if folders:
                 self.folder_id = folders[0]['id']
-                print(f"既存フォルダを使用: {folder_name}")
+                logger.info("既存フォルダを使用: %s", folder_name)
             else:
                 # フォルダを新規作成
                 folder_metadata = {
                     'name': folder_name,
-                    'mimeType': 'application/vnd.google-apps.folder'
+                    'mimeType': FOLDER_MIMETYPE
                 }
-                folder = self.service.files().create(body=folder_metadata, fields='id').execute()
+                with API_LATENCY.time('folder'):
+                    folder = service.files().create(body=folder_metadata, fields='id').execute()
                 self.folder_id = folder.get('id')
-                print(f"新規フォルダを作成: {folder_name}")
+                logger.info("新規フォルダを作成: %s", folder_name)
+            
+            self._save_folder_cache(folder_name, self.folder_id)
                 
         except Exception as e:
-            print(f"フォルダ設定エラー: {e}")
+            logger.error("フォルダ設定エラー: %s", e)
             self.folder_id = None
     
+    def _load_folder_cache(self) -> Dict[str, str]:
+        """フォルダIDキャッシュ読み込み"""
+        try:
+            with open(self._folder_cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            return cache if isinstance(cache, dict) else {}
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_folder_cache(self, folder_name: str, folder_id: str) -> None:
+        """フォルダIDキャッシュ保存（一時ファイル経由で置き換え）"""
+        try:
+            cache = self._load_folder_cache()
+            if folder_id:
+                cache[folder_name] = folder_id
+            else:
+                cache.pop(folder_name, None)
+            
+            tmp_path = f"{self._folder_cache_file}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False)
+            os.replace(tmp_path, self._folder_cache_file)
+        except OSError as e:
+            logger.warning("フォルダIDキャッシュ保存エラー: %s", e)
+    
+    def _with_folder_retry(self, operation: Callable[[], Any]) -> Any:
+        """フォルダIDが無効（404）だった場合にフォルダを再解決して1回だけ再実行"""
+        folder_id = self.folder_id
+        try:
+            return operation()
+        except Exception as e:
+            # HttpError判定は属性で行う（googleapiclient.errorsを読み込まないため）
+            status = getattr(getattr(e, 'resp', None), 'status', None)
+            if status != 404 or not folder_id or folder_id not in str(e):
+                raise
+            API_RETRIES.labels('folder').inc()
+            with self._folder_lock:
+                # 同時に失敗した他のスレッドが再解決済みなら、そのIDで再実行する（フォルダを重複作成しない）
+                if self.folder_id == folder_id:
+                    logger.warning("キャッシュ済みフォルダIDが無効です。再解決します: %s", folder_id)
+                    self._save_folder_cache(self.config['gdrive']['folder_name'], None)
+                    self._resolve_monitoring_folder()
+            return operation()
+    
+    @staticmethod
+    def _escape_query(value: str) -> str:
+        """Drive検索クエリ用の文字列エスケープ"""
+        return value.replace('\\', '\\\\').replace("'", "\\'")
+    
+    def _file_metadata(self, filename: str) -> Dict[str, Any]:
+        """アップロード用ファイルメタデータ"""
+        return {
+            'name': filename,
+            'parents': [self.folder_id] if self.folder_id else []
+        }
+    
+    def _folder_query(self) -> str:
+        """監視フォルダ内の（ゴミ箱以外の）ファイルを対象とするクエリ"""
+        if self.folder_id:
+            return f"'{self.folder_id}' in parents and trashed=false"
+        return "trashed=false"
+    
     def check_connection(self) -> Dict[str, Any]:
-        """接続状態確認"""
+        """接続状態確認（実行中の確認があればその結果を共有）"""
+        return self._status_flight.do('connection', self._check_connection)
+    
+    def _check_connection(self) -> Dict[str, Any]:
+        """接続状態確認本体"""
         try:
             if not self._authenticated:
                 return {
@@ -172,27 +303,53 @@ class GDriveManager:
                 }
             
             # 簡単なAPI呼び出しで接続確認
-            about = self.service.about().get(fields="user,storageQuota").execute()
+            with API_LATENCY.time('about'):
+                about = self._thread_service().about().get(fields="user,storageQuota").execute()
             
             return {
                 'status': 'connected',
                 'user_email': about.get('user', {}).get('emailAddress', '不明'),
                 'storage_used': about.get('storageQuota', {}).get('usage', '不明'),
                 'folder_id': self.folder_id,
+                'token': self.credentials.get_status(),
                 'last_check': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'message': '正常に接続されています'
             }
             
         except Exception as e:
-            print(f"Google Drive connection check error: {e}")
+            logger.error("Google Drive connection check error: %s", e)
             return {
                 'status': 'error',
                 'message': f'接続エラー: {str(e)}',
                 'last_check': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
     
+    def get_status(self) -> Dict[str, Any]:
+        """状態取得（未認証なら非対話で認証を試行してから接続確認、同時の呼び出しは1回にまとめる）"""
+        return self._status_flight.do('status', self._get_status)
+    
+    def _get_status(self) -> Dict[str, Any]:
+        """状態取得本体"""
+        if not self._authenticated:
+            logger.debug("Attempting Google Drive authentication")
+            if not self.authenticate(interactive=False):
+                return {
+                    'status': 'authentication_failed',
+                    'message': '認証に失敗しました。credentials.jsonを確認してください。',
+                    'last_check': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                }
+        
+        return self.check_connection()
+    
     def upload_data(self, data: Dict[str, Any], filename: str) -> Dict[str, Any]:
         """データをGoogle Driveにアップロード"""
+        # JSONデータを文字列に変換
+        json_data = json.dumps(data, ensure_ascii=False, indent=2)
+        return self.upload_bytes(json_data.encode('utf-8'), filename, 'application/json')
+    
+    def upload_bytes(self, payload: bytes, filename: str,
+                     mimetype: str = 'application/octet-stream') -> Dict[str, Any]:
+        """メモリ上のバイト列をGoogle Driveにアップロード"""
         try:
             if not self._authenticated:
                 return {
@@ -200,33 +357,20 @@ class GDriveManager:
                     'message': '認証が必要です'
                 }
             
-            # JSONデータを文字列に変換
-            json_data = json.dumps(data, ensure_ascii=False, indent=2)
-            
             # MediaIoBaseUploadを使用してメモリ上のデータをアップロード
-            media = MediaIoBaseUpload(
-                io.BytesIO(json_data.encode('utf-8')),
-                mimetype='application/json'
+            media = google_client.load().MediaIoBaseUpload(
+                io.BytesIO(payload),
+                mimetype=mimetype
             )
             
-            # ファイルメタデータ
-            file_metadata = {
-                'name': filename,
-                'parents': [self.folder_id] if self.folder_id else []
-            }
-            
-            # アップロード実行
-            file = self.service.files().create(
-                body=file_metadata,
-                media_body=media,
-                fields='id,name,webViewLink'
-            ).execute()
+            file = self._execute_upload(filename, media, len(payload), 'id,name,webViewLink')
             
             return {
                 'success': True,
                 'file_id': file.get('id'),
                 'filename': file.get('name'),
                 'web_link': file.get('webViewLink'),
+                'file_size': len(payload),
                 'upload_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'message': 'アップロード成功'
             }
@@ -237,8 +381,13 @@ class GDriveManager:
                 'message': f'アップロードエラー: {str(e)}'
             }
     
-    def upload_file(self, file_path: str, filename: str = None) -> Dict[str, Any]:
-        """ファイルをGoogle Driveにアップロード"""
+    def upload_file(self, file_path: str, filename: str = None, md5: Optional[str] = None) -> Dict[str, Any]:
+        """ファイルをGoogle Driveにアップロード（md5指定時は同一内容のファイルがあればスキップ）"""
+        return self._upload_file(file_path, filename, self._thread_service(), md5)
+    
+    def _upload_file(self, file_path: str, filename: Optional[str], service: Any,
+                     md5: Optional[str] = None) -> Dict[str, Any]:
+        """指定クライアントでファイルをアップロード"""
         try:
             if not self._authenticated:
                 return {
@@ -256,6 +405,23 @@ class GDriveManager:
             if not filename:
                 filename = os.path.basename(file_path)
             
+            # 録音時に計算済みのMD5があれば、Drive上の同名ファイルのmd5Checksumと比較して再アップロードを省く
+            if md5:
+                existing = self._find_same_file(filename, md5, service)
+                if existing:
+                    UPLOADS.labels('skipped').inc()
+                    return {
+                        'success': True,
+                        'skipped': True,
+                        'file_id': existing.get('id'),
+                        'filename': existing.get('name'),
+                        'web_link': existing.get('webViewLink'),
+                        'file_size': existing.get('size'),
+                        'md5_verified': True,
+                        'upload_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                        'message': '同一内容のファイルがアップロード済みのためスキップしました'
+                    }
+            
             # ファイルの MIME タイプを推定
             if filename.endswith('.wav'):
                 mimetype = 'audio/wav'
@@ -268,31 +434,33 @@ class GDriveManager:
             else:
                 mimetype = 'application/octet-stream'
             
-            # MediaFileUploadを使用してファイルをアップロード
-            media = MediaFileUpload(file_path, mimetype=mimetype)
-            
-            # ファイルメタデータ
-            file_metadata = {
-                'name': filename,
-                'parents': [self.folder_id] if self.folder_id else []
-            }
+            # チャンクサイズより大きいファイルはレジューム可能アップロードでチャンク単位に帯域制御
+            file_size = os.path.getsize(file_path)
+            resumable = file_size > self.chunk_size
+            media = google_client.load().MediaFileUpload(
+                file_path, mimetype=mimetype,
+                chunksize=self.chunk_size if resumable else -1,
+                resumable=resumable
+            )
             
-            # アップロード実行
-            file = self.service.files().create(
-                body=file_metadata,
-                media_body=media,
-                fields='id,name,webViewLink,size'
-            ).execute()
+            file = self._execute_upload(filename, media, file_size, 'id,name,webViewLink,size,md5Checksum', service)
             
-            return {
+            result = {
                 'success': True,
                 'file_id': file.get('id'),
                 'filename': file.get('name'),
                 'web_link': file.get('webViewLink'),
                 'file_size': file.get('size'),
+                'md5_checksum': file.get('md5Checksum'),
                 'upload_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'message': 'ファイルアップロード成功'
             }
+            if md5:
+                # 録音時のMD5とDriveが計算したMD5の照合（読み直しなしで転送内容を検証）
+                result['md5_verified'] = file.get('md5Checksum') == md5
+                if not result['md5_verified']:
+                    logger.warning("MD5不一致: %s (local=%s, drive=%s)", filename, md5, file.get('md5Checksum'))
+            return result
             
         except Exception as e:
             return {
@@ -300,8 +468,218 @@ class GDriveManager:
                 'message': f'ファイルアップロードエラー: {str(e)}'
             }
     
-    def list_files(self, limit: int = 10) -> Dict[str, Any]:
-        """Google Driveのファイル一覧を取得"""
+    def upload_files(self, paths: List[str], concurrency: int = 2,
+                     filenames: Optional[List[str]] = None,
+                     md5s: Optional[List[Optional[str]]] = None) -> Dict[str, Any]:
+        """複数ファイルを並列アップロード（スレッドごとのDriveクライアントを使用）"""
+        if not self._authenticated:
+            return {
+                'success': False,
+                'message': '認証が必要です',
+                'results': []
+            }
+        
+        filenames = filenames or [None] * len(paths)
+        md5s = md5s or [None] * len(paths)
+        concurrency = max(1, min(concurrency, self.max_upload_workers, len(paths) or 1))
+        executor = self._get_upload_executor()
+        slots = threading.BoundedSemaphore(concurrency)
+        
+        def upload_one(path: str, filename: Optional[str], md5: Optional[str]) -> Dict[str, Any]:
+            try:
+                self.credentials.ensure_valid()
+                result = self._upload_file(path, filename, self._thread_service(), md5)
+            except Exception as e:
+                result = {
+                    'success': False,
+                    'message': f'ファイルアップロードエラー: {str(e)}'
+                }
+            finally:
+                slots.release()
+            result['file_path'] = path
+            return result
+        
+        started = time.monotonic()
+        futures = []
+        for path, filename, md5 in zip(paths, filenames, md5s):
+            # 同時実行数をconcurrencyに制限（共有プールは他の呼び出しとも共用）
+            slots.acquire()
+            futures.append(executor.submit(upload_one, path, filename, md5))
+        results = [future.result() for future in futures]
+        elapsed = time.monotonic() - started
+        
+        uploaded = [r for r in results if r['success']]
+        total_bytes = sum(int(r.get('file_size') or 0) for r in uploaded)
+        return {
+            'success': len(uploaded) == len(results),
+            'results': results,
+            'uploaded': len(uploaded),
+            'failed': len(results) - len(uploaded),
+            'concurrency': concurrency,
+            'total_bytes': total_bytes,
+            'elapsed_seconds': round(elapsed, 2),
+            'throughput_mbps': round(total_bytes * 8 / elapsed / 1e6, 2) if elapsed else None,
+            'message': f'{len(uploaded)}/{len(results)}件のアップロードに成功しました'
+        }
+    
+    def _find_same_file(self, filename: str, md5: str, service: Any = None) -> Optional[Dict[str, Any]]:
+        """監視フォルダ内の同名・同一MD5のファイルを検索"""
+        service = service or self._thread_service()
+        
+        def run():
+            # フォルダ再解決後に作り直せるようクエリは実行時に組み立てる
+            query = f"name='{self._escape_query(filename)}' and {self._folder_query()}"
+            with API_LATENCY.time('search'):
+                return service.files().list(
+                    q=query, spaces='drive', pageSize=10,
+                    fields='files(id,name,size,md5Checksum,webViewLink)'
+                ).execute()
+        
+        files = self._with_folder_retry(run).get('files', [])
+        return next((f for f in files if f.get('md5Checksum') == md5), None)
+    
+    def _get_upload_executor(self) -> ThreadPoolExecutor:
+        """並列アップロード用スレッドプール（スレッドを使い回し、クライアントの接続も再利用する）"""
+        with self._executor_lock:
+            if self._upload_executor is None:
+                self._upload_executor = ThreadPoolExecutor(
+                    max_workers=self.max_upload_workers, thread_name_prefix='gdrive-upload'
+                )
+            return self._upload_executor
+    
+    def _thread_service(self) -> Any:
+        """スレッド専用のDriveクライアント（認証情報は全スレッドで共有、HTTP接続はスレッドごと）"""
+        creds = self.credentials.credentials
+        service = getattr(self._thread_local, 'service', None)
+        if service is None or getattr(self._thread_local, 'credentials', None) is not creds:
+            service = google_client.build_drive_service(
+                http=self._authorized_http(), cache_file=self.discovery_cache_file,
+                client_options=self.client_options
+            )
+            self._thread_local.service = service
+            self._thread_local.credentials = creds
+        return service
+    
+    def _authorized_http(self) -> Any:
+        """新しい認証済みHTTPクライアント（認証情報が無い場合は認証なし）"""
+        google = google_client.load()
+        http = google.httplib2.Http(timeout=120)
+        creds = self.credentials.credentials
+        return google.AuthorizedHttp(creds, http=http) if creds is not None else http
+    
+    def start_upload_session(self, filename: str, mimetype: str, http: Any) -> str:
+        """レジューム可能アップロードのセッション開始（サイズ未定のストリーム送信用）、送信先URLを返す"""
+        google = google_client.load()
+        # アップロード用エンドポイントはAPIのベースURLと同じホストの /upload/drive/v3/files
+        url = (urljoin(self._thread_service()._baseUrl, '/upload/drive/v3/files')
+               + '?uploadType=resumable&fields=' + quote('id,name,size,md5Checksum'))
+        
+        def run():
+            body = dict(self._file_metadata(filename), mimeType=mimetype)
+            with API_LATENCY.time('upload_session'):
+                resp, content = http.request(url, 'POST', body=json.dumps(body), headers={
+                    'Content-Type': 'application/json; charset=UTF-8',
+                    'X-Upload-Content-Type': mimetype
+                })
+            if resp.status >= 300 or 'location' not in resp:
+                raise google.HttpError(resp, content, uri=url)
+            return resp['location']
+        
+        return self._with_folder_retry(run)
+    
+    def download_range(self, file_id: str, start: int, end: int) -> bytes:
+        """ファイルの一部（start〜endバイト目、endを含む）をダウンロード"""
+        request = self._thread_service().files().get_media(fileId=file_id)
+        request.headers['Range'] = f'bytes={start}-{end}'
+        with API_LATENCY.time('download'):
+            return request.execute(num_retries=3)
+    
+    def _execute_upload(self, filename: str, media: Any, total_size: int, fields: str,
+                        service: Any = None) -> Dict[str, Any]:
+        """アップロード実行（帯域制御付き、メタデータは再試行時のフォルダIDで毎回作り直す）"""
+        service = service or self._thread_service()
+        # 進行中アップロードは同名ファイルの同時アップロードでも区別できるようIDで管理する
+        upload_id = uuid.uuid4().hex[:12]
+        
+        def run():
+            request = service.files().create(
+                body=self._file_metadata(filename),
+                media_body=media,
+                fields=fields
+            )
+            
+            if not media.resumable():
+                self.throttle.acquire(total_size)
+                started = time.monotonic()
+                response = request.execute(num_retries=3)
+                elapsed = time.monotonic() - started
+                API_LATENCY.labels('upload').observe(elapsed)
+                self.throttle.record_sent(total_size, elapsed)
+                return response
+            
+            response = None
+            sent = 0
+            while response is None:
+                self.throttle.acquire(min(self.chunk_size, total_size - sent))
+                started = time.monotonic()
+                status, response = request.next_chunk(num_retries=3)
+                elapsed = time.monotonic() - started
+                API_LATENCY.labels('upload_chunk').observe(elapsed)
+                progress = status.resumable_progress if status else total_size
+                self.throttle.record_sent(progress - sent, elapsed)
+                sent = progress
+                self.throttle.set_current_upload(upload_id, {
+                    'filename': filename,
+                    'bytes_sent': sent,
+                    'total_bytes': total_size
+                })
+            return response
+        
+        try:
+            response = self._with_folder_retry(run)
+            UPLOADS.labels('success').inc()
+            return response
+        except Exception:
+            UPLOADS.labels('failed').inc()
+            raise
+        finally:
+            self.throttle.set_current_upload(upload_id, None)
+    
+    def iter_files(self, query: Optional[str] = None, page_size: int = 100,
+                   fields: str = FILE_FIELDS, order_by: str = 'createdTime desc') -> Iterator[Dict[str, Any]]:
+        """監視フォルダのファイルを全ページ分順次返すジェネレータ"""
+        if not self._authenticated:
+            return
+        
+        page_token = None
+        while True:
+            page = self._list_page(query, page_size, fields, order_by, page_token)
+            for file in page.get('files', []):
+                yield file
+            
+            page_token = page.get('nextPageToken')
+            if not page_token:
+                break
+    
+    def _list_page(self, query: Optional[str], page_size: int, fields: str,
+                   order_by: str, page_token: Optional[str]) -> Dict[str, Any]:
+        """1ページ分のファイル一覧取得"""
+        def request_page():
+            q = query or self._folder_query()
+            with API_LATENCY.time('list'):
+                return self._thread_service().files().list(
+                    q=q,
+                    pageSize=page_size,
+                    pageToken=page_token,
+                    spaces='drive',
+                    fields=f"nextPageToken,files({fields})",
+                    orderBy=order_by
+                ).execute()
+        
+        return self._with_folder_retry(request_page)
+    
+    def list_files(self, limit: int = 10, page_token: Optional[str] = None) -> Dict[str, Any]:
+        """Google Driveのファイル一覧を取得（next_page_tokenで続きを取得可能）"""
         try:
             if not self._authenticated:
                 return {
@@ -309,23 +687,14 @@ class GDriveManager:
                     'message': '認証が必要です'
                 }
             
-            # クエリ構築
-            query = f"parents in '{self.folder_id}'" if self.folder_id else None
-            
-            # ファイル一覧取得
-            results = self.service.files().list(
-                q=query,
-                pageSize=limit,
-                fields="files(id,name,mimeType,size,createdTime,webViewLink)",
-                orderBy="createdTime desc"
-            ).execute()
-            
-            files = results.get('files', [])
+            page = self._list_page(None, limit, FILE_FIELDS, 'createdTime desc', page_token)
+            files = page.get('files', [])
             
             return {
                 'success': True,
                 'files': files,
                 'count': len(files),
+                'next_page_token': page.get('nextPageToken'),
                 'folder_id': self.folder_id,
                 'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
@@ -346,7 +715,8 @@ class GDriveManager:
                 }
             
             # ファイル削除
-            self.service.files().delete(fileId=file_id).execute()
+            with API_LATENCY.time('delete'):
+                self._thread_service().files().delete(fileId=file_id).execute()
             
             return {
                 'success': True,
@@ -359,3 +729,28 @@ class GDriveManager:
                 'success': False,
                 'message': f'ファイル削除エラー: {str(e)}'
             }
+    
+    def get_start_page_token(self) -> str:
+        """変更フィードの開始トークン取得（これ以降の変更がfetch_changesで取得できる）"""
+        with API_LATENCY.time('changes'):
+            response = self._thread_service().changes().getStartPageToken().execute()
+        return response['startPageToken']
+    
+    def fetch_changes(self, page_token: str,
+                      file_fields: str = 'id,name,size,md5Checksum,parents,trashed') -> Tuple[List[Dict[str, Any]], str]:
+        """前回トークン以降の変更を全ページ取得し、（変更一覧, 次回用トークン）を返す"""
+        changes = []
+        service = self._thread_service()
+        while True:
+            with API_LATENCY.time('changes'):
+                response = service.changes().list(
+                    pageToken=page_token,
+                    pageSize=1000,
+                    spaces='drive',
+                    fields=f'nextPageToken,newStartPageToken,changes(fileId,removed,file({file_fields}))'
+                ).execute()
+            changes.extend(response.get('changes', []))
+            
+            if 'newStartPageToken' in response:
+                return changes, response['newStartPageToken']
+            page_token = response['nextPageToken']
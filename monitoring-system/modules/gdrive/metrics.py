@@ -0,0 +1,27 @@
+"""
+Google Drive連携のメトリクス（/metrics で出力）
+"""
+
+import logging
+
+from utils import Counter, Histogram
+
+UPLOAD_BYTES = Counter('monitoring_gdrive_upload_bytes_total', 'Google Driveへ送信したバイト数')
+UPLOADS = Counter('monitoring_gdrive_uploads_total', 'アップロードの回数（成功・スキップ・失敗）', ['result'])
+API_RETRIES = Counter('monitoring_gdrive_api_retries_total', 'API呼び出しの再試行回数', ['reason'])
+API_LATENCY = Histogram(
+    'monitoring_gdrive_api_request_duration_seconds', 'Drive API呼び出しの所要時間（秒）', ['operation'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+
+class _RetryLogCounter(logging.Filter):
+    """googleapiclientの再試行ログ（num_retriesによる自動再試行）を数える"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.msg, str) and record.msg.startswith('Sleeping'):
+            API_RETRIES.labels('http').inc()
+        return True
+
+def install_retry_counter() -> None:
+    """googleapiclient読み込み後に1回だけ呼ぶ"""
+    logging.getLogger('googleapiclient.http').addFilter(_RetryLogCounter())
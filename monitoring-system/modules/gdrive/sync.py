@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+録音ディレクトリ同期モジュール
+ローカルのマニフェストとDriveの変更フィードを使い、録音ディレクトリとDriveフォルダの差分だけを反映する
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class RecordingSync:
+    """録音ディレクトリとGoogle Driveフォルダの増分同期"""
+
+    MANIFEST_VERSION = 1
+
+    def __init__(self, gdrive_manager: Any, recordings_dir: str, manifest_path: str,
+                 remote_prefix: str = 'raspi_recording_', extensions: tuple = ('.wav',),
+                 delete_remote: bool = False, concurrency: int = 2,
+                 checksum_provider: Optional[Callable[[str], Optional[str]]] = None,
+                 active_file_provider: Optional[Callable[[], Optional[str]]] = None):
+        """
+        remote_prefix: Drive上のファイル名の接頭辞（既存のアップロードAPIと同じ命名）
+        delete_remote: 同期済みのローカルファイルが削除されたらDrive側も削除する
+        checksum_provider: ファイル名から録音時に計算済みのMD5を返す関数（サイズに加えてMD5でも比較する）
+        active_file_provider: 録音中のファイル名を返す関数（書き込み途中のWAVは同期しない）
+        """
+        self.gdrive_manager = gdrive_manager
+        self.recordings_dir = os.path.abspath(recordings_dir)
+        self.manifest_path = manifest_path
+        self.remote_prefix = remote_prefix
+        self.extensions = extensions
+        self.delete_remote = delete_remote
+        self.concurrency = concurrency
+        self.checksum_provider = checksum_provider
+        self.active_file_provider = active_file_provider
+
+        self._lock = threading.Lock()
+        self.manifest = self._load_manifest()
+        self.last_result = None
+
+    # ---------- マニフェスト ----------
+
+    def _empty_manifest(self) -> Dict[str, Any]:
+        """空のマニフェスト"""
+        return {
+            'version': self.MANIFEST_VERSION,
+            'folder_id': None,
+            'start_page_token': None,
+            'remote': {},   # file_id -> {name, size, md5Checksum}
+            'local': {}     # filename -> {size, mtime, file_id}（最後に同期した状態）
+        }
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        """マニフェスト読み込み"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == self.MANIFEST_VERSION:
+                return manifest
+        except (OSError, ValueError):
+            pass
+        return self._empty_manifest()
+
+    def _save_manifest(self) -> None:
+        """マニフェスト保存（一時ファイル経由で置き換え）"""
+        os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    # ---------- リモート状態 ----------
+
+    def _refresh_remote(self) -> Dict[str, Any]:
+        """変更フィードでリモート状態を更新（初回・フォルダ変更時のみ全件取得）"""
+        folder_id = self.gdrive_manager.folder_id
+        manifest = self.manifest
+
+        if manifest['start_page_token'] and manifest['folder_id'] == folder_id:
+            changes, next_token = self.gdrive_manager.fetch_changes(manifest['start_page_token'])
+            applied = 0
+            for change in changes:
+                file = change.get('file') or {}
+                file_id = change.get('fileId')
+                in_folder = folder_id in file.get('parents', [])
+                if change.get('removed') or file.get('trashed') or not in_folder:
+                    if manifest['remote'].pop(file_id, None) is not None:
+                        applied += 1
+                elif file.get('name', '').startswith(self.remote_prefix):
+                    manifest['remote'][file_id] = self._remote_entry(file)
+                    applied += 1
+            manifest['start_page_token'] = next_token
+            return {'mode': 'incremental', 'changes': len(changes), 'applied': applied}
+
+        # 初回：先にトークンを取得してから全件取得（取得中の変更は次回の差分で拾う）
+        start_token = self.gdrive_manager.get_start_page_token()
+        remote = {}
+        for file in self.gdrive_manager.iter_files(fields='id,name,size,md5Checksum', page_size=1000):
+            if file.get('name', '').startswith(self.remote_prefix):
+                remote[file['id']] = self._remote_entry(file)
+        manifest.update({
+            'folder_id': folder_id,
+            'start_page_token': start_token,
+            'remote': remote
+        })
+        return {'mode': 'full', 'changes': len(remote), 'applied': len(remote)}
+
+    @staticmethod
+    def _remote_entry(file: Dict[str, Any]) -> Dict[str, Any]:
+        """マニフェスト用リモートファイル情報"""
+        return {
+            'name': file.get('name'),
+            'size': int(file['size']) if file.get('size') is not None else None,
+            'md5Checksum': file.get('md5Checksum')
+        }
+
+    # ---------- 差分計算 ----------
+
+    def _scan_local(self) -> Dict[str, Dict[str, Any]]:
+        """録音ディレクトリのファイル一覧（サイズ・更新時刻、録音中のファイルは除く）"""
+        local = {}
+        if not os.path.isdir(self.recordings_dir):
+            return local
+        active = self.active_file_provider() if self.active_file_provider else None
+        with os.scandir(self.recordings_dir) as entries:
+            for entry in entries:
+                if entry.name == active:
+                    continue
+                if entry.is_file() and entry.name.endswith(self.extensions):
+                    stat = entry.stat()
+                    local[entry.name] = {'size': stat.st_size, 'mtime': stat.st_mtime}
+                    if self.checksum_provider:
+                        local[entry.name]['md5'] = self.checksum_provider(entry.name)
+        return local
+
+    def compute_plan(self, local: Dict[str, Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """必要最小限のアップロード・リモート削除を計算"""
+        remote_by_name = {}
+        for file_id, entry in self.manifest['remote'].items():
+            remote_by_name.setdefault(entry['name'], []).append(dict(entry, file_id=file_id))
+
+        uploads, deletions, skipped, matched = [], [], [], []
+        synced = self.manifest['local']
+
+        for filename, info in sorted(local.items()):
+            remote_name = self.remote_prefix + filename
+            remote_files = remote_by_name.get(remote_name, [])
+            previous = synced.get(filename)
+
+            same = [r for r in remote_files if r['size'] == info['size']
+                    and (not info.get('md5') or not r.get('md5Checksum') or r['md5Checksum'] == info['md5'])]
+            if same:
+                # 同一サイズのファイルがDriveにある（手動アップロード分も同期済みとして扱う）
+                if not previous or previous.get('file_id') != same[0]['file_id'] \
+                        or previous['mtime'] != info['mtime']:
+                    matched.append({'filename': filename, 'file_id': same[0]['file_id']})
+                continue
+
+            if previous and previous.get('file_id') and not remote_files \
+                    and previous['size'] == info['size'] and previous['mtime'] == info['mtime']:
+                # 同期済みでローカル未変更のままDrive側で削除された：Drive側の削除を尊重する
+                skipped.append({'filename': filename, 'reason': 'remote_deleted'})
+                continue
+
+            uploads.append({
+                'filename': filename,
+                'remote_name': remote_name,
+                'size': info['size'],
+                'md5': info.get('md5'),
+                # 内容が変わった場合は古いリモートファイルを置き換える
+                'replaces': [r['file_id'] for r in remote_files]
+            })
+
+        if self.delete_remote:
+            for filename in synced:
+                if filename in local:
+                    continue
+                for remote in remote_by_name.get(self.remote_prefix + filename, []):
+                    deletions.append({'filename': filename, 'file_id': remote['file_id']})
+
+        return {'uploads': uploads, 'deletions': deletions, 'skipped': skipped, 'matched': matched}
+
+    # ---------- 実行 ----------
+
+    def sync(self, dry_run: bool = False, concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """同期1サイクル実行"""
+        if not self._lock.acquire(blocking=False):
+            return {'success': False, 'message': '同期処理を実行中です'}
+
+        started = time.monotonic()
+        try:
+            if not self.gdrive_manager._authenticated:
+                return {'success': False, 'message': '認証が必要です'}
+
+            remote_summary = self._refresh_remote()
+            local = self._scan_local()
+            plan = self.compute_plan(local)
+
+            result = {
+                'success': True,
+                'dry_run': dry_run,
+                'remote': remote_summary,
+                'local_files': len(local),
+                'remote_files': len(self.manifest['remote']),
+                'plan': plan,
+                'uploaded': 0,
+                'deleted': 0,
+                'errors': []
+            }
+
+            if not dry_run:
+                for item in plan['matched']:
+                    self.manifest['local'][item['filename']] = dict(local[item['filename']], file_id=item['file_id'])
+                self._apply_uploads(plan['uploads'], local, concurrency or self.concurrency, result)
+                self._apply_deletions(plan['deletions'], result)
+
+                # ローカルから消えたファイルは同期済み一覧からも外す
+                for filename in list(self.manifest['local']):
+                    if filename not in local:
+                        del self.manifest['local'][filename]
+
+            # 差分計算に使ったリモート状態は dry_run でも保存（次回は続きから差分取得）
+            self._save_manifest()
+
+            result['success'] = not result['errors']
+            result['elapsed_seconds'] = round(time.monotonic() - started, 2)
+            result['timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            result['message'] = (f"アップロード{result['uploaded']}件・削除{result['deleted']}件"
+                                 if not dry_run else
+                                 f"アップロード予定{len(plan['uploads'])}件・削除予定{len(plan['deletions'])}件")
+            self.last_result = result
+            return result
+
+        except Exception as e:
+            logger.error("Recording sync error: %s", e)
+            self.last_result = {
+                'success': False,
+                'message': f'同期エラー: {str(e)}',
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }
+            return self.last_result
+        finally:
+            self._lock.release()
+
+    def _apply_uploads(self, uploads: List[Dict[str, Any]], local: Dict[str, Dict[str, Any]],
+                       concurrency: int, result: Dict[str, Any]) -> None:
+        """アップロード実行とマニフェスト反映"""
+        if not uploads:
+            return
+
+        upload_result = self.gdrive_manager.upload_files(
+            [os.path.join(self.recordings_dir, u['filename']) for u in uploads],
+            concurrency=concurrency,
+            filenames=[u['remote_name'] for u in uploads],
+            md5s=[u['md5'] for u in uploads]
+        )
+
+        for item, outcome in zip(uploads, upload_result['results']):
+            if not outcome['success']:
+                result['errors'].append({'filename': item['filename'], 'message': outcome['message']})
+                continue
+
+            result['uploaded'] += 1
+            self.manifest['remote'][outcome['file_id']] = {
+                'name': item['remote_name'],
+                'size': int(outcome.get('file_size') or item['size']),
+                'md5Checksum': outcome.get('md5_checksum')
+            }
+            self.manifest['local'][item['filename']] = dict(local[item['filename']], file_id=outcome['file_id'])
+
+            # 置き換えた古いリモートファイルを削除
+            for old_id in item['replaces']:
+                if self.gdrive_manager.delete_file(old_id)['success']:
+                    self.manifest['remote'].pop(old_id, None)
+
+    def _apply_deletions(self, deletions: List[Dict[str, Any]], result: Dict[str, Any]) -> None:
+        """リモート削除実行とマニフェスト反映"""
+        for item in deletions:
+            outcome = self.gdrive_manager.delete_file(item['file_id'])
+            if outcome['success']:
+                result['deleted'] += 1
+                self.manifest['remote'].pop(item['file_id'], None)
+            else:
+                result['errors'].append({'filename': item['filename'], 'message': outcome['message']})
+
+    def get_status(self) -> Dict[str, Any]:
+        """同期状態取得"""
+        return {
+            'running': self._lock.locked(),
+            'recordings_dir': self.recordings_dir,
+            'synced_files': len(self.manifest['local']),
+            'remote_files': len(self.manifest['remote']),
+            'has_change_token': bool(self.manifest['start_page_token']),
+            'delete_remote': self.delete_remote,
+            'last_result': self.last_result
+        }
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+テレメトリバッチ送信モジュール
+小さな監視データをローカルにNDJSONで蓄積し、件数・サイズ・経過時間の閾値で
+gzip圧縮した1ファイルとしてGoogle Driveへまとめてアップロードする
+"""
+
+import bisect
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+class TelemetryBatcher:
+    """テレメトリのバッチ送信（gzip圧縮NDJSON、時間範囲インデックス付き）"""
+
+    SPOOL_NAME = 'current.ndjson'
+
+    def __init__(self, gdrive_manager: Any, spool_dir: str, max_records: int = 500,
+                 max_bytes: int = 256 * 1024, max_age: float = 600,
+                 index_file: Optional[str] = None):
+        """
+        max_records / max_bytes / max_age: いずれかに達したらフラッシュ
+        （max_bytesは未圧縮NDJSONのバイト数、max_ageは最初のレコードからの秒数）
+        """
+        self.gdrive_manager = gdrive_manager
+        self.spool_dir = os.path.abspath(spool_dir)
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.index_file = index_file or os.path.join(self.spool_dir, 'telemetry_index.json')
+
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._spool_path = os.path.join(self.spool_dir, self.SPOOL_NAME)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._index = self._load_index()
+
+        # 前回起動時の未送信分を引き継ぐ
+        self._buffer_records, self._buffer_bytes, self._buffer_start, self._buffer_end = \
+            self._scan_spool(self._spool_path)
+        self._buffer_opened_at = time.monotonic() if self._buffer_records else None
+
+        self.stats = {
+            'records_added': 0,
+            'batches_uploaded': 0,
+            'bytes_uploaded': 0,
+            'upload_failures': 0,
+            'last_flush': None,
+            'last_error': None
+        }
+
+    # ---------- 蓄積 ----------
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """レコード追加（閾値に達したらバックグラウンドでフラッシュ）"""
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n'
+        encoded = line.encode('utf-8')
+        timestamp = self._record_time(record)
+
+        with self._lock:
+            with open(self._spool_path, 'ab') as f:
+                f.write(encoded)
+            self._buffer_records += 1
+            self._buffer_bytes += len(encoded)
+            self._buffer_start = min(self._buffer_start or timestamp, timestamp)
+            self._buffer_end = max(self._buffer_end or timestamp, timestamp)
+            if self._buffer_opened_at is None:
+                self._buffer_opened_at = time.monotonic()
+            self.stats['records_added'] += 1
+            due = self._is_due_locked()
+
+        if due:
+            self.flush_async()
+
+    def flush_if_due(self) -> None:
+        """経過時間の閾値チェック（定期的に呼ぶ）"""
+        with self._lock:
+            due = self._is_due_locked()
+        if due:
+            self.flush_async()
+
+    def _is_due_locked(self) -> bool:
+        """フラッシュ条件判定"""
+        if not self._buffer_records:
+            return False
+        if self._buffer_records >= self.max_records or self._buffer_bytes >= self.max_bytes:
+            return True
+        return time.monotonic() - self._buffer_opened_at >= self.max_age
+
+    # ---------- 送信 ----------
+
+    def flush_async(self) -> None:
+        """バックグラウンドでフラッシュ（実行中なら何もしない）"""
+        if self._flush_lock.locked():
+            return
+        threading.Thread(target=self.flush, name='telemetry-flush', daemon=True).start()
+
+    def flush(self) -> Dict[str, Any]:
+        """蓄積分を1ファイルとしてアップロード（未送信の過去分も再送）"""
+        if not self._flush_lock.acquire(blocking=False):
+            return {'success': False, 'message': 'フラッシュ実行中です'}
+
+        try:
+            self._rotate_spool()
+            pending = sorted(
+                name for name in os.listdir(self.spool_dir)
+                if name.startswith('pending_') and name.endswith('.ndjson')
+            )
+            uploaded = []
+            for name in pending:
+                result = self._upload_pending(os.path.join(self.spool_dir, name))
+                if not result['success']:
+                    self.stats['upload_failures'] += 1
+                    self.stats['last_error'] = result['message']
+                    return {
+                        'success': False,
+                        'message': result['message'],
+                        'uploaded': uploaded,
+                        'pending': len(pending) - len(uploaded)
+                    }
+                uploaded.append(result['batch'])
+
+            self.stats['last_flush'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self.stats['last_error'] = None
+            return {'success': True, 'uploaded': uploaded, 'pending': 0}
+        finally:
+            self._flush_lock.release()
+
+    def _rotate_spool(self) -> None:
+        """現在のスプールを送信待ちファイルに切り替え"""
+        with self._lock:
+            if not self._buffer_records:
+                return
+            pending_path = os.path.join(
+                self.spool_dir, f"pending_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.ndjson"
+            )
+            os.replace(self._spool_path, pending_path)
+            self._buffer_records = 0
+            self._buffer_bytes = 0
+            self._buffer_start = None
+            self._buffer_end = None
+            self._buffer_opened_at = None
+
+    def _upload_pending(self, path: str) -> Dict[str, Any]:
+        """送信待ちファイル1つを圧縮してアップロードし、インデックスに登録"""
+        with open(path, 'rb') as f:
+            raw = f.read()
+        count, _, start, end = self._scan_spool(path)
+        if not count:
+            os.remove(path)
+            return {'success': True, 'batch': None}
+
+        compressed = gzip.compress(raw, compresslevel=6)
+        local_start, local_end = start.astimezone(), end.astimezone()
+        filename = f"telemetry_{local_start.strftime('%Y%m%d_%H%M%S')}_{local_end.strftime('%Y%m%d_%H%M%S')}.ndjson.gz"
+
+        result = self.gdrive_manager.upload_bytes(compressed, filename, 'application/gzip')
+        if not result['success']:
+            return {'success': False, 'message': result['message']}
+
+        batch = {
+            'file_id': result['file_id'],
+            'filename': result['filename'],
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'count': count,
+            'bytes': len(raw),
+            'compressed_bytes': len(compressed),
+            'uploaded_at': result['upload_time']
+        }
+        with self._lock:
+            self._insert_index_locked(batch)
+            self._save_index_locked()
+        os.remove(path)
+
+        self.stats['batches_uploaded'] += 1
+        self.stats['bytes_uploaded'] += len(compressed)
+        logger.info("テレメトリ送信: %s (%d件, %d→%d bytes)", filename, count, len(raw), len(compressed))
+        return {'success': True, 'batch': batch}
+
+    # ---------- インデックス ----------
+
+    def find_batches(self, start: Union[str, datetime, None] = None,
+                     end: Union[str, datetime, None] = None) -> List[Dict[str, Any]]:
+        """指定時間範囲と重なるバッチを検索"""
+        start_key = self._to_iso(start) if start else ''
+        end_key = self._to_iso(end) if end else None
+
+        with self._lock:
+            # インデックスは開始時刻順。範囲終端より後に始まるバッチは対象外
+            limit = bisect.bisect_right(self._index_starts, end_key) if end_key else len(self._index)
+            return [batch for batch in self._index[:limit] if batch['end'] >= start_key]
+
+    def _load_index(self) -> List[Dict[str, Any]]:
+        """インデックス読み込み"""
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = []
+        for batch in index:
+            # タイムゾーン無しで保存された古いインデックスもUTCで比較できるようにする
+            batch['start'], batch['end'] = self._to_iso(batch['start']), self._to_iso(batch['end'])
+        index.sort(key=lambda batch: batch['start'])
+        self._index_starts = [batch['start'] for batch in index]
+        return index
+
+    def _insert_index_locked(self, batch: Dict[str, Any]) -> None:
+        """開始時刻順を保ってインデックスに追加"""
+        position = bisect.bisect_right(self._index_starts, batch['start'])
+        self._index.insert(position, batch)
+        self._index_starts.insert(position, batch['start'])
+
+    def _save_index_locked(self) -> None:
+        """インデックス保存（一時ファイル経由で置き換え）"""
+        tmp_path = f"{self.index_file}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_file)
+
+    # ---------- 補助 ----------
+
+    def _scan_spool(self, path: str) -> tuple:
+        """スプールファイルの件数・サイズ・時間範囲"""
+        count, size, start, end = 0, 0, None, None
+        try:
+            with open(path, 'rb') as f:
+                for line in f:
+                    size += len(line)
+                    try:
+                        timestamp = self._record_time(json.loads(line))
+                    except (ValueError, TypeError):
+                        continue
+                    count += 1
+                    start = min(start or timestamp, timestamp)
+                    end = max(end or timestamp, timestamp)
+        except OSError:
+            pass
+        return count, size, start, end
+
+    @staticmethod
+    def _to_utc(value: datetime) -> datetime:
+        """UTCのタイムゾーン付き時刻（タイムゾーン無しはローカル時刻とみなす）"""
+        return value.astimezone(timezone.utc)
+
+    @classmethod
+    def _record_time(cls, record: Dict[str, Any]) -> datetime:
+        """レコードの時刻（UTC、timestampが無い・不正なら現在時刻）"""
+        try:
+            return cls._to_utc(datetime.fromisoformat(record['timestamp']))
+        except (KeyError, TypeError, ValueError):
+            return datetime.now(timezone.utc)
+
+    @classmethod
+    def _to_iso(cls, value: Union[str, datetime]) -> str:
+        """比較用ISO文字列（UTC）"""
+        if not isinstance(value, datetime):
+            value = datetime.fromisoformat(value)
+        return cls._to_utc(value).isoformat()
+
+    def get_status(self) -> Dict[str, Any]:
+        """バッチ送信状態取得"""
+        with self._lock:
+            pending_files = len([
+                name for name in os.listdir(self.spool_dir) if name.startswith('pending_')
+            ])
+            return {
+                'buffered_records': self._buffer_records,
+                'buffered_bytes': self._buffer_bytes,
+                'buffer_start': self._buffer_start.isoformat() if self._buffer_start else None,
+                'buffer_end': self._buffer_end.isoformat() if self._buffer_end else None,
+                'pending_files': pending_files,
+                'batches_indexed': len(self._index),
+                'thresholds': {
+                    'max_records': self.max_records,
+                    'max_bytes': self.max_bytes,
+                    'max_age': self.max_age
+                },
+                'stats': self.stats.copy(),
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }
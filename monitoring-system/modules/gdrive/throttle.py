@@ -0,0 +1,242 @@
+"""
+アップロード帯域制御モジュール
+トークンバケットでGoogle Driveへのアップロード速度を制限し、監視用の通信と回線を共有する
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .metrics import UPLOAD_BYTES
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """トークンバケット（バイト単位）"""
+
+    def __init__(self, rate: Optional[float], burst: float):
+        """rate: 補充速度（bytes/秒、Noneなら無制限）、burst: バケット容量（bytes）"""
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate: Optional[float]) -> None:
+        """補充速度変更"""
+        with self._lock:
+            self._fill_locked()
+            self.rate = rate
+
+    def reserve(self, amount: float) -> float:
+        """トークンを予約し、送信可能になるまでの待ち秒数を返す"""
+        with self._lock:
+            self._fill_locked()
+            if not self.rate:
+                return 0.0
+            # バケット容量を超える要求も受け付け、不足分は負債として次回以降に待つ
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def _fill_locked(self) -> None:
+        """経過時間分のトークン補充"""
+        now = time.monotonic()
+        if self.rate:
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        else:
+            self._tokens = self.burst
+        self._last = now
+
+class UploadThrottle:
+    """アップロード帯域制御（時間帯スケジュール・回線容量追従・テスト中一時停止）"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        config例:
+            enabled: true
+            rate_kbps: 2000          # 既定の上限（0または未指定で無制限）
+            burst_kb: 512
+            link_share: 0.5          # 計測した回線容量のうちアップロードに使う割合
+            pause_during_tests: true # Ping/速度テスト中はアップロードを止める
+            schedule:                # 時間帯別の上限（終了が開始より前なら日付またぎ）
+              - {start: '08:00', end: '20:00', rate_kbps: 500}
+              - {start: '22:00', end: '06:00', rate_kbps: 0}
+        """
+        config = config or {}
+        self.enabled = config.get('enabled', False)
+        self.default_rate_kbps = config.get('rate_kbps') or 0
+        self.link_share = config.get('link_share', 0.5)
+        self.pause_during_tests = config.get('pause_during_tests', True)
+        self.schedule = self._parse_schedule(config.get('schedule', []))
+
+        burst = config.get('burst_kb', 512) * 1024
+        self._bucket = TokenBucket(None, burst)
+        self._link_capacity_bps = None
+        self._pause_cond = threading.Condition()
+        self._pause_reasons = {}
+        self._samples = deque()  # (monotonic, bytes)
+        self._samples_lock = threading.Lock()
+        self._window = 5.0
+
+        self.stats = {
+            'bytes_sent': 0,
+            'wait_seconds': 0.0,
+            'paused_seconds': 0.0
+        }
+        self._current_uploads: Dict[str, Dict[str, Any]] = {}
+
+    def _parse_schedule(self, schedule: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """スケジュール設定を分単位に変換"""
+        parsed = []
+        for entry in schedule:
+            try:
+                start_h, start_m = map(int, str(entry['start']).split(':'))
+                end_h, end_m = map(int, str(entry['end']).split(':'))
+                parsed.append({
+                    'start': start_h * 60 + start_m,
+                    'end': end_h * 60 + end_m,
+                    'rate_kbps': entry.get('rate_kbps') or 0,
+                    'label': f"{entry['start']}-{entry['end']}"
+                })
+            except (KeyError, ValueError) as e:
+                logger.warning("アップロードスケジュール設定エラー: %s (%s)", entry, e)
+        return parsed
+
+    def _scheduled_rate_kbps(self, now: Optional[datetime] = None) -> float:
+        """現在時刻に適用される上限（kbps、0は無制限）"""
+        now = now or datetime.now()
+        minute = now.hour * 60 + now.minute
+        for entry in self.schedule:
+            start, end = entry['start'], entry['end']
+            if start <= end:
+                active = start <= minute < end
+            else:
+                active = minute >= start or minute < end
+            if active:
+                return entry['rate_kbps']
+        return self.default_rate_kbps
+
+    def current_limit(self) -> Optional[float]:
+        """現在の上限（bytes/秒、Noneは無制限）"""
+        if not self.enabled:
+            return None
+
+        limits = []
+        scheduled = self._scheduled_rate_kbps()
+        if scheduled:
+            limits.append(scheduled * 1000 / 8)
+        if self._link_capacity_bps and self.link_share:
+            limits.append(self._link_capacity_bps * self.link_share)
+        return min(limits) if limits else None
+
+    def update_link_capacity(self, bytes_per_second: float) -> None:
+        """計測した回線容量を反映（指数移動平均）"""
+        if bytes_per_second <= 0:
+            return
+        if self._link_capacity_bps is None:
+            self._link_capacity_bps = bytes_per_second
+        else:
+            self._link_capacity_bps = 0.7 * self._link_capacity_bps + 0.3 * bytes_per_second
+
+    def pause(self, reason: str) -> None:
+        """アップロード一時停止（理由ごとに管理）"""
+        with self._pause_cond:
+            self._pause_reasons[reason] = self._pause_reasons.get(reason, 0) + 1
+
+    def resume(self, reason: str) -> None:
+        """一時停止解除"""
+        with self._pause_cond:
+            count = self._pause_reasons.get(reason, 0) - 1
+            if count > 0:
+                self._pause_reasons[reason] = count
+            else:
+                self._pause_reasons.pop(reason, None)
+            self._pause_cond.notify_all()
+
+    def on_network_test(self, event: str, test_name: str) -> None:
+        """NetworkMonitorのテスト開始/終了通知"""
+        if not self.pause_during_tests:
+            return
+        if event == 'start':
+            self.pause(f'network_test:{test_name}')
+        else:
+            self.resume(f'network_test:{test_name}')
+
+    def acquire(self, amount: int) -> None:
+        """amountバイト送信前に呼ぶ（一時停止中・上限超過時はブロック）"""
+        if not self.enabled:
+            return
+
+        # 一時停止中は解除まで待つ
+        with self._pause_cond:
+            if self._pause_reasons:
+                started = time.monotonic()
+                self._pause_cond.wait_for(lambda: not self._pause_reasons)
+                self.stats['paused_seconds'] += time.monotonic() - started
+
+        self._bucket.set_rate(self.current_limit())
+        wait = self._bucket.reserve(amount)
+        if wait > 0:
+            self.stats['wait_seconds'] += wait
+            time.sleep(wait)
+
+    def record_sent(self, amount: int, elapsed: Optional[float] = None) -> None:
+        """送信済みバイト数の記録（elapsed指定時は回線容量の推定にも使う）"""
+        now = time.monotonic()
+        with self._samples_lock:
+            self._samples.append((now, amount))
+            self.stats['bytes_sent'] += amount
+            UPLOAD_BYTES.inc(amount)
+            while self._samples and now - self._samples[0][0] > self._window:
+                self._samples.popleft()
+
+        # 十分な大きさのチャンクのみ容量推定に使う（小さい送信は遅延の影響が大きい）
+        # 並列アップロード中は1本あたりの速度×本数を回線全体の容量とみなす
+        if elapsed and elapsed > 0 and amount >= 256 * 1024:
+            with self._samples_lock:
+                streams = max(1, len(self._current_uploads))
+            self.update_link_capacity(amount / elapsed * streams)
+
+    def current_rate(self) -> float:
+        """直近の実アップロード速度（bytes/秒）"""
+        now = time.monotonic()
+        with self._samples_lock:
+            while self._samples and now - self._samples[0][0] > self._window:
+                self._samples.popleft()
+            total = sum(amount for _, amount in self._samples)
+        return total / self._window
+
+    def set_current_upload(self, upload_id: str, info: Optional[Dict[str, Any]]) -> None:
+        """進行中アップロード情報の更新（upload_idはアップロードごとに一意、infoがNoneなら完了として削除）"""
+        with self._samples_lock:
+            if info is None:
+                self._current_uploads.pop(upload_id, None)
+            else:
+                self._current_uploads[upload_id] = info
+
+    def get_stats(self) -> Dict[str, Any]:
+        """帯域制御状態取得"""
+        limit = self.current_limit()
+        with self._pause_cond:
+            paused_by = sorted(self._pause_reasons)
+        with self._samples_lock:
+            current_uploads = list(self._current_uploads.values())
+        return {
+            'enabled': self.enabled,
+            'limit_kbps': round(limit * 8 / 1000, 1) if limit else None,
+            'scheduled_kbps': self._scheduled_rate_kbps() or None,
+            'link_capacity_kbps': round(self._link_capacity_bps * 8 / 1000, 1) if self._link_capacity_bps else None,
+            'current_rate_kbps': round(self.current_rate() * 8 / 1000, 1),
+            'paused': bool(paused_by),
+            'paused_by': paused_by,
+            'bytes_sent': self.stats['bytes_sent'],
+            'wait_seconds': round(self.stats['wait_seconds'], 1),
+            'paused_seconds': round(self.stats['paused_seconds'], 1),
+            'current_uploads': current_uploads,
+            'timestamp': datetime.now().strftime('%H:%M:%S')
+        }
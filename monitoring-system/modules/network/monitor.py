@@ -3,19 +3,48 @@
 速度テストとPingテストのみに特化
 """
 
+import logging
 import subprocess
 import re
 import platform
-import psutil
 import requests
 import time
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional
+
+from utils import Counter, Gauge, Histogram, SingleFlight
+
+# 計測結果のメトリクス（/metrics で出力）
+PING_RTT = Histogram(
+    'monitoring_network_ping_rtt_seconds', 'Ping平均往復時間（秒）', ['host'],
+    buckets=(0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0)
+)
+PACKET_LOSS = Gauge('monitoring_network_ping_packet_loss_ratio', '直近のPingのパケット損失率（0〜1）', ['host'])
+PROBE_DURATION = Histogram(
+    'monitoring_network_probe_duration_seconds', '計測処理の所要時間（秒）', ['probe'],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 30.0)
+)
+PROBE_FAILURES = Counter('monitoring_network_probe_failures_total', '失敗した計測の回数', ['probe'])
+DOWNLOAD_SPEED = Gauge('monitoring_network_download_speed_bits_per_second', '直近の速度テストの結果（bps）')
+CONNECTION_STATUS = Gauge('monitoring_network_connection_status', '接続状態（現在の状態のみ1）', ['status'])
+
+CONNECTION_STATES = ('connected', 'limited', 'disconnected', 'error')
+
+# 設定された宛先以外（/api/ping-test で任意に指定されたホスト）のメトリクスのラベル
+ADHOC_HOST_LABEL = 'adhoc'
+
+logger = logging.getLogger(__name__)
 
 class NetworkMonitor:
     """ネットワーク監視クラス（簡素化版）"""
     
-    def __init__(self):
+    def __init__(self, speed_test_ttl: float = 5, ping_ttl: float = 0, ping_host: str = '8.8.8.8'):
+        """
+        同時に呼ばれた同じテストは1回だけ実行して結果を共有する（同時に速度テストを行うと互いの結果を汚すため）
+        speed_test_ttl / ping_ttl: 完了したテスト結果を再利用する秒数
+        ping_host: 定期監視のPing宛先（メトリクスのhostラベルはこの宛先のみ、他は'adhoc'にまとめる）
+        """
+        self.ping_host = ping_host
         self.data = {
             'last_update': None,
             'ping_latency': None,
@@ -23,11 +52,49 @@ class NetworkMonitor:
             'connection_status': 'checking'
         }
         self.is_windows = platform.system().lower() == 'windows'
+        self._test_listeners: List[Callable[[str, str], None]] = []
+        self._speed_flight = SingleFlight('network-speed', ttl=speed_test_ttl)
+        self._probe_flight = SingleFlight('network-probe', ttl=ping_ttl)
+    
+    def add_test_listener(self, listener: Callable[[str, str], None]) -> None:
+        """テスト開始/終了の通知先を登録（listener(event, test_name)、eventは'start'/'end'）"""
+        self._test_listeners.append(listener)
+    
+    def _notify_test(self, event: str, test_name: str) -> None:
+        """テスト開始/終了を通知"""
+        for listener in self._test_listeners:
+            try:
+                listener(event, test_name)
+            except Exception as e:
+                logger.error("Network test listener error: %s", e)
+    
+    def ping_test(self, host: Optional[str] = None, count: int = 3) -> Optional[float]:
+        """Ping レイテンシテスト（クロスプラットフォーム対応、同じ宛先・回数のテストが実行中ならその結果を共有）"""
+        host = host or self.ping_host
+        return self._probe_flight.do(('ping', host, count), self._measure_ping, host, count)
+    
+    def _measure_ping(self, host: str, count: int) -> Optional[float]:
+        """Ping レイテンシテストの実行と計測"""
+        self._notify_test('start', 'ping')
+        try:
+            with PROBE_DURATION.time('ping'):
+                latency = self._run_ping_test(host, count)
+            if latency is None:
+                PROBE_FAILURES.labels('ping').inc()
+            else:
+                PING_RTT.labels(self._host_label(host)).observe(latency / 1000)
+            return latency
+        finally:
+            self._notify_test('end', 'ping')
     
-    def ping_test(self, host: str = '8.8.8.8', count: int = 3) -> Optional[float]:
-        """Ping レイテンシテスト（クロスプラットフォーム対応）"""
+    def _host_label(self, host: str) -> str:
+        """メトリクスのhostラベル（任意の宛先ごとに系列が増えないよう、設定された宛先以外は'adhoc'）"""
+        return host if host == self.ping_host else ADHOC_HOST_LABEL
+    
+    def _run_ping_test(self, host: str, count: int) -> Optional[float]:
+        """Ping レイテンシテスト本体"""
         try:
-            print(f"Ping test to {host} with {count} packets on {platform.system()}...")
+            logger.debug("Ping test to %s with %d packets on %s", host, count, platform.system())
             
             # プラットフォーム別のpingコマンド
             if self.is_windows:
@@ -42,29 +109,32 @@ class NetworkMonitor:
                 capture_output=True, text=True, timeout=15
             )
             
+            loss = self._parse_packet_loss(result.stdout)
+            if loss is not None:
+                PACKET_LOSS.labels(self._host_label(host)).set(loss)
+            
             if result.returncode == 0:
                 # プラットフォーム別の出力解析
                 latency = self._parse_ping_output(result.stdout)
                 if latency:
-                    print(f"Ping successful: {latency}ms")
+                    logger.debug("Ping successful: %sms", latency)
                     return latency
                 else:
-                    print("Could not parse ping output")
-                    print(f"Raw output: {result.stdout}")
+                    logger.warning("Could not parse ping output: %s", result.stdout)
             else:
-                print(f"Ping failed with return code: {result.returncode}")
-                print(f"Error output: {result.stderr}")
-                print(f"Raw output: {result.stdout}")
+                logger.warning("Ping to %s failed with return code %d: %s", host, result.returncode,
+                               (result.stderr or result.stdout).strip())
             return None
             
         except subprocess.TimeoutExpired:
-            print("Ping test timed out")
+            logger.warning("Ping test to %s timed out", host)
+            PACKET_LOSS.labels(self._host_label(host)).set(1)
             return None
         except FileNotFoundError:
-            print("Ping command not found")
+            logger.error("Ping command not found")
             return None
         except Exception as e:
-            print(f"Ping error: {e}")
+            logger.error("Ping error: %s", e)
             return None
     
     def _parse_ping_output(self, output: str) -> Optional[float]:
@@ -102,13 +172,38 @@ class NetworkMonitor:
             return None
             
         except Exception as e:
-            print(f"Ping output parsing error: {e}")
+            logger.warning("Ping output parsing error: %s", e)
             return None
     
+    @staticmethod
+    def _parse_packet_loss(output: str) -> Optional[float]:
+        """Pingコマンドの出力からパケット損失率（0〜1）を取得"""
+        # 例: "3 packets transmitted, 3 received, 0% packet loss" / "(0% loss)" / "(0% の損失)"
+        match = re.search(r'([\d.]+)%\s*(?:packet\s+)?(?:loss|の損失)', output, re.IGNORECASE)
+        return float(match.group(1)) / 100 if match else None
+    
     def internet_speed_test(self) -> Optional[float]:
-        """簡易インターネット速度テスト"""
+        """簡易インターネット速度テスト（実行中ならその結果を共有）"""
+        return self._speed_flight.do('speed', self._measure_speed)
+    
+    def _measure_speed(self) -> Optional[float]:
+        """簡易インターネット速度テストの実行と計測"""
+        self._notify_test('start', 'speed')
         try:
-            print("Starting internet speed test...")
+            with PROBE_DURATION.time('speed'):
+                speed = self._run_speed_test()
+            if speed is None:
+                PROBE_FAILURES.labels('speed').inc()
+            else:
+                DOWNLOAD_SPEED.set(speed * 1000000)
+            return speed
+        finally:
+            self._notify_test('end', 'speed')
+    
+    def _run_speed_test(self) -> Optional[float]:
+        """簡易インターネット速度テスト本体"""
+        try:
+            logger.info("Starting internet speed test")
             # 小さなファイルをダウンロードして速度測定
             start_time = time.time()
             response = requests.get('http://httpbin.org/bytes/1048576', timeout=15)  # 1MB
@@ -119,31 +214,40 @@ class NetworkMonitor:
                 size_mb = len(response.content) / (1024 * 1024)
                 speed_mbps = (size_mb * 8) / duration  # Mbps
                 result = round(speed_mbps, 2)
-                print(f"Speed test successful: {result} Mbps")
+                logger.info("Speed test successful: %s Mbps", result)
                 return result
             else:
-                print(f"Speed test failed with status: {response.status_code}")
+                logger.warning("Speed test failed with status: %d", response.status_code)
                 
         except requests.Timeout:
-            print("Speed test timed out")
+            logger.warning("Speed test timed out")
         except Exception as e:
-            print(f"Speed test error: {e}")
+            logger.error("Speed test error: %s", e)
             
         return None
     
     def test_connectivity(self) -> bool:
-        """基本的な接続テスト"""
+        """基本的な接続テスト（実行中ならその結果を共有）"""
+        return self._probe_flight.do('connectivity', self._check_connectivity)
+    
+    def _check_connectivity(self) -> bool:
+        """基本的な接続テスト本体"""
         try:
             # 簡単なHTTPリクエストで接続確認
-            response = requests.get('http://www.google.com', timeout=5)
-            return response.status_code == 200
+            with PROBE_DURATION.time('connectivity'):
+                response = requests.get('http://www.google.com', timeout=5)
+            if response.status_code == 200:
+                return True
         except:
-            return False
+            pass
+        PROBE_FAILURES.labels('connectivity').inc()
+        return False
     
     def update_data(self) -> Dict[str, any]:
         """ネットワークデータ更新（基本情報のみ）"""
+        previous_status = self.data['connection_status']
         try:
-            print("Updating basic network data...")
+            logger.debug("Updating basic network data")
             
             # Ping レイテンシ
             latency = self.ping_test()
@@ -159,17 +263,27 @@ class NetworkMonitor:
                 else:
                     self.data['connection_status'] = 'disconnected'
             
+            if self.data['connection_status'] != previous_status:
+                logger.info("Connection status: %s -> %s", previous_status, self.data['connection_status'])
+            
             # 最終更新時刻
             self.data['last_update'] = datetime.now().strftime('%H:%M:%S')
-            print(f"Basic network data updated: {self.data['connection_status']}")
+            logger.debug("Basic network data updated: %s", self.data['connection_status'])
+            self._record_status()
             
             return self.data
             
         except Exception as e:
-            print(f"Network update error: {e}")
+            logger.error("Network update error: %s", e)
             self.data['connection_status'] = 'error'
+            self._record_status()
             return self.data
     
+    def _record_status(self) -> None:
+        """接続状態をメトリクスに反映"""
+        for status in CONNECTION_STATES:
+            CONNECTION_STATUS.labels(status).set(1 if self.data['connection_status'] == status else 0)
+    
     def get_data(self) -> Dict[str, any]:
         """現在のネットワークデータ取得"""
         return self.data.copy()
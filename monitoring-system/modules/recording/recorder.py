@@ -3,18 +3,136 @@
 音声録音とファイル管理を担当
 """
 
+import hashlib
+import json
+import logging
 import os
+import re
+import struct
 import subprocess
 import threading
-import time
+import zlib
+from collections import deque
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 
+from utils import Counter, Gauge, Histogram, SingleFlight
+
+# 録音データの読み取り単位
+CAPTURE_BLOCK_SIZE = 64 * 1024
+
+# arecordのエラー出力を保持する行数（異常終了時のログ用）
+STDERR_LINES = 20
+
+# カードを特定できない録音で、USBの切断後もarecordがこの秒数動き続けていれば別のデバイスの切断とみなす
+DEVICE_REMOVED_GRACE = 3
+
+# 録音と同時に計算できる高速ハッシュ
+FAST_HASHES = ('crc32', 'blake2b')
+
+# 録音のメトリクス（/metrics で出力）
+BYTES_WRITTEN = Counter('monitoring_recording_bytes_written_total', '録音ファイルに書き込んだバイト数')
+ACTIVE_SESSIONS = Gauge('monitoring_recording_active_sessions', '実行中の録音数')
+RECORDINGS = Counter('monitoring_recordings_total', '録音の回数（開始・完了・失敗・デバイス切断による中断）', ['result'])
+RECORDING_DURATION = Histogram(
+    'monitoring_recording_duration_seconds', '完了した録音の長さ（秒）',
+    buckets=(5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+)
+
+logger = logging.getLogger(__name__)
+
+# default の実体を定義するALSAの設定ファイル（先に見つかった定義を使う）
+ALSA_CONFIG_FILES = ('~/.asoundrc', '/etc/asound.conf')
+
+def resolve_alsa_card(device_id: str) -> Optional[str]:
+    """録音デバイス名からALSAのカード（番号またはID）を求める（pulse・dsnoop などで特定できなければNone）"""
+    match = re.match(r'^(?:plug)?hw:(?:CARD=)?([^,]+)', device_id)
+    if match:
+        return match.group(1)
+    if device_id not in ('default', 'sysdefault', 'plug:default'):
+        return None
+    
+    for path in ALSA_CONFIG_FILES:
+        try:
+            with open(os.path.expanduser(path), encoding='utf-8', errors='replace') as f:
+                text = re.sub(r'#.*', '', f.read())
+        except OSError:
+            continue
+        match = re.search(r'defaults\.pcm\.card\s+"?([\w-]+)', text)
+        if match:
+            return match.group(1)
+        block = re.search(r'pcm\.!?default\s*\{([^{}]*(?:\{[^{}]*\}[^{}]*)*)\}', text)
+        if block:
+            card = re.search(r'\bcard\s+"?([\w-]+)', block.group(1))
+            # カードの指定が無い default（pulse など）は実際のデバイスがわからない
+            return card.group(1) if card else None
+    # 設定が無ければ ALSA_CARD またはカード0
+    return os.environ.get('ALSA_CARD', '0')
+
+def wav_header(data_size: int, sample_rate: int, channels: int, bits: int = 16) -> bytes:
+    """PCM WAVヘッダー（44バイト）"""
+    block_align = channels * bits // 8
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate, sample_rate * block_align, block_align, bits,
+        b'data', data_size
+    )
+
+class _CaptureHash:
+    """
+    書き込んだバイト列のハッシュを逐次計算
+    ファイル全体のMD5（Driveのmd5Checksumと比較する）とは別に、ヘッダーを除くPCMデータのハッシュを持つ
+    （早期停止でヘッダーが変わってもPCMデータのハッシュはそのまま使える）
+    """
+    
+    def __init__(self, fast_hash: Optional[str] = None):
+        self.fast_hash = fast_hash
+        self._md5 = hashlib.md5()
+        self._pcm_md5 = hashlib.md5()
+        self._crc32 = 0
+        self._blake2b = hashlib.blake2b(digest_size=16) if fast_hash == 'blake2b' else None
+    
+    def update_header(self, header: bytes) -> None:
+        self._md5.update(header)
+    
+    def update(self, data: bytes) -> None:
+        self._md5.update(data)
+        self._pcm_md5.update(data)
+        if self.fast_hash == 'crc32':
+            self._crc32 = zlib.crc32(data, self._crc32)
+        elif self._blake2b is not None:
+            self._blake2b.update(data)
+    
+    def result(self, header_valid: bool = True) -> Dict[str, Any]:
+        """header_valid: 書き込んだヘッダーが最終的なものか（Falseならファイル全体のMD5はNone）"""
+        checksums = {
+            'md5': self._md5.hexdigest() if header_valid else None,
+            'pcm_md5': self._pcm_md5.hexdigest()
+        }
+        if self.fast_hash == 'crc32':
+            checksums['crc32'] = f'{self._crc32:08x}'
+        elif self._blake2b is not None:
+            checksums['blake2b'] = self._blake2b.hexdigest()
+        return checksums
+
 class AudioRecorder:
     """音声録音クラス"""
     
-    def __init__(self, save_directory: str):
+    def __init__(self, save_directory: str, fast_hash: Optional[str] = None, devices_ttl: float = 5):
+        """
+        fast_hash: MD5に加えて録音中に計算するハッシュ（'crc32' / 'blake2b'、Noneで無効）
+        devices_ttl: 録音デバイス一覧（arecord -l の結果）を再利用する秒数
+        """
         self.save_directory = os.path.abspath(save_directory)
+        self.fast_hash = fast_hash if fast_hash in FAST_HASHES else None
+        self._capture = None
+        self._stop_lock = threading.Lock()
+        # USBの切断通知で決まった停止の理由（停止処理は録音監視 poll_recording が行う）
+        self._pending_stop: Optional[str] = None
+        # カードを特定できない録音中にオーディオデバイスが切断された時刻
+        self._device_removed: Optional[datetime] = None
+        self._devices_flight = SingleFlight('audio-devices', ttl=devices_ttl)
         self.data = {
             'is_recording': False,
             'start_time': None,
@@ -30,10 +148,14 @@ class AudioRecorder:
         
         # 録音ディレクトリ作成
         os.makedirs(self.save_directory, exist_ok=True)
-        print(f"📁 録音保存ディレクトリ: {self.save_directory}")
+        logger.info("録音保存ディレクトリ: %s", self.save_directory)
     
     def get_audio_devices(self) -> List[Dict[str, Any]]:
-        """利用可能な録音デバイスの一覧を取得"""
+        """利用可能な録音デバイスの一覧を取得（同時の呼び出しは1回の検出にまとめる）"""
+        return self._devices_flight.do('devices', self._scan_audio_devices)
+    
+    def _scan_audio_devices(self) -> List[Dict[str, Any]]:
+        """録音デバイスの検出"""
         try:
             devices = [{
                 'id': 'default',
@@ -44,15 +166,11 @@ class AudioRecorder:
             
             # ALSA録音デバイスの検出
             try:
-                print("🔍 Detecting ALSA audio devices...")
                 result = subprocess.run(['arecord', '-l'], capture_output=True, text=True, timeout=5)
-                print(f"arecord -l result: {result.returncode}")
                 
                 if result.returncode == 0:
-                    print(f"arecord output: {result.stdout}")
                     lines = result.stdout.split('\n')
                     for line in lines:
-                        import re
                         # 日本語版と英語版の両方に対応
                         match = re.match(r'カード\s+(\d+):\s+([^\[]+)\s*\[([^\]]+)\].*デバイス\s+(\d+):\s*([^\[]+)\s*\[([^\]]+)\]', line)
                         if not match:
@@ -69,17 +187,17 @@ class AudioRecorder:
                                 'description': f'{card_desc.strip()}'
                             }
                             devices.append(device_info)
-                            print(f"Found device: {device_info}")
+                            logger.debug("Found device: %s", device_info)
                 else:
-                    print(f"arecord error: {result.stderr}")
+                    logger.warning("arecord -l failed (%d): %s", result.returncode, result.stderr.strip())
             except Exception as e:
-                print(f"ALSA device detection error: {e}")
+                logger.warning("ALSA device detection error: %s", e)
             
-            print(f"🎤 Found {len(devices)} audio devices")
+            logger.debug("Found %d audio devices", len(devices))
             return devices
             
         except Exception as e:
-            print(f"Audio devices scan error: {e}")
+            logger.error("Audio devices scan error: %s", e)
             return []
     
     def start_recording(self, duration: int, device_id: str = 'default', 
@@ -98,7 +216,7 @@ class AudioRecorder:
             filename = f'recording_{timestamp}.wav'
             filepath = os.path.join(self.save_directory, filename)
             
-            # 録音コマンド構築
+            # 録音コマンド構築（生PCMを標準出力に出し、WAVファイルへの書き込みとハッシュ計算はこちらで行う）
             cmd = [
                 'arecord',
                 '-D', device_id,
@@ -106,15 +224,41 @@ class AudioRecorder:
                 '-r', str(sample_rate),
                 '-c', str(channels),
                 '-f', 'S16_LE',  # 16bit signed little endian
-                '-t', 'wav',
-                filepath
+                '-t', 'raw',
+                '-'
             ]
             
-            print(f"Starting recording with command: {' '.join(cmd)}")
+            logger.info("Starting recording with command: %s", ' '.join(cmd))
             
             # 録音プロセス開始
             process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
             
+            # 録音データの書き込みスレッド開始（ヘッダーは予定の長さで書き、早期停止時に修正する）
+            self._capture = {
+                'expected_bytes': duration * sample_rate * channels * 2,
+                'data_bytes': 0,
+                'hash': _CaptureHash(self.fast_hash),
+                'sample_rate': sample_rate,
+                'channels': channels,
+                'error': None,
+                'stderr': deque(maxlen=STDERR_LINES)
+            }
+            self._capture['thread'] = threading.Thread(
+                target=self._pump_audio, args=(process, filepath, self._capture),
+                name='audio-capture', daemon=True
+            )
+            self._capture['thread'].start()
+            # エラー出力も読み続けないとパイプが詰まってarecordが止まる
+            self._capture['stderr_thread'] = threading.Thread(
+                target=self._drain_stderr, args=(process, self._capture),
+                name='audio-capture-stderr', daemon=True
+            )
+            self._capture['stderr_thread'].start()
+            ACTIVE_SESSIONS.inc()
+            RECORDINGS.labels('started').inc()
+            self._pending_stop = None
+            self._device_removed = None
+            
             # 録音状態更新
             self.data.update({
                 'is_recording': True,
@@ -125,6 +269,7 @@ class AudioRecorder:
                 'status': 'recording',
                 'process': process,
                 'selected_device': device_id,
+                'alsa_card': resolve_alsa_card(device_id),
                 'sample_rate': sample_rate,
                 'channels': channels
             })
@@ -137,19 +282,27 @@ class AudioRecorder:
             }
             
         except Exception as e:
-            print(f"Recording start error: {e}")
+            logger.error("Recording start error: %s", e)
+            RECORDINGS.labels('failed').inc()
             self.data['status'] = 'error'
             return {
                 'success': False,
                 'message': f'録音開始エラー: {str(e)}'
             }
     
-    def stop_recording(self) -> Dict[str, Any]:
-        """録音停止"""
+    def stop_recording(self, reason: Optional[str] = None) -> Dict[str, Any]:
+        """録音停止（reason: 中断の理由、'device_removed' など。録音の記録に interrupted として残す）"""
+        # API・録音監視・USBの切断通知から同時に呼ばれても停止処理は1回だけ行う
+        with self._stop_lock:
+            return self._stop_recording(reason)
+    
+    def _stop_recording(self, reason: Optional[str]) -> Dict[str, Any]:
         try:
             if self.data['is_recording'] and self.data['process']:
                 # プロセス終了
                 process = self.data['process']
+                # 停止前に自分で終了していたか（terminate後の終了コードはエラーとみなさない）
+                exited = process.poll() is not None
                 process.terminate()
                 
                 # プロセス終了待ち（最大5秒）
@@ -158,11 +311,20 @@ class AudioRecorder:
                 except subprocess.TimeoutExpired:
                     process.kill()
                     process.wait()
+                ACTIVE_SESSIONS.dec()
+                if exited and process.returncode != 0:
+                    self._log_arecord_error(process.returncode)
                 
                 # 録音完了情報を保存
                 end_time = datetime.now()
                 actual_duration = (end_time - self.data['start_time']).total_seconds()
                 
+                # 書き込み完了を待ってチェックサム確定
+                checksums = self._finish_capture(self.data['filepath'])
+                for stream in (process.stdout, process.stderr):
+                    if stream:
+                        stream.close()
+                
                 # ファイルサイズ確認
                 file_size = 0
                 if os.path.exists(self.data['filepath']):
@@ -178,8 +340,13 @@ class AudioRecorder:
                     'file_size': file_size,
                     'device': self.data['selected_device'],
                     'sample_rate': self.data.get('sample_rate', 44100),
-                    'channels': self.data.get('channels', 2)
+                    'channels': self.data.get('channels', 2),
+                    'checksums': checksums,
+                    'interrupted': reason
                 }
+                self._save_metadata(self.data['filepath'], self.data['last_recording'])
+                RECORDINGS.labels('interrupted' if reason else 'completed' if checksums else 'failed').inc()
+                RECORDING_DURATION.observe(actual_duration)
             
             # 録音状態リセット
             self.data.update({
@@ -194,16 +361,161 @@ class AudioRecorder:
             
             return {
                 'success': True,
-                'message': '録音を停止しました'
+                'message': '録音デバイスが切断されたため録音を停止しました' if reason == 'device_removed'
+                else '録音を停止しました'
             }
             
         except Exception as e:
-            print(f"Recording stop error: {e}")
+            logger.error("Recording stop error: %s", e)
             return {
                 'success': False,
                 'message': f'録音停止エラー: {str(e)}'
             }
     
+    def on_usb_event(self, event: Dict[str, Any]) -> bool:
+        """
+        USBデバイスの接続・切断の通知（modules.system.UsbMonitor のリスナー）
+        録音中のデバイスが外れたら停止を予約してTrueを返す（ueventの受信スレッドで呼ばれるため、
+        arecordの終了待ち・ファイルの確定は poll_recording に任せてすぐに戻る）
+        """
+        device = event['device']
+        if device.get('sound_card') is None and device.get('type') != 'オーディオ':
+            return False
+        # 録音デバイスの一覧は次の取得で作り直す
+        self._devices_flight.forget('devices')
+        if event['action'] != 'detach' or not self.data['is_recording']:
+            return False
+        
+        card = self.data.get('alsa_card')
+        selected = self.data['selected_device']
+        if card is None:
+            # カードを特定できない録音は、arecordが予定より早く終了したかを録音監視（poll_recording）が判断する
+            self._device_removed = datetime.now()
+            return False
+        if card not in (str(device.get('sound_card')), device.get('sound_card_id')):
+            return False
+        
+        logger.warning("Recording device removed (%s, %s), stopping recording", device.get('name'), selected)
+        self._pending_stop = 'device_removed'
+        return True
+    
+    def _pump_audio(self, process: subprocess.Popen, filepath: str, capture: Dict[str, Any]) -> None:
+        """arecordの出力をWAVファイルに書き込みながらハッシュを計算"""
+        try:
+            with open(filepath, 'wb') as f:
+                header = wav_header(capture['expected_bytes'], capture['sample_rate'], capture['channels'])
+                f.write(header)
+                capture['hash'].update_header(header)
+                BYTES_WRITTEN.inc(len(header))
+                
+                while True:
+                    block = process.stdout.read(CAPTURE_BLOCK_SIZE)
+                    if not block:
+                        break
+                    f.write(block)
+                    capture['hash'].update(block)
+                    capture['data_bytes'] += len(block)
+                    BYTES_WRITTEN.inc(len(block))
+        except Exception as e:
+            logger.error("Recording capture error: %s", e)
+            capture['error'] = str(e)
+    
+    def _drain_stderr(self, process: subprocess.Popen, capture: Dict[str, Any]) -> None:
+        """arecordのエラー出力を読み、末尾の行を保持"""
+        try:
+            for line in process.stderr:
+                line = line.decode('utf-8', errors='replace').strip()
+                if line:
+                    capture['stderr'].append(line)
+        except Exception as e:
+            logger.debug("arecord stderr read error: %s", e)
+    
+    def _log_arecord_error(self, returncode: int) -> None:
+        """arecordの異常終了をエラー出力とともにログに残す"""
+        capture = self._capture
+        lines = []
+        if capture:
+            capture['stderr_thread'].join(timeout=1)
+            lines = list(capture['stderr'])
+        logger.error("arecord exited with code %d: %s", returncode, ' / '.join(lines) or '(no output)')
+    
+    def _finish_capture(self, filepath: str) -> Optional[Dict[str, Any]]:
+        """書き込み完了待ちとチェックサム確定（予定より短い場合はヘッダーを修正）"""
+        capture, self._capture = self._capture, None
+        if not capture:
+            return None
+        
+        capture['thread'].join(timeout=10)
+        if capture['thread'].is_alive() or capture['error']:
+            return None
+        
+        if capture['data_bytes'] == capture['expected_bytes']:
+            checksums = capture['hash'].result()
+            checksums['source'] = 'capture'
+            return checksums
+        
+        # 早期停止：ヘッダーのサイズだけ書き換える。PCMデータのハッシュはそのまま使い、
+        # ファイル全体のMD5はアップロードで必要になった時に計算する（get_checksum）
+        with open(filepath, 'r+b') as f:
+            f.write(wav_header(capture['data_bytes'], capture['sample_rate'], capture['channels']))
+        checksums = capture['hash'].result(header_valid=False)
+        checksums['source'] = 'partial'
+        return checksums
+    
+    def _hash_file(self, filepath: str) -> str:
+        """ファイル全体のMD5計算"""
+        md5 = hashlib.md5()
+        with open(filepath, 'rb') as f:
+            for block in iter(lambda: f.read(CAPTURE_BLOCK_SIZE), b''):
+                md5.update(block)
+        return md5.hexdigest()
+    
+    @staticmethod
+    def _metadata_path(filepath: str) -> str:
+        """録音メタデータ（サイドカーファイル）のパス"""
+        return os.path.splitext(filepath)[0] + '.json'
+    
+    def _save_metadata(self, filepath: str, metadata: Dict[str, Any]) -> None:
+        """録音メタデータ保存"""
+        try:
+            with open(self._metadata_path(filepath), 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            logger.error("Recording metadata save error: %s", e)
+    
+    def get_metadata(self, filename: str) -> Optional[Dict[str, Any]]:
+        """録音メタデータ取得（録音後にファイルが変更されていればNone）"""
+        filepath = os.path.join(self.save_directory, os.path.basename(filename))
+        try:
+            with open(self._metadata_path(filepath), 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+            if os.path.getsize(filepath) != metadata.get('file_size'):
+                return None
+            return metadata
+        except (OSError, ValueError):
+            return None
+    
+    def get_active_file(self) -> Optional[str]:
+        """録音中（書き込み中）のファイル名（録音していなければNone）"""
+        filepath = self.data['filepath']
+        return os.path.basename(filepath) if filepath else None
+    
+    def get_checksum(self, filename: str) -> Optional[str]:
+        """録音ファイル全体のMD5（録音時に計算したもの、途中で停止した録音は初回に計算して保存。無ければNone）"""
+        metadata = self.get_metadata(filename)
+        if not metadata or not metadata.get('checksums'):
+            return None
+        checksums = metadata['checksums']
+        if not checksums.get('md5'):
+            filepath = os.path.join(self.save_directory, os.path.basename(filename))
+            try:
+                checksums['md5'] = self._hash_file(filepath)
+            except OSError as e:
+                logger.error("Recording checksum error: %s", e)
+                return None
+            self._save_metadata(filepath, metadata)
+        return checksums['md5']
+    
     def get_status(self) -> Dict[str, Any]:
         """録音状態取得"""
         try:
@@ -257,7 +569,7 @@ class AudioRecorder:
             return files
             
         except Exception as e:
-            print(f"File list error: {e}")
+            logger.error("File list error: %s", e)
             return []
     
     def get_file_path(self, filename: str) -> Optional[str]:
@@ -267,26 +579,37 @@ class AudioRecorder:
             return filepath
         return None
     
-    def monitor_recording(self) -> None:
-        """録音監視（バックグラウンド実行）"""
-        while True:
-            try:
-                if self.data['is_recording'] and self.data['process']:
-                    process = self.data['process']
-                    
-                    # プロセス状態確認
-                    if process.poll() is not None:
-                        # プロセスが終了している場合
-                        print("Recording process finished")
-                        self.stop_recording()
-                    
-                    # 録音時間更新
-                    if self.data['start_time']:
-                        elapsed = (datetime.now() - self.data['start_time']).total_seconds()
-                        self.data['elapsed_time'] = round(elapsed, 1)
-                
-                time.sleep(1)
-                
-            except Exception as e:
-                print(f"Recording monitor error: {e}")
-                time.sleep(5)
+    def poll_recording(self) -> bool:
+        """録音状態の確認（停止の予約・録音プロセスの終了検出・経過時間の更新、1秒ごとに呼ぶ）、停止した場合はTrue"""
+        stopped = False
+        if self.data['is_recording'] and self.data['process']:
+            process = self.data['process']
+            
+            if self._pending_stop:
+                # USBの切断通知で予約された停止
+                reason, self._pending_stop = self._pending_stop, None
+                self.stop_recording(reason=reason)
+                stopped = True
+            elif process.poll() is not None:
+                # プロセスが終了している場合（切断の後に予定より早く終わったものだけを中断とする）
+                logger.info("Recording process finished (code %s)", process.returncode)
+                removed = self._device_removed is not None and self._exited_early(process)
+                self.stop_recording(reason='device_removed' if removed else None)
+                stopped = True
+            elif self._device_removed is not None and \
+                    (datetime.now() - self._device_removed).total_seconds() >= DEVICE_REMOVED_GRACE:
+                # 切断後も録音が続いている＝切断されたのは録音していない別のデバイス
+                self._device_removed = None
+            
+            # 録音時間更新
+            if self.data['start_time']:
+                elapsed = (datetime.now() - self.data['start_time']).total_seconds()
+                self.data['elapsed_time'] = round(elapsed, 1)
+        return stopped
+    
+    def _exited_early(self, process: subprocess.Popen) -> bool:
+        """arecordがエラーで、または予定の長さより前に終了したか"""
+        if process.returncode != 0:
+            return True
+        elapsed = (datetime.now() - self.data['start_time']).total_seconds()
+        return elapsed < self.data['duration'] - 1
@@ -0,0 +1,19 @@
+"""
+システム情報モジュール
+crontab・Tailscale・USBデバイスの状態取得（SystemCollectorsでバックグラウンド収集）
+"""
+
+from .crontab import CrontabCollector, get_crontab_status
+from .tailscale import TailscaleCollector, get_tailscale_status
+from .usb import UsbMonitor, scan_usb_devices
+from .collectors import SystemCollectors
+
+__all__ = [
+    'CrontabCollector',
+    'get_crontab_status',
+    'TailscaleCollector',
+    'get_tailscale_status',
+    'UsbMonitor',
+    'scan_usb_devices',
+    'SystemCollectors'
+]
@@ -0,0 +1,134 @@
+"""
+システム情報の定期収集モジュール
+crontab・Tailscale・USBデバイスの取得（外部コマンド実行）をバックグラウンドで行い、
+APIやイベント配信にはキャッシュ済みの結果を返す
+"""
+
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from utils import RefreshingCache
+
+from .crontab import CrontabCollector
+from .tailscale import TailscaleCollector
+from .usb import UsbMonitor
+
+logger = logging.getLogger(__name__)
+
+# 情報源ごとの既定の更新間隔（秒）
+DEFAULT_INTERVALS = {
+    'crontab': 15,
+    'tailscale': 30,
+    'devices': 30
+}
+
+class SystemCollectors:
+    """情報源ごとのTTLキャッシュと定期更新"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 on_update: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                 is_active: Optional[Callable[[], bool]] = None):
+        """
+        config: {'crontab': {'interval': 60}, ..., 'max_stale': 600, 'wait_timeout': 10}
+        config['crontab'] / config['tailscale'] / config['devices'] はそのまま
+        CrontabCollector / TailscaleCollector / UsbMonitor に渡す
+        on_update: 取得完了ごとに (名前, 結果) で呼ばれる（イベント配信用）
+        is_active: 参照者がいるか。Falseの間は定期更新を止め、APIから参照された時だけ再取得する
+        """
+        config = config or {}
+        self.on_update = on_update
+        self.is_active = is_active or (lambda: True)
+        self.caches: Dict[str, RefreshingCache] = {}
+        self.intervals: Dict[str, float] = {}
+
+        self.crontab = CrontabCollector(config.get('crontab', {}))
+        self.tailscale = TailscaleCollector(config.get('tailscale', {}))
+        self.usb = UsbMonitor(config.get('devices', {}))
+        sources = {
+            'crontab': self.crontab.collect,
+            'tailscale': self.tailscale.collect,
+            'devices': self.usb.snapshot
+        }
+
+        for name, collect in sources.items():
+            interval = config.get(name, {}).get('interval', DEFAULT_INTERVALS[name])
+            self.intervals[name] = interval
+            self.caches[name] = RefreshingCache(
+                loader=self._make_loader(name, collect),
+                ttl=interval,
+                max_stale=config.get('max_stale', 600),
+                wait_timeout=config.get('wait_timeout', 10),
+                default={
+                    'status': 'checking',
+                    'message': '状態を確認中です'
+                },
+                name=f'{name}-collector'
+            )
+
+        self._scheduler = None
+        
+        # USBデバイスの接続・切断は定期取得を待たずに一覧を更新して配信する
+        self.usb.add_listener(lambda event: self.caches['devices'].refresh_async())
+
+    def _make_loader(self, name: str, collect: Callable[[], Dict[str, Any]]) -> Callable[[], Dict[str, Any]]:
+        """取得後にon_updateを呼ぶローダー"""
+        def load():
+            result = collect()
+            if self.on_update:
+                try:
+                    self.on_update(name, result)
+                except Exception as e:
+                    logger.error("Collector update callback error (%s): %s", name, e)
+            return result
+        return load
+
+    def get(self, name: str, refresh: bool = False) -> Dict[str, Any]:
+        """キャッシュ済みの結果（cache_age / stale付き、refresh=Trueで再取得）"""
+        cache = self.caches[name]
+        if refresh:
+            result = cache.refresh(timeout=cache.wait_timeout)
+        else:
+            result = cache.get()
+        return {
+            **result,
+            'cache_age': cache.age(),
+            'stale': cache.is_stale()
+        }
+
+    def schedule(self, scheduler: Any) -> None:
+        """定期収集をスケジューラー（utils.Scheduler）に登録し、USBの接続検出を開始（取得はスケジューラーのワーカーで行う）"""
+        for name, cache in self.caches.items():
+            # 参照者がいない間は初回の取得だけ行う
+            cache.schedule(scheduler, self.intervals[name], condition=self.is_active)
+        self.usb.start()
+        if self.tailscale.ping_enabled:
+            scheduler.add_periodic(
+                'tailscale-ping', self.ping_tailscale, interval=self.tailscale.ping_interval,
+                timeout=self.tailscale.ping_max_peers * (self.tailscale.ping_timeout + 5),
+                initial_delay=min(self.tailscale.ping_interval, 15)
+            )
+        self._scheduler = scheduler
+    
+    def ping_tailscale(self) -> Dict[str, Optional[float]]:
+        """Tailscaleのピアにpingして応答時間の履歴を更新（参照者がいなくても履歴が途切れないよう状態も取得し直す）"""
+        cache = self.caches['tailscale']
+        age = cache.age()
+        if age is None or age >= self.intervals['tailscale']:
+            cache.refresh(timeout=cache.wait_timeout)
+        return self.tailscale.ping_peers()
+
+    def stop(self) -> None:
+        """USBの接続検出の停止（定期収集はスケジューラーの停止で止まる）"""
+        self.usb.stop()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """各キャッシュの状態"""
+        return {
+            'running': bool(self._scheduler and self._scheduler.running),
+            'sources': {
+                name: {**cache.info(), 'interval': self.intervals[name]}
+                for name, cache in self.caches.items()
+            },
+            'crontab': self.crontab.get_stats(),
+            'usb': self.usb.get_stats()
+        }
@@ -0,0 +1,218 @@
+"""
+crontab の解析
+スケジュール（5フィールド・@daily などのマクロ）・コマンド・環境変数行を構造化し、次回実行時刻を計算する
+"""
+
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+MACROS = {
+    '@yearly': '0 0 1 1 *',
+    '@annually': '0 0 1 1 *',
+    '@monthly': '0 0 1 * *',
+    '@weekly': '0 0 * * 0',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@hourly': '0 * * * *'
+}
+
+MONTH_NAMES = {name: index for index, name in enumerate(
+    ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'), start=1)}
+DAY_NAMES = {name: index for index, name in enumerate(('sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat'))}
+
+# (最小値, 最大値, 名前)
+FIELDS = (
+    ('minute', 0, 59, None),
+    ('hour', 0, 23, None),
+    ('day', 1, 31, None),
+    ('month', 1, 12, MONTH_NAMES),
+    ('weekday', 0, 7, DAY_NAMES)
+)
+
+ENV_PATTERN = re.compile(r'^([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(.*)$')
+
+WEEKDAY_TEXT = '日月火水木金土'
+
+class CronSyntaxError(ValueError):
+    """解析できないスケジュール"""
+
+def _parse_value(text: str, names: Optional[Dict[str, int]]) -> int:
+    if names and text.lower() in names:
+        return names[text.lower()]
+    if not text.isdigit():
+        raise CronSyntaxError(f"不正な値です: {text}")
+    return int(text)
+
+def parse_field(text: str, low: int, high: int, names: Optional[Dict[str, int]] = None) -> FrozenSet[int]:
+    """1フィールド（*、*/n、a-b、a-b/n、リスト、月・曜日の名前）を値の集合にする"""
+    values = set()
+    for part in text.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            if not step_text.isdigit() or int(step_text) == 0:
+                raise CronSyntaxError(f"不正な間隔です: {step_text}")
+            step = int(step_text)
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start_text, end_text = part.split('-', 1)
+            start, end = _parse_value(start_text, names), _parse_value(end_text, names)
+        else:
+            start = _parse_value(part, names)
+            # "5/10" は 5 から最大値まで10ごと
+            end = high if step > 1 else start
+        if not low <= start <= high or not low <= end <= high or start > end:
+            raise CronSyntaxError(f"範囲外の値です: {text}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+class CronSchedule:
+    """5フィールドのスケジュール"""
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise CronSyntaxError(f"フィールド数が5ではありません: {expression}")
+        self.expression = expression
+        sets = [parse_field(text, low, high, names) for text, (_, low, high, names) in zip(parts, FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = sets
+        # 0と7はどちらも日曜日
+        self.weekdays = frozenset(day % 7 for day in weekdays)
+        # 日と曜日が両方指定された場合はどちらかに一致すれば実行（cronの仕様）
+        self.day_restricted = parts[2] != '*' and not parts[2].startswith('*/')
+        self.weekday_restricted = parts[4] != '*' and not parts[4].startswith('*/')
+        self._sorted_minutes = sorted(self.minutes)
+
+    def matches_day(self, moment: datetime) -> bool:
+        """日・曜日の条件に一致するか"""
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.isoweekday() % 7) in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_run(self, after: datetime, limit_days: int = 366 * 5) -> Optional[datetime]:
+        """after より後の最初の実行時刻（一致しないスケジュールはNone、2/30など）"""
+        moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=limit_days)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if not self.matches_day(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+                continue
+            minute = next((m for m in self._sorted_minutes if m >= moment.minute), None)
+            if minute is None:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+                continue
+            return moment.replace(minute=minute)
+        return None
+
+    def describe(self) -> str:
+        """日本語の説明（よくある形のみ、それ以外は式をそのまま）"""
+        parts = self.expression.split()
+        minute, hour, day, month, weekday = parts
+        if parts == ['*'] * 5:
+            return '毎分実行'
+        if minute.startswith('*/') and parts[1:] == ['*'] * 4:
+            return f'{minute[2:]}分ごとに実行'
+        if not (minute.isdigit() and day == '*' and month == '*'):
+            return f'カスタムスケジュール ({self.expression})'
+        if hour == '*':
+            return f'毎時 {int(minute)} 分に実行'
+        if hour.startswith('*/'):
+            return f'{hour[2:]}時間ごと（{int(minute)}分）に実行'
+        if not hour.isdigit():
+            return f'カスタムスケジュール ({self.expression})'
+        time_text = f'{int(hour)}:{int(minute):02d}'
+        if weekday == '*':
+            return f'毎日 {time_text} に実行'
+        if self.weekdays and len(self.weekdays) < 7:
+            days = ''.join(WEEKDAY_TEXT[d] for d in sorted(self.weekdays))
+            return f'毎週{days}曜日 {time_text} に実行'
+        return f'カスタムスケジュール ({self.expression})'
+
+def split_command(text: str) -> Tuple[str, Optional[str]]:
+    """コマンド部分を実行コマンドと標準入力（エスケープされていない最初の % 以降）に分ける"""
+    match = re.search(r'(?<!\\)%', text)
+    if not match:
+        return text.replace('\\%', '%'), None
+    command = text[:match.start()].replace('\\%', '%')
+    stdin = text[match.end():].replace('\\%', '%').replace('%', '\n')
+    return command, stdin
+
+def parse_crontab(text: str, system: bool = False, source: Optional[str] = None,
+                  user: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Dict[str, str], List[Dict[str, Any]]]:
+    """
+    crontab の内容を解析し (ジョブ, 最終的な環境変数, 解析エラー) を返す
+    system: /etc/crontab・/etc/cron.d 形式（スケジュールとコマンドの間にユーザー名がある）
+    各ジョブの env はその行より前に定義された環境変数
+    """
+    entries: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    env: Dict[str, str] = {}
+
+    for line_number, raw in enumerate(text.splitlines(), start=1):
+        line = raw.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        env_match = ENV_PATTERN.match(line)
+        if env_match and not line.startswith('@'):
+            value = env_match.group(2).strip()
+            if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+                value = value[1:-1]
+            env[env_match.group(1)] = value
+            continue
+
+        try:
+            if line.startswith('@'):
+                macro, *rest = line.split(None, 1)
+                macro = macro.lower()
+                if macro != '@reboot' and macro not in MACROS:
+                    raise CronSyntaxError(f"不明なマクロです: {macro}")
+                expression = MACROS.get(macro)
+                fields = rest[0] if rest else ''
+            else:
+                parts = line.split(None, 5)
+                if len(parts) < 6:
+                    raise CronSyntaxError('フィールドが不足しています')
+                macro = None
+                expression = ' '.join(parts[:5])
+                fields = parts[5]
+
+            entry_user = user
+            if system:
+                user_fields = fields.split(None, 1)
+                if len(user_fields) < 2:
+                    raise CronSyntaxError('ユーザー名またはコマンドがありません')
+                entry_user, fields = user_fields
+            command, stdin = split_command(fields.strip())
+            if not command:
+                raise CronSyntaxError('コマンドがありません')
+            schedule = CronSchedule(expression) if expression else None
+        except CronSyntaxError as e:
+            errors.append({'source': source, 'line': line_number, 'text': line, 'error': str(e)})
+            continue
+
+        entries.append({
+            'source': source,
+            'line': line_number,
+            'raw': line,
+            'macro': macro,
+            'schedule': expression,
+            'user': entry_user,
+            'command': command,
+            'stdin': stdin,
+            'env': dict(env),
+            'description': '起動時に実行' if macro == '@reboot' else schedule.describe(),
+            '_schedule': schedule
+        })
+
+    return entries, env, errors
@@ -0,0 +1,528 @@
+"""
+crontab情報モジュール
+crontab を構造化して解析し、次回実行時刻の索引と syslog / journal の実行記録（最終実行・所要時間）を付けて返す。
+解析結果はcrontabファイル（読めなければspoolディレクトリ）の更新時刻が変わるまで再利用する
+"""
+
+import bisect
+import getpass
+import json
+import logging
+import os
+import re
+import subprocess
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .cronparse import parse_crontab
+
+logger = logging.getLogger(__name__)
+
+# cronの実行記録（Debian系のcron、syslog形式とjournalのMESSAGE）
+SYSLOG_PATTERN = re.compile(
+    r'^(?P<time>[A-Z][a-z]{2} +\d+ \d\d:\d\d:\d\d|\d{4}-\d\d-\d\dT\S+) \S+ CRON\[(?P<pid>\d+)\]: (?P<message>.*)$'
+)
+CMD_PATTERN = re.compile(r'^\((?P<user>[^)]+)\) CMD \((?P<command>.*)\)$')
+SESSION_CLOSED_PATTERN = re.compile(r'pam_unix\(cron:session\): session closed for user (\S+)')
+
+def _now() -> str:
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+def _format(moment: Optional[datetime]) -> Optional[str]:
+    return moment.strftime('%Y-%m-%d %H:%M:%S') if moment else None
+
+def _parse_syslog_time(text: str, now: datetime) -> Optional[datetime]:
+    """syslogの時刻（"Oct 19 14:00:01" または RFC3339）をローカル時刻にする"""
+    try:
+        if text[0].isdigit():
+            moment = datetime.fromisoformat(text)
+            return moment.astimezone().replace(tzinfo=None) if moment.tzinfo else moment
+        moment = datetime.strptime(f'{now.year} {text}', '%Y %b %d %H:%M:%S')
+    except ValueError:
+        return None
+    # 年が書かれていないため、未来になる場合は前年の記録
+    if moment > now + timedelta(days=1):
+        moment = moment.replace(year=moment.year - 1)
+    return moment
+
+class CronLogReader:
+    """syslog / journal からcronの実行記録を差分で読み、コマンドごとの最終実行・所要時間を保持する"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        config: {'enabled': True, 'syslog_files': ['/var/log/syslog', '/var/log/cron.log'], 'journal': True,
+                 'lookback': 86400, 'max_initial_bytes': 1048576, 'history_size': 10}
+        syslog_files: 読めるファイルがあればjournalより優先して読む（前回の位置から差分のみ）
+        lookback: 起動後の初回に遡って読む秒数（journal）
+        """
+        config = config or {}
+        self.enabled = config.get('enabled', True)
+        self.syslog_files = config.get('syslog_files', ['/var/log/syslog', '/var/log/cron.log'])
+        self.journal = config.get('journal', True)
+        self.lookback = config.get('lookback', 86400)
+        self.max_initial_bytes = config.get('max_initial_bytes', 1024 * 1024)
+        self.history_size = config.get('history_size', 10)
+
+        self.source = None
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+        self._cursor = None
+        self._pending: 'OrderedDict[int, Tuple[datetime, str, str]]' = OrderedDict()
+        self._runs: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=20)
+        self._lock = threading.Lock()
+
+    def poll(self) -> int:
+        """新しい記録を読み込む（読み込んだ実行記録の件数を返す）"""
+        if not self.enabled:
+            return 0
+        now = datetime.now()
+        for path in self.syslog_files:
+            if os.access(path, os.R_OK):
+                self.source = path
+                return self._read_syslog(path, now)
+        if self.journal:
+            self.source = 'journal'
+            return self._read_journal()
+        self.source = None
+        return 0
+
+    def _read_syslog(self, path: str, now: datetime) -> int:
+        """syslogファイルの前回の位置以降を読む（ローテーションで別ファイル・縮小したら先頭から）"""
+        try:
+            stat = os.stat(path)
+            inode, offset = self._offsets.get(path, (None, None))
+            if inode != stat.st_ino or offset is None or offset > stat.st_size:
+                offset = max(stat.st_size - self.max_initial_bytes, 0) if inode is None else 0
+            with open(path, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        except OSError as e:
+            logger.warning("Cron log read failed (%s): %s", path, e)
+            return 0
+
+        # 途中までしか書かれていない最後の行は次回に読む
+        end = data.rfind(b'\n') + 1
+        self._offsets[path] = (stat.st_ino, offset + end)
+        count = 0
+        for line in data[:end].decode('utf-8', errors='replace').splitlines():
+            if 'CRON[' not in line:
+                continue
+            match = SYSLOG_PATTERN.match(line)
+            if not match:
+                continue
+            moment = _parse_syslog_time(match.group('time'), now)
+            if moment is not None:
+                count += self._handle(moment, int(match.group('pid')), match.group('message'))
+        return count
+
+    def _read_journal(self) -> int:
+        """journalctl -t CRON の前回のカーソル以降を読む"""
+        command = ['journalctl', '-t', 'CRON', '-o', 'json', '--no-pager', '-q']
+        command += ['--after-cursor', self._cursor] if self._cursor else ['--since', f'-{int(self.lookback)}s']
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=15)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.debug("journalctl failed: %s", e)
+            return 0
+
+        count = 0
+        for line in result.stdout.splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            self._cursor = record.get('__CURSOR', self._cursor)
+            message = record.get('MESSAGE')
+            if isinstance(message, list):
+                # UTF-8でないメッセージはバイト列の配列になる
+                message = bytes(message).decode('utf-8', errors='replace')
+            try:
+                moment = datetime.fromtimestamp(int(record['__REALTIME_TIMESTAMP']) / 1_000_000)
+                pid = int(record.get('_PID', 0))
+            except (KeyError, ValueError):
+                continue
+            count += self._handle(moment, pid, message or '')
+        return count
+
+    def _handle(self, moment: datetime, pid: int, message: str) -> int:
+        """1行の記録（CMDで開始、同じPIDのセッション終了で完了、PAMの記録が無い環境では所要時間は不明のまま）"""
+        match = CMD_PATTERN.match(message)
+        with self._lock:
+            if match:
+                user, command = match.group('user'), match.group('command')
+                self._pending[pid] = (moment, user, command)
+                while len(self._pending) > 256:
+                    self._pending.popitem(last=False)
+                run = self._runs.setdefault((user, command), {
+                    'runs': 0, 'last_run': None, 'last_duration': None, 'history': deque(maxlen=self.history_size)
+                })
+                run['runs'] += 1
+                run['last_run'] = moment
+                return 1
+
+            if SESSION_CLOSED_PATTERN.search(message) and pid in self._pending:
+                started, user, command = self._pending.pop(pid)
+                duration = round(max((moment - started).total_seconds(), 0.0), 1)
+                run = self._runs.get((user, command))
+                if run is not None and run['last_run'] == started:
+                    run['last_duration'] = duration
+                    run['history'].append({'start': _format(started), 'duration': duration})
+                self._recent.append({'time': _format(started), 'user': user, 'command': command,
+                                     'duration': duration})
+        return 0
+
+    def lookup(self, user: Optional[str], command: str) -> Optional[Dict[str, Any]]:
+        """ジョブの実行記録（記録が無ければNone）"""
+        with self._lock:
+            run = self._runs.get((user, command))
+            if run is None:
+                return None
+            return {
+                'runs': run['runs'],
+                'last_run': _format(run['last_run']),
+                'last_duration': run['last_duration'],
+                'history': list(run['history'])
+            }
+
+    def recent(self) -> List[Dict[str, Any]]:
+        """直近に完了した実行（古い順）"""
+        with self._lock:
+            return list(self._recent)
+
+class CrontabCollector:
+    """crontabの解析結果・次回実行の索引・実行記録"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        config: {'user': None, 'spool_dir': '/var/spool/cron/crontabs', 'system_files': [],
+                 'fallback_interval': 300, 'index_horizon': 86400, 'max_occurrences': 1440,
+                 'log_interval': 60, 'logs': {...}}
+        spool_dir: ユーザーのcrontabの保存先。ファイルが読めれば直接読み、読めなければ crontab -l を
+                   ディレクトリの更新時刻が変わった時だけ実行する（どちらも確認できなければ fallback_interval 秒ごと）
+        system_files: 併せて読むシステムのcrontab（例: ['/etc/crontab', '/etc/cron.d']、ユーザー名の列あり）
+        index_horizon / max_occurrences: 次回実行の索引を作る範囲（秒）とジョブあたりの件数の上限
+        log_interval: 実行記録を読み直す間隔（秒）
+        """
+        config = config or {}
+        self.user = config.get('user') or os.environ.get('USER') or getpass.getuser()
+        self.spool_dir = config.get('spool_dir', '/var/spool/cron/crontabs')
+        self.system_files = config.get('system_files', [])
+        self.fallback_interval = config.get('fallback_interval', 300)
+        self.index_horizon = config.get('index_horizon', 86400)
+        self.max_occurrences = config.get('max_occurrences', 1440)
+        self.log_interval = config.get('log_interval', 60)
+        self.logs = CronLogReader(config.get('logs', {}))
+
+        self._signature = None
+        self._loaded_at = None
+        self._parsed: Optional[Dict[str, Any]] = None
+        self._entries: List[Dict[str, Any]] = []
+        self._logs_polled = None
+
+        self._index_times: List[datetime] = []
+        self._index_entries: List[int] = []
+        self._index_start = None
+        self._index_lock = threading.Lock()
+
+        self.stats = {
+            'reloads': 0,
+            'reused': 0,
+            'crontab_commands': 0
+        }
+
+    # ---------- 読み込み ----------
+
+    def _user_file(self) -> str:
+        return os.path.join(self.spool_dir, self.user)
+
+    def _stat_signature(self) -> Optional[Tuple[Any, ...]]:
+        """更新の判定に使う (種類, 更新時刻, サイズ) の組（確認できなければNone）"""
+        parts: List[Any] = []
+        try:
+            stat = os.stat(self._user_file())
+            parts.append(('file', stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            parts.append(('missing',))
+        except PermissionError:
+            try:
+                # crontab -e はファイルを置き換えるため、ディレクトリの更新時刻が変わる
+                parts.append(('dir', os.stat(self.spool_dir).st_mtime_ns))
+            except OSError:
+                return None
+        except OSError:
+            return None
+
+        for path in self.system_files:
+            try:
+                parts.append((path, os.stat(path).st_mtime_ns))
+                if os.path.isdir(path):
+                    for name in sorted(os.listdir(path)):
+                        child = os.path.join(path, name)
+                        parts.append((child, os.stat(child).st_mtime_ns))
+            except OSError:
+                parts.append((path, None))
+        return tuple(parts)
+
+    def _load(self) -> Dict[str, Any]:
+        """解析結果（更新時刻が変わっていなければ前回のもの）"""
+        signature = self._stat_signature()
+        now = time.monotonic()
+        if self._parsed is not None:
+            unchanged = signature == self._signature if signature is not None else (
+                now - self._loaded_at < self.fallback_interval)
+            if unchanged:
+                self.stats['reused'] += 1
+                return self._parsed
+
+        self.stats['reloads'] += 1
+        self._parsed = self._read_all(signature)
+        self._signature = signature
+        self._loaded_at = now
+        entries = self._parsed.pop('_entries')
+        for index, entry in enumerate(entries):
+            entry['id'] = index
+        self._replace_entries(entries)
+        return self._parsed
+
+    def _replace_entries(self, entries: List[Dict[str, Any]]) -> None:
+        """ジョブを入れ替えて索引を捨てる（索引のIDが別のジョブを指さないよう同じロックの中で行う）"""
+        with self._index_lock:
+            self._entries = entries
+            self._index_times, self._index_entries = [], []
+            self._index_start = None
+
+    def _read_all(self, signature: Optional[Tuple[Any, ...]]) -> Dict[str, Any]:
+        """ユーザー・システムのcrontabを読んで解析"""
+        if signature is not None and signature[0][0] == 'file':
+            try:
+                with open(self._user_file(), encoding='utf-8', errors='replace') as f:
+                    text = f.read()
+                result = {'status': 'ok', 'mode': 'file'}
+            except OSError as e:
+                text, result = None, self._crontab_error('error', f'crontabの読み込みに失敗しました: {e}')
+        elif signature is not None and signature[0][0] == 'missing':
+            text, result = '', {'status': 'ok', 'mode': 'file', 'no_crontab': True}
+        else:
+            text, result = self._read_with_command()
+
+        entries, errors, env = [], [], {}
+        if text is not None:
+            entries, env, errors = parse_crontab(text, source='user', user=self.user)
+        for path in self.system_files:
+            files = [path]
+            if os.path.isdir(path):
+                # cronと同じく、名前に "." を含むファイルやバックアップ（~）は読まない
+                files = [os.path.join(path, name) for name in sorted(os.listdir(path))
+                         if '.' not in name and not name.endswith('~')]
+            for file_path in files:
+                try:
+                    with open(file_path, encoding='utf-8', errors='replace') as f:
+                        system_entries, _, system_errors = parse_crontab(f.read(), system=True, source=file_path)
+                except OSError:
+                    continue
+                entries.extend(system_entries)
+                errors.extend(system_errors)
+
+        result.update({'_entries': entries, 'env': env, 'errors': errors})
+        return result
+
+    def _read_with_command(self) -> Tuple[Optional[str], Dict[str, Any]]:
+        """crontab -l で読む（spoolのファイルを読めない場合）"""
+        self.stats['crontab_commands'] += 1
+        # systemdサービス実行時の環境変数設定
+        env = os.environ.copy()
+        env.update({
+            'PATH': '/usr/local/bin:/usr/bin:/bin:/usr/local/sbin:/usr/sbin:/sbin',
+            'USER': self.user,
+            'HOME': os.environ.get('HOME', '/home/administrator'),
+            'LOGNAME': self.user
+        })
+        try:
+            result = subprocess.run(['crontab', '-l'], capture_output=True, text=True, timeout=10, env=env)
+        except subprocess.TimeoutExpired:
+            return None, self._crontab_error('timeout', 'crontabコマンドがタイムアウトしました')
+        except FileNotFoundError:
+            return None, self._crontab_error(
+                'command_not_found', 'crontabコマンドが見つかりません（システムにインストールされていない可能性）')
+        except Exception as e:
+            return None, self._crontab_error('error', f'システムエラー: {str(e)}')
+
+        if result.returncode == 0:
+            return result.stdout, {'status': 'ok', 'mode': 'crontab -l'}
+
+        # よくあるエラーパターンの判定
+        stderr_text = result.stderr.strip() if result.stderr else ''
+        stderr_lower = stderr_text.lower()
+        if 'no crontab' in stderr_lower:
+            return '', {'status': 'ok', 'mode': 'crontab -l', 'no_crontab': True}
+        if 'permission denied' in stderr_lower:
+            status, message = 'permission_error', 'crontabへのアクセス権限がありません'
+        elif 'not found' in stderr_lower:
+            status, message = 'command_not_found', 'crontabコマンドが見つかりません'
+        else:
+            status = 'error'
+            message = f'crontabエラー: {stderr_text}' if stderr_text else 'crontabコマンドの実行に失敗しました'
+        error = self._crontab_error(status, message)
+        error['debug_info'] = {
+            'returncode': result.returncode,
+            'stderr': stderr_text,
+            'user': env.get('USER'),
+            'home': env.get('HOME'),
+            'path': env.get('PATH')
+        }
+        return None, error
+
+    @staticmethod
+    def _crontab_error(status: str, message: str) -> Dict[str, Any]:
+        return {'status': status, 'message': message, 'mode': None}
+
+    # ---------- 次回実行 ----------
+
+    def _ensure_index(self, now: datetime) -> None:
+        """次回実行の索引（作成から index_horizon の半分が過ぎるか、crontabが変わったら作り直す）"""
+        with self._index_lock:
+            if self._index_start is not None and now < self._index_start + timedelta(
+                    seconds=self.index_horizon / 2):
+                return
+            end = now + timedelta(seconds=self.index_horizon)
+            occurrences = []
+            for entry in self._entries:
+                schedule = entry['_schedule']
+                if schedule is None:
+                    continue
+                moment = now
+                for _ in range(self.max_occurrences):
+                    moment = schedule.next_run(moment)
+                    if moment is None or moment > end:
+                        break
+                    occurrences.append((moment, entry['id']))
+            occurrences.sort()
+            self._index_times = [moment for moment, _ in occurrences]
+            self._index_entries = [entry_id for _, entry_id in occurrences]
+            self._index_start = now
+
+    def clamp_within(self, within: float) -> float:
+        """upcoming() で実際に使う範囲（秒、索引が必ず含む index_horizon の半分まで）"""
+        return min(max(within, 0), self.index_horizon / 2)
+
+    def upcoming(self, within: float = 3600, now: Optional[datetime] = None,
+                 limit: int = 100) -> List[Dict[str, Any]]:
+        """within 秒以内に実行されるジョブ（時刻順、最大limit件、索引は collect() が作り直す）"""
+        now = now or datetime.now()
+        within = self.clamp_within(within)
+        with self._index_lock:
+            start = bisect.bisect_right(self._index_times, now)
+            end = min(bisect.bisect_right(self._index_times, now + timedelta(seconds=within)), start + limit)
+            return [{
+                'time': _format(moment),
+                'id': entry_id,
+                'command': self._entries[entry_id]['command'],
+                'user': self._entries[entry_id]['user']
+            } for moment, entry_id in zip(self._index_times[start:end], self._index_entries[start:end])]
+
+    def _next_run(self, entry: Dict[str, Any], now: datetime) -> Optional[datetime]:
+        """ジョブの次回実行（索引の範囲外ならスケジュールから計算）"""
+        if entry['_schedule'] is None:
+            return None
+        with self._index_lock:
+            start = bisect.bisect_right(self._index_times, now)
+            for position in range(start, len(self._index_times)):
+                if self._index_entries[position] == entry['id']:
+                    return self._index_times[position]
+        return entry['_schedule'].next_run(now)
+
+    # ---------- 結果 ----------
+
+    def collect(self) -> Dict[str, Any]:
+        """Crontab状態確認（systemd対応版）"""
+        try:
+            parsed = self._load()
+        except Exception as e:
+            logger.error("Crontab load error: %s", e)
+            parsed = self._crontab_error('error', f'システムエラー: {str(e)}')
+            self._parsed = None
+            self._replace_entries([])
+
+        if parsed['status'] != 'ok':
+            return {
+                'status': parsed['status'],
+                'active_jobs': 0,
+                'jobs': [],
+                'entries': [],
+                'upcoming': [],
+                'last_check': _now(),
+                'message': parsed['message'],
+                **({'debug_info': parsed['debug_info']} if 'debug_info' in parsed else {})
+            }
+
+        monotonic = time.monotonic()
+        if self._logs_polled is None or monotonic - self._logs_polled >= self.log_interval:
+            self._logs_polled = monotonic
+            try:
+                self.logs.poll()
+            except Exception as e:
+                logger.warning("Cron log poll error: %s", e)
+
+        now = datetime.now()
+        self._ensure_index(now)
+        entries = []
+        for entry in self._entries:
+            next_run = self._next_run(entry, now)
+            entries.append({
+                **{key: value for key, value in entry.items() if not key.startswith('_')},
+                'next_run': _format(next_run),
+                'last': self.logs.lookup(entry['user'], entry['command'])
+            })
+
+        active_jobs = len(entries)
+        next_runs = [entry for entry in entries if entry['next_run']]
+        last_runs = [entry for entry in entries if entry['last'] and entry['last']['last_run']]
+        if parsed.get('no_crontab') and not entries:
+            message = 'このユーザーにはcrontabが設定されていません（正常状態）'
+        else:
+            message = f'{active_jobs}個のアクティブジョブ' if active_jobs > 0 else 'アクティブなジョブなし'
+
+        return {
+            'status': 'active' if active_jobs > 0 else 'inactive',
+            'active_jobs': active_jobs,
+            'jobs': [entry['raw'] for entry in entries[:10]],  # 互換性のため最初の10個の行も提供
+            'entries': entries,
+            'env': parsed['env'],
+            'errors': parsed['errors'],
+            'next_run': min(next_runs, key=lambda e: e['next_run'])['next_run'] if next_runs else None,
+            'last_run': max(last_runs, key=lambda e: e['last']['last_run'])['last']['last_run'] if last_runs else None,
+            'upcoming': self.upcoming(3600, now),
+            'logs': [
+                f"{run['time']} ({run['user']}) {run['command']} - {run['duration']:.0f}秒"
+                for run in self.logs.recent()
+            ],
+            'log_source': self.logs.source,
+            'read_mode': parsed['mode'],
+            'last_check': _now(),
+            'message': message,
+            'user': self.user,
+            'home': os.environ.get('HOME', '/home/administrator')
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """読み込み回数（reused は更新時刻が同じで解析を省略した回数）"""
+        with self._index_lock:
+            indexed = len(self._index_times)
+        return {
+            **self.stats,
+            'entries': len(self._entries),
+            'indexed_runs': indexed,
+            'log_source': self.logs.source
+        }
+
+_default_collector: Optional[CrontabCollector] = None
+
+def get_crontab_status() -> Dict[str, Any]:
+    """Crontab状態確認（既定の設定のコレクターを使用）"""
+    global _default_collector
+    if _default_collector is None:
+        _default_collector = CrontabCollector()
+    return _default_collector.collect()
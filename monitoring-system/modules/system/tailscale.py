@@ -0,0 +1,369 @@
+"""
+Tailscale情報モジュール
+tailscale status --json で接続状態とピア一覧（直接接続かDERPリレー経由か・送受信量）を取得し、
+ピアごとの通信量と tailscale ping の応答時間の履歴を保持する
+"""
+
+import json
+import logging
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Union
+
+from utils import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+PEERS = Gauge('monitoring_tailscale_peers', 'オンラインのピア数（経路別）', ['path'])
+PING_LATENCY = Gauge('monitoring_tailscale_ping_latency_seconds', '直近のtailscale pingの応答時間（秒）', ['peer', 'via'])
+RELAY_FALLBACKS = Counter('monitoring_tailscale_relay_fallbacks_total', '直接接続からDERPリレー経由に切り替わった回数')
+
+PATHS = ('direct', 'relay', 'idle')
+
+# tailscale ping の応答（例: "pong from pi (100.64.0.2) via 203.0.113.5:41641 in 12ms" / "via DERP(tok) in 95ms"）
+PONG_PATTERN = re.compile(r'pong from (\S+) \(([^)]+)\) via (DERP\(([^)]*)\)|\S+) in ([\d.]+)ms')
+
+def _now() -> str:
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+def _log_line(message: str) -> str:
+    return f'{datetime.now().strftime("%H:%M:%S")} {message}'
+
+class _PeerState:
+    """ピアごとの前回の送受信量と履歴"""
+
+    __slots__ = ('rx_bytes', 'tx_bytes', 'sampled', 'path', 'history', 'latency_ms', 'ping_via', 'pinged_at',
+                 'last_seen')
+
+    def __init__(self, history_size: int):
+        self.rx_bytes = None
+        self.tx_bytes = None
+        self.sampled = None
+        self.path = None
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self.latency_ms = None
+        self.ping_via = None
+        self.pinged_at = None
+        self.last_seen = time.monotonic()
+
+class TailscaleCollector:
+    """tailscale status --json の取得とピアごとの履歴"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        config: {'binary': 'tailscale', 'timeout': 10, 'history_size': 120, 'max_peers': 64,
+                 'ping': {'enabled': True, 'interval': 60, 'timeout': 5, 'max_peers': 8}}
+        binary: 実行するコマンド（文字列またはリスト、動作確認では tools/fake_tailscale.py を指定できる）
+        history_size: ピアごとに保持する履歴の件数
+        max_peers: 履歴を保持するピア数の上限（長く見えないピアから削除）
+        """
+        config = config or {}
+        binary: Union[str, List[str]] = config.get('binary', 'tailscale')
+        self.command = [binary] if isinstance(binary, str) else list(binary)
+        self.timeout = config.get('timeout', 10)
+        self.history_size = config.get('history_size', 120)
+        self.max_peers = config.get('max_peers', 64)
+
+        ping_config = config.get('ping', {})
+        self.ping_enabled = ping_config.get('enabled', True)
+        self.ping_interval = ping_config.get('interval', 60)
+        self.ping_timeout = ping_config.get('timeout', 5)
+        self.ping_max_peers = ping_config.get('max_peers', 8)
+
+        self._peers: Dict[str, _PeerState] = {}
+        self._online: List[Dict[str, Any]] = []
+        self._events: Deque[str] = deque(maxlen=20)
+        self._lock = threading.Lock()
+
+    # ---------- 状態取得 ----------
+
+    def collect(self) -> Dict[str, Any]:
+        """Tailscale状態確認"""
+        try:
+            result = subprocess.run(self.command + ['status', '--json'],
+                                    capture_output=True, text=True, timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            return self._error_result('timeout', 'Tailscaleコマンドがタイムアウトしました',
+                                      'ERROR: Tailscale command timed out')
+        except FileNotFoundError:
+            return self._error_result('error', 'Tailscaleコマンドの実行に失敗しました（未インストールの可能性）',
+                                      f'ERROR: {self.command[0]} not found')
+        except Exception as e:
+            return self._error_result('error', f'エラー: {str(e)}', f'ERROR: {str(e)}')
+
+        # 停止中（BackendState: Stopped）でも --json は状態を返すため、終了コードより出力を優先する
+        try:
+            status = json.loads(result.stdout)
+        except ValueError:
+            return self._error_result(
+                'error', 'Tailscaleコマンドの実行に失敗しました（未インストールの可能性）',
+                f'ERROR: {result.stderr.strip() or "Unknown error"}'
+            )
+        return self._build_result(status)
+
+    def _build_result(self, status: Dict[str, Any]) -> Dict[str, Any]:
+        """status --json の内容からAPIの応答を作る"""
+        backend_state = status.get('BackendState', 'Unknown')
+        connected = backend_state == 'Running'
+        self_node = status.get('Self') or {}
+        self_ips = status.get('TailscaleIPs') or self_node.get('TailscaleIPs') or []
+        tailscale_ip = next((ip for ip in self_ips if '.' in ip), self_ips[0] if self_ips else None)
+
+        now = time.monotonic()
+        devices = []
+        if self_node:
+            devices.append({
+                **self._node_info(self_node),
+                'name': f"{self._node_name(self_node)} (このデバイス)",
+                'status': 'online' if connected else 'offline',
+                'self': True
+            })
+
+        peers = []
+        with self._lock:
+            for key, node in (status.get('Peer') or {}).items():
+                peer = self._peer_info(key, node, now)
+                peers.append(peer)
+            self._prune_locked(now)
+            self._online = [{'key': peer['key'], 'name': peer['name'], 'ip': peer['ip']}
+                            for peer in peers if peer['status'] == 'online' and peer['ip']]
+            events = list(self._events)
+
+        # 通信中のピアを先に、次に名前順
+        peers.sort(key=lambda p: (p['status'] != 'online', p['path'] == 'idle', p['name']))
+        devices.extend(peers)
+
+        counts = {path: sum(1 for p in peers if p['status'] == 'online' and p['path'] == path) for path in PATHS}
+        for path, count in counts.items():
+            PEERS.labels(path).set(count)
+
+        if not connected or not tailscale_ip:
+            quality = 'poor'
+        elif counts['relay'] and not counts['direct']:
+            quality = 'relay'
+        else:
+            quality = 'good'
+
+        health = status.get('Health') or []
+        logs = [_log_line(f'WARNING: {message}') for message in health] + events
+        logs.append(_log_line(
+            f"Tailscale {backend_state}: {counts['direct']} direct / {counts['relay']} relay / "
+            f"{counts['idle']} idle peers, VPN IP: {tailscale_ip or 'N/A'}"
+        ))
+
+        return {
+            'status': 'connected' if connected else 'disconnected',
+            'ip': tailscale_ip,
+            'ip_address': tailscale_ip,  # 互換性のため両方提供
+            'backend_state': backend_state,
+            'version': status.get('Version'),
+            'tailnet': (status.get('CurrentTailnet') or {}).get('Name'),
+            'magic_dns_suffix': status.get('MagicDNSSuffix'),
+            'health': health,
+            'device_count': len(devices),
+            'devices': devices,
+            'peer_count': len(peers),
+            'online_count': sum(counts.values()),
+            'direct_count': counts['direct'],
+            'relay_count': counts['relay'],
+            'connection_quality': quality,
+            'logs': logs,
+            'last_check': _now(),
+            'message': 'Tailscale接続中' if connected else f'Tailscale切断中 ({backend_state})'
+        }
+
+    @staticmethod
+    def _node_name(node: Dict[str, Any]) -> str:
+        """表示名（MagicDNS名の先頭、無ければホスト名）"""
+        dns_name = (node.get('DNSName') or '').split('.')[0]
+        return dns_name or node.get('HostName') or 'Unknown'
+
+    @staticmethod
+    def _node_info(node: Dict[str, Any]) -> Dict[str, Any]:
+        """ノードの共通項目"""
+        ips = node.get('TailscaleIPs') or []
+        return {
+            'name': TailscaleCollector._node_name(node),
+            'hostname': node.get('HostName'),
+            'ip': next((ip for ip in ips if '.' in ip), ips[0] if ips else None),
+            'ips': ips,
+            'os': node.get('OS'),
+            'relay': node.get('Relay') or None,
+            'rx_bytes': node.get('RxBytes', 0),
+            'tx_bytes': node.get('TxBytes', 0),
+            'exit_node': node.get('ExitNode', False)
+        }
+
+    def _peer_info(self, key: str, node: Dict[str, Any], now: float) -> Dict[str, Any]:
+        """ピアの情報と履歴の更新（ロック保持中に呼ぶ）"""
+        info = self._node_info(node)
+        online = bool(node.get('Online'))
+        cur_addr = node.get('CurAddr') or None
+        # 直接接続のエンドポイントがあれば direct、通信中でエンドポイントが無ければDERPリレー経由
+        if cur_addr:
+            path = 'direct'
+        elif online and node.get('Active'):
+            path = 'relay'
+        else:
+            path = 'idle'
+
+        state = self._peers.get(key)
+        if state is None:
+            state = self._peers[key] = _PeerState(self.history_size)
+        state.last_seen = now
+
+        rx_rate = tx_rate = None
+        if state.sampled is not None and now > state.sampled:
+            elapsed = now - state.sampled
+            # tailscaled の再起動で送受信量が0に戻った場合は計算しない
+            if info['rx_bytes'] >= state.rx_bytes and info['tx_bytes'] >= state.tx_bytes:
+                rx_rate = round((info['rx_bytes'] - state.rx_bytes) / elapsed, 1)
+                tx_rate = round((info['tx_bytes'] - state.tx_bytes) / elapsed, 1)
+        state.rx_bytes, state.tx_bytes, state.sampled = info['rx_bytes'], info['tx_bytes'], now
+
+        if state.path == 'direct' and path == 'relay':
+            RELAY_FALLBACKS.inc()
+            self._events.append(_log_line(f"WARNING: {info['name']} がDERPリレー経由に切り替わりました ({info['relay']})"))
+            logger.info("Tailscale peer %s fell back to DERP relay (%s)", info['name'], info['relay'])
+        elif state.path == 'relay' and path == 'direct':
+            self._events.append(_log_line(f"{info['name']} との直接接続が確立しました ({cur_addr})"))
+            logger.info("Tailscale peer %s is direct again (%s)", info['name'], cur_addr)
+        state.path = path
+
+        state.history.append({
+            'time': _now(),
+            'source': 'status',
+            'path': path,
+            'relay': info['relay'],
+            'rx_rate': rx_rate,
+            'tx_rate': tx_rate
+        })
+
+        return {
+            **info,
+            'key': key,
+            'status': 'online' if online else 'offline',
+            'path': path,
+            'cur_addr': cur_addr,
+            'active': bool(node.get('Active')),
+            'rx_rate': rx_rate,
+            'tx_rate': tx_rate,
+            'latency_ms': state.latency_ms,
+            'ping_via': state.ping_via,
+            'pinged_at': state.pinged_at,
+            'last_seen': node.get('LastSeen'),
+            'last_handshake': node.get('LastHandshake')
+        }
+
+    def _prune_locked(self, now: float) -> None:
+        """上限を超えたピアの履歴を、最後に見えた時刻の古い順に削除（ロック保持中に呼ぶ）"""
+        excess = len(self._peers) - self.max_peers
+        if excess <= 0:
+            return
+        for key in sorted(self._peers, key=lambda k: self._peers[k].last_seen)[:excess]:
+            del self._peers[key]
+
+    def _error_result(self, status: str, message: str, log: str) -> Dict[str, Any]:
+        """取得失敗時の応答"""
+        for path in PATHS:
+            PEERS.labels(path).set(0)
+        return {
+            'status': status,
+            'ip': None,
+            'ip_address': None,
+            'device_count': 0,
+            'devices': [],
+            'connection_quality': 'poor',
+            'logs': [_log_line(log)],
+            'last_check': _now(),
+            'message': message
+        }
+
+    # ---------- 応答時間 ----------
+
+    def ping_peers(self) -> Dict[str, Optional[float]]:
+        """オンラインのピアに tailscale ping（最大ping.max_peers台、ピアごとの応答時間ミリ秒を返す）"""
+        with self._lock:
+            targets = self._online[:self.ping_max_peers]
+
+        results = {}
+        PING_LATENCY.clear()
+        for target in targets:
+            latency, via = self.ping(target['ip'])
+            results[target['name']] = latency
+            with self._lock:
+                state = self._peers.get(target['key'])
+                if state is None:
+                    continue
+                state.latency_ms = latency
+                state.ping_via = via
+                state.pinged_at = _now()
+                state.history.append({
+                    'time': state.pinged_at,
+                    'source': 'ping',
+                    'path': 'relay' if via and via.startswith('DERP') else ('direct' if via else None),
+                    'relay': via[5:-1] if via and via.startswith('DERP(') else None,
+                    'latency_ms': latency
+                })
+            if latency is not None:
+                PING_LATENCY.labels(target['name'], 'relay' if via.startswith('DERP') else 'direct').set(latency / 1000)
+        return results
+
+    def ping(self, ip: str) -> tuple:
+        """1回の tailscale ping、(応答時間ミリ秒, 経路) を返す（応答なしは (None, None)）"""
+        try:
+            result = subprocess.run(
+                self.command + ['ping', '--c', '1', '--timeout', f'{self.ping_timeout}s', ip],
+                capture_output=True, text=True, timeout=self.ping_timeout + 5
+            )
+        except (subprocess.TimeoutExpired, OSError) as e:
+            logger.warning("tailscale ping %s failed: %s", ip, e)
+            return None, None
+
+        # 直接接続できなかった場合も終了コードは0以外になるが、リレー経由の応答は得られている
+        match = PONG_PATTERN.search(result.stdout)
+        if not match:
+            logger.debug("tailscale ping %s: no pong (%s)", ip, (result.stdout or result.stderr).strip())
+            return None, None
+        return float(match.group(5)), match.group(3)
+
+    # ---------- 履歴 ----------
+
+    def get_history(self, peer: Optional[str] = None) -> Dict[str, Any]:
+        """ピアごとの通信量・経路・応答時間の履歴（peerで名前・IP・キーを指定して絞り込み）"""
+        with self._lock:
+            online = {target['key']: target for target in self._online}
+            peers = {}
+            for key, state in self._peers.items():
+                if not state.history:
+                    continue
+                name = online.get(key, {}).get('name') or key
+                if peer and peer not in (key, name, online.get(key, {}).get('ip')):
+                    continue
+                history = list(state.history)
+                peers[name] = {
+                    'key': key,
+                    'path': state.path,
+                    'latency_ms': state.latency_ms,
+                    'relay_samples': sum(1 for entry in history if entry['path'] == 'relay'),
+                    'history': history
+                }
+        return {
+            'history_size': self.history_size,
+            'ping_interval': self.ping_interval if self.ping_enabled else None,
+            'peers': peers,
+            'timestamp': _now()
+        }
+
+_default_collector: Optional[TailscaleCollector] = None
+
+def get_tailscale_status() -> Dict[str, Any]:
+    """Tailscale状態確認（既定の設定のコレクターを使用）"""
+    global _default_collector
+    if _default_collector is None:
+        _default_collector = TailscaleCollector()
+    return _default_collector.collect()
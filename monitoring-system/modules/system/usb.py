@@ -0,0 +1,463 @@
+"""
+USBデバイス情報モジュール
+/sys/bus/usb/devices からUSBデバイスを読み取り（種類はUSBのクラスコードで判定）、
+カーネルのuevent（netlink）で接続・切断を検出して一覧を差分で更新する
+"""
+
+import errno
+import logging
+import os
+import re
+import select
+import socket
+import subprocess
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from utils import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+USB_EVENTS = Counter('monitoring_usb_events_total', 'USBデバイスの接続・切断の検出数', ['action'])
+USB_DEVICES = Gauge('monitoring_usb_devices', '接続中のUSBデバイス数（ルートハブを除く）')
+
+# netlinkのカーネルuevent（linux/netlink.h）
+NETLINK_KOBJECT_UEVENT = 15
+UEVENT_KERNEL_GROUP = 1
+
+# USBデバイスのsysfs名（"1-1"、"1-1.2" など、ルートハブ "usb1" とインターフェース "1-1:1.0" は含まない）
+DEVICE_NAME_PATTERN = re.compile(r'^\d+-\d+(\.\d+)*$')
+
+# USBのクラスコード（デバイス・インターフェース）と表示する種類
+USB_CLASS_TYPES = {
+    0x01: 'オーディオ',
+    0x02: 'シリアル通信',
+    0x03: '入力デバイス',
+    0x06: 'カメラ',
+    0x07: '印刷機器',
+    0x08: 'ストレージ',
+    0x09: 'USBハブ',
+    0x0a: 'シリアル通信',
+    0x0e: 'カメラ',
+    0xe0: 'ネットワーク'
+}
+
+# インターフェースが複数ある場合に種類として優先するクラス（ヘッドセット付きカメラはカメラ、など）
+CLASS_PRIORITY = (0x0e, 0x06, 0x01, 0x08, 0x07, 0x03, 0xe0, 0x02, 0x0a, 0x09)
+
+# ベンダー固有クラス（0xff）のうち、ドライバー名から種類がわかるもの
+DRIVER_TYPES = {
+    'ftdi_sio': 'シリアル通信',
+    'pl2303': 'シリアル通信',
+    'ch341': 'シリアル通信',
+    'cp210x': 'シリアル通信',
+    'cdc_acm': 'シリアル通信',
+    'option': 'ネットワーク',
+    'qmi_wwan': 'ネットワーク',
+    'cdc_ether': 'ネットワーク',
+    'rndis_host': 'ネットワーク',
+    'r8152': 'ネットワーク',
+    'asix': 'ネットワーク'
+}
+
+# GPS受信機のベンダーID（u-blox）
+GPS_VENDORS = {'1546'}
+
+def _now() -> str:
+    return datetime.now().strftime('%H:%M:%S')
+
+def _read(path: str, name: str) -> Optional[str]:
+    """sysfsの属性（無い・読めなければNone）"""
+    try:
+        with open(os.path.join(path, name), encoding='utf-8', errors='replace') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _hex(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value, 16) if value else None
+    except ValueError:
+        return None
+
+def read_usb_device(path: str) -> Optional[Dict[str, Any]]:
+    """1台分のsysfsディレクトリからデバイス情報を作る（読めなければNone）"""
+    vendor = _read(path, 'idVendor')
+    product_id = _read(path, 'idProduct')
+    if vendor is None or product_id is None:
+        return None
+
+    interfaces = []
+    sound_card = None
+    sound_card_id = None
+    name = os.path.basename(path)
+    try:
+        children = sorted(os.listdir(path))
+    except OSError:
+        children = []
+    for child in children:
+        if not child.startswith(f'{name}:'):
+            continue
+        interface_path = os.path.join(path, child)
+        driver_link = os.path.join(interface_path, 'driver')
+        driver = os.path.basename(os.readlink(driver_link)) if os.path.islink(driver_link) else None
+        interfaces.append({'class': _hex(_read(interface_path, 'bInterfaceClass')), 'driver': driver})
+        # オーディオインターフェースにはALSAのカードが作られる（sound/card1 など）
+        try:
+            for entry in os.listdir(os.path.join(interface_path, 'sound')):
+                if entry.startswith('card') and entry[4:].isdigit() and sound_card is None:
+                    sound_card = int(entry[4:])
+                    sound_card_id = _read(os.path.join(interface_path, 'sound', entry), 'id')
+        except OSError:
+            pass
+
+    device_class = _hex(_read(path, 'bDeviceClass'))
+    manufacturer = _read(path, 'manufacturer')
+    product = _read(path, 'product')
+    device_id = f'{vendor}:{product_id}'
+    return {
+        'name': ' '.join(part for part in (manufacturer, product) if part) or f'USB Device {device_id}',
+        'type': classify(device_class, interfaces, vendor),
+        'bus': _read(path, 'busnum'),
+        'device': _read(path, 'devnum'),
+        'id': device_id,
+        'path': name,
+        'manufacturer': manufacturer,
+        'product': product,
+        'serial': _read(path, 'serial'),
+        'speed': _read(path, 'speed'),
+        'class': device_class,
+        'interfaces': interfaces,
+        'sound_card': sound_card,
+        'sound_card_id': sound_card_id
+    }
+
+def classify(device_class: Optional[int], interfaces: List[Dict[str, Any]], vendor: Optional[str] = None) -> str:
+    """クラスコードから種類を判定（デバイスのクラスが0ならインターフェースのクラスで判定）"""
+    if vendor in GPS_VENDORS:
+        return 'GPS'
+    classes = {interface['class'] for interface in interfaces}
+    if device_class and device_class not in (0xef, 0xff):
+        classes.add(device_class)
+    for usb_class in CLASS_PRIORITY:
+        if usb_class in classes:
+            return USB_CLASS_TYPES[usb_class]
+    for interface in interfaces:
+        if interface['driver'] in DRIVER_TYPES:
+            return DRIVER_TYPES[interface['driver']]
+    return 'その他'
+
+def _parent_device(devpath: str) -> Optional[str]:
+    """ueventのDEVPATHが属するUSBデバイスのsysfs名"""
+    for part in reversed(devpath.split('/')):
+        if DEVICE_NAME_PATTERN.match(part):
+            return part
+    return None
+
+class UsbMonitor:
+    """sysfsから読んだUSBデバイス一覧と、ueventによる接続・切断の検出"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        config: {'sysfs_root': '/sys/bus/usb/devices', 'hotplug': True, 'event_history': 50}
+        hotplug: netlinkのueventで接続・切断を検出する（使えない環境では定期取得の時に差分から検出）
+        """
+        config = config or {}
+        self.sysfs_root = config.get('sysfs_root', '/sys/bus/usb/devices')
+        self.hotplug = config.get('hotplug', True)
+
+        self._devices: Dict[str, Dict[str, Any]] = {}
+        self._scanned = False
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=config.get('event_history', 50))
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+
+        self._socket: Optional[socket.socket] = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        self.stats = {
+            'scans': 0,
+            'uevents': 0,
+            'overflows': 0
+        }
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """接続・切断時に {'action': 'attach'|'detach'|'change', 'device': {...}, 'time': ...} で呼ばれる
+        （ueventの受信スレッドから呼ぶため、時間のかかる処理は避ける）"""
+        self._listeners.append(callback)
+
+    # ---------- 一覧 ----------
+
+    def scan(self) -> None:
+        """全デバイスを読み直し、前回との差分を接続・切断として通知"""
+        self.stats['scans'] += 1
+        devices = {}
+        try:
+            names = os.listdir(self.sysfs_root)
+        except OSError as e:
+            raise RuntimeError(f'{self.sysfs_root} を読めません: {e}')
+        for name in names:
+            if DEVICE_NAME_PATTERN.match(name):
+                info = read_usb_device(os.path.join(self.sysfs_root, name))
+                if info:
+                    devices[name] = info
+
+        with self._lock:
+            previous, self._devices = self._devices, devices
+            initial = not self._scanned
+            self._scanned = True
+        USB_DEVICES.set(len(devices))
+        if initial:
+            return
+        for name in previous.keys() - devices.keys():
+            self._emit('detach', previous[name])
+        for name in devices.keys() - previous.keys():
+            self._emit('attach', devices[name])
+
+    def snapshot(self) -> Dict[str, Any]:
+        """USBデバイス一覧（ueventを受信中ならキャッシュ、そうでなければ読み直す）"""
+        try:
+            if not self.listening or not self._scanned:
+                self.scan()
+        except RuntimeError as e:
+            # sysfsの無い環境（コンテナなど）は従来どおり lsusb で取得する
+            logger.debug("USB sysfs scan unavailable: %s", e)
+            return scan_lsusb()
+
+        with self._lock:
+            devices = sorted(self._devices.values(), key=lambda d: (d['type'] == 'USBハブ', d['path']))
+            events = list(self._events)
+        return {
+            'devices': devices,
+            'count': len(devices),
+            'events': events,
+            'source': 'sysfs',
+            'hotplug': self.listening,
+            'timestamp': _now(),
+            'status': 'success' if devices else 'no_devices_found'
+        }
+
+    def find_sound_card(self, card: Any) -> Optional[Dict[str, Any]]:
+        """ALSAのカード番号またはカードIDに対応するUSBデバイス"""
+        with self._lock:
+            for device in self._devices.values():
+                if device['sound_card'] is not None and str(card) in (str(device['sound_card']),
+                                                                       device['sound_card_id']):
+                    return device
+        return None
+
+    def _emit(self, action: str, device: Dict[str, Any]) -> None:
+        event = {'action': action, 'device': device, 'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]}
+        USB_EVENTS.labels(action).inc()
+        with self._lock:
+            self._events.append({'action': action, 'path': device['path'], 'name': device['name'],
+                                 'type': device['type'], 'time': event['time']})
+        if action != 'change':
+            logger.info("USB device %s: %s (%s, %s)", action, device['name'], device['path'], device['type'])
+        for callback in list(self._listeners):
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error("USB event listener error: %s", e)
+
+    # ---------- uevent ----------
+
+    @property
+    def listening(self) -> bool:
+        """ueventを受信中か"""
+        return bool(self._thread and self._thread.is_alive())
+
+    def start(self) -> bool:
+        """ueventの受信スレッド開始（netlinkが使えなければFalse、起動済みなら何もしない）"""
+        if not self.hotplug or self.listening:
+            return self.listening
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1024 * 1024)
+            sock.bind((0, UEVENT_KERNEL_GROUP))
+        except (AttributeError, OSError) as e:
+            logger.warning("USB hotplug detection unavailable (polling instead): %s", e)
+            return False
+
+        self._socket = sock
+        self._stop_event.clear()
+        try:
+            self.scan()
+        except RuntimeError as e:
+            logger.warning("USB sysfs scan unavailable: %s", e)
+            sock.close()
+            self._socket = None
+            return False
+        self._thread = threading.Thread(target=self._listen, name='usb-hotplug', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        """ueventの受信停止"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+        if self._socket:
+            self._socket.close()
+            self._socket = None
+
+    def _listen(self) -> None:
+        """ueventの受信ループ"""
+        sock = self._socket
+        while not self._stop_event.is_set():
+            try:
+                readable, _, _ = select.select([sock], [], [], 1)
+                if not readable:
+                    continue
+                data = sock.recv(65536)
+            except OSError as e:
+                if e.errno == errno.ENOBUFS:
+                    # 受信が追いつかず取りこぼした場合は全体を読み直して差分を通知する
+                    self.stats['overflows'] += 1
+                    logger.warning("USB uevent buffer overflow, rescanning")
+                    self._rescan()
+                    continue
+                if not self._stop_event.is_set():
+                    logger.error("USB uevent receive error: %s", e)
+                break
+            self._handle_uevent(data)
+
+    def _rescan(self) -> None:
+        try:
+            self.scan()
+        except RuntimeError as e:
+            logger.error("USB rescan error: %s", e)
+
+    def _handle_uevent(self, data: bytes) -> None:
+        """1件のuevent（"add@/devices/...\\0ACTION=add\\0DEVPATH=...\\0SUBSYSTEM=usb\\0..."）"""
+        fields = {}
+        for part in data.split(b'\0')[1:]:
+            key, sep, value = part.partition(b'=')
+            if sep:
+                fields[key.decode('ascii', 'replace')] = value.decode('utf-8', 'replace')
+        subsystem = fields.get('SUBSYSTEM')
+        if subsystem not in ('usb', 'sound'):
+            return
+        self.stats['uevents'] += 1
+
+        action = fields.get('ACTION')
+        devpath = fields.get('DEVPATH', '')
+        name = _parent_device(devpath)
+        if name is None:
+            return
+
+        if subsystem == 'usb' and fields.get('DEVTYPE') == 'usb_device' and action == 'remove':
+            with self._lock:
+                device = self._devices.pop(name, None)
+                count = len(self._devices)
+            USB_DEVICES.set(count)
+            if device:
+                self._emit('detach', device)
+            return
+
+        if action not in ('add', 'bind', 'change'):
+            # 切断時はサウンドカード・インターフェースの remove が先に届き、デバイスの remove は最後になる。
+            # ここで読み直すとカード番号・種類が消えた状態で detach を通知してしまうため、最後に読んだ内容を保持する
+            return
+        # デバイスの追加後にインターフェース・ALSAのカードが順に追加されるため、そのたびに読み直す
+        device = read_usb_device(os.path.join(self.sysfs_root, name))
+        if device is None:
+            return
+        with self._lock:
+            previous = self._devices.get(name)
+            self._devices[name] = device
+            count = len(self._devices)
+        USB_DEVICES.set(count)
+        if previous is None:
+            self._emit('attach', device)
+        elif (previous['type'], previous['sound_card'], previous['interfaces']) != (
+                device['type'], device['sound_card'], device['interfaces']):
+            self._emit('change', device)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """検出状況"""
+        with self._lock:
+            count = len(self._devices)
+        return {
+            'listening': self.listening,
+            'devices': count,
+            **self.stats
+        }
+
+def scan_lsusb() -> Dict[str, Any]:
+    """lsusb によるUSBデバイススキャン（sysfsを読めない環境用、種類は説明文から推定）"""
+    try:
+        devices = []
+
+        # lsusbコマンドでUSBデバイスを取得
+        try:
+            result = subprocess.run(['lsusb'], capture_output=True, text=True, timeout=10)
+            if result.returncode == 0:
+                for line in result.stdout.strip().split('\n'):
+                    if line.strip():
+                        # lsusbの出力を解析
+                        match = re.search(r'Bus\s+(\d+)\s+Device\s+(\d+):\s+ID\s+([0-9a-f:]+)\s+(.+)', line)
+                        if match:
+                            bus, device_num, device_id, description = match.groups()
+
+                            # デバイスタイプを推定
+                            device_type = 'その他'
+                            desc_lower = description.lower()
+                            if ('audio' in desc_lower or 'sound' in desc_lower or
+                                'microphone' in desc_lower or 'mic' in desc_lower or
+                                'speaker' in desc_lower or 'headphone' in desc_lower):
+                                device_type = 'オーディオ'
+                            elif 'camera' in desc_lower or 'webcam' in desc_lower:
+                                device_type = 'カメラ'
+                            elif 'storage' in desc_lower or 'disk' in desc_lower:
+                                device_type = 'ストレージ'
+                            elif 'keyboard' in desc_lower or 'mouse' in desc_lower:
+                                device_type = '入力デバイス'
+                            elif 'hub' in desc_lower:
+                                device_type = 'USBハブ'
+                            elif 'serial' in desc_lower or 'uart' in desc_lower:
+                                device_type = 'シリアル通信'
+                            elif 'root hub' in desc_lower:
+                                continue  # ルートハブは表示をスキップ
+
+                            devices.append({
+                                'name': description,
+                                'type': device_type,
+                                'bus': bus,
+                                'device': device_num,
+                                'id': device_id
+                            })
+        except subprocess.TimeoutExpired:
+            logger.warning("lsusb command timed out")
+        except FileNotFoundError:
+            logger.warning("lsusb command not found")
+
+        return {
+            'devices': devices,
+            'count': len(devices),
+            'source': 'lsusb',
+            'hotplug': False,
+            'timestamp': _now(),
+            'status': 'success' if devices else 'no_devices_found'
+        }
+
+    except Exception as e:
+        logger.error("Device scan error: %s", e)
+        return {
+            'devices': [],
+            'count': 0,
+            'timestamp': _now(),
+            'status': 'error',
+            'error': str(e)
+        }
+
+_default_monitor: Optional[UsbMonitor] = None
+
+def scan_usb_devices() -> Dict[str, Any]:
+    """簡易USBデバイススキャン（ラズパイ対応、既定の設定のモニターを使用）"""
+    global _default_monitor
+    if _default_monitor is None:
+        _default_monitor = UsbMonitor()
+    return _default_monitor.snapshot()
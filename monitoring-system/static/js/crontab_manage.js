@@ -0,0 +1,234 @@
+class CrontabManager {
+    constructor() {
+        this.liveEvents = null;
+        this.isUpdating = false;
+        this.init();
+    }
+
+    async init() {
+        console.log('Crontab Manager initializing...');
+        await this.updateStatus();
+        this.startAutoUpdate();
+    }
+
+    async updateStatus(forceRefresh = false) {
+        if (this.isUpdating) return;
+        this.isUpdating = true;
+
+        try {
+            const response = await fetch(forceRefresh ? '/api/crontab-status?refresh=1' : '/api/crontab-status');
+            if (!response.ok) {
+                throw new Error(`API error: ${response.status}`);
+            }
+
+            const data = await response.json();
+            this.updateUI(data);
+
+            // 最終更新時刻
+            document.getElementById('last-update').textContent =
+                new Date().toLocaleTimeString('ja-JP');
+
+        } catch (error) {
+            console.error('Status update error:', error);
+            this.showAlert('データの取得に失敗しました: ' + error.message, 'error');
+        } finally {
+            this.isUpdating = false;
+        }
+    }
+
+    updateUI(data) {
+        // メイン状態インジケーター
+        const mainStatus = document.getElementById('main-status');
+        const statusClass = data.status === 'active' ? 'status-active' :
+                          data.status === 'inactive' ? 'status-inactive' : 'status-warning';
+        mainStatus.className = `status-indicator ${statusClass}`;
+
+        // サービス状態
+        const serviceStatus = document.getElementById('service-status');
+        serviceStatus.textContent = this.getStatusText(data.status);
+        serviceStatus.className = `status-value ${data.status}`;
+
+        // アクティブジョブ数
+        document.getElementById('active-jobs').textContent =
+            `${data.active_jobs || 0} 個`;
+
+        // 最終実行（syslog / journal の実行記録）・次回実行
+        document.getElementById('last-execution').textContent = data.last_run || '記録なし';
+        document.getElementById('next-execution').textContent = data.next_run || '-';
+
+        // ジョブ一覧更新
+        this.updateJobsList(data.entries || []);
+
+        // 実行ログ（直近に完了した実行）
+        this.updateLogs(data.logs || []);
+
+        // アラート表示
+        if (data.status === 'error' || data.status === 'timeout') {
+            this.showAlert(data.message, 'error');
+        } else if (data.status === 'inactive') {
+            this.showAlert('アクティブなCrontabジョブがありません', 'warning');
+        } else {
+            this.clearAlert();
+        }
+    }
+
+    updateJobsList(jobs) {
+        const jobsList = document.getElementById('jobs-list');
+
+        if (jobs.length === 0) {
+            jobsList.innerHTML = `
+                <div class="empty-state">
+                    <div class="empty-state-icon">📅</div>
+                    <div>スケジュール済みジョブがありません</div>
+                    <div style="font-size: 12px; margin-top: 8px; color: #999;">
+                        Crontabにジョブを追加してください
+                    </div>
+                </div>
+            `;
+            return;
+        }
+
+        jobsList.innerHTML = jobs.map(job => {
+            const last = job.last;
+            const details = [job.description];
+            if (job.next_run) details.push(`次回 ${job.next_run}`);
+            if (last && last.last_run) {
+                const duration = last.last_duration !== null ? ` (${last.last_duration}秒)` : '';
+                details.push(`前回 ${last.last_run}${duration}`);
+            }
+
+            return `
+                <div class="job-item active">
+                    <div class="job-header">
+                        <div class="job-schedule">${this.escapeHtml(job.macro || job.schedule)}</div>
+                        <div class="job-status active">有効</div>
+                    </div>
+                    <div class="job-command">${this.escapeHtml(job.command)}</div>
+                    <div class="job-description">
+                        ${this.escapeHtml(details.join(' / '))}
+                    </div>
+                </div>
+            `;
+        }).join('');
+    }
+
+    updateLogs(logs) {
+        const logsContainer = document.getElementById('logs-container');
+
+        if (logs.length === 0) {
+            logsContainer.innerHTML = '<div class="log-line">実行ログがありません</div>';
+            return;
+        }
+
+        logsContainer.innerHTML = logs.map(log => {
+            let logClass = 'log-line';
+            if (log.toLowerCase().includes('error')) logClass += ' error';
+            else if (log.toLowerCase().includes('success')) logClass += ' success';
+            else logClass += ' info';
+
+            return `<div class="${logClass}">${this.escapeHtml(log)}</div>`;
+        }).join('');
+
+        // 最新ログまでスクロール
+        logsContainer.scrollTop = logsContainer.scrollHeight;
+    }
+
+    getStatusText(status) {
+        switch (status) {
+            case 'active': return '稼働中';
+            case 'inactive': return '非アクティブ';
+            case 'error': return 'エラー';
+            case 'timeout': return 'タイムアウト';
+            default: return '不明';
+        }
+    }
+
+    showAlert(message, type = 'warning') {
+        const alertArea = document.getElementById('alert-area');
+        const alertClass = `alert alert-${type}`;
+        alertArea.innerHTML = `<div class="${alertClass}">${this.escapeHtml(message)}</div>`;
+    }
+
+    clearAlert() {
+        document.getElementById('alert-area').innerHTML = '';
+    }
+
+    escapeHtml(text) {
+        const div = document.createElement('div');
+        div.textContent = text;
+        return div.innerHTML;
+    }
+
+    startAutoUpdate() {
+        // 状態は変化した時だけプッシュ配信される（接続できない場合は20秒ごとのポーリング）
+        this.liveEvents = new LiveEvents(['crontab'], {
+            crontab: data => {
+                this.updateUI(data);
+                document.getElementById('last-update').textContent =
+                    new Date().toLocaleTimeString('ja-JP');
+            }
+        }, {
+            fallback: () => this.updateStatus(),
+            fallbackInterval: 20000
+        });
+        this.liveEvents.start();
+    }
+
+    stopAutoUpdate() {
+        if (this.liveEvents) {
+            this.liveEvents.stop();
+            this.liveEvents = null;
+        }
+    }
+}
+
+// グローバル関数
+let crontabManager;
+
+function refreshStatus() {
+    const refreshBtn = document.getElementById('refresh-btn');
+    const refreshIcon = document.getElementById('refresh-icon');
+
+    refreshBtn.disabled = true;
+    refreshIcon.innerHTML = '<span class="loading"></span>';
+
+    crontabManager.updateStatus(true).finally(() => {
+        setTimeout(() => {
+            refreshBtn.disabled = false;
+            refreshIcon.textContent = '🔄';
+        }, 1000);
+    });
+}
+
+function viewFullCrontab() {
+    // 完全なCrontab表示（将来実装）
+    fetch('/api/crontab-status')
+        .then(response => response.json())
+        .then(data => {
+            if (data.jobs && data.jobs.length > 0) {
+                const fullCrontab = data.jobs.join('\n');
+                alert(`完全なCrontab:\n\n${fullCrontab}`);
+            } else {
+                alert('表示できるCrontabジョブがありません');
+            }
+        })
+        .catch(error => {
+            alert('Crontab情報の取得に失敗しました');
+        });
+}
+
+function showCronHelp() {
+    alert('Cron表記ヘルプ:\n\n分 時 日 月 曜日 コマンド\n\n* = 全て\n0 9 * * 1 = 毎週月曜日9時\n*/5 * * * * = 5分毎\n0 */2 * * * = 2時間毎\n\n詳細は "man crontab" を参照してください');
+}
+
+// 初期化
+document.addEventListener('DOMContentLoaded', () => {
+    crontabManager = new CrontabManager();
+});
+
+// ページ離脱時のクリーンアップ
+window.addEventListener('beforeunload', () => {
+    if (crontabManager) {
+        crontabManager.stopAutoUpdate();
+    }
+});
@@ -0,0 +1,171 @@
+class SimpleUSBDeviceManager {
+    constructor() {
+        this.devices = [];
+        this.isScanning = false;
+        this.init();
+    }
+
+    async init() {
+        console.log('Simple USB Device Manager initializing...');
+        await this.loadUSBDevices();
+        this.startAutoRefresh();
+    }
+
+    async loadUSBDevices(forceRefresh = false) {
+        if (this.isScanning) return;
+
+        try {
+            this.setStatus('scanning');
+            this.isScanning = true;
+
+            const response = await fetch(forceRefresh ? '/api/device-scan?refresh=1' : '/api/device-scan');
+            const data = await response.json();
+
+            if (response.ok && data.devices) {
+                this.devices = data.devices;
+                this.updateUI();
+
+                document.getElementById('last-scan').textContent =
+                    new Date().toLocaleTimeString('ja-JP');
+            } else {
+                throw new Error(data.error || 'デバイススキャンに失敗しました');
+            }
+
+        } catch (error) {
+            console.error('USB device loading error:', error);
+            this.showError('USBデバイスの取得に失敗しました: ' + error.message);
+        } finally {
+            this.isScanning = false;
+        }
+    }
+
+    updateUI() {
+        this.updateSummary();
+        this.renderDevices();
+    }
+
+    updateSummary() {
+        const total = this.devices.length;
+        document.getElementById('total-devices').textContent = total;
+    }
+
+    renderDevices() {
+        const container = document.getElementById('devices-container');
+
+        if (this.devices.length === 0) {
+            container.innerHTML = `
+                <div class="empty-state">
+                    <div class="empty-state-icon">🔌</div>
+                    <div>USBデバイスが見つかりませんでした</div>
+                </div>
+            `;
+            document.getElementById('device-count').textContent = '(0台)';
+            return;
+        }
+
+        document.getElementById('device-count').textContent = `(${this.devices.length}台)`;
+
+        container.innerHTML = this.devices.map(device => `
+            <div class="device-item">
+                <div class="device-icon">${this.getDeviceIcon(device.type)}</div>
+                <div class="device-name">${device.name}</div>
+            </div>
+        `).join('');
+    }
+
+    getDeviceIcon(type) {
+        const icons = {
+            'オーディオ': '🎵',
+            'カメラ': '📷',
+            'ストレージ': '💾',
+            '入力デバイス': '⌨️',
+            'ネットワーク': '🌐',
+            'シリアル通信': '📡',
+            'GPS': '🛰️',
+            '印刷機器': '🖨️',
+            'その他': '🔧'
+        };
+        return icons[type] || '🔌';
+    }
+
+    setStatus(status) {
+        const indicator = document.getElementById('scan-status');
+        indicator.style.background = status === 'scanning' ? '#FF9800' : '#4CAF50';
+    }
+
+    showError(message) {
+        const container = document.getElementById('devices-container');
+        container.innerHTML = `
+            <div class="empty-state">
+                <div class="empty-state-icon">⚠️</div>
+                <div style="color: #f44336;">${message}</div>
+            </div>
+        `;
+    }
+
+    startAutoRefresh() {
+        // 接続デバイスが変化した時だけプッシュ配信される（接続できない場合は30秒ごとのポーリング）
+        this.liveEvents = new LiveEvents(['devices'], {
+            devices: data => {
+                if (!data.devices) return;
+                this.devices = data.devices;
+                this.updateUI();
+                document.getElementById('last-scan').textContent =
+                    new Date().toLocaleTimeString('ja-JP');
+            }
+        }, {
+            fallback: () => {
+                if (!this.isScanning) {
+                    this.loadUSBDevices();
+                }
+            },
+            fallbackInterval: 30000
+        });
+        this.liveEvents.start();
+    }
+}
+
+// グローバル関数
+let usbDeviceManager;
+
+async function scanUSBDevices() {
+    const button = document.querySelector('.btn');
+    const icon = document.getElementById('scan-icon');
+    const text = document.getElementById('scan-text');
+
+    button.disabled = true;
+    icon.innerHTML = '<span class="loading"></span>';
+    text.textContent = 'スキャン中...';
+
+    try {
+        await usbDeviceManager.loadUSBDevices(true);
+    } finally {
+        setTimeout(() => {
+            button.disabled = false;
+            icon.textContent = '🔍';
+            text.textContent = 'デバイススキャン';
+        }, 1000);
+    }
+}
+
+async function refreshDevices() {
+    const button = document.querySelectorAll('.btn')[1];
+    const icon = document.getElementById('refresh-icon');
+
+    button.disabled = true;
+    icon.innerHTML = '<span class="loading"></span>';
+
+    try {
+        await usbDeviceManager.loadUSBDevices(true);
+    } finally {
+        setTimeout(() => {
+            button.disabled = false;
+            icon.textContent = '🔄';
+        }, 500);
+    }
+}
+
+// 初期化
+document.addEventListener('DOMContentLoaded', () => {
+    usbDeviceManager = new SimpleUSBDeviceManager();
+});
@@ -0,0 +1,495 @@
+class GDriveManager {
+    constructor() {
+        this.liveEvents = null;
+        this.updateInterval = null;
+        this.isUpdating = false;
+        this.driveFilesPageToken = null;
+        this.init();
+    }
+
+    async init() {
+        console.log('GDrive Manager initializing...');
+        await this.updateStatus();
+        await this.loadRecordingFiles();
+        await this.loadDriveFiles();
+        this.startAutoUpdate();
+    }
+
+    async updateStatus(forceRefresh = false) {
+        if (this.isUpdating) return;
+        this.isUpdating = true;
+
+        try {
+            const response = await fetch(forceRefresh ? '/api/gdrive-status?refresh=1' : '/api/gdrive-status');
+            if (!response.ok) {
+                throw new Error(`API error: ${response.status}`);
+            }
+
+            const data = await response.json();
+            this.updateUI(data);
+
+            // 最終更新時刻
+            document.getElementById('last-update').textContent =
+                new Date().toLocaleTimeString('ja-JP');
+
+        } catch (error) {
+            console.error('Status update error:', error);
+            this.showAlert('データの取得に失敗しました: ' + error.message, 'error');
+        } finally {
+            this.isUpdating = false;
+        }
+    }
+
+    updateUI(data) {
+        // メイン状態インジケーター
+        const mainStatus = document.getElementById('main-status');
+        const statusClass = this.getStatusIndicatorClass(data.status);
+        mainStatus.className = `status-indicator ${statusClass}`;
+
+        // 接続状態
+        const connectionStatus = document.getElementById('connection-status');
+        connectionStatus.textContent = this.getStatusText(data.status);
+        connectionStatus.className = `status-value ${this.getStatusClass(data.status)}`;
+
+        // ユーザーアカウント
+        document.getElementById('user-email').textContent = data.user_email || '未認証';
+
+        // 最終アップロード
+        const lastUploadElement = document.getElementById('last-upload');
+        if (data.last_upload) {
+            lastUploadElement.textContent = data.last_upload.upload_time || '情報なし';
+            this.updateUploadDetails(data.last_upload);
+        } else {
+            lastUploadElement.textContent = 'なし';
+            document.getElementById('upload-section').style.display = 'none';
+        }
+
+        // アラート表示
+        if (data.status === 'error' || data.status === 'authentication_failed') {
+            this.showAlert(data.message, 'error');
+        } else if (data.status === 'not_configured') {
+            this.showAlert('Google Drive連携の設定が必要です', 'warning');
+        } else if (data.status === 'connected') {
+            this.clearAlert();
+        }
+    }
+
+    updateUploadDetails(upload) {
+        const uploadSection = document.getElementById('upload-section');
+        const uploadDetails = document.getElementById('upload-details');
+
+        uploadDetails.innerHTML = `
+            <div class="upload-item">
+                <div class="upload-info">
+                    <div class="upload-name">${upload.filename || 'Unknown'}</div>
+                    <div class="upload-details">
+                        タイプ: ${upload.data_type || 'Unknown'} |
+                        時刻: ${upload.upload_time || 'Unknown'}
+                        ${upload.web_link ? ' | <a href="' + upload.web_link + '" target="_blank">Drive で開く</a>' : ''}
+                    </div>
+                </div>
+            </div>
+        `;
+
+        uploadSection.style.display = 'block';
+    }
+
+    getStatusIndicatorClass(status) {
+        switch (status) {
+            case 'connected':
+            case 'authenticating':
+                return 'status-connected';
+            case 'not_configured':
+            case 'not_authenticated':
+                return 'status-warning';
+            case 'error':
+            case 'authentication_failed':
+            case 'not_available':
+                return 'status-error';
+            default:
+                return 'status-warning';
+        }
+    }
+
+    getStatusClass(status) {
+        switch (status) {
+            case 'connected':
+            case 'authenticating':
+                return 'connected';
+            case 'error':
+            case 'authentication_failed':
+            case 'not_available':
+                return 'error';
+            default:
+                return 'warning';
+        }
+    }
+
+    getStatusText(status) {
+        switch (status) {
+            case 'connected': return '接続済み';
+            case 'authenticating': return '認証済み';
+            case 'not_configured': return '未設定';
+            case 'not_authenticated': return '未認証';
+            case 'authentication_failed': return '認証失敗';
+            case 'error': return 'エラー';
+            case 'not_available': return '利用不可';
+            default: return '不明';
+        }
+    }
+
+    showAlert(message, type = 'warning') {
+        const alertArea = document.getElementById('alert-area');
+        const alertClass = `alert alert-${type}`;
+        alertArea.innerHTML = `<div class="${alertClass}">${this.escapeHtml(message)}</div>`;
+    }
+
+    clearAlert() {
+        document.getElementById('alert-area').innerHTML = '';
+    }
+
+    escapeHtml(text) {
+        const div = document.createElement('div');
+        div.textContent = text;
+        return div.innerHTML;
+    }
+
+    startAutoUpdate() {
+        // 接続状態は変化した時だけプッシュ配信される（接続できない場合は30秒ごとのポーリング）
+        this.liveEvents = new LiveEvents(['gdrive'], {
+            gdrive: data => {
+                this.updateUI(data);
+                document.getElementById('last-update').textContent =
+                    new Date().toLocaleTimeString('ja-JP');
+            }
+        }, {
+            fallback: () => this.updateStatus(),
+            fallbackInterval: 30000
+        });
+        this.liveEvents.start();
+
+        this.updateInterval = setInterval(() => {
+            this.loadRecordingFiles();
+        }, 30000); // 30秒ごと
+    }
+
+    stopAutoUpdate() {
+        if (this.liveEvents) {
+            this.liveEvents.stop();
+            this.liveEvents = null;
+        }
+        if (this.updateInterval) {
+            clearInterval(this.updateInterval);
+            this.updateInterval = null;
+        }
+    }
+
+    async loadRecordingFiles() {
+        try {
+            const response = await fetch('/api/gdrive/recording-files');
+            if (!response.ok) {
+                throw new Error(`API error: ${response.status}`);
+            }
+
+            const data = await response.json();
+            this.updateRecordingFilesList(data);
+
+        } catch (error) {
+            console.error('Recording files load error:', error);
+            this.showRecordingFilesError('録音ファイルの読み込みに失敗しました');
+        }
+    }
+
+    updateRecordingFilesList(data) {
+        const filesList = document.getElementById('recording-files-list');
+
+        if (data.error) {
+            this.showRecordingFilesError(data.error);
+            return;
+        }
+
+        if (data.files && data.files.length > 0) {
+            filesList.innerHTML = data.files.map((file, index) => `
+                <div class="upload-item" style="${index >= 5 ? 'display: none;' : ''}">
+                    <div class="upload-info">
+                        <div class="upload-name">${file.filename}</div>
+                        <div class="upload-details">
+                            サイズ: ${this.formatFileSize(file.size)} |
+                            作成: ${file.created} |
+                            更新: ${file.modified}
+                        </div>
+                    </div>
+                    <div>
+                        <button class="btn btn-success"
+                                onclick="uploadSpecificFile('${file.filename}')"
+                                style="padding: 8px 15px; font-size: 14px;">
+                            📤 アップロード
+                        </button>
+                    </div>
+                </div>
+            `).join('') +
+            (data.files.length > 5 ? `
+                <div style="text-align: center; margin-top: 15px;">
+                    <button class="btn btn-secondary" onclick="toggleAllRecordingFiles()"
+                            style="padding: 8px 15px; font-size: 14px;">
+                        すべて表示 (${data.files.length}件)
+                    </button>
+                </div>
+            ` : '');
+        } else {
+            filesList.innerHTML = `
+                <div style="text-align: center; color: #6c757d; padding: 20px;">
+                    🎤 録音ファイルが見つかりません
+                </div>
+            `;
+        }
+    }
+
+    async loadDriveFiles(append = false) {
+        const filesList = document.getElementById('drive-files-list');
+        const moreButton = document.getElementById('drive-files-more');
+
+        try {
+            // 続きのページはカーソル（page_token）で取得し、先頭から再取得しない
+            let url = '/api/gdrive/files?limit=20';
+            if (append && this.driveFilesPageToken) {
+                url += '&page_token=' + encodeURIComponent(this.driveFilesPageToken);
+            }
+
+            const response = await fetch(url);
+            const data = await response.json();
+            if (!data.success) {
+                throw new Error(data.message || `API error: ${response.status}`);
+            }
+
+            const items = data.files.map(file => `
+                <div class="upload-item">
+                    <div class="upload-info">
+                        <div class="upload-name">${this.escapeHtml(file.name)}</div>
+                        <div class="upload-details">
+                            サイズ: ${file.size ? this.formatFileSize(Number(file.size)) : '-'} |
+                            作成: ${file.createdTime ? new Date(file.createdTime).toLocaleString('ja-JP') : '-'}
+                            ${file.webViewLink ? ' | <a href="' + file.webViewLink + '" target="_blank">Drive で開く</a>' : ''}
+                        </div>
+                    </div>
+                </div>
+            `).join('');
+
+            if (append) {
+                filesList.insertAdjacentHTML('beforeend', items);
+            } else {
+                filesList.innerHTML = items || `
+                    <div style="text-align: center; color: #6c757d; padding: 20px;">
+                        ☁️ Google Drive上にファイルはありません
+                    </div>
+                `;
+            }
+
+            this.driveFilesPageToken = data.next_page_token;
+            moreButton.style.display = data.next_page_token ? 'block' : 'none';
+
+        } catch (error) {
+            console.error('Drive files load error:', error);
+            if (!append) {
+                filesList.innerHTML = `
+                    <div style="text-align: center; color: #6c757d; padding: 20px;">
+                        ${this.escapeHtml(error.message)}
+                    </div>
+                `;
+            }
+        }
+    }
+
+    showRecordingFilesError(message) {
+        const filesList = document.getElementById('recording-files-list');
+        filesList.innerHTML = `
+            <div style="text-align: center; color: #dc3545; padding: 20px;">
+                ⚠️ ${this.escapeHtml(message)}
+            </div>
+        `;
+    }
+
+    formatFileSize(bytes) {
+        if (bytes === 0) return '0 B';
+        const k = 1024;
+        const sizes = ['B', 'KB', 'MB', 'GB'];
+        const i = Math.floor(Math.log(bytes) / Math.log(k));
+        return parseFloat((bytes / Math.pow(k, i)).toFixed(2)) + ' ' + sizes[i];
+    }
+}
+
+// グローバル関数
+let gdriveManager;
+
+function refreshStatus() {
+    const refreshBtn = document.getElementById('refresh-btn');
+    const refreshIcon = document.getElementById('refresh-icon');
+
+    refreshBtn.disabled = true;
+    refreshIcon.innerHTML = '<span class="loading"></span>';
+
+    gdriveManager.updateStatus(true).finally(() => {
+        setTimeout(() => {
+            refreshBtn.disabled = false;
+            refreshIcon.textContent = '🔄';
+        }, 1000);
+    });
+}
+
+function testUpload() {
+    const testBtn = document.getElementById('test-upload-btn');
+
+    testBtn.disabled = true;
+    testBtn.innerHTML = '<span class="loading"></span> 送信中...';
+
+    // 実際のテストアップロード処理
+    fetch('/api/gdrive/test-upload', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        testBtn.disabled = false;
+        testBtn.innerHTML = '<span>📤</span> テスト送信';
+
+        if (data.success) {
+            gdriveManager.showAlert(
+                `アップロード成功: ${data.upload_info.filename}`,
+                'success'
+            );
+
+            // 状態を更新
+            gdriveManager.updateStatus();
+
+            // アップロード詳細を表示
+            if (data.upload_info.web_link) {
+                setTimeout(() => {
+                    if (confirm('アップロードが完了しました。\n\nGoogle Driveでファイルを開きますか？')) {
+                        window.open(data.upload_info.web_link, '_blank');
+                    }
+                }, 1000);
+            }
+        } else {
+            gdriveManager.showAlert(
+                `アップロード失敗: ${data.message}`,
+                'error'
+            );
+        }
+    })
+    .catch(error => {
+        console.error('Upload error:', error);
+        testBtn.disabled = false;
+        testBtn.innerHTML = '<span>📤</span> テスト送信';
+        gdriveManager.showAlert('アップロード処理中にエラーが発生しました', 'error');
+    });
+}
+
+function authenticateGDrive() {
+    alert('Google Drive認証機能は開発中です。\n\n現在の認証方法:\n1. credentials.jsonをdata/credentials/に配置\n2. アプリ再起動で自動認証\n3. ブラウザで認証画面が開きます');
+}
+
+function changeFolderName() {
+    const currentName = document.getElementById('folder-name').textContent.trim();
+    const newName = prompt('新しいGoogle Driveフォルダ名を入力してください:', currentName);
+
+    if (newName && newName !== currentName && newName.trim() !== '') {
+        // 実際のフォルダ名変更処理は将来実装
+        alert('フォルダ名変更機能は開発中です。\n\n現在の方法:\n1. app.pyの"folder_name"設定を変更\n2. アプリを再起動\n\n希望フォルダ名: "' + newName + '"');
+    }
+}
+
+function uploadSpecificFile(filename) {
+    if (confirm(`録音ファイル "${filename}" をGoogle Driveにアップロードしますか？`)) {
+        const uploadButtons = document.querySelectorAll(`button[onclick="uploadSpecificFile('${filename}')"]`);
+        uploadButtons.forEach(btn => {
+            btn.disabled = true;
+            btn.innerHTML = '<span class="loading"></span> 送信中...';
+        });
+
+        fetch('/api/gdrive/upload-file', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ filename: filename })
+        })
+        .then(response => response.json())
+        .then(data => {
+            uploadButtons.forEach(btn => {
+                btn.disabled = false;
+                btn.innerHTML = '📤 アップロード';
+            });
+
+            if (data.success) {
+                gdriveManager.showAlert(
+                    `アップロード成功: ${data.upload_info.filename}`,
+                    'success'
+                );
+
+                // 状態を更新
+                gdriveManager.updateStatus();
+
+                // Google Driveで開くか確認
+                if (data.upload_info.web_link) {
+                    setTimeout(() => {
+                        if (confirm('アップロードが完了しました。\n\nGoogle Driveでファイルを開きますか？')) {
+                            window.open(data.upload_info.web_link, '_blank');
+                        }
+                    }, 1000);
+                }
+            } else {
+                gdriveManager.showAlert(
+                    `アップロード失敗: ${data.message}`,
+                    'error'
+                );
+            }
+        })
+        .catch(error => {
+            console.error('Specific file upload error:', error);
+            uploadButtons.forEach(btn => {
+                btn.disabled = false;
+                btn.innerHTML = '📤 アップロード';
+            });
+            gdriveManager.showAlert('アップロード処理中にエラーが発生しました', 'error');
+        });
+    }
+}
+
+function toggleAllRecordingFiles() {
+    const hiddenItems = document.querySelectorAll('#recording-files-list .upload-item[style*="display: none"]');
+    const toggleButton = document.querySelector('#recording-files-list button[onclick="toggleAllRecordingFiles()"]');
+
+    if (hiddenItems.length > 0) {
+        // 非表示のアイテムを表示
+        hiddenItems.forEach(item => {
+            item.style.display = 'flex';
+        });
+        toggleButton.textContent = '折りたたむ';
+    } else {
+        // す5個を除いて非表示に
+        const allItems = document.querySelectorAll('#recording-files-list .upload-item');
+        allItems.forEach((item, index) => {
+            if (index >= 5) {
+                item.style.display = 'none';
+            }
+        });
+
+        // ボタンテキストを更新
+        const totalCount = allItems.length;
+        toggleButton.innerHTML = `すべて表示 (${totalCount}件)`;
+    }
+}
+
+// 初期化
+document.addEventListener('DOMContentLoaded', () => {
+    gdriveManager = new GDriveManager();
+});
+
+// ページ離脱時のクリーンアップ
+window.addEventListener('beforeunload', () => {
+    if (gdriveManager) {
+        gdriveManager.stopAutoUpdate();
+    }
+});
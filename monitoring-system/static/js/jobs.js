@@ -0,0 +1,66 @@
+/**
+ * 時間のかかる処理のジョブ実行（/api/jobs）
+ * POSTでジョブを開始し、完了をイベント配信（jobsトピック）で受け取る。配信を使えない場合はポーリングで確認する
+ */
+
+function isJobFinished(job) {
+    return job.status === 'completed' || job.status === 'error';
+}
+
+/**
+ * ジョブを開始して完了を待つ
+ * @param {string} url ジョブを開始するAPI（POST）
+ * @param {Object} body 送信するJSON
+ * @param {Object} options pollInterval: ポーリング時の確認間隔(ms)
+ * @returns {Promise<Object>} 完了したジョブ（status: completed / error、result に結果）
+ */
+async function runJob(url, body = {}, options = {}) {
+    const response = await fetch(url, {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify(body)
+    });
+    const data = await response.json();
+    if (!response.ok || !data.success) {
+        throw new Error(data.message || 'ジョブを開始できませんでした');
+    }
+    return waitForJob(data.job, options.pollInterval || 1000);
+}
+
+function waitForJob(job, pollInterval = 1000) {
+    if (isJobFinished(job)) return Promise.resolve(job);
+
+    return new Promise((resolve, reject) => {
+        let settled = false;
+        let events = null;
+
+        const settle = (callback, value) => {
+            if (settled) return;
+            settled = true;
+            events.stop();
+            callback(value);
+        };
+
+        const check = async () => {
+            try {
+                const response = await fetch(`/api/jobs/${job.id}`);
+                const data = await response.json();
+                if (!response.ok) throw new Error(data.message || 'ジョブが見つかりません');
+                if (isJobFinished(data.job)) settle(resolve, data.job);
+            } catch (error) {
+                settle(reject, error);
+            }
+        };
+
+        events = new LiveEvents(['jobs'], {
+            jobs: data => {
+                const latest = data.jobs[job.id];
+                if (latest && isJobFinished(latest)) settle(resolve, latest);
+            }
+        }, {
+            fallback: check,
+            fallbackInterval: pollInterval
+        });
+        events.start();
+    });
+}
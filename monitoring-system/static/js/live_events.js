@@ -0,0 +1,85 @@
+/**
+ * 状態変更のプッシュ受信（/api/events のServer-Sent Events）
+ * EventSourceが使えない・接続エラーが続く場合は従来のポーリングに切り替える
+ */
+class LiveEvents {
+    /**
+     * @param {string[]} topics 購読するトピック（network / recording / gdrive / crontab / tailscale / devices / jobs）
+     * @param {Object<string, function(Object)>} handlers トピック名 -> 受信データを処理する関数
+     * @param {Object} options fallback: ポーリング時に呼ぶ関数, fallbackInterval: ポーリング間隔(ms),
+     *                         maxErrors: ポーリングに切り替えるまでの連続エラー回数
+     */
+    constructor(topics, handlers, options = {}) {
+        this.topics = topics;
+        this.handlers = handlers;
+        this.fallback = options.fallback || null;
+        this.fallbackInterval = options.fallbackInterval || 10000;
+        this.maxErrors = options.maxErrors || 3;
+
+        this.source = null;
+        this.pollInterval = null;
+        this.errorCount = 0;
+    }
+
+    start() {
+        if (!window.EventSource) {
+            this.startPolling();
+            return;
+        }
+
+        const url = `/api/events?topics=${encodeURIComponent(this.topics.join(','))}`;
+        this.source = new EventSource(url);
+
+        this.source.onopen = () => {
+            this.errorCount = 0;
+        };
+
+        this.source.onerror = () => {
+            // EventSourceは自動で再接続するため、連続して失敗した場合のみポーリングへ切り替え
+            // （接続数の上限による503などで再接続しない状態になった場合はすぐに切り替え）
+            this.errorCount++;
+            if (this.errorCount >= this.maxErrors || this.source.readyState === EventSource.CLOSED) {
+                console.warn('Event stream unavailable, falling back to polling');
+                this.closeSource();
+                this.startPolling();
+            }
+        };
+
+        this.topics.forEach(topic => {
+            this.source.addEventListener(topic, event => {
+                this.errorCount = 0;
+                try {
+                    this.handlers[topic](JSON.parse(event.data));
+                } catch (error) {
+                    console.error(`Event handler error (${topic}):`, error);
+                }
+            });
+        });
+    }
+
+    stop() {
+        this.closeSource();
+        this.stopPolling();
+    }
+
+    closeSource() {
+        if (this.source) {
+            this.source.close();
+            this.source = null;
+        }
+    }
+
+    startPolling() {
+        if (!this.fallback || this.pollInterval) return;
+        this.pollInterval = setInterval(() => {
+            this.fallback();
+        }, this.fallbackInterval);
+    }
+
+    stopPolling() {
+        if (this.pollInterval) {
+            clearInterval(this.pollInterval);
+            this.pollInterval = null;
+        }
+    }
+}
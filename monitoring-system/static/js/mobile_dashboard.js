@@ -0,0 +1,162 @@
+// ダッシュボードで使う状態（/api/dashboard の fields）
+const DASHBOARD_FIELDS = [
+    'network.connection_status', 'network.tailscale_status',
+    'recording.is_recording',
+    'gdrive.status',
+    'crontab.status', 'crontab.active_jobs'
+].join(',');
+
+// ダッシュボードクラス
+class IoTDashboard {
+    constructor() {
+        this.liveEvents = null;
+        this.version = 0;
+        this.isUpdating = false;
+        this.init();
+    }
+
+    async init() {
+        console.log('IoT Dashboard initializing...');
+        await this.updateAllData(true);
+        this.startAutoUpdate();
+    }
+
+    async updateAllData(full = false) {
+        if (this.isUpdating) return;
+        this.isUpdating = true;
+
+        try {
+            // 1回のリクエストで全カードの状態を取得（前回以降に変わったトピックのみ）
+            const since = full ? 0 : this.version;
+            const response = await fetch(`/api/dashboard?fields=${DASHBOARD_FIELDS}&since=${since}`);
+            if (!response.ok) {
+                throw new Error(`Dashboard API error: ${response.status}`);
+            }
+            const snapshot = await response.json();
+            this.version = snapshot.version;
+
+            // UI更新
+            const handlers = {
+                network: this.updateNetworkUI,
+                recording: this.updateRecordingUI,
+                gdrive: this.updateGDriveUI,
+                crontab: this.updateCrontabUI
+            };
+            Object.entries(snapshot.data).forEach(([topic, data]) => {
+                try {
+                    handlers[topic].call(this, data);
+                } catch (error) {
+                    console.warn(`${topic} UI update failed:`, error);
+                }
+            });
+
+            // 最終更新時刻
+            document.getElementById('last-update').textContent =
+                new Date().toLocaleTimeString('ja-JP');
+
+        } catch (error) {
+            console.error('Dashboard update error:', error);
+        } finally {
+            this.isUpdating = false;
+        }
+    }
+
+    updateNetworkUI(data) {
+        // カードステータス更新
+        this.updateCardStatus('network-card-status', data.connection_status === 'connected');
+        this.updateCardStatus('tailscale-card-status', data.tailscale_status === 'connected');
+
+        // システム全体ステータス
+        const systemOnline = data.connection_status === 'connected';
+        this.updateSystemStatus(systemOnline);
+    }
+
+    updateRecordingUI(data) {
+        const isRecording = data.is_recording || false;
+        document.getElementById('recording-status').className =
+            `card-status ${isRecording ? 'active' : 'inactive'}`;
+    }
+
+    updateGDriveUI(data) {
+        const isConnected = data.status === 'connected' || data.status === 'authenticating';
+        document.getElementById('gdrive-card-status').className =
+            `card-status ${isConnected ? 'active' : 'inactive'}`;
+    }
+
+    updateCrontabUI(data) {
+        const isActive = data.status === 'active';
+        const hasJobs = data.active_jobs > 0;
+
+        document.getElementById('crontab-card-status').className =
+            `card-status ${isActive && hasJobs ? 'active' : hasJobs ? 'warning' : 'inactive'}`;
+    }
+
+    updateCardStatus(elementId, isActive) {
+        const element = document.getElementById(elementId);
+        if (element) {
+            element.className = `card-status ${isActive ? 'active' : 'inactive'}`;
+        }
+    }
+
+    updateSystemStatus(isOnline) {
+        const indicator = document.getElementById('system-status');
+        indicator.className = `status-indicator ${isOnline ? 'status-online' : 'status-offline'}`;
+    }
+
+    startAutoUpdate() {
+        // 各カードの状態は変化した時だけプッシュ配信される（接続できない場合は10秒ごとのポーリング）
+        const pushed = handler => data => {
+            handler.call(this, data);
+            document.getElementById('last-update').textContent =
+                new Date().toLocaleTimeString('ja-JP');
+        };
+        this.liveEvents = new LiveEvents(['network', 'recording', 'gdrive', 'crontab'], {
+            network: pushed(this.updateNetworkUI),
+            recording: pushed(this.updateRecordingUI),
+            gdrive: pushed(this.updateGDriveUI),
+            crontab: pushed(this.updateCrontabUI)
+        }, {
+            fallback: () => this.updateAllData(),
+            fallbackInterval: 10000
+        });
+        this.liveEvents.start();
+    }
+
+    stopAutoUpdate() {
+        if (this.liveEvents) {
+            this.liveEvents.stop();
+            this.liveEvents = null;
+        }
+    }
+}
+
+// グローバル関数
+let dashboard;
+
+function refreshAll() {
+    const refreshIcon = document.getElementById('refresh-icon');
+    const originalIcon = refreshIcon.textContent;
+
+    refreshIcon.innerHTML = '<span class="loading"></span>';
+
+    dashboard.updateAllData(true).finally(() => {
+        setTimeout(() => {
+            refreshIcon.textContent = originalIcon;
+        }, 500);
+    });
+}
+
+// 初期化
+document.addEventListener('DOMContentLoaded', () => {
+    dashboard = new IoTDashboard();
+});
+
+// ページ離脱時のクリーンアップ
+window.addEventListener('beforeunload', () => {
+    if (dashboard) {
+        dashboard.stopAutoUpdate();
+    }
+});
+
+// タッチデバイス対応
+document.addEventListener('touchstart', function() {}, true);
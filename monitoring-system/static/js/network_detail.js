@@ -0,0 +1,97 @@
+let isTestRunning = false;
+
+async function runSpeedTest() {
+    if (isTestRunning) return;
+
+    const button = document.getElementById('speed-test-btn');
+    const icon = document.getElementById('speed-icon');
+    const text = document.getElementById('speed-text');
+    const result = document.getElementById('speed-result');
+    const time = document.getElementById('speed-time');
+
+    isTestRunning = true;
+    button.disabled = true;
+    icon.innerHTML = '<span class="loading"></span>';
+    text.textContent = '測定中...';
+    result.textContent = '-';
+    time.textContent = '測定中...';
+
+    try {
+        // 測定はサーバー側のジョブとして実行し、完了を待つ（他の人が実行中の測定があればその結果を受け取る）
+        const job = await runJob('/api/speed-test');
+        const data = job.status === 'completed' ? job.result : {};
+
+        if (data.status === 'success' && data.speed_mbps) {
+            result.textContent = data.speed_mbps.toFixed(1);
+            result.className = 'result-value status-success';
+            time.textContent = `測定時刻: ${data.timestamp}`;
+        } else {
+            result.textContent = 'エラー';
+            result.className = 'result-value status-error';
+            time.textContent = '測定に失敗しました';
+        }
+
+    } catch (error) {
+        console.error('Speed test error:', error);
+        result.textContent = 'エラー';
+        result.className = 'result-value status-error';
+        time.textContent = 'ネットワークエラー';
+    } finally {
+        setTimeout(() => {
+            isTestRunning = false;
+            button.disabled = false;
+            icon.textContent = '⚡';
+            text.textContent = '速度測定開始';
+        }, 2000);
+    }
+}
+
+async function runPingTest() {
+    if (isTestRunning) return;
+
+    const button = document.getElementById('ping-test-btn');
+    const icon = document.getElementById('ping-icon');
+    const text = document.getElementById('ping-text');
+    const result = document.getElementById('ping-result');
+    const time = document.getElementById('ping-time');
+
+    isTestRunning = true;
+    button.disabled = true;
+    icon.innerHTML = '<span class="loading"></span>';
+    text.textContent = '測定中...';
+    result.textContent = '-';
+    time.textContent = '測定中...';
+
+    try {
+        const job = await runJob('/api/ping-test');
+        const data = job.status === 'completed' ? job.result : {};
+
+        if (data.status === 'success' && data.latency) {
+            result.textContent = data.latency.toFixed(1);
+            result.className = 'result-value status-success';
+            time.textContent = `測定時刻: ${data.timestamp}`;
+        } else {
+            result.textContent = 'エラー';
+            result.className = 'result-value status-error';
+            time.textContent = 'Ping送信に失敗しました';
+        }
+
+    } catch (error) {
+        console.error('Ping test error:', error);
+        result.textContent = 'エラー';
+        result.className = 'result-value status-error';
+        time.textContent = 'ネットワークエラー';
+    } finally {
+        setTimeout(() => {
+            isTestRunning = false;
+            button.disabled = false;
+            icon.textContent = '📶';
+            text.textContent = '応答テスト開始';
+        }, 2000);
+    }
+}
+
+// 初期表示時の簡単な説明
+document.addEventListener('DOMContentLoaded', () => {
+    console.log('Network test page loaded');
+});
@@ -0,0 +1,201 @@
+// ネットワーク状態の更新（変化した時だけプッシュ配信される）
+let liveEvents;
+
+function updateNetworkStatus() {
+    fetch('/api/network-status')
+        .then(response => response.json())
+        .then(data => {
+            updateUI(data);
+        })
+        .catch(error => {
+            console.error('Network status update error:', error);
+        });
+}
+
+function updateUI(data) {
+    // 接続機器情報
+    document.getElementById('device-count').textContent =
+        data.connected_devices ? `${data.connected_devices.length} 台` : '- 台';
+
+    const devicesList = document.getElementById('devices-list');
+    if (data.connected_devices && data.connected_devices.length > 0) {
+        devicesList.innerHTML = '';
+        data.connected_devices.forEach(device => {
+            const div = document.createElement('div');
+            div.className = 'device-item';
+
+            // デバイスタイプに応じたクラス名
+            let typeClass = '';
+            if (device.type === 'カメラ') typeClass = 'camera';
+            else if (device.type === 'マイク') typeClass = 'microphone';
+            else if (device.type === 'GPS') typeClass = 'gps';
+
+            div.innerHTML = `
+                <div class="device-ip">${device.name}</div>
+                <div class="device-path">${device.device_path || ''}</div>
+                <div class="device-vendor">${device.driver || device.method || ''}</div>
+                <div class="device-type ${typeClass}">${device.type}</div>
+                <div class="device-status ${device.status}">状態: ${device.status}</div>
+            `;
+            devicesList.appendChild(div);
+        });
+    } else if (data.connected_devices && data.connected_devices.length === 0) {
+        devicesList.innerHTML = '<div style="text-align: center; color: #6c757d; padding: 20px;">🔍 デバイスが見つかりません</div>';
+    }
+
+    // 接続状態
+    const statusElement = document.getElementById('connection-status');
+    const statusIndicator = statusElement.querySelector('.status-indicator');
+
+    switch(data.connection_status) {
+        case 'connected':
+            statusIndicator.className = 'status-indicator status-connected';
+            statusElement.innerHTML = '<span class="status-indicator status-connected"></span>接続中';
+            break;
+        case 'disconnected':
+            statusIndicator.className = 'status-indicator status-disconnected';
+            statusElement.innerHTML = '<span class="status-indicator status-disconnected"></span>切断';
+            break;
+        default:
+            statusIndicator.className = 'status-indicator status-checking';
+            statusElement.innerHTML = '<span class="status-indicator status-checking"></span>確認中';
+    }
+
+    // Ping レイテンシ
+    document.getElementById('ping-latency').textContent =
+        data.ping_latency ? `${data.ping_latency.toFixed(1)} ms` : '- ms';
+
+    // 通信速度
+    document.getElementById('internet-speed').textContent =
+        data.internet_speed ? `${data.internet_speed} Mbps` : '- Mbps';
+
+    // Tailscale状態
+    const tailscaleStatus = document.getElementById('tailscale-status');
+    const tailscaleIndicator = tailscaleStatus.querySelector('.status-indicator');
+
+    switch(data.tailscale_status) {
+        case 'connected':
+            tailscaleIndicator.className = 'status-indicator status-connected';
+            tailscaleStatus.innerHTML = '<span class="status-indicator status-connected"></span>接続中';
+            break;
+        case 'disconnected':
+            tailscaleIndicator.className = 'status-indicator status-disconnected';
+            tailscaleStatus.innerHTML = '<span class="status-indicator status-disconnected"></span>切断';
+            break;
+        default:
+            tailscaleIndicator.className = 'status-indicator status-checking';
+            tailscaleStatus.innerHTML = '<span class="status-indicator status-checking"></span>不明';
+    }
+
+    document.getElementById('tailscale-ip').textContent = data.tailscale_ip || '-';
+
+    // ネットワークインターフェース
+    const interfacesList = document.getElementById('interfaces-list');
+    if (data.network_interfaces && data.network_interfaces.length > 0) {
+        interfacesList.innerHTML = '';
+        data.network_interfaces.forEach(iface => {
+            const div = document.createElement('div');
+            div.className = 'interface-item';
+
+            const ips = iface.ip_addresses.map(ip => ip.address).join(', ');
+
+            div.innerHTML = `
+                <div class="interface-name">${iface.name} ${iface.is_up ? '🟢' : '🔴'}</div>
+                <div class="interface-ip">${ips}</div>
+            `;
+            interfacesList.appendChild(div);
+        });
+    }
+
+    // 最終更新時刻
+    document.getElementById('last-update').textContent = data.last_update || '-';
+}
+
+function runPingTest() {
+    runJob('/api/ping-test')
+        .then(job => {
+            const data = job.result || {};
+            alert(`Ping結果: ${data.latency ? data.latency.toFixed(1) + 'ms' : '失敗'}`);
+        })
+        .catch(error => alert(`Ping結果: 失敗 (${error.message})`));
+}
+
+function runSpeedTest() {
+    const btn = document.getElementById('speed-test-btn');
+    btn.disabled = true;
+    btn.innerHTML = '<span class="loading"></span> 測定中...';
+
+    runJob('/api/speed-test')
+        .then(job => {
+            const data = job.result || {};
+            alert(`速度測定結果: ${data.speed_mbps ? data.speed_mbps + ' Mbps' : '失敗'}`);
+        })
+        .catch(error => alert(`速度測定結果: 失敗 (${error.message})`))
+        .finally(() => {
+            btn.disabled = false;
+            btn.textContent = '速度テスト';
+        });
+}
+
+function runDeviceScan() {
+    const btn = document.getElementById('device-scan-btn');
+    const devicesList = document.getElementById('devices-list');
+
+    btn.disabled = true;
+    btn.innerHTML = '<span class="loading"></span> スキャン中...';
+    devicesList.innerHTML = '<div class="loading"></div> 機器をスキャン中...';
+
+    fetch('/api/device-scan')
+        .then(response => response.json())
+        .then(data => {
+            document.getElementById('device-count').textContent = `${data.count} 台`;
+
+            if (data.devices && data.devices.length > 0) {
+                devicesList.innerHTML = '';
+                data.devices.forEach(device => {
+                    const div = document.createElement('div');
+                    div.className = 'device-item';
+
+                    // デバイスタイプに応じたクラス名
+                    let typeClass = '';
+                    if (device.type === 'カメラ') typeClass = 'camera';
+                    else if (device.type === 'マイク') typeClass = 'microphone';
+                    else if (device.type === 'GPS') typeClass = 'gps';
+
+                    div.innerHTML = `
+                        <div class="device-ip">${device.name}</div>
+                        <div class="device-path">${device.device_path || ''}</div>
+                        <div class="device-vendor">${device.driver || device.method || ''}</div>
+                        <div class="device-type ${typeClass}">${device.type}</div>
+                        <div class="device-status ${device.status}">状態: ${device.status}</div>
+                    `;
+                    devicesList.appendChild(div);
+                });
+            } else {
+                devicesList.innerHTML = '<div style="text-align: center; color: #6c757d; padding: 20px;">🔍 デバイスが見つかりません</div>';
+            }
+        })
+        .catch(error => {
+            console.error('Device scan error:', error);
+            devicesList.innerHTML = '<div style="text-align: center; color: #dc3545; padding: 20px;">⚠️ スキャンエラー</div>';
+        })
+        .finally(() => {
+            btn.disabled = false;
+            btn.textContent = '再スキャン';
+        });
+}
+
+// 初回読み込みと更新開始（接続できない場合は5秒ごとのポーリング）
+updateNetworkStatus();
+liveEvents = new LiveEvents(['network'], { network: updateUI }, {
+    fallback: updateNetworkStatus,
+    fallbackInterval: 5000
+});
+liveEvents.start();
+
+// ページ離脱時に接続を閉じる
+window.addEventListener('beforeunload', () => {
+    if (liveEvents) {
+        liveEvents.stop();
+    }
+});
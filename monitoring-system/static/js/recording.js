@@ -0,0 +1,260 @@
+class RecordingApp {
+    constructor() {
+        this.isRecording = false;
+        this.liveEvents = null;
+        this.init();
+    }
+
+    async init() {
+        this.bindEvents();
+        await this.loadDevices();
+        await this.loadFiles();
+        this.startStatusUpdates();
+    }
+
+    bindEvents() {
+        document.getElementById('start-btn').addEventListener('click', () => this.startRecording());
+        document.getElementById('stop-btn').addEventListener('click', () => this.stopRecording());
+        document.getElementById('refresh-files').addEventListener('click', () => this.loadFiles());
+    }
+
+    async loadDevices() {
+        try {
+            const response = await fetch('/api/recording/devices');
+            const data = await response.json();
+
+            const deviceSelect = document.getElementById('device-select');
+            deviceSelect.innerHTML = '';
+
+            if (data.devices && data.devices.length > 0) {
+                data.devices.forEach(device => {
+                    const option = document.createElement('option');
+                    option.value = device.id;
+                    option.textContent = `${device.name} (${device.type})`;
+                    deviceSelect.appendChild(option);
+                });
+            } else {
+                deviceSelect.innerHTML = '<option value="">録音デバイスが見つかりません</option>';
+            }
+        } catch (error) {
+            console.error('デバイス読み込みエラー:', error);
+            this.showMessage('デバイス読み込みに失敗しました', 'danger');
+        }
+    }
+
+    async startRecording() {
+        try {
+            const duration = parseInt(document.getElementById('duration-input').value);
+            const deviceId = document.getElementById('device-select').value;
+            const sampleRate = parseInt(document.getElementById('sample-rate').value);
+            const channels = parseInt(document.getElementById('channels').value);
+
+            if (!duration || duration < 1 || duration > 3600) {
+                this.showMessage('録音時間は1秒から3600秒の間で指定してください', 'danger');
+                return;
+            }
+
+            if (!deviceId) {
+                this.showMessage('録音デバイスを選択してください', 'danger');
+                return;
+            }
+
+            const response = await fetch('/api/recording/start', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({
+                    duration: duration,
+                    device_id: deviceId,
+                    sample_rate: sampleRate,
+                    channels: channels
+                })
+            });
+
+            const result = await response.json();
+
+            if (result.success) {
+                this.isRecording = true;
+                this.updateUI();
+                this.showMessage(result.message, 'success');
+            } else {
+                this.showMessage(result.message, 'danger');
+            }
+        } catch (error) {
+            console.error('録音開始エラー:', error);
+            this.showMessage('録音開始に失敗しました', 'danger');
+        }
+    }
+
+    async stopRecording() {
+        try {
+            const response = await fetch('/api/recording/stop', {
+                method: 'POST'
+            });
+
+            const result = await response.json();
+
+            if (result.success) {
+                this.isRecording = false;
+                this.updateUI();
+                this.showMessage(result.message, 'success');
+                await this.loadFiles();
+            } else {
+                this.showMessage(result.message, 'danger');
+            }
+        } catch (error) {
+            console.error('録音停止エラー:', error);
+            this.showMessage('録音停止に失敗しました', 'danger');
+        }
+    }
+
+    async updateStatus() {
+        try {
+            const response = await fetch('/api/recording/status');
+            const data = await response.json();
+
+            if (data.error) {
+                this.showMessage(`状態取得エラー: ${data.error}`, 'danger');
+                return;
+            }
+
+            this.renderStatus(data);
+
+        } catch (error) {
+            console.error('状態更新エラー:', error);
+        }
+    }
+
+    renderStatus(data) {
+        this.isRecording = data.is_recording;
+
+        if (this.isRecording) {
+            document.getElementById('elapsed-time').textContent = data.elapsed_time || 0;
+            document.getElementById('remaining-time').textContent = Math.round(data.remaining_time || 0);
+
+            const progress = ((data.elapsed_time || 0) / (data.duration || 1)) * 100;
+            document.getElementById('progress-fill').style.width = `${Math.min(progress, 100)}%`;
+
+            document.getElementById('status-text').textContent =
+                `録音中: ${data.filename || ''} (${data.elapsed_time || 0}秒/${data.duration || 0}秒)`;
+        } else {
+            document.getElementById('status-text').textContent = data.last_recording
+                ? `最後の録音: ${data.last_recording.filename} (${data.last_recording.actual_duration}秒)` +
+                  (data.last_recording.interrupted === 'device_removed' ? ' - 録音デバイスの切断により中断' : '')
+                : '待機中';
+        }
+
+        this.updateUI();
+    }
+
+    updateUI() {
+        const startBtn = document.getElementById('start-btn');
+        const stopBtn = document.getElementById('stop-btn');
+        const recordingIndicator = document.getElementById('recording-indicator');
+        const controls = document.querySelectorAll('#device-select, #duration-input, #sample-rate, #channels');
+
+        if (this.isRecording) {
+            startBtn.style.display = 'none';
+            stopBtn.style.display = 'inline-block';
+            recordingIndicator.style.display = 'block';
+            controls.forEach(control => control.disabled = true);
+        } else {
+            startBtn.style.display = 'inline-block';
+            stopBtn.style.display = 'none';
+            recordingIndicator.style.display = 'none';
+            controls.forEach(control => control.disabled = false);
+        }
+    }
+
+    async loadFiles() {
+        try {
+            const response = await fetch('/api/recording/list');
+            const data = await response.json();
+
+            const fileList = document.getElementById('file-list');
+
+            if (data.error) {
+                fileList.innerHTML = `<div class="alert alert-danger">${data.error}</div>`;
+                return;
+            }
+
+            if (data.files && data.files.length > 0) {
+                fileList.innerHTML = data.files.map(file => `
+                    <div class="file-item">
+                        <div class="file-info">
+                            <div class="file-name">${file.filename}</div>
+                            <div class="file-details">
+                                サイズ: ${this.formatFileSize(file.size)} |
+                                作成: ${file.created} |
+                                更新: ${file.modified}
+                            </div>
+                        </div>
+                        <div>
+                            <a href="/api/recording/download/${file.filename}"
+                               class="button btn-primary"
+                               style="padding: 8px 15px; font-size: 14px;">
+                                📥 ダウンロード
+                            </a>
+                        </div>
+                    </div>
+                `).join('');
+            } else {
+                fileList.innerHTML = '<div class="alert alert-secondary">録音ファイルがありません</div>';
+            }
+        } catch (error) {
+            console.error('ファイル一覧読み込みエラー:', error);
+            document.getElementById('file-list').innerHTML =
+                '<div class="alert alert-danger">ファイル一覧の読み込みに失敗しました</div>';
+        }
+    }
+
+    formatFileSize(bytes) {
+        if (bytes === 0) return '0 B';
+        const k = 1024;
+        const sizes = ['B', 'KB', 'MB', 'GB'];
+        const i = Math.floor(Math.log(bytes) / Math.log(k));
+        return parseFloat((bytes / Math.pow(k, i)).toFixed(2)) + ' ' + sizes[i];
+    }
+
+    showMessage(message, type = 'info') {
+        const messageArea = document.getElementById('message-area');
+        const alertClass = type === 'success' ? 'alert-success' :
+                         type === 'danger' ? 'alert-danger' : 'alert-secondary';
+
+        messageArea.innerHTML = `<div class="alert ${alertClass}">${message}</div>`;
+
+        setTimeout(() => {
+            messageArea.innerHTML = '';
+        }, 5000);
+    }
+
+    startStatusUpdates() {
+        this.updateStatus();
+        // 録音状態は変化した時だけプッシュ配信される（接続できない場合は1秒ごとのポーリング）
+        this.liveEvents = new LiveEvents(['recording'], {
+            recording: data => this.renderStatus(data)
+        }, {
+            fallback: () => this.updateStatus(),
+            fallbackInterval: 1000
+        });
+        this.liveEvents.start();
+    }
+
+    stopStatusUpdates() {
+        if (this.liveEvents) {
+            this.liveEvents.stop();
+            this.liveEvents = null;
+        }
+    }
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    window.recordingApp = new RecordingApp();
+});
+
+window.addEventListener('beforeunload', () => {
+    if (window.recordingApp) {
+        window.recordingApp.stopStatusUpdates();
+    }
+});
@@ -0,0 +1,254 @@
+class TailscaleManager {
+    constructor() {
+        this.liveEvents = null;
+        this.isUpdating = false;
+        this.init();
+    }
+
+    async init() {
+        console.log('Tailscale Manager initializing...');
+        await this.updateStatus();
+        this.startAutoUpdate();
+    }
+
+    async updateStatus(forceRefresh = false) {
+        if (this.isUpdating) return;
+        this.isUpdating = true;
+
+        try {
+            const response = await fetch(forceRefresh ? '/api/tailscale-status?refresh=1' : '/api/tailscale-status');
+            if (!response.ok) {
+                throw new Error(`API error: ${response.status}`);
+            }
+
+            const data = await response.json();
+            this.updateUI(data);
+
+            // 最終更新時刻
+            document.getElementById('last-update').textContent =
+                new Date().toLocaleTimeString('ja-JP');
+
+        } catch (error) {
+            console.error('Status update error:', error);
+            this.showAlert('データの取得に失敗しました: ' + error.message, 'error');
+        } finally {
+            this.isUpdating = false;
+        }
+    }
+
+    updateUI(data) {
+        // メイン状態インジケーター
+        const mainStatus = document.getElementById('main-status');
+        const statusClass = data.status === 'connected' ? 'status-connected' :
+                          data.status === 'disconnected' ? 'status-disconnected' : 'status-error';
+        mainStatus.className = `status-indicator ${statusClass}`;
+
+        // 接続状態
+        const connectionStatus = document.getElementById('connection-status');
+        connectionStatus.textContent = this.getStatusText(data.status);
+        connectionStatus.className = `status-value ${data.status}`;
+
+        // VPN IP
+        document.getElementById('vpn-ip').textContent = data.ip || '不明';
+
+        // 接続品質
+        const qualityElement = document.getElementById('connection-quality');
+        qualityElement.textContent = this.getQualityText(data.connection_quality);
+        qualityElement.className = `status-value ${data.connection_quality}`;
+
+        // デバイス数
+        document.getElementById('device-count').textContent =
+            `${data.devices ? data.devices.length : 0} 台`;
+
+        // デバイス一覧更新
+        this.updateDeviceList(data.devices || []);
+
+        // ログ更新
+        this.updateLogs(data.logs || []);
+
+        // アラート表示
+        if (data.status === 'error' || data.status === 'timeout') {
+            this.showAlert(data.message, 'error');
+        } else if (data.status === 'disconnected') {
+            this.showAlert('Tailscaleが切断されています', 'warning');
+        } else {
+            this.clearAlert();
+        }
+    }
+
+    updateDeviceList(devices) {
+        const deviceList = document.getElementById('device-list');
+
+        if (devices.length === 0) {
+            deviceList.innerHTML = `
+                <div style="text-align: center; color: #6c757d; padding: 20px;">
+                    📱 接続デバイスが見つかりません
+                </div>
+            `;
+            return;
+        }
+
+        deviceList.innerHTML = devices.map(device => `
+            <div class="device-item">
+                <div class="device-info">
+                    <div class="device-name">${device.name || 'Unknown Device'}</div>
+                    <div class="device-ip">${device.ip}${this.getPathText(device)}</div>
+                </div>
+                <div class="device-status ${device.status}">
+                    ${device.status === 'online' ? 'オンライン' : 'オフライン'}
+                </div>
+            </div>
+        `).join('');
+    }
+
+    updateLogs(logs) {
+        const logContainer = document.getElementById('log-container');
+
+        if (logs.length === 0) {
+            logContainer.innerHTML = '<div class="log-line">ログ情報がありません</div>';
+            return;
+        }
+
+        logContainer.innerHTML = logs.map(log => {
+            let logClass = 'log-line';
+            if (log.toLowerCase().includes('error')) logClass += ' error';
+            else if (log.toLowerCase().includes('warning')) logClass += ' warning';
+            else if (log.toLowerCase().includes('success') || log.toLowerCase().includes('connected')) logClass += ' success';
+
+            return `<div class="${logClass}">${this.escapeHtml(log)}</div>`;
+        }).join('');
+
+        // 最新ログまでスクロール
+        logContainer.scrollTop = logContainer.scrollHeight;
+    }
+
+    getStatusText(status) {
+        switch (status) {
+            case 'connected': return '接続中';
+            case 'disconnected': return '切断';
+            case 'error': return 'エラー';
+            case 'timeout': return 'タイムアウト';
+            default: return '不明';
+        }
+    }
+
+    getQualityText(quality) {
+        switch (quality) {
+            case 'good': return '良好';
+            case 'relay': return 'リレー経由';
+            case 'poor': return '不良';
+            default: return '不明';
+        }
+    }
+
+    getPathText(device) {
+        // 経路（直接/DERPリレー）・ping応答時間・受信速度
+        if (device.self || device.status !== 'online' || !device.path) {
+            return '';
+        }
+        const parts = [];
+        if (device.path === 'direct') {
+            parts.push('直接');
+        } else if (device.path === 'relay') {
+            parts.push(`リレー (${this.escapeHtml(device.relay || 'DERP')})`);
+        }
+        if (device.latency_ms !== null && device.latency_ms !== undefined) {
+            parts.push(`${device.latency_ms}ms`);
+        }
+        if (device.rx_rate) {
+            parts.push(`↓${(device.rx_rate / 1024).toFixed(1)}KB/s`);
+        }
+        return parts.length ? ` · ${parts.join(' · ')}` : '';
+    }
+
+    showAlert(message, type = 'warning') {
+        const alertArea = document.getElementById('alert-area');
+        const alertClass = `alert alert-${type}`;
+        alertArea.innerHTML = `<div class="${alertClass}">${this.escapeHtml(message)}</div>`;
+    }
+
+    clearAlert() {
+        document.getElementById('alert-area').innerHTML = '';
+    }
+
+    escapeHtml(text) {
+        const div = document.createElement('div');
+        div.textContent = text;
+        return div.innerHTML;
+    }
+
+    startAutoUpdate() {
+        // 状態は変化した時だけプッシュ配信される（接続できない場合は15秒ごとのポーリング）
+        this.liveEvents = new LiveEvents(['tailscale'], {
+            tailscale: data => {
+                this.updateUI(data);
+                document.getElementById('last-update').textContent =
+                    new Date().toLocaleTimeString('ja-JP');
+            }
+        }, {
+            fallback: () => this.updateStatus(),
+            fallbackInterval: 15000
+        });
+        this.liveEvents.start();
+    }
+
+    stopAutoUpdate() {
+        if (this.liveEvents) {
+            this.liveEvents.stop();
+            this.liveEvents = null;
+        }
+    }
+}
+
+// グローバル関数
+let tailscaleManager;
+
+function refreshStatus() {
+    const refreshBtn = document.getElementById('refresh-btn');
+    const refreshIcon = document.getElementById('refresh-icon');
+
+    refreshBtn.disabled = true;
+    refreshIcon.innerHTML = '<span class="loading"></span>';
+
+    tailscaleManager.updateStatus(true).finally(() => {
+        setTimeout(() => {
+            refreshBtn.disabled = false;
+            refreshIcon.textContent = '🔄';
+        }, 1000);
+    });
+}
+
+function reconnectTailscale() {
+    const reconnectBtn = document.getElementById('reconnect-btn');
+
+    if (confirm('Tailscaleに再接続しますか？\n\n注意: 一時的に接続が切断される可能性があります。')) {
+        reconnectBtn.disabled = true;
+        reconnectBtn.innerHTML = '<span class="loading"></span> 再接続中...';
+
+        // 実際の再接続処理は将来実装
+        // ここでは5秒後に状態更新のみ行う
+        setTimeout(() => {
+            tailscaleManager.updateStatus(true);
+            reconnectBtn.disabled = false;
+            reconnectBtn.innerHTML = '<span>🔗</span> 再接続';
+            alert('再接続処理を実行しました。\n状態が更新されるまでしばらくお待ちください。');
+        }, 3000);
+    }
+}
+
+function showAdvancedInfo() {
+    // 詳細情報の表示（将来実装）
+    alert('詳細情報機能は開発中です。\n\n将来の機能:\n- 接続履歴\n- 帯域使用量\n- 設定変更\n- ログエクスポート');
+}
+
+// 初期化
+document.addEventListener('DOMContentLoaded', () => {
+    tailscaleManager = new TailscaleManager();
+});
+
+// ページ離脱時のクリーンアップ
+window.addEventListener('beforeunload', () => {
+    if (tailscaleManager) {
+        tailscaleManager.stopAutoUpdate();
+    }
+});
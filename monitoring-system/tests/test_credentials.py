@@ -0,0 +1,41 @@
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from modules.gdrive.credentials import CredentialManager
+
+class FakeCredentials:
+    def __init__(self, expiry, refresh_token=None):
+        self.expiry = expiry
+        self.refresh_token = refresh_token
+
+    @property
+    def valid(self):
+        return self.expiry > datetime.utcnow()
+
+    def to_json(self):
+        return '{}'
+
+class RefreshLoopTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.manager = CredentialManager(os.path.join(self.tmp.name, 'token.json'), [])
+        self.addCleanup(self.manager.stop)
+
+    def test_expired_without_refresh_token_waits_for_new_credentials(self):
+        self.manager.credentials = FakeCredentials(datetime.utcnow() - timedelta(hours=1))
+        with mock.patch.object(self.manager, 'time_to_expiry', wraps=self.manager.time_to_expiry) as checks:
+            self.manager.start()
+            time.sleep(1.5)
+            self.assertEqual(checks.call_count, 1)
+
+            self.manager.set_credentials(FakeCredentials(datetime.utcnow() + timedelta(hours=1)))
+            time.sleep(0.2)
+            self.assertEqual(checks.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+from datetime import datetime
+
+from modules.system.cronparse import parse_crontab
+
+class ParseCrontabTest(unittest.TestCase):
+    def test_macro_separated_by_tab(self):
+        entries, _, errors = parse_crontab('@daily\t/bin/x\n@reboot\t\t/usr/local/bin/start.sh --now\n')
+        self.assertEqual(errors, [])
+        self.assertEqual([(e['macro'], e['schedule'], e['command']) for e in entries], [
+            ('@daily', '0 0 * * *', '/bin/x'),
+            ('@reboot', None, '/usr/local/bin/start.sh --now')
+        ])
+
+    def test_debian_system_crontab_with_tabs(self):
+        text = (
+            'SHELL=/bin/sh\n'
+            '17 *\t* * *\troot    cd / && run-parts --report /etc/cron.hourly\n'
+            '25 6\t* * *\troot\ttest -x /usr/sbin/anacron || { cd / && run-parts --report /etc/cron.daily; }\n'
+            '@weekly\troot\t/usr/local/bin/backup\n'
+        )
+        entries, env, errors = parse_crontab(text, system=True, source='/etc/crontab')
+        self.assertEqual(errors, [])
+        self.assertEqual(env, {'SHELL': '/bin/sh'})
+        self.assertEqual([e['user'] for e in entries], ['root', 'root', 'root'])
+        self.assertEqual(entries[1]['schedule'], '25 6 * * *')
+        self.assertEqual(entries[1]['command'],
+                         'test -x /usr/sbin/anacron || { cd / && run-parts --report /etc/cron.daily; }')
+        self.assertEqual(entries[2]['command'], '/usr/local/bin/backup')
+        self.assertEqual(entries[1]['_schedule'].next_run(datetime(2024, 5, 1, 7, 0)), datetime(2024, 5, 2, 6, 25))
+
+    def test_system_line_without_command_is_error(self):
+        entries, _, errors = parse_crontab('@daily\troot\n', system=True)
+        self.assertEqual(entries, [])
+        self.assertEqual(len(errors), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from modules.system.crontab import CrontabCollector
+
+class CrontabUpcomingTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'crontab')
+        with open(self.path, 'w') as f:
+            f.write('*/10 * * * *\troot\t/usr/local/bin/check\n@reboot\troot\t/usr/local/bin/start\n')
+        self.collector = CrontabCollector({
+            'user': 'pi', 'spool_dir': self.tmp.name, 'system_files': [self.path], 'logs': {'syslog_files': []}
+        })
+        self.collector._load()
+
+    def test_upcoming_reads_index_built_by_collector(self):
+        now = datetime(2024, 5, 1, 12, 3)
+        self.assertEqual(self.collector.upcoming(3600, now), [])
+        self.collector._ensure_index(now)
+        runs = self.collector.upcoming(1800, now)
+        self.assertEqual([run['time'] for run in runs],
+                         ['2024-05-01 12:10:00', '2024-05-01 12:20:00', '2024-05-01 12:30:00'])
+        self.assertEqual({run['command'] for run in runs}, {'/usr/local/bin/check'})
+
+    def test_within_is_capped_at_half_horizon(self):
+        self.assertEqual(self.collector.clamp_within(10 ** 9), self.collector.index_horizon / 2)
+        self.assertEqual(self.collector.clamp_within(600), 600)
+
+    def test_reload_discards_index(self):
+        self.collector._ensure_index(datetime(2024, 5, 1, 12, 3))
+        self.collector._replace_entries([])
+        self.assertEqual(self.collector.upcoming(3600, datetime(2024, 5, 1, 12, 3)), [])
+
+if __name__ == '__main__':
+    unittest.main()
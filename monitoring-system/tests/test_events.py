@@ -0,0 +1,30 @@
+import unittest
+
+from utils.events import EventBus
+
+class EventIdTest(unittest.TestCase):
+    def setUp(self):
+        self.bus = EventBus()
+        self.bus.publish('recording', {'is_recording': False})
+        self.bus.publish('recording', {'is_recording': True})
+
+    def test_round_trip(self):
+        event_id = self.bus.event_id(2)
+        self.assertTrue(event_id.startswith(self.bus.epoch + '-'))
+        self.assertEqual(self.bus.parse_id(event_id), 2)
+
+    def test_previous_boot_id_resends_everything(self):
+        restarted = EventBus()
+        restarted.publish('recording', {'is_recording': True})
+        since = restarted.parse_id(self.bus.event_id(2))
+        self.assertEqual(since, 0)
+        version, full, parts = restarted.snapshot(since)
+        self.assertTrue(full)
+        self.assertIn('recording', parts)
+
+    def test_invalid_ids(self):
+        for value in (None, '', '0', '2', 'abc', f'{self.bus.epoch}-x'):
+            self.assertEqual(self.bus.parse_id(value), 0)
+
+if __name__ == '__main__':
+    unittest.main()
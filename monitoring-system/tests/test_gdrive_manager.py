@@ -0,0 +1,88 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from modules.gdrive import manager as manager_module
+from modules.gdrive.manager import GDriveManager
+
+class NotFound(Exception):
+    def __init__(self, folder_id):
+        super().__init__(f'File not found: {folder_id}')
+        self.resp = mock.Mock(status=404)
+
+class ThreadServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.manager = GDriveManager({'gdrive': {
+            'folder_name': 'test-folder',
+            'credentials_file': os.path.join(self.tmp.name, 'credentials.json'),
+            'token_file': os.path.join(self.tmp.name, 'token.json')
+        }})
+        patchers = [
+            mock.patch.object(manager_module.google_client, 'build_drive_service',
+                              side_effect=lambda **kwargs: mock.Mock(name='service')),
+            mock.patch.object(self.manager, '_authorized_http', return_value=None)
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def services_by_thread(self, count):
+        services = [None] * count
+        def worker(index):
+            services[index] = (self.manager._thread_service(), self.manager._thread_service())
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return services
+
+    def test_each_thread_has_its_own_service(self):
+        services = self.services_by_thread(3)
+        self.assertTrue(all(first is second for first, second in services))
+        self.assertEqual(len({id(first) for first, _ in services}), 3)
+
+    def test_concurrent_folder_retry_resolves_once(self):
+        self.manager.folder_id = 'stale'
+        barrier = threading.Barrier(3)
+        resolved = []
+
+        def resolve():
+            resolved.append(threading.current_thread().name)
+            self.manager.folder_id = 'fresh'
+
+        def operation():
+            folder_id = self.manager.folder_id
+            if folder_id == 'stale':
+                barrier.wait(2)
+                raise NotFound(folder_id)
+            return folder_id
+
+        results = []
+        with mock.patch.object(self.manager, '_resolve_monitoring_folder', side_effect=resolve), \
+                mock.patch.object(self.manager, '_save_folder_cache'), \
+                self.assertLogs('modules.gdrive.manager', 'WARNING'):
+            threads = [threading.Thread(target=lambda: results.append(self.manager._with_folder_retry(operation)))
+                       for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(resolved), 1)
+        self.assertEqual(results, ['fresh'] * 3)
+
+class CurrentUploadTest(unittest.TestCase):
+    def test_same_filename_uploads_are_tracked_separately(self):
+        throttle = manager_module.UploadThrottle({})
+        throttle.set_current_upload('a', {'filename': 'x.wav', 'bytes_sent': 1})
+        throttle.set_current_upload('b', {'filename': 'x.wav', 'bytes_sent': 2})
+        throttle.set_current_upload('a', None)
+        self.assertEqual(throttle.get_stats()['current_uploads'], [{'filename': 'x.wav', 'bytes_sent': 2}])
+
+if __name__ == '__main__':
+    unittest.main()
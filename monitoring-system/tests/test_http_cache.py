@@ -0,0 +1,51 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from flask import Flask
+
+from utils.http_cache import HttpCache
+
+class StaticCompressionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.css = os.path.join(self.tmp.name, 'app.css')
+        with open(self.css, 'w') as f:
+            f.write('body { margin: 0; }\n' * 100)
+        app = Flask(__name__, static_folder=self.tmp.name, static_url_path='/static')
+        self.http_cache = HttpCache(app, {'compress_min_size': 512})
+        self.client = app.test_client()
+
+    def get(self, **headers):
+        return self.client.get('/static/app.css', headers={'Accept-Encoding': 'gzip', **headers})
+
+    def test_compresses_without_precompressed_file(self):
+        response = self.get()
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(response.mimetype, 'text/css')
+        self.assertEqual(gzip.decompress(response.data), b'body { margin: 0; }\n' * 100)
+
+        self.get()
+        self.assertEqual(self.http_cache.stats['static_compressed'], 1)
+        self.assertEqual(self.http_cache.stats['static_cache_hits'], 1)
+
+    def test_recompresses_after_file_changes(self):
+        self.get()
+        with open(self.css, 'a') as f:
+            f.write('p { color: red; }\n')
+        self.assertTrue(gzip.decompress(self.get().data).endswith(b'p { color: red; }\n'))
+        self.assertEqual(self.http_cache.stats['static_compressed'], 2)
+
+    def test_not_modified_with_etag(self):
+        etag = self.get().headers['ETag']
+        self.assertEqual(self.get(**{'If-None-Match': etag}).status_code, 304)
+
+    def test_identity_when_not_accepted(self):
+        response = self.client.get('/static/app.css')
+        self.assertNotIn('Content-Encoding', response.headers)
+        response.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import logging
+import unittest
+from unittest import mock
+
+from utils import log
+
+class SetupLoggingTest(unittest.TestCase):
+    def setUp(self):
+        root = logging.getLogger()
+        handlers, level = list(root.handlers), root.level
+
+        def restore():
+            log.stop_logging()
+            for handler in handlers:
+                root.addHandler(handler)
+            root.setLevel(level)
+        self.addCleanup(restore)
+
+    def test_atexit_registered_once(self):
+        with mock.patch.object(log, '_atexit_registered', False), \
+                mock.patch.object(log.atexit, 'register') as register:
+            log.setup_logging({'levels': {}})
+            log.setup_logging({'levels': {}})
+        register.assert_called_once_with(log.stop_logging)
+
+    def test_stop_logging(self):
+        with mock.patch.object(log.atexit, 'register'):
+            log.setup_logging({'levels': {}})
+        self.assertTrue(log.get_logging_stats()['running'])
+        log.stop_logging()
+        stats = log.get_logging_stats()
+        self.assertFalse(stats['running'])
+        self.assertEqual(stats['queued'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from modules.recording import recorder
+
+class ResolveAlsaCardTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config = os.path.join(self.tmp.name, 'asoundrc')
+        patcher = mock.patch.object(recorder, 'ALSA_CONFIG_FILES', (self.config,))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def write_config(self, text):
+        with open(self.config, 'w') as f:
+            f.write(text)
+
+    def test_card_from_device_name(self):
+        self.assertEqual(recorder.resolve_alsa_card('hw:1,0'), '1')
+        self.assertEqual(recorder.resolve_alsa_card('plughw:CARD=Device,DEV=0'), 'Device')
+
+    def test_default_without_config_is_card_zero(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertEqual(recorder.resolve_alsa_card('default'), '0')
+
+    def test_default_from_defaults_pcm_card(self):
+        self.write_config('# USBマイク\ndefaults.pcm.card 1\ndefaults.ctl.card 1\n')
+        self.assertEqual(recorder.resolve_alsa_card('default'), '1')
+
+    def test_default_from_pcm_default_block(self):
+        self.write_config('pcm.!default {\n    type hw\n    card Device\n}\n')
+        self.assertEqual(recorder.resolve_alsa_card('default'), 'Device')
+
+    def test_unknown_card_is_none(self):
+        self.write_config('pcm.!default {\n    type pulse\n}\n')
+        self.assertIsNone(recorder.resolve_alsa_card('default'))
+        self.assertIsNone(recorder.resolve_alsa_card('dsnoop'))
+
+class FakeProcess:
+    def __init__(self, returncode=None):
+        self.returncode = returncode
+
+    def poll(self):
+        return self.returncode
+
+class UsbRemovalTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.recorder = recorder.AudioRecorder(self.tmp.name)
+        self.process = FakeProcess()
+        self.recorder.data.update({
+            'is_recording': True,
+            'process': self.process,
+            'start_time': datetime.now() - timedelta(seconds=10),
+            'duration': 60,
+            'selected_device': 'hw:1,0',
+            'alsa_card': '1'
+        })
+        patcher = mock.patch.object(self.recorder, 'stop_recording')
+        self.stop = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def detach(self, **device):
+        return self.recorder.on_usb_event({'action': 'detach', 'device': {'type': 'オーディオ', **device}})
+
+    def test_detach_only_schedules_stop(self):
+        with self.assertLogs('modules.recording.recorder', 'WARNING'):
+            self.assertTrue(self.detach(sound_card=1))
+        self.stop.assert_not_called()
+        self.assertTrue(self.recorder.poll_recording())
+        self.stop.assert_called_once_with(reason='device_removed')
+
+    def test_other_card_is_ignored(self):
+        self.assertFalse(self.detach(sound_card=2))
+        self.assertFalse(self.recorder.poll_recording())
+        self.stop.assert_not_called()
+
+    def test_unknown_card_full_length_exit_is_not_removal(self):
+        self.recorder.data.update({'alsa_card': None, 'duration': 5})
+        self.detach(sound_card=2)
+        self.process.returncode = 0
+        self.recorder.poll_recording()
+        self.stop.assert_called_once_with(reason=None)
+
+    def test_unknown_card_early_exit_is_removal(self):
+        self.recorder.data['alsa_card'] = None
+        self.detach(sound_card=2)
+        self.process.returncode = 1
+        self.recorder.poll_recording()
+        self.stop.assert_called_once_with(reason='device_removed')
+
+    def test_unknown_card_detach_cleared_while_recording_continues(self):
+        self.recorder.data['alsa_card'] = None
+        self.detach(sound_card=2)
+        self.recorder._device_removed -= timedelta(seconds=recorder.DEVICE_REMOVED_GRACE)
+        self.recorder.poll_recording()
+        self.assertIsNone(self.recorder._device_removed)
+        self.process.returncode = 1
+        self.recorder.poll_recording()
+        self.stop.assert_called_once_with(reason=None)
+
+class RecordingProcessTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.recorder = recorder.AudioRecorder(self.tmp.name)
+
+    def start(self, script):
+        popen = subprocess.Popen
+        with mock.patch.object(recorder.subprocess, 'Popen',
+                               lambda cmd, **kwargs: popen([sys.executable, '-c', script], **kwargs)):
+            self.assertTrue(self.recorder.start_recording(1, 'hw:1,0')['success'])
+
+    def wait_for_stop(self):
+        deadline = time.monotonic() + 5
+        while not self.recorder.poll_recording():
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.05)
+
+    def file_md5(self, filename):
+        with open(os.path.join(self.tmp.name, filename), 'rb') as f:
+            return hashlib.md5(f.read()).hexdigest()
+
+    def test_failure_logs_stderr(self):
+        self.start("import sys; sys.stderr.write('arecord: audio open error: Device or resource busy\\n'); sys.exit(1)")
+        with self.assertLogs('modules.recording.recorder', 'ERROR') as logs:
+            self.wait_for_stop()
+        self.assertIn('code 1', logs.output[0])
+        self.assertIn('Device or resource busy', logs.output[0])
+
+    def test_stop_does_not_log_error(self):
+        self.start('import time; time.sleep(30)')
+        with mock.patch.object(recorder.logger, 'error') as error:
+            self.assertTrue(self.recorder.stop_recording()['success'])
+        error.assert_not_called()
+
+    def test_full_length_uses_capture_hash(self):
+        self.start("import sys; sys.stdout.buffer.write(b'\\x01' * 176400)")
+        self.wait_for_stop()
+        last = self.recorder.data['last_recording']
+        self.assertEqual(last['checksums']['source'], 'capture')
+        self.assertEqual(last['checksums']['md5'], self.file_md5(last['filename']))
+        self.assertEqual(last['checksums']['pcm_md5'], hashlib.md5(b'\x01' * 176400).hexdigest())
+
+    def test_early_stop_does_not_reread_file(self):
+        self.start("import sys; sys.stdout.buffer.write(b'\\x01' * 1000)")
+        with mock.patch.object(self.recorder, '_hash_file') as hash_file:
+            self.wait_for_stop()
+        hash_file.assert_not_called()
+        last = self.recorder.data['last_recording']
+        self.assertEqual(last['checksums']['source'], 'partial')
+        self.assertIsNone(last['checksums']['md5'])
+        self.assertEqual(last['checksums']['pcm_md5'], hashlib.md5(b'\x01' * 1000).hexdigest())
+
+        # ファイル全体のMD5は初回の取得時に計算して保存する
+        md5 = self.file_md5(last['filename'])
+        self.assertEqual(self.recorder.get_checksum(last['filename']), md5)
+        self.assertEqual(self.recorder.get_metadata(last['filename'])['checksums']['md5'], md5)
+
+if __name__ == '__main__':
+    unittest.main()
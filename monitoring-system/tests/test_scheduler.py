@@ -0,0 +1,71 @@
+import threading
+import time
+import unittest
+
+from utils.cache import RefreshingCache
+from utils.scheduler import Scheduler
+
+class SchedulerWorkersTest(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = Scheduler()
+        self.release = threading.Event()
+        self.addCleanup(self.scheduler.stop)
+        self.addCleanup(self.release.set)
+
+    def test_short_task_is_not_queued_behind_blocking_tasks(self):
+        for index in range(6):
+            self.scheduler.add_periodic(f'slow-{index}', self.release.wait, interval=60, timeout=30)
+        polled = threading.Event()
+        self.scheduler.add_periodic('recording', polled.set, interval=1, initial_delay=0.2)
+
+        self.scheduler.start()
+        self.assertTrue(polled.wait(2))
+        self.assertEqual(self.scheduler.get_stats()['max_workers'], 7)
+
+    def test_pool_grows_when_blocking_task_is_added_after_start(self):
+        self.scheduler.add_periodic('slow', self.release.wait, interval=60, timeout=30)
+        self.scheduler.start()
+        time.sleep(0.1)
+        added = threading.Event()
+        self.scheduler.add_periodic('added', added.set, interval=60)
+        self.assertTrue(added.wait(2))
+
+    def test_fixed_worker_count(self):
+        self.assertEqual(Scheduler({'max_workers': 2}).get_stats()['max_workers'], 2)
+
+class ScheduledCacheTest(unittest.TestCase):
+    def test_refresh_runs_on_scheduler_worker(self):
+        scheduler = Scheduler()
+        self.addCleanup(scheduler.stop)
+        threads = []
+        loaded = threading.Event()
+
+        def loader():
+            threads.append(threading.current_thread().name)
+            loaded.set()
+            return len(threads)
+
+        cache = RefreshingCache(loader, ttl=60, name='test')
+        cache.schedule(scheduler)
+        scheduler.start()
+        self.assertTrue(loaded.wait(2))
+
+        loaded.clear()
+        cache.refresh_async()
+        self.assertTrue(loaded.wait(2))
+        self.assertTrue(all(name.startswith('scheduler-worker') for name in threads))
+        self.assertEqual(scheduler.get_stats()['tasks']['test-load']['blocking'], True)
+
+    def test_condition_only_skips_periodic_refresh(self):
+        scheduler = Scheduler()
+        self.addCleanup(scheduler.stop)
+        loaded = threading.Event()
+        cache = RefreshingCache(lambda: loaded.set(), ttl=0.1, name='idle')
+        cache.schedule(scheduler, condition=lambda: False)
+        scheduler.start()
+        self.assertTrue(loaded.wait(2))
+        loaded.clear()
+        self.assertFalse(loaded.wait(1.5))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+import os
+import tempfile
+import unittest
+
+from modules.gdrive.sync import RecordingSync
+
+class ScanLocalTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        for name in ('recording_20250710_090000.wav', 'recording_20250710_091000.wav', 'notes.txt'):
+            with open(os.path.join(self.tmp.name, name), 'wb') as f:
+                f.write(b'RIFF')
+        self.active = None
+        self.sync = RecordingSync(None, self.tmp.name, os.path.join(self.tmp.name, 'manifest.json'),
+                                  active_file_provider=lambda: self.active)
+
+    def test_skips_file_being_recorded(self):
+        self.assertEqual(sorted(self.sync._scan_local()),
+                         ['recording_20250710_090000.wav', 'recording_20250710_091000.wav'])
+        self.active = 'recording_20250710_091000.wav'
+        self.assertEqual(list(self.sync._scan_local()), ['recording_20250710_090000.wav'])
+
+if __name__ == '__main__':
+    unittest.main()
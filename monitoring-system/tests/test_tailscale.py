@@ -0,0 +1,65 @@
+import os
+import sys
+import tempfile
+import unittest
+
+from modules.system.tailscale import TailscaleCollector
+
+FAKE_TAILSCALE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tools', 'fake_tailscale.py')
+
+STOPPED_STATUS = {
+    'BackendState': 'Stopped',
+    'TailscaleIPs': [],
+    'Self': {'HostName': 'raspberrypi', 'TailscaleIPs': ['100.64.0.1'], 'Online': False},
+    'Health': ['Tailscale is stopped.'],
+    'Peer': {}
+}
+
+class TailscaleCollectorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def collector(self, script, timeout=10):
+        """status --json の代わりに script を実行するコレクター"""
+        path = os.path.join(self.tmp.name, 'tailscale.py')
+        with open(path, 'w') as f:
+            f.write(script)
+        return TailscaleCollector({'binary': [sys.executable, path], 'timeout': timeout})
+
+    def test_status(self):
+        collector = TailscaleCollector({'binary': [sys.executable, FAKE_TAILSCALE, '--peers', '4']})
+        result = collector.collect()
+        self.assertEqual(result['status'], 'connected')
+        self.assertEqual(result['ip'], '100.64.0.1')
+        self.assertEqual(result['peer_count'], 4)
+        # peer-03 はオフライン、peer-05 以降が無いので peer-01・peer-02（直接/リレー）・peer-04（直接）がオンライン
+        self.assertEqual(result['online_count'], 3)
+        self.assertEqual(result['devices'][0]['name'], 'raspberrypi (このデバイス)')
+
+    def test_nonzero_exit_with_status_output(self):
+        collector = self.collector(
+            f"import json, sys\nprint(json.dumps({STOPPED_STATUS!r}))\nsys.exit(1)\n"
+        )
+        result = collector.collect()
+        self.assertEqual(result['status'], 'disconnected')
+        self.assertEqual(result['backend_state'], 'Stopped')
+        self.assertEqual(result['health'], ['Tailscale is stopped.'])
+
+    def test_nonzero_exit_without_output(self):
+        collector = self.collector(
+            "import sys\nsys.stderr.write('failed to connect to local tailscaled\\n')\nsys.exit(1)\n"
+        )
+        result = collector.collect()
+        self.assertEqual(result['status'], 'error')
+        self.assertEqual(result['devices'], [])
+        self.assertIn('failed to connect to local tailscaled', result['logs'][0])
+
+    def test_timeout(self):
+        collector = self.collector("import time\ntime.sleep(30)\n", timeout=0.5)
+        result = collector.collect()
+        self.assertEqual(result['status'], 'timeout')
+        self.assertEqual(result['connection_quality'], 'poor')
+
+if __name__ == '__main__':
+    unittest.main()
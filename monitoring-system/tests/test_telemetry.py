@@ -0,0 +1,50 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from modules.gdrive.telemetry import TelemetryBatcher
+
+class FakeDrive:
+    def __init__(self):
+        self.uploads = []
+
+    def upload_bytes(self, data, filename, mimetype):
+        self.uploads.append(filename)
+        return {'success': True, 'file_id': f'id-{len(self.uploads)}', 'filename': filename,
+                'upload_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+
+class TelemetryTimeTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.drive = FakeDrive()
+
+    def batcher(self):
+        return TelemetryBatcher(self.drive, self.tmp.name, max_records=100)
+
+    def test_mixed_naive_and_aware_timestamps(self):
+        batcher = self.batcher()
+        naive = datetime(2025, 7, 10, 9, 0)
+        aware = naive.astimezone(timezone.utc) + timedelta(minutes=5)
+        batcher.add({'timestamp': naive.isoformat(), 'value': 1})
+        batcher.add({'timestamp': aware.isoformat(), 'value': 2})
+        batcher.add({'value': 3})
+
+        status = batcher.get_status()
+        self.assertEqual(status['buffered_records'], 3)
+        self.assertEqual(status['buffer_start'], naive.astimezone(timezone.utc).isoformat())
+
+        self.assertTrue(batcher.flush()['success'])
+        self.assertEqual(len(batcher.find_batches(naive + timedelta(minutes=1), aware)), 1)
+
+    def test_scan_spool_skips_invalid_lines(self):
+        with open(os.path.join(self.tmp.name, TelemetryBatcher.SPOOL_NAME), 'w') as f:
+            f.write(json.dumps({'timestamp': '2025-07-10T09:00:00'}) + '\n')
+            f.write(json.dumps({'timestamp': '2025-07-10T00:10:00+00:00'}) + '\n')
+            f.write('not json\n')
+        self.assertEqual(self.batcher().get_status()['buffered_records'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
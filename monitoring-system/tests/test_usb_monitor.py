@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from modules.system.usb import UsbMonitor
+
+DEVPATH = '/devices/platform/scb/usb1/1-1/1-1.2'
+
+def uevent(action: str, devpath: str, subsystem: str, devtype: str = None) -> bytes:
+    """カーネルのuevent（netlink）と同じ形式のメッセージ"""
+    fields = [f'{action}@{devpath}', f'ACTION={action}', f'DEVPATH={devpath}', f'SUBSYSTEM={subsystem}']
+    if devtype:
+        fields.append(f'DEVTYPE={devtype}')
+    return '\0'.join(fields).encode() + b'\0'
+
+def write(path: str, **attributes: str) -> None:
+    os.makedirs(path, exist_ok=True)
+    for name, value in attributes.items():
+        with open(os.path.join(path, name), 'w') as f:
+            f.write(f'{value}\n')
+
+class TestUsbMonitor(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.device = os.path.join(self.root, '1-1.2')
+        write(self.device, idVendor='0d8c', idProduct='0014', bDeviceClass='00',
+              manufacturer='C-Media Electronics Inc.', product='USB Audio Device')
+        write(os.path.join(self.device, '1-1.2:1.0'), bInterfaceClass='01')
+        write(os.path.join(self.device, '1-1.2:1.0', 'sound', 'card1'), id='Device')
+        write(os.path.join(self.device, '1-1.2:1.3'), bInterfaceClass='03')
+
+        self.monitor = UsbMonitor({'sysfs_root': self.root, 'hotplug': False})
+        self.events = []
+        self.monitor.add_listener(self.events.append)
+        self.monitor.scan()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_scan_classifies_by_interface_class(self):
+        device = self.monitor.snapshot()['devices'][0]
+        self.assertEqual(device['type'], 'オーディオ')
+        self.assertEqual(device['sound_card'], 1)
+        self.assertEqual(device['sound_card_id'], 'Device')
+
+    def test_unplug_keeps_sound_card_until_detach(self):
+        # 切断時のカーネルの順序: サウンドカード → インターフェース → デバイス（sysfsはその都度消える）
+        card = os.path.join(self.device, '1-1.2:1.0', 'sound', 'card1')
+        shutil.rmtree(card)
+        self.monitor._handle_uevent(uevent('remove', f'{DEVPATH}/1-1.2:1.0/sound/card1', 'sound'))
+        for interface in ('1-1.2:1.0', '1-1.2:1.3'):
+            self.monitor._handle_uevent(uevent('unbind', f'{DEVPATH}/{interface}', 'usb', 'usb_interface'))
+            shutil.rmtree(os.path.join(self.device, interface))
+            self.monitor._handle_uevent(uevent('remove', f'{DEVPATH}/{interface}', 'usb', 'usb_interface'))
+        self.monitor._handle_uevent(uevent('unbind', DEVPATH, 'usb', 'usb_device'))
+        shutil.rmtree(self.device)
+        self.monitor._handle_uevent(uevent('remove', DEVPATH, 'usb', 'usb_device'))
+
+        self.assertEqual([event['action'] for event in self.events], ['detach'])
+        device = self.events[0]['device']
+        self.assertEqual(device['type'], 'オーディオ')
+        self.assertEqual(device['sound_card'], 1)
+        self.assertEqual(device['sound_card_id'], 'Device')
+        self.assertEqual(self.monitor.snapshot()['devices'], [])
+
+    def test_plug_in_emits_attach_then_change_for_sound_card(self):
+        path = os.path.join(self.root, '1-1.3')
+        devpath = '/devices/platform/scb/usb1/1-1/1-1.3'
+        write(path, idVendor='0d8c', idProduct='0014', bDeviceClass='00')
+        self.monitor._handle_uevent(uevent('add', devpath, 'usb', 'usb_device'))
+        write(os.path.join(path, '1-1.3:1.0'), bInterfaceClass='01')
+        self.monitor._handle_uevent(uevent('add', f'{devpath}/1-1.3:1.0', 'usb', 'usb_interface'))
+        write(os.path.join(path, '1-1.3:1.0', 'sound', 'card2'), id='Mic')
+        self.monitor._handle_uevent(uevent('add', f'{devpath}/1-1.3:1.0/sound/card2', 'sound'))
+
+        self.assertEqual([event['action'] for event in self.events], ['attach', 'change', 'change'])
+        self.assertEqual(self.events[-1]['device']['sound_card'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
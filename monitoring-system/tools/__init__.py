@@ -0,0 +1,3 @@
+"""
+開発用ツール（疑似Google Driveサーバー・ベンチマーク）
+"""
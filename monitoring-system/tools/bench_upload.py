@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+GDriveManager アップロード性能ベンチマーク
+tools/fake_drive.py の疑似Driveサーバーに対して各アップロード経路を実行し、
+スループット・リトライ回数・1MBあたりのメモリ使用量を計測する
+
+使い方:
+  python tools/bench_upload.py --sizes 1,8,32 --latency 0.02 --bandwidth-kbps 20000 --error-rate 0.05
+  python tools/bench_upload.py --paths resumable --repeat 3 --json bench_result.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+# monitoring-system をインポートパスに追加
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.fake_drive import FakeDriveServer
+
+MB = 1024 * 1024
+
+def make_manager(server: FakeDriveServer, work_dir: str, chunk_size: int) -> Any:
+    """疑似サーバーに接続済みのGDriveManagerを生成"""
+    from modules.gdrive import GDriveManager
+
+    manager = GDriveManager({'gdrive': {
+        'folder_name': 'bench-folder',
+        'credentials_file': os.path.join(work_dir, 'credentials.json'),
+        'token_file': os.path.join(work_dir, 'token.json'),
+        'upload_chunk_size': chunk_size,
+        # 疑似サーバー向けのクライアント（同梱のディスカバリ文書を使用し、認証なし）
+        'client_options': {'api_endpoint': server.api_endpoint}
+    }})
+    manager._authenticated = True
+    manager._setup_monitoring_folder()
+    return manager
+
+def make_test_file(work_dir: str, size_mb: float) -> str:
+    """指定サイズのテストファイル作成"""
+    path = os.path.join(work_dir, f'bench_{size_mb}MB.wav')
+    if not os.path.exists(path):
+        with open(path, 'wb') as f:
+            remaining = int(size_mb * MB)
+            block = os.urandom(MB)
+            while remaining > 0:
+                f.write(block[:min(MB, remaining)])
+                remaining -= MB
+    return path
+
+def measure(server: FakeDriveServer, size_bytes: int, action: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """1回分のアップロード計測"""
+    server.state.reset_stats()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = action()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = server.state.stats
+    size_mb = size_bytes / MB
+    return {
+        'success': result.get('success', False),
+        'message': None if result.get('success') else result.get('message'),
+        'seconds': round(elapsed, 3),
+        'throughput_mbps': round(size_mb * 8 / elapsed, 2) if elapsed else None,
+        'requests': stats['requests'],
+        'retries': stats['errors_injected'],
+        'peak_memory_mb': round(peak / MB, 2),
+        'memory_per_mb': round(peak / MB / size_mb, 3) if size_mb else None
+    }
+
+def run_benchmark(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """全経路・全サイズの計測"""
+    server = FakeDriveServer(
+        latency=args.latency,
+        bandwidth=args.bandwidth_kbps * 1000 / 8 if args.bandwidth_kbps else None,
+        error_rate=args.error_rate,
+        keep_content=False,
+        seed=args.seed
+    ).start()
+
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            for path_name in args.paths:
+                chunk_size = 1 << 40 if path_name == 'simple' else args.chunk_kb * 1024
+                manager = make_manager(server, work_dir, chunk_size)
+
+                for size_mb in args.sizes:
+                    for attempt in range(args.repeat):
+                        if path_name == 'data':
+                            # JSONデータ経路（upload_data）：約size_mbのレコード配列
+                            record = {'timestamp': '2025-01-01T00:00:00', 'ping_latency': 12.3,
+                                      'connection_status': 'connected'}
+                            count = max(1, int(size_mb * MB / len(json.dumps(record, indent=2))))
+                            payload = {'records': [record] * count}
+                            size_bytes = len(json.dumps(payload, ensure_ascii=False, indent=2).encode('utf-8'))
+                            row = measure(server, size_bytes,
+                                          lambda: manager.upload_data(payload, f'bench_{size_mb}MB.json'))
+                        else:
+                            file_path = make_test_file(work_dir, size_mb)
+                            size_bytes = os.path.getsize(file_path)
+                            row = measure(server, size_bytes,
+                                          lambda: manager.upload_file(file_path))
+
+                        row.update({'path': path_name, 'size_mb': size_mb, 'attempt': attempt + 1})
+                        results.append(row)
+                        print_row(row)
+    finally:
+        server.stop()
+
+    return results
+
+def print_row(row: Dict[str, Any]) -> None:
+    """結果1行表示"""
+    status = 'OK ' if row['success'] else 'NG '
+    print(f"{status} {row['path']:<10} {row['size_mb']:>6}MB  "
+          f"{row['seconds']:>8.3f}s  {row['throughput_mbps'] or 0:>8.2f}Mbps  "
+          f"req={row['requests']:<4} retries={row['retries']:<3} "
+          f"peak={row['peak_memory_mb']:>7.2f}MB ({row['memory_per_mb']}MB/MB)"
+          + (f"  {row['message']}" if row['message'] else ''))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='GDriveManager アップロード性能ベンチマーク')
+    parser.add_argument('--paths', default='simple,resumable,data',
+                        help='計測する経路（simple / resumable / data）をカンマ区切りで指定')
+    parser.add_argument('--sizes', default='1,8,32', help='ファイルサイズ（MB）をカンマ区切りで指定')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--chunk-kb', type=int, default=1024, help='レジューム可能アップロードのチャンクサイズ（KB）')
+    parser.add_argument('--latency', type=float, default=0.0, help='疑似サーバーのリクエスト遅延（秒）')
+    parser.add_argument('--bandwidth-kbps', type=float, default=0, help='疑似サーバーの受信帯域（kbps、0で無制限）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='アップロード時の503発生確率')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help='結果をJSONで保存するパス')
+    args = parser.parse_args()
+    args.paths = [p.strip() for p in args.paths.split(',') if p.strip()]
+    args.sizes = [float(s) for s in args.sizes.split(',') if s.strip()]
+
+    print("=" * 50)
+    print("📊 GDriveManager アップロードベンチマーク")
+    print(f"  latency={args.latency}s bandwidth={args.bandwidth_kbps or '∞'}kbps error_rate={args.error_rate}")
+    print("=" * 50)
+
+    results = run_benchmark(args)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'results': results}, f, ensure_ascii=False, indent=2)
+        print(f"結果を保存: {args.json}")
+
+if __name__ == '__main__':
+    main()
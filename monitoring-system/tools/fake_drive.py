@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Google Drive API ローカル代替サーバー
+認証・ネットワーク無しでGDriveManagerの動作確認・性能計測を行うための簡易実装
+
+対応エンドポイント:
+  POST   /upload/drive/v3/files?uploadType=media|multipart|resumable
+  PUT    /upload/drive/v3/files?uploadType=resumable&upload_id=...
+  POST   /drive/v3/files            （メタデータのみ作成、フォルダ作成用）
+  GET    /drive/v3/files            （q / pageSize / pageToken 対応）
+  GET    /drive/v3/files/<id>       （alt=media でRange付きダウンロード）
+  DELETE /drive/v3/files/<id>
+  GET    /drive/v3/about
+
+使い方:
+  python tools/fake_drive.py --port 8765 --latency 0.05 --bandwidth-kbps 4000 --error-rate 0.05
+"""
+
+import argparse
+import email.parser
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+class FakeDriveState:
+    """疑似Driveのファイル・セッション・統計"""
+
+    def __init__(self, latency: float = 0.0, bandwidth: Optional[float] = None,
+                 error_rate: float = 0.0, keep_content: bool = True, seed: Optional[int] = None):
+        """
+        latency: 1リクエストあたりの追加遅延（秒）
+        bandwidth: リクエストボディの受信速度上限（bytes/秒、Noneは無制限）
+        error_rate: アップロード系リクエストで503を返す確率
+        keep_content: アップロード内容を保持するか（ダウンロード確認用）
+        """
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.keep_content = keep_content
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.contents: Dict[str, bytes] = {}
+        self.sessions: Dict[str, Dict[str, Any]] = {}
+        self.stats = {
+            'requests': 0,
+            'bytes_received': 0,
+            'errors_injected': 0,
+            'uploads_completed': 0,
+            'by_endpoint': {}
+        }
+
+    def reset_stats(self) -> None:
+        """統計リセット"""
+        with self.lock:
+            self.stats.update({
+                'requests': 0,
+                'bytes_received': 0,
+                'errors_injected': 0,
+                'uploads_completed': 0,
+                'by_endpoint': {}
+            })
+
+    def count(self, endpoint: str, body_size: int) -> None:
+        """リクエスト計数"""
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['bytes_received'] += body_size
+            self.stats['by_endpoint'][endpoint] = self.stats['by_endpoint'].get(endpoint, 0) + 1
+
+    def should_fail(self) -> bool:
+        """エラー注入判定"""
+        if self.error_rate and self.random.random() < self.error_rate:
+            with self.lock:
+                self.stats['errors_injected'] += 1
+            return True
+        return False
+
+    def create_file(self, metadata: Dict[str, Any], content: Optional[bytes]) -> Dict[str, Any]:
+        """ファイル作成"""
+        file_id = uuid.uuid4().hex
+        content = content or b''
+        entry = {
+            'id': file_id,
+            'name': metadata.get('name', 'Untitled'),
+            'mimeType': metadata.get('mimeType', 'application/octet-stream'),
+            'parents': metadata.get('parents', []),
+            'size': str(len(content)),
+            'md5Checksum': hashlib.md5(content).hexdigest(),
+            'createdTime': datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
+            'webViewLink': f'https://drive.example.invalid/file/d/{file_id}/view',
+            'trashed': False
+        }
+        if entry['mimeType'] == 'application/vnd.google-apps.folder':
+            entry.pop('size')
+            entry.pop('md5Checksum')
+        with self.lock:
+            self.files[file_id] = entry
+            if self.keep_content:
+                self.contents[file_id] = content
+            if content:
+                self.stats['uploads_completed'] += 1
+        return entry
+
+    def query(self, q: Optional[str]) -> List[Dict[str, Any]]:
+        """簡易クエリ評価（name= / mimeType= / 'id' in parents / trashed=false の論理積のみ）"""
+        with self.lock:
+            files = list(self.files.values())
+
+        if not q:
+            return [f for f in files if not f['trashed']]
+
+        for clause in re.split(r'\s+and\s+', q):
+            clause = clause.strip()
+            match = re.match(r"'([^']*)' in parents", clause)
+            if match:
+                parent = match.group(1)
+                files = [f for f in files if parent in f['parents']]
+                continue
+            match = re.match(r"(name|mimeType)\s*=\s*'((?:[^'\\]|\\.)*)'", clause)
+            if match:
+                key, value = match.group(1), match.group(2).replace("\\'", "'").replace('\\\\', '\\')
+                files = [f for f in files if f.get(key) == value]
+                continue
+            match = re.match(r'trashed\s*=\s*(true|false)', clause)
+            if match:
+                trashed = match.group(1) == 'true'
+                files = [f for f in files if f['trashed'] == trashed]
+        return files
+
+class FakeDriveHandler(BaseHTTPRequestHandler):
+    """疑似Drive APIハンドラー"""
+
+    protocol_version = 'HTTP/1.1'
+    state: FakeDriveState = None  # サーバー生成時に設定
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """アクセスログを抑制"""
+        pass
+
+    # ---------- 共通処理 ----------
+
+    def _read_body(self) -> bytes:
+        """リクエストボディ受信（帯域制限をシミュレート）"""
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        if self.state.bandwidth and body:
+            time.sleep(len(body) / self.state.bandwidth)
+        return body
+
+    def _send_json(self, status: int, data: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        """JSONレスポンス送信"""
+        payload = json.dumps(data).encode('utf-8') if data is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_error(self, status: int, message: str) -> None:
+        """Drive形式のエラーレスポンス"""
+        self._send_json(status, {'error': {'code': status, 'message': message,
+                                           'errors': [{'message': message, 'reason': 'fake'}]}})
+
+    def _prepare(self, endpoint: str) -> Tuple[Dict[str, List[str]], bytes]:
+        """遅延注入・ボディ受信・計数"""
+        if self.state.latency:
+            time.sleep(self.state.latency)
+        body = self._read_body()
+        self.state.count(endpoint, len(body))
+        return parse_qs(urlparse(self.path).query), body
+
+    def _public(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """レスポンス用ファイル情報"""
+        return {k: v for k, v in entry.items() if k != 'trashed'}
+
+    # ---------- HTTPメソッド ----------
+
+    def do_GET(self) -> None:
+        path = urlparse(self.path).path
+        label = '/drive/v3/files/<id>' if path.startswith('/drive/v3/files/') else path
+        params, _ = self._prepare(f'GET {label}')
+
+        if path == '/drive/v3/about':
+            with self.state.lock:
+                usage = sum(int(f.get('size', 0)) for f in self.state.files.values())
+            self._send_json(200, {
+                'user': {'emailAddress': 'fake-drive@example.invalid', 'displayName': 'Fake Drive'},
+                'storageQuota': {'usage': str(usage), 'limit': str(15 * 1024 ** 3)}
+            })
+            return
+
+        if path == '/drive/v3/files':
+            files = self.state.query(params.get('q', [None])[0])
+            files.sort(key=lambda f: f['createdTime'], reverse='desc' in params.get('orderBy', [''])[0])
+            page_size = int(params.get('pageSize', ['100'])[0])
+            offset = int(params.get('pageToken', ['0'])[0])
+            page = files[offset:offset + page_size]
+            result = {'files': [self._public(f) for f in page]}
+            if offset + page_size < len(files):
+                result['nextPageToken'] = str(offset + page_size)
+            self._send_json(200, result)
+            return
+
+        match = re.match(r'^/drive/v3/files/([^/]+)$', path)
+        if match:
+            file_id = match.group(1)
+            with self.state.lock:
+                entry = self.state.files.get(file_id)
+                content = self.state.contents.get(file_id, b'')
+            if not entry:
+                self._send_error(404, f'File not found: {file_id}.')
+                return
+            if params.get('alt', [''])[0] != 'media':
+                self._send_json(200, self._public(entry))
+                return
+            self._send_media(content)
+            return
+
+        self._send_error(404, f'Unknown endpoint: {path}')
+
+    def _send_media(self, content: bytes) -> None:
+        """ファイル内容送信（Rangeヘッダー対応）"""
+        status = 200
+        range_header = self.headers.get('Range')
+        if range_header:
+            match = re.match(r'bytes=(\d+)-(\d*)', range_header)
+            if match:
+                start = int(match.group(1))
+                end = int(match.group(2)) if match.group(2) else len(content) - 1
+                content = content[start:end + 1]
+                status = 206
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_DELETE(self) -> None:
+        path = urlparse(self.path).path
+        self._prepare('DELETE /drive/v3/files')
+        match = re.match(r'^/drive/v3/files/([^/]+)$', path)
+        if not match:
+            self._send_error(404, f'Unknown endpoint: {path}')
+            return
+        with self.state.lock:
+            removed = self.state.files.pop(match.group(1), None)
+            self.state.contents.pop(match.group(1), None)
+        if not removed:
+            self._send_error(404, f'File not found: {match.group(1)}.')
+            return
+        self.send_response(204)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_POST(self) -> None:
+        path = urlparse(self.path).path
+        upload_type = parse_qs(urlparse(self.path).query).get('uploadType', [''])[0]
+        params, body = self._prepare(f'POST {path} {upload_type}'.strip())
+
+        if path == '/drive/v3/files':
+            metadata = json.loads(body or b'{}')
+            if self._check_parents(metadata):
+                self._send_json(200, self._public(self.state.create_file(metadata, None)))
+            return
+
+        if path != '/upload/drive/v3/files':
+            self._send_error(404, f'Unknown endpoint: {path}')
+            return
+
+        if self.state.should_fail():
+            self._send_error(503, 'Injected backend error')
+            return
+
+        if upload_type == 'media':
+            entry = self.state.create_file({}, body)
+            self._send_json(200, self._public(entry))
+        elif upload_type == 'multipart':
+            metadata, content = self._parse_multipart(body)
+            if self._check_parents(metadata):
+                self._send_json(200, self._public(self.state.create_file(metadata, content)))
+        elif upload_type == 'resumable':
+            metadata = json.loads(body or b'{}')
+            if not self._check_parents(metadata):
+                return
+            upload_id = uuid.uuid4().hex
+            with self.state.lock:
+                self.state.sessions[upload_id] = {'metadata': metadata, 'data': bytearray()}
+            host = self.headers.get('Host', f'{self.server.server_address[0]}:{self.server.server_address[1]}')
+            location = f'http://{host}/upload/drive/v3/files?uploadType=resumable&upload_id={upload_id}'
+            self._send_json(200, None, {'Location': location})
+        else:
+            self._send_error(400, f'Unsupported uploadType: {upload_type}')
+
+    def do_PUT(self) -> None:
+        params, body = self._prepare('PUT /upload/drive/v3/files resumable')
+        upload_id = params.get('upload_id', [''])[0]
+        with self.state.lock:
+            session = self.state.sessions.get(upload_id)
+        if not session:
+            self._send_error(404, 'Upload session not found')
+            return
+
+        if self.state.should_fail():
+            self._send_error(503, 'Injected backend error')
+            return
+
+        # Content-Range: bytes a-b/total | bytes */total | bytes a-b/*
+        content_range = self.headers.get('Content-Range', '')
+        match = re.match(r'bytes (\d+)-(\d+)/(\d+|\*)', content_range)
+        total = None
+        if match:
+            start = int(match.group(1))
+            if start != len(session['data']):
+                # クライアントが送り直した場合は受信済み位置に合わせる
+                body = body[len(session['data']) - start:] if start < len(session['data']) else b''
+            session['data'].extend(body)
+            total = None if match.group(3) == '*' else int(match.group(3))
+        else:
+            match = re.match(r'bytes \*/(\d+|\*)', content_range)
+            if match and match.group(1) != '*':
+                total = int(match.group(1))
+            elif not content_range:
+                session['data'].extend(body)
+                total = len(session['data'])
+
+        if total is not None and len(session['data']) >= total:
+            with self.state.lock:
+                self.state.sessions.pop(upload_id, None)
+            entry = self.state.create_file(session['metadata'], bytes(session['data']))
+            self._send_json(200, self._public(entry))
+            return
+
+        headers = {}
+        if session['data']:
+            headers['Range'] = f'bytes=0-{len(session["data"]) - 1}'
+        self.send_response(308)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    # ---------- ヘルパー ----------
+
+    def _check_parents(self, metadata: Dict[str, Any]) -> bool:
+        """親フォルダの存在確認（存在しなければ404を送信してFalse）"""
+        for parent in metadata.get('parents', []):
+            with self.state.lock:
+                exists = parent in self.state.files
+            if not exists:
+                self._send_error(404, f'File not found: {parent}.')
+                return False
+        return True
+
+    def _parse_multipart(self, body: bytes) -> Tuple[Dict[str, Any], bytes]:
+        """multipart/related ボディ解析（1つ目がメタデータ、2つ目が内容）"""
+        content_type = self.headers.get('Content-Type', '')
+        message = email.parser.BytesParser().parsebytes(
+            b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n' + body
+        )
+        parts = message.get_payload()
+        metadata = json.loads(parts[0].get_payload(decode=True) or b'{}')
+        content = parts[1].get_payload(decode=True) if len(parts) > 1 else b''
+        return metadata, content
+
+class FakeDriveServer:
+    """疑似Driveサーバー（スレッド起動）"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, **options: Any):
+        self.state = FakeDriveState(**options)
+        handler = type('BoundFakeDriveHandler', (FakeDriveHandler,), {'state': self.state})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """ベースURL"""
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    @property
+    def api_endpoint(self) -> str:
+        """googleapiclient の client_options['api_endpoint'] に渡すURL"""
+        return self.url + 'drive/v3/'
+
+    def start(self) -> 'FakeDriveServer':
+        """バックグラウンドで起動"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='fake-drive', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """停止"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> 'FakeDriveServer':
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Google Drive API ローカル代替サーバー')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='リクエストごとの遅延（秒）')
+    parser.add_argument('--bandwidth-kbps', type=float, default=0, help='受信帯域上限（kbps、0で無制限）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='アップロード時の503発生確率')
+    args = parser.parse_args()
+
+    server = FakeDriveServer(
+        args.host, args.port,
+        latency=args.latency,
+        bandwidth=args.bandwidth_kbps * 1000 / 8 if args.bandwidth_kbps else None,
+        error_rate=args.error_rate
+    )
+    print(f"🧪 Fake Drive server: {server.url} (api_endpoint={server.api_endpoint})")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("停止します")
+        server.httpd.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+tailscale コマンドの代替
+Tailscale未導入の環境でTailscaleCollectorの動作確認を行うための簡易実装
+
+対応コマンド:
+  status --json             （BackendState / Self / Peer、送受信量は時刻に比例して増える）
+  ping --c N --timeout Ts <IP>
+
+ピアの構成（ピア数1以上）:
+  peer-01 は常に直接接続、peer-02 は --relay-period 秒ごとに直接接続とDERPリレー経由を繰り返し、
+  peer-03 はオフライン、以降は交互に通信中（直接）・待機中
+
+使い方（config.yaml）:
+  collectors:
+    tailscale:
+      binary: ['python3', 'tools/fake_tailscale.py', '--peers', '4', '--relay-period', '120']
+
+単体での確認:
+  python tools/fake_tailscale.py status --json
+  python tools/fake_tailscale.py ping --c 1 --timeout 5s 100.64.0.2
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+SELF_IP = '100.64.0.1'
+DERP_REGION = 'tok'
+
+def peer_ip(index: int) -> str:
+    return f'100.64.0.{index + 1}'
+
+def peer_path(index: int, relay_period: float, now: float) -> str:
+    """ピアの経路（'direct' / 'relay' / 'offline' / 'idle'）"""
+    if index == 1:
+        return 'direct'
+    if index == 2:
+        return 'relay' if int(now // relay_period) % 2 else 'direct'
+    if index == 3:
+        return 'offline'
+    return 'direct' if index % 2 == 0 else 'idle'
+
+def build_status(args: argparse.Namespace) -> Dict[str, Any]:
+    """status --json の出力"""
+    now = time.time()
+    last_seen = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    running = args.state == 'Running'
+
+    peers = {}
+    for index in range(1, args.peers + 1):
+        path = peer_path(index, args.relay_period, now) if running else 'offline'
+        online = path != 'offline'
+        active = path in ('direct', 'relay')
+        # 送受信量はピアごとに異なる一定の速度で増える（呼び出しをまたいでも単調増加）
+        rx_rate, tx_rate = 2000 * index, 500 * index
+        peers[f'nodekey:{index:064x}'] = {
+            'ID': f'n{index}',
+            'HostName': f'peer-{index:02d}',
+            'DNSName': f'peer-{index:02d}.example.ts.net.',
+            'OS': 'linux' if index % 2 else 'android',
+            'TailscaleIPs': [peer_ip(index), f'fd7a:115c:a1e0::{index + 1}'],
+            'Relay': DERP_REGION,
+            'CurAddr': f'192.0.2.{index + 1}:41641' if path == 'direct' else '',
+            'RxBytes': int(now * rx_rate) if active else 0,
+            'TxBytes': int(now * tx_rate) if active else 0,
+            'Online': online,
+            'Active': active,
+            'ExitNode': False,
+            'LastSeen': last_seen if not online else '0001-01-01T00:00:00Z',
+            'LastHandshake': last_seen if active else '0001-01-01T00:00:00Z'
+        }
+
+    return {
+        'Version': '1.64.0-fake',
+        'BackendState': args.state,
+        'TailscaleIPs': [SELF_IP, 'fd7a:115c:a1e0::1'] if running else [],
+        'Self': {
+            'ID': 'n0',
+            'HostName': 'raspberrypi',
+            'DNSName': 'raspberrypi.example.ts.net.',
+            'OS': 'linux',
+            'TailscaleIPs': [SELF_IP, 'fd7a:115c:a1e0::1'],
+            'Relay': DERP_REGION,
+            'Online': running,
+            'RxBytes': 0,
+            'TxBytes': 0
+        },
+        'Health': [] if running else ['Tailscale is stopped.'],
+        'MagicDNSSuffix': 'example.ts.net',
+        'CurrentTailnet': {'Name': 'example.github', 'MagicDNSSuffix': 'example.ts.net'},
+        'Peer': peers
+    }
+
+def ping(args: argparse.Namespace) -> int:
+    """ping の出力（直接接続できないピアはDERP経由の応答のみで終了コード1）"""
+    now = time.time()
+    index = next((i for i in range(1, args.peers + 1) if peer_ip(i) == args.target), None)
+    if index is None or args.state != 'Running':
+        print(f'ping "{args.target}" timed out')
+        return 1
+
+    name = f'peer-{index:02d}'
+    path = peer_path(index, args.relay_period, now)
+    if path == 'offline':
+        time.sleep(min(args.timeout, 0.2))
+        for _ in range(args.count):
+            print(f'ping "{args.target}" timed out')
+        return 1
+
+    for _ in range(args.count):
+        if path == 'relay':
+            latency = args.latency * 8 + random.uniform(0, args.latency)
+            print(f'pong from {name} ({args.target}) via DERP({DERP_REGION}) in {latency:.0f}ms')
+        else:
+            latency = args.latency + random.uniform(0, args.latency / 2)
+            print(f'pong from {name} ({args.target}) via 192.0.2.{index + 1}:41641 in {latency:.0f}ms')
+    if path == 'relay':
+        print('direct connection not established')
+        return 1
+    return 0
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='tailscale コマンドの代替')
+    parser.add_argument('--peers', type=int, default=4, help='ピア数')
+    parser.add_argument('--relay-period', type=float, default=120, help='peer-02 の経路が切り替わる間隔（秒）')
+    parser.add_argument('--latency', type=float, default=12, help='直接接続時の応答時間（ミリ秒）')
+    parser.add_argument('--state', default='Running', help='BackendState（Running / Stopped / NeedsLogin）')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    status = commands.add_parser('status')
+    status.add_argument('--json', action='store_true')
+
+    ping_parser = commands.add_parser('ping')
+    ping_parser.add_argument('--c', dest='count', type=int, default=10)
+    ping_parser.add_argument('--timeout', type=lambda value: float(value.rstrip('s')), default=5)
+    ping_parser.add_argument('target')
+
+    args = parser.parse_args()
+    if args.command == 'status':
+        status_data = build_status(args)
+        if args.json:
+            print(json.dumps(status_data, indent=2))
+        else:
+            for peer in [status_data['Self'], *status_data['Peer'].values()]:
+                print(f"{peer['TailscaleIPs'][0]:<16}{peer['HostName']:<16}{peer['OS']}")
+        return 0
+    return ping(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+静的ファイルの事前圧縮
+static/ 以下のCSS・JavaScriptなどから .gz（brotliがインストール済みなら .br も）を作成する。
+配信時は utils/http_cache.py がクライアントの対応方式に合わせて圧縮済みファイルを返す
+
+使い方:
+  python tools/precompress.py
+  python tools/precompress.py --clean
+"""
+
+import argparse
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+
+# 圧縮するファイルの拡張子
+EXTENSIONS = ('.css', '.js', '.html', '.svg', '.json', '.txt')
+
+def variants():
+    """作成する圧縮形式 (拡張子, 圧縮関数)"""
+    result = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        result.append(('.br', lambda data: brotli.compress(data, quality=11)))
+    return result
+
+def precompress(static_dir: str, min_size: int = 512) -> None:
+    """更新されたファイルだけ圧縮（元より小さくならない場合は作らない）"""
+    created = skipped = 0
+    for root, _, files in os.walk(static_dir):
+        for name in sorted(files):
+            if not name.endswith(EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+
+            for suffix, compress in variants():
+                target = path + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                    skipped += 1
+                    continue
+                compressed = compress(data)
+                if len(data) < min_size or len(compressed) >= len(data):
+                    # 古い圧縮ファイルが残っていると内容が食い違うため削除
+                    if os.path.exists(target):
+                        os.remove(target)
+                    continue
+                with open(target, 'wb') as f:
+                    f.write(compressed)
+                created += 1
+                print(f"{os.path.relpath(target, static_dir)}: {len(data)} -> {len(compressed)} bytes")
+
+    print(f"作成: {created}件, 最新のためスキップ: {skipped}件"
+          f"{'' if brotli is not None else '（brotli未インストールのため .br は作成しません）'}")
+
+def clean(static_dir: str) -> None:
+    """圧縮済みファイルを削除"""
+    removed = 0
+    for root, _, files in os.walk(static_dir):
+        for name in files:
+            if name.endswith(('.gz', '.br')):
+                os.remove(os.path.join(root, name))
+                removed += 1
+    print(f"削除: {removed}件")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='静的ファイルの事前圧縮')
+    parser.add_argument('--static-dir', default=STATIC_DIR, help='静的ファイルのディレクトリ')
+    parser.add_argument('--min-size', type=int, default=512, help='これより小さいファイルは圧縮しない（バイト）')
+    parser.add_argument('--clean', action='store_true', help='圧縮済みファイルを削除')
+    args = parser.parse_args()
+
+    if args.clean:
+        clean(args.static_dir)
+    else:
+        precompress(args.static_dir, args.min_size)
+
+if __name__ == '__main__':
+    main()
@@ -3,7 +3,6 @@
 """
 
 from .helpers import (
-    setup_logging,
     safe_dict_get,
     format_file_size,
     validate_duration,
@@ -12,6 +11,17 @@ from .helpers import (
     ModuleStatus,
     module_status
 )
+from .singleflight import SingleFlight, get_singleflight_stats
+from .cache import RefreshingCache
+from .startup import StartupProfiler
+from .events import EventBus
+from .server import PooledWSGIServer, serve
+from .http_cache import HttpCache
+from .metrics import Counter, Gauge, Histogram, Registry, REGISTRY, ProcessMetrics
+from .timing import RequestTimer
+from .jobs import JobManager
+from .scheduler import Scheduler
+from .log import setup_logging, stop_logging, get_logging_stats
 
 __all__ = [
     'setup_logging',
@@ -21,5 +31,24 @@ __all__ = [
     'get_timestamp',
     'ensure_directory',
     'ModuleStatus',
-    'module_status'
+    'module_status',
+    'SingleFlight',
+    'get_singleflight_stats',
+    'RefreshingCache',
+    'StartupProfiler',
+    'EventBus',
+    'PooledWSGIServer',
+    'serve',
+    'HttpCache',
+    'Counter',
+    'Gauge',
+    'Histogram',
+    'Registry',
+    'REGISTRY',
+    'ProcessMetrics',
+    'RequestTimer',
+    'JobManager',
+    'Scheduler',
+    'stop_logging',
+    'get_logging_stats'
 ]
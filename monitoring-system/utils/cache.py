@@ -0,0 +1,172 @@
+"""
+バックグラウンド更新型キャッシュ
+TTL付きスナップショットを保持し、期限切れ後も一定時間は古い値を返しつつ再取得する
+（stale-while-revalidate）。再取得は SingleFlight で1回にまとめ、同時に呼ばれても loader は1つだけ実行する。
+schedule() でスケジューラーに登録すると、裏での再取得はスケジューラーのワーカーで行う
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+class RefreshingCache:
+    """TTLキャッシュ（stale-while-revalidate・単一フライト更新）"""
+
+    def __init__(self, loader: Callable[[], Any], ttl: float = 60,
+                 max_stale: float = 600, wait_timeout: float = 10,
+                 default: Any = None, name: str = 'cache'):
+        """
+        loader: 値を取得する関数（ブロッキング可）
+        ttl: この秒数以内の値は新鮮として扱う
+        max_stale: この秒数以内なら古い値を返しつつ裏で再取得する
+        wait_timeout: 値が無い場合に取得完了を待つ最大秒数
+        default: 待機がタイムアウトした場合に返す値
+        """
+        self.loader = loader
+        self.ttl = ttl
+        self.max_stale = max(max_stale, ttl)
+        self.wait_timeout = wait_timeout
+        self.default = default
+        self.name = name
+
+        self._lock = threading.Lock()
+        self._value = None
+        self._has_value = False
+        self._updated_at = None  # time.monotonic()
+        self._flight = SingleFlight(name)
+        self._last_error = None
+        self._scheduler = None
+        self._load_task = None
+
+        self.stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'refreshes': 0,
+            'errors': 0,
+            'last_refresh_duration': None
+        }
+
+    def get(self) -> Any:
+        """キャッシュ値取得（新鮮でなければ再取得を起動）"""
+        with self._lock:
+            age = self._age_locked()
+
+            if self._has_value and age <= self.ttl:
+                self.stats['hits'] += 1
+                return self._value
+
+            stale = self._has_value and age <= self.max_stale
+            if stale:
+                self.stats['stale_hits'] += 1
+                value = self._value
+            else:
+                self.stats['misses'] += 1
+
+        if stale:
+            # 古い値をそのまま返し、裏で再取得
+            self.refresh_async()
+            return value
+
+        # 値が無い・古すぎる場合は取得完了を待つ
+        return self.refresh(timeout=self.wait_timeout)
+
+    def refresh(self, timeout: Optional[float] = None) -> Any:
+        """即時再取得（実行中の取得があればtimeout秒までその完了を待って共有）"""
+        try:
+            self._flight.do('refresh', self._run_loader, timeout=timeout)
+        except TimeoutError:
+            pass
+
+        with self._lock:
+            return self._value if self._has_value else self.default
+
+    def refresh_async(self) -> None:
+        """バックグラウンドで再取得（実行中なら何もしない、スケジューラーに登録済みならそのワーカーで実行）"""
+        scheduler = self._scheduler
+        if scheduler is not None and scheduler.running:
+            scheduler.trigger(self._load_task)
+        else:
+            self._flight.start('refresh', self._run_loader)
+
+    def age(self) -> Optional[float]:
+        """キャッシュ値の経過秒数"""
+        with self._lock:
+            if not self._has_value:
+                return None
+            return round(self._age_locked(), 2)
+
+    def is_stale(self) -> bool:
+        """TTLを過ぎているか"""
+        with self._lock:
+            return not self._has_value or self._age_locked() > self.ttl
+
+    def info(self) -> Dict[str, Any]:
+        """キャッシュ状態（値は含まない）"""
+        with self._lock:
+            return {
+                'name': self.name,
+                'ttl': self.ttl,
+                'max_stale': self.max_stale,
+                'age': round(self._age_locked(), 2) if self._has_value else None,
+                'stale': not self._has_value or self._age_locked() > self.ttl,
+                'refreshing': self._flight.in_flight('refresh'),
+                'last_error': self._last_error,
+                'stats': self.stats.copy()
+            }
+
+    def schedule(self, scheduler: Any, interval: Optional[float] = None,
+                 condition: Optional[Callable[[], bool]] = None) -> None:
+        """
+        定期更新をスケジューラー（utils.Scheduler）に登録（interval未指定時はTTL間隔）
+        期限の確認（<name>-refresh）はイベントループ上で行い、loaderは <name>-load タスクとしてワーカーで実行する
+        condition: Falseを返す間は期限切れでも定期更新しない（値が無い場合・refresh_async() は除く）
+        """
+        interval = interval or self.ttl
+
+        def refresh_if_due():
+            age = self.age()
+            if age is None or (age >= interval and (condition is None or condition())):
+                self.refresh_async()
+
+        self._load_task = f'{self.name}-load'
+        scheduler.add_trigger(self._load_task, self._load_scheduled)
+        scheduler.add_periodic(f'{self.name}-refresh', refresh_if_due, interval=min(interval, 1), blocking=False)
+        self._scheduler = scheduler
+
+    def _load_scheduled(self) -> None:
+        """スケジューラーのワーカーでの再取得（同時に呼ばれた refresh() とは1回にまとめる）"""
+        self._flight.do('refresh', self._run_loader)
+
+    def _run_loader(self) -> None:
+        """loader実行と結果反映（SingleFlight経由で同時に1つだけ実行される）"""
+        started = time.monotonic()
+        try:
+            value = self.loader()
+            error = None
+        except Exception as e:
+            logger.error("%s refresh error: %s", self.name, e)
+            value = None
+            error = str(e)
+
+        with self._lock:
+            if error is None:
+                self._value = value
+                self._has_value = True
+                self._updated_at = time.monotonic()
+            else:
+                self.stats['errors'] += 1
+            self._last_error = error
+            self.stats['refreshes'] += 1
+            self.stats['last_refresh_duration'] = round(time.monotonic() - started, 3)
+
+    def _age_locked(self) -> float:
+        """経過秒数（ロック保持中に呼ぶ）"""
+        if self._updated_at is None:
+            return float('inf')
+        return time.monotonic() - self._updated_at
@@ -0,0 +1,194 @@
+"""
+状態変更イベントバス
+各トピック（network / recording など）の最新状態を保持し、内容が変わった時だけバージョンを進めて購読者に通知する
+"""
+
+import json
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# 変更判定で無視するキー（取得時刻だけが変わった状態は変更とみなさない）
+DEFAULT_IGNORE_KEYS = ('timestamp', 'last_check')
+
+class EventBus:
+    """トピック別の最新状態と変更通知（バージョン番号付き）"""
+
+    def __init__(self, encoder: Optional[Callable[[Any], str]] = None):
+        """encoder: 状態をJSON文字列にする関数（変更時に1回だけ呼ばれ、全購読者で共有される）"""
+        self.encoder = encoder or (lambda data: json.dumps(data, ensure_ascii=False, default=str))
+        self._cond = threading.Condition()
+        self._version = 0
+        # バージョンは起動ごとに0から数え直すため、ETag・イベントIDには起動ごとのトークンを付ける
+        # （RTCのないRaspberry Piでは起動時刻が重なることがあるので乱数にする）
+        self.epoch = secrets.token_hex(4)
+        self._topics: Dict[str, Dict[str, Any]] = {}
+        self._subscribers = 0
+        self._last_read = 0.0
+        self._closed = False
+
+        self.stats = {
+            'published': 0,
+            'changes': 0,
+            'suppressed': 0,
+            'snapshots': 0,
+            'delta_snapshots': 0
+        }
+
+    @property
+    def version(self) -> int:
+        """現在のバージョン（いずれかのトピックが変わるたびに増える）"""
+        return self._version
+
+    @property
+    def closed(self) -> bool:
+        """停止済みか（購読中のストリームは終了する）"""
+        return self._closed
+
+    @property
+    def subscribers(self) -> int:
+        """接続中の購読者数"""
+        return self._subscribers
+
+    def event_id(self, version: int) -> str:
+        """バージョンを起動ごとに一意なID（<epoch>-<version>）にする"""
+        return f"{self.epoch}-{version}"
+
+    def parse_id(self, value: Optional[str]) -> int:
+        """event_id()のIDからバージョンを取り出す（別の起動のID・不正な値は0=全件）"""
+        epoch, _, version = (value or '').rpartition('-')
+        if epoch != self.epoch or not version.isdigit():
+            return 0
+        return int(version)
+
+    def publish(self, topic: str, data: Any, ignore: Iterable[str] = DEFAULT_IGNORE_KEYS) -> bool:
+        """状態を登録（前回と同じ内容なら通知しない）、変更があればTrue"""
+        return self._publish(topic, data, ignore)[0]
+
+    def publish_entry(self, topic: str, data: Any,
+                      ignore: Iterable[str] = DEFAULT_IGNORE_KEYS) -> Dict[str, Any]:
+        """状態を登録し、その内容に対応するエントリ（バージョン・更新時刻）を返す"""
+        return self._publish(topic, data, ignore)[1]
+
+    def _publish(self, topic: str, data: Any, ignore: Iterable[str]) -> Tuple[bool, Dict[str, Any]]:
+        """状態登録（変更有無とエントリを返す）"""
+        if isinstance(data, dict):
+            compared = {k: v for k, v in data.items() if k not in ignore}
+        else:
+            compared = data
+        fingerprint = json.dumps(compared, sort_keys=True, default=str)
+
+        with self._cond:
+            self.stats['published'] += 1
+            entry = self._topics.get(topic)
+            if entry and entry['fingerprint'] == fingerprint:
+                self.stats['suppressed'] += 1
+                return False, entry
+
+            self._version += 1
+            entry = {
+                'version': self._version,
+                'data': data,
+                'json': self.encoder(data),
+                'fingerprint': fingerprint,
+                'updated_at': time.time()
+            }
+            self._topics[topic] = entry
+            self.stats['changes'] += 1
+            self._cond.notify_all()
+            return True, entry
+
+    def get(self, topic: str) -> Optional[Dict[str, Any]]:
+        """トピックの最新エントリ"""
+        with self._cond:
+            return self._topics.get(topic)
+
+    def changes_since(self, since: int = 0,
+                      topics: Optional[Iterable[str]] = None) -> Tuple[int, List[Tuple[str, Dict[str, Any]]]]:
+        """since以降に変わったトピック（バージョン順）と現在のバージョン"""
+        with self._cond:
+            return self._changes_locked(since, topics)
+
+    def wait(self, since: int, topics: Optional[Iterable[str]] = None,
+             timeout: float = 15) -> Tuple[int, List[Tuple[str, Dict[str, Any]]]]:
+        """since以降の変更が届くまで待つ（タイムアウト時は空リスト）"""
+        topics = list(topics) if topics else None
+        with self._cond:
+            if since > self._version:
+                # サーバー再起動などでバージョンが巻き戻った場合は全件送り直す
+                since = 0
+            self._cond.wait_for(lambda: self._closed or self._changes_locked(since, topics)[1], timeout)
+            return self._changes_locked(since, topics)
+
+    def _changes_locked(self, since: int,
+                        topics: Optional[Iterable[str]]) -> Tuple[int, List[Tuple[str, Dict[str, Any]]]]:
+        """変更一覧（ロック取得済み前提）"""
+        names = topics if topics is not None else self._topics.keys()
+        changed = [
+            (name, self._topics[name]) for name in names
+            if name in self._topics and self._topics[name]['version'] > since
+        ]
+        changed.sort(key=lambda item: item[1]['version'])
+        return self._version, changed
+
+    def snapshot(self, since: int = 0,
+                 fields: Optional[Dict[str, Optional[List[str]]]] = None) -> Tuple[int, bool, Dict[str, str]]:
+        """
+        全トピックの一貫したスナップショット（現在のバージョン, 全件か, トピック -> JSON文字列）
+        since: このバージョン以降に変わったトピックだけを返す（0または未来のバージョンなら全件）
+        fields: トピック -> 返すキー（Noneならトピック全体）。省略時は全トピック
+        """
+        with self._cond:
+            self._last_read = time.monotonic()
+            full = since <= 0 or since > self._version
+            version, changes = self._changes_locked(0 if full else since, list(fields) if fields else None)
+            self.stats['snapshots' if full else 'delta_snapshots'] += 1
+
+        parts = {}
+        for topic, entry in changes:
+            keys = fields.get(topic) if fields else None
+            if keys is None:
+                # トピック全体は変更時に作成済みのJSONをそのまま使う
+                parts[topic] = entry['json']
+            else:
+                data = entry['data']
+                parts[topic] = self.encoder({k: data[k] for k in keys if k in data})
+        return version, full, parts
+
+    def is_active(self, idle: float = 60) -> bool:
+        """購読者がいる、またはidle秒以内にスナップショットが読まれたか"""
+        return self._subscribers > 0 or time.monotonic() - self._last_read < idle
+
+    def close(self) -> None:
+        """停止（待機中の購読者をすぐに戻す）"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @contextmanager
+    def subscription(self) -> Iterator[None]:
+        """購読者数の管理（SSE接続中はwith内にいる）"""
+        with self._cond:
+            self._subscribers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._subscribers -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """イベントバス状態"""
+        with self._cond:
+            return {
+                'epoch': self.epoch,
+                'version': self._version,
+                'subscribers': self._subscribers,
+                'active': self.is_active(),
+                'topics': {
+                    name: {'version': entry['version'], 'updated_at': entry['updated_at']}
+                    for name, entry in self._topics.items()
+                },
+                **self.stats
+            }
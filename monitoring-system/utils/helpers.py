@@ -8,32 +8,6 @@ import os
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-def setup_logging(log_level: str = 'INFO', log_file: Optional[str] = None) -> None:
-    """ログ設定初期化"""
-    level = getattr(logging, log_level.upper(), logging.INFO)
-    
-    # フォーマッター設定
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    
-    # ハンドラー設定
-    handlers = [logging.StreamHandler()]
-    
-    if log_file:
-        os.makedirs(os.path.dirname(log_file), exist_ok=True)
-        handlers.append(logging.FileHandler(log_file))
-    
-    # ログ設定適用
-    for handler in handlers:
-        handler.setFormatter(formatter)
-    
-    logging.basicConfig(
-        level=level,
-        handlers=handlers,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-
 def safe_dict_get(data: Dict[str, Any], key: str, default: Any = None) -> Any:
     """安全な辞書値取得（ドット記法対応）"""
     try:
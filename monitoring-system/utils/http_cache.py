@@ -0,0 +1,240 @@
+"""
+HTTP応答の圧縮・キャッシュ制御
+JSON・HTMLをgzip（brotliがあればbrotli）で圧縮し、ETagによる条件付きGET（304）に対応する。
+静的ファイルは内容のハッシュ付きURLで長期キャッシュさせ、事前圧縮版（.br / .gz）があればそれを、
+無ければその場で圧縮した結果（更新時刻が変わるまでメモリに保持）を返す
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from flask import Flask, Response, request, send_from_directory
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 圧縮対象のMIMEタイプ
+COMPRESSIBLE_TYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/javascript',
+    'application/javascript', 'application/json', 'image/svg+xml'
+}
+
+# 事前圧縮ファイルの拡張子（優先順）
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+def accepted_encodings() -> set:
+    """クライアントが受け付ける圧縮方式"""
+    header = request.headers.get('Accept-Encoding', '')
+    encodings = set()
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0'):
+            continue
+        encodings.add(name.strip().lower())
+    return encodings
+
+def compress(data: bytes, encoding: str, level: int = 6, brotli_quality: int = 5) -> bytes:
+    """指定方式で圧縮"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+class HttpCache:
+    """Flaskアプリへの圧縮・ETag・静的ファイルキャッシュの組み込み"""
+
+    def __init__(self, app: Flask, config: Optional[Dict[str, Any]] = None):
+        """
+        config: {'compression': True, 'compress_min_size': 512, 'compress_level': 6,
+                 'brotli_quality': 5, 'static_max_age': 31536000}
+        """
+        config = config or {}
+        self.app = app
+        self.enabled = config.get('compression', True)
+        self.min_size = config.get('compress_min_size', 512)
+        self.level = config.get('compress_level', 6)
+        self.brotli_quality = config.get('brotli_quality', 5)
+        self.static_max_age = config.get('static_max_age', 31536000)
+        self._static_versions: Dict[str, str] = {}
+        # (ファイル名, 圧縮方式) -> ((更新時刻, サイズ), 圧縮結果, 元の内容のハッシュ)
+        self._static_compressed: Dict[Tuple[str, str], Tuple[Tuple[float, int], bytes, str]] = {}
+        self._static_lock = threading.Lock()
+
+        self.stats = {
+            'compressed': 0,
+            'bytes_in': 0,
+            'bytes_out': 0,
+            'not_modified': 0,
+            'precompressed': 0,
+            'static_compressed': 0,
+            'static_cache_hits': 0
+        }
+
+        app.add_template_global(self.static_url, 'static_url')
+        app.view_functions['static'] = self.send_static
+        app.after_request(self.process_response)
+
+    # ---------- 静的ファイル ----------
+
+    def static_url(self, filename: str) -> str:
+        """内容のハッシュ付きURL（内容が変わるとURLも変わるため長期キャッシュできる）"""
+        version = self._static_versions.get(filename)
+        if version is None:
+            path = os.path.join(self.app.static_folder, filename)
+            try:
+                with open(path, 'rb') as f:
+                    version = hashlib.md5(f.read()).hexdigest()[:10]
+            except OSError:
+                version = ''
+            # 本番では起動後に静的ファイルが変わらないため一度だけ計算する
+            if not self.app.debug:
+                self._static_versions[filename] = version
+        return f"{self.app.static_url_path}/{filename}?v={version}" if version else \
+            f"{self.app.static_url_path}/{filename}"
+
+    def send_static(self, filename: str) -> Response:
+        """静的ファイル配信（事前圧縮版があれば優先、無ければその場で圧縮）"""
+        encodings = accepted_encodings() if self.enabled else set()
+        for encoding, suffix in PRECOMPRESSED:
+            if encoding not in encodings:
+                continue
+            path = safe_join(self.app.static_folder, filename + suffix)
+            original = safe_join(self.app.static_folder, filename)
+            # 元ファイルより古い圧縮ファイル（更新後に再作成していない）は使わない
+            if not (path and original and os.path.isfile(path) and os.path.isfile(original)):
+                continue
+            if os.path.getmtime(path) >= os.path.getmtime(original):
+                # 事前圧縮ファイルは元ファイルのMIMEタイプで返す
+                response = send_from_directory(
+                    self.app.static_folder, filename + suffix,
+                    mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+                )
+                response.headers['Content-Encoding'] = encoding
+                response.vary.add('Accept-Encoding')
+                self.stats['precompressed'] += 1
+                break
+        else:
+            # send_from_directory の応答はファイルをそのまま送るため process_response では圧縮されない
+            response = self._send_compressed_static(filename, encodings) or \
+                send_from_directory(self.app.static_folder, filename)
+
+        if request.args.get('v'):
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = self.static_max_age
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        return response
+
+    def _send_compressed_static(self, filename: str, encodings: set) -> Optional[Response]:
+        """事前圧縮版の無い静的ファイルを圧縮して返す（圧縮対象外・小さいファイルはNone）"""
+        mimetype = mimetypes.guess_type(filename)[0]
+        if mimetype not in COMPRESSIBLE_TYPES:
+            return None
+        if brotli is not None and 'br' in encodings:
+            encoding = 'br'
+        elif 'gzip' in encodings:
+            encoding = 'gzip'
+        else:
+            return None
+
+        path = safe_join(self.app.static_folder, filename)
+        if not path or not os.path.isfile(path):
+            return None
+        stat = os.stat(path)
+        if stat.st_size < self.min_size:
+            return None
+
+        key = (filename, encoding)
+        signature = (stat.st_mtime, stat.st_size)
+        with self._static_lock:
+            cached = self._static_compressed.get(key)
+        if cached is not None and cached[0] == signature:
+            self.stats['static_cache_hits'] += 1
+        else:
+            with open(path, 'rb') as f:
+                data = f.read()
+            compressed = compress(data, encoding, self.level, self.brotli_quality)
+            cached = (signature, compressed, hashlib.md5(data).hexdigest())
+            with self._static_lock:
+                self._static_compressed[key] = cached
+            self.stats['static_compressed'] += 1
+            self.stats['bytes_in'] += len(data)
+            self.stats['bytes_out'] += len(compressed)
+
+        response = Response(cached[1], mimetype=mimetype)
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        # 圧縮方式が違っても同じ内容なので元の内容から作る弱いETag（process_response が304を判定する）
+        response.set_etag(cached[2], weak=True)
+        response.last_modified = stat.st_mtime
+        return response
+
+    # ---------- 応答の後処理 ----------
+
+    def process_response(self, response: Response) -> Response:
+        """ETag付与・304応答・圧縮"""
+        if request.method not in ('GET', 'HEAD') or response.status_code != 200:
+            return response
+        # ストリーミング（イベント配信）・ファイル送信はそのまま返す
+        if response.is_streamed or response.direct_passthrough:
+            return response
+        if response.mimetype not in COMPRESSIBLE_TYPES:
+            return response
+
+        if 'ETag' not in response.headers:
+            # 圧縮前の内容から作る（圧縮方式が違っても同じ内容なので弱いETag）
+            response.set_etag(hashlib.md5(response.get_data()).hexdigest(), weak=True)
+            if not response.cache_control.max_age:
+                response.cache_control.no_cache = True
+
+        response.make_conditional(request)
+        if response.status_code == 304:
+            self.stats['not_modified'] += 1
+            return response
+
+        return self._compress(response)
+
+    def _compress(self, response: Response) -> Response:
+        """クライアントが対応していれば圧縮"""
+        response.vary.add('Accept-Encoding')
+        if not self.enabled or 'Content-Encoding' in response.headers:
+            return response
+
+        encodings = accepted_encodings()
+        if brotli is not None and 'br' in encodings:
+            encoding = 'br'
+        elif 'gzip' in encodings:
+            encoding = 'gzip'
+        else:
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        compressed = compress(data, encoding, self.level, self.brotli_quality)
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+
+        self.stats['compressed'] += 1
+        self.stats['bytes_in'] += len(data)
+        self.stats['bytes_out'] += len(compressed)
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        """圧縮・条件付きGETの統計"""
+        ratio = self.stats['bytes_out'] / self.stats['bytes_in'] if self.stats['bytes_in'] else None
+        return {
+            'compression': self.enabled,
+            'brotli': brotli is not None,
+            'compression_ratio': round(ratio, 3) if ratio is not None else None,
+            **self.stats
+        }
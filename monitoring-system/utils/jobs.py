@@ -0,0 +1,192 @@
+"""
+バックグラウンドジョブ管理
+速度テストなど時間のかかる処理をリクエストの処理スレッドから切り離し、スレッド数を固定したワーカーで実行する。
+同じ種類・同じ対象のジョブが実行中なら新しく作らずにそのジョブを返し、完了したジョブは一定時間保持する
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 実行が終わった状態
+FINISHED_STATES = ('completed', 'error')
+
+class _Job:
+    """1件のジョブ"""
+
+    def __init__(self, kind: str, key: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.key = key
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.started_at = None
+        self.finished_at = None
+        self.duration = None
+        self.finished_monotonic = None
+        self.done = threading.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'key': self.key,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'duration': self.duration
+        }
+
+class JobManager:
+    """固定数のワーカーでジョブを実行し、結果を保持する"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 on_update: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        config: {'max_workers': 2, 'max_pending': 8, 'retention': 600, 'max_finished': 50}
+        max_pending: 実行待ち・実行中のジョブの上限（超えた分は受け付けない）
+        retention / max_finished: 完了したジョブを保持する秒数・件数
+        on_update: ジョブの状態が変わるたびに呼ばれる（イベント配信用）
+        """
+        config = config or {}
+        self.max_workers = config.get('max_workers', 2)
+        self.max_pending = config.get('max_pending', 8)
+        self.retention = config.get('retention', 600)
+        self.max_finished = config.get('max_finished', 50)
+        self.on_update = on_update
+
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job-worker')
+        self._jobs: 'OrderedDict[str, _Job]' = OrderedDict()
+        self._active: Dict[Tuple[str, str], _Job] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.stats = {
+            'submitted': 0,
+            'joined': 0,
+            'rejected': 0,
+            'completed': 0,
+            'errors': 0
+        }
+
+    def submit(self, kind: str, func: Callable[..., Any], *args: Any,
+               key: str = '') -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        ジョブ開始、(ジョブ, 新規作成したか) を返す
+        同じ kind・key のジョブが実行待ち・実行中ならそのジョブを返し、上限を超える場合は (None, False)
+        """
+        with self._lock:
+            self._prune()
+            job = self._active.get((kind, key))
+            if job is not None:
+                self.stats['joined'] += 1
+                return job.to_dict(), False
+            if self._closed or len(self._active) >= self.max_pending:
+                self.stats['rejected'] += 1
+                return None, False
+
+            job = _Job(kind, key)
+            self._jobs[job.id] = job
+            self._active[(kind, key)] = job
+            self.stats['submitted'] += 1
+            snapshot = job.to_dict()
+
+        self._notify(job)
+        self._executor.submit(self._run, job, func, args)
+        return snapshot, True
+
+    def _run(self, job: _Job, func: Callable[..., Any], args: Tuple[Any, ...]) -> None:
+        """ワーカースレッドでの実行"""
+        started = time.monotonic()
+        job.status = 'running'
+        job.started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._notify(job)
+
+        try:
+            job.result = func(*args)
+            job.status = 'completed'
+        except Exception as e:
+            logger.error("Job error (%s): %s", job.kind, e)
+            job.error = str(e)
+            job.status = 'error'
+
+        job.finished_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        job.duration = round(time.monotonic() - started, 3)
+        job.finished_monotonic = time.monotonic()
+        with self._lock:
+            self._active.pop((job.kind, job.key), None)
+            self.stats['completed' if job.status == 'completed' else 'errors'] += 1
+        job.done.set()
+        self._notify(job)
+
+    def _notify(self, job: _Job) -> None:
+        if self.on_update:
+            try:
+                self.on_update(job.to_dict())
+            except Exception as e:
+                logger.error("Job update callback error: %s", e)
+
+    def _prune(self) -> None:
+        """保持期間・件数を超えた完了済みジョブを削除（ロック取得中に呼ぶ）"""
+        now = time.monotonic()
+        finished = [job for job in self._jobs.values() if job.finished_monotonic is not None]
+        excess = len(finished) - self.max_finished
+        for job in finished:
+            if excess > 0 or now - job.finished_monotonic > self.retention:
+                del self._jobs[job.id]
+                excess -= 1
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """ジョブの状態（無い・保持期間切れならNone）"""
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """ジョブの完了を待って状態を返す（タイムアウト時は実行中の状態）"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        job.done.wait(timeout)
+        return job.to_dict()
+
+    def list(self, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """保持しているジョブ（新しい順）"""
+        with self._lock:
+            self._prune()
+            jobs = [job for job in self._jobs.values() if kind is None or job.kind == kind]
+        return [job.to_dict() for job in reversed(jobs)]
+
+    def shutdown(self) -> None:
+        """新規受付を止め、実行待ちのジョブを取り消す（実行中のジョブは完了まで続く）"""
+        with self._lock:
+            self._closed = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """実行状況"""
+        with self._lock:
+            active = list(self._active.values())
+            retained = len(self._jobs)
+        return {
+            'max_workers': self.max_workers,
+            'max_pending': self.max_pending,
+            'running': sum(1 for job in active if job.status == 'running'),
+            'queued': sum(1 for job in active if job.status == 'queued'),
+            'retained': retained,
+            **self.stats
+        }
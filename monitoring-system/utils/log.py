@@ -0,0 +1,187 @@
+"""
+ログ出力の設定
+各スレッドはキューに積むだけにして、書き込み（標準出力・journald・ファイル）は専用スレッドで行う。
+モジュールごとのレベル、同じメッセージの連続出力の抑制、JSON Lines形式での出力に対応する
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from .metrics import Counter
+
+LOG_MESSAGES = Counter('monitoring_log_messages_total', 'ログ出力数（レベル別）', ['level'])
+LOG_DROPPED = Counter('monitoring_log_dropped_total', 'キューが満杯で破棄したログ数')
+LOG_SUPPRESSED = Counter('monitoring_log_suppressed_total', '連続出力の抑制で省略したログ数')
+
+TEXT_FORMAT = '%(asctime)s %(levelname)-7s %(name)s: %(message)s'
+
+# LogRecordの標準属性（JSON出力でextraとして扱わないもの）
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+class JsonFormatter(logging.Formatter):
+    """1行1件のJSON（extraで渡した項目もそのまま出力する）"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3],
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class RateLimitFilter(logging.Filter):
+    """同じ書式のメッセージはinterval秒あたりburst件まで出力し、省略した件数は次の出力に添える"""
+
+    def __init__(self, interval: float = 60, burst: int = 5, max_keys: int = 1024):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self.max_keys = max_keys
+        self._windows: Dict[Tuple[str, int, str], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # 引数を埋め込む前の書式で判定する（"Ping failed: %s" は宛先が違っても同じメッセージ）
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                if len(self._windows) >= self.max_keys:
+                    self._windows.clear()
+                window = self._windows[key] = [now, 0, 0]
+            elif now - window[0] >= self.interval:
+                window[0] = now
+                window[1] = 0
+            window[1] += 1
+            if window[1] > self.burst:
+                window[2] += 1
+                LOG_SUPPRESSED.inc()
+                return False
+            suppressed, window[2] = window[2], 0
+
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """キューが満杯なら待たずに破棄する"""
+
+    _exc_formatter = logging.Formatter()
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_DROPPED.inc()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """引数の埋め込みと例外の整形だけ呼び出し元で行い、書式の適用は書き込みスレッドに任せる"""
+        LOG_MESSAGES.labels(record.levelname).inc()
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # トレースバックはフレームを参照しているため、キューに積む前に文字列にする
+            record.exc_text = self._exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            record.msg = f"{record.msg} (同じメッセージを{suppressed}件省略)"
+        return record
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[_NonBlockingQueueHandler] = None
+_atexit_registered = False
+
+def setup_logging(config: Optional[Dict[str, Any]] = None) -> None:
+    """
+    ログ設定初期化（再実行すると設定を置き換える）
+    config: {'level': 'INFO', 'format': 'text', 'file': None, 'max_bytes': 5242880, 'backup_count': 3,
+             'levels': {'werkzeug': 'WARNING'}, 'queue_size': 10000,
+             'rate_limit': {'interval': 60, 'burst': 5}}
+    format: 'text' または 'json'（JSON Lines）
+    levels: ロガー名（モジュール名の接頭辞）ごとのレベル
+    """
+    global _listener, _queue_handler, _atexit_registered
+    config = config or {}
+    stop_logging()
+
+    formatter = JsonFormatter() if config.get('format', 'text') == 'json' else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler(sys.stdout)]
+    log_file = config.get('file')
+    if log_file:
+        os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+        handlers.append(logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=config.get('max_bytes', 5 * 1024 * 1024),
+            backupCount=config.get('backup_count', 3), encoding='utf-8'
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=config.get('queue_size', 10000))
+    _queue_handler = _NonBlockingQueueHandler(log_queue)
+    rate_limit = config.get('rate_limit', {})
+    if rate_limit.get('enabled', True):
+        _queue_handler.addFilter(RateLimitFilter(rate_limit.get('interval', 60), rate_limit.get('burst', 5)))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(getattr(logging, str(config.get('level', 'INFO')).upper(), logging.INFO))
+
+    for name, level in config.get('levels', {'werkzeug': 'WARNING'}).items():
+        logging.getLogger(name).setLevel(getattr(logging, str(level).upper(), logging.INFO))
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    if not _atexit_registered:
+        # 再設定のたびに登録すると終了時に同じ処理が重なるため1回だけ
+        atexit.register(stop_logging)
+        _atexit_registered = True
+
+def stop_logging() -> None:
+    """書き込みスレッドを止める（キューに残ったログは書き出してから終了する）"""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        try:
+            _listener.stop()
+        except queue.Full:
+            # 終了の合図を積めない場合は残りを書き出さずに終える（デーモンスレッドのため終了を妨げない）
+            pass
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+def get_logging_stats() -> Dict[str, Any]:
+    """出力数・破棄数・抑制数"""
+    return {
+        'running': _listener is not None,
+        'queued': _queue_handler.queue.qsize() if _queue_handler is not None else 0,
+        'messages': {key[0]: int(value) for key, value in LOG_MESSAGES.series().items()},
+        'dropped': int(LOG_DROPPED.series()[()]),
+        'suppressed': int(LOG_SUPPRESSED.series()[()])
+    }
@@ -0,0 +1,336 @@
+"""
+Prometheus形式のメトリクス
+各モジュールが計測時にカウンター・ゲージ・ヒストグラムへ値を積み上げ、
+/metrics では集計済みの値をテキスト形式に並べるだけにする（取得時に外部コマンド等は実行しない）
+"""
+
+import bisect
+import logging
+import math
+import os
+import resource
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# Prometheusテキスト形式のContent-Type
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# ヒストグラムの既定バケット（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# psutilが無い場合のプロセス開始時刻の代用
+_MODULE_LOADED = time.monotonic()
+
+def format_value(value: float) -> str:
+    """数値のテキスト表現"""
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    """ラベル値のエスケープ"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _label_text(names: Sequence[str], values: Sequence[str]) -> str:
+    """{name="value",...} 形式（ラベル無しは空文字）"""
+    if not names:
+        return ''
+    return '{' + ','.join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + '}'
+
+class _Value:
+    """カウンター・ゲージの値"""
+
+    __slots__ = ('_lock', 'value', 'function')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+        self.function = None
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+    def get(self) -> float:
+        if self.function is not None:
+            try:
+                return float(self.function())
+            except Exception:
+                return math.nan
+        return self.value
+
+class _HistogramValue:
+    """ヒストグラムの値（バケットごとの件数・合計・件数）"""
+
+    __slots__ = ('_lock', 'upper_bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self.upper_bounds = upper_bounds
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+class _Metric:
+    """メトリクスの共通部分（ラベルの組み合わせごとに値を持つ）"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional['Registry'] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_value()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _new_value(self) -> Any:
+        return _Value()
+
+    def labels(self, *values: Any) -> Any:
+        """ラベル値を指定した系列"""
+        child = self._children.get(values)
+        if child is not None:
+            return child
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name}: ラベルの数が一致しません {self.labelnames}")
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_value())
+        return child
+
+    def _unlabelled(self) -> Any:
+        if self.labelnames:
+            raise ValueError(f"{self.name}: ラベルを指定してください {self.labelnames}")
+        return self._children[()]
+
+    def clear(self) -> None:
+        """ラベル付きの系列を全て削除"""
+        if self.labelnames:
+            with self._lock:
+                self._children.clear()
+
+    def _items(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        with self._lock:
+            return list(self._children.items())
+
+    def series(self) -> Dict[Tuple[str, ...], Any]:
+        """ラベル値ごとの現在値"""
+        return {key: child.get() for key, child in self._items()}
+
+    def samples(self) -> Iterator[str]:
+        for key, child in self._items():
+            yield f"{self.name}{_label_text(self.labelnames, key)} {format_value(child.get())}"
+
+class Counter(_Metric):
+    """単調増加するカウンター"""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError('カウンターは減らせません')
+        self._unlabelled().inc(amount)
+
+class Gauge(_Metric):
+    """増減する現在値"""
+
+    kind = 'gauge'
+
+    def set(self, value: float) -> None:
+        self._unlabelled().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabelled().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._unlabelled().inc(-amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """取得時に呼ぶ関数で値を返す（集計済みの値を読むだけの軽い関数に限る）"""
+        self._unlabelled().function = function
+
+class Histogram(_Metric):
+    """値の分布（累積バケット・合計・件数）"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Optional['Registry'] = None):
+        self.upper_bounds = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+        self._bucket_labels = [format_value(b) for b in self.upper_bounds] + ['+Inf']
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_value(self) -> _HistogramValue:
+        return _HistogramValue(self.upper_bounds)
+
+    def observe(self, value: float) -> None:
+        self._unlabelled().observe(value)
+
+    def time(self, *label_values: Any) -> '_Timer':
+        """with内の処理時間（秒）を記録"""
+        return _Timer(self.labels(*label_values) if label_values else self._unlabelled())
+
+    def series(self) -> Dict[Tuple[str, ...], Tuple[List[int], float, int]]:
+        """ラベル値ごとの (バケットごとの件数（非累積、最後は+Inf）, 合計, 件数)"""
+        return {key: child.snapshot() for key, child in self._items()}
+
+    def samples(self) -> Iterator[str]:
+        labelnames = self.labelnames + ('le',)
+        for key, child in self._items():
+            counts, total, count = child.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(self._bucket_labels, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket{_label_text(labelnames, key + (bound,))} {cumulative}"
+            labels = _label_text(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+class _Timer:
+    """Histogram.time() の計測用"""
+
+    def __init__(self, child: _HistogramValue):
+        self._child = child
+        self._started = 0.0
+
+    def __enter__(self) -> '_Timer':
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._child.observe(time.perf_counter() - self._started)
+
+class Registry:
+    """メトリクスの登録先とテキスト形式への変換"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._hooks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self.stats = {
+            'scrapes': 0,
+            'last_render_seconds': None
+        }
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"メトリクス名が重複しています: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def add_hook(self, hook: Callable[[], None]) -> None:
+        """出力前に呼ぶ更新処理（プロセス情報など、出力時にしか読めない値用）"""
+        self._hooks.append(hook)
+
+    def render(self) -> str:
+        """Prometheusテキスト形式"""
+        started = time.perf_counter()
+        for hook in self._hooks:
+            try:
+                hook()
+            except Exception as e:
+                logger.error("Metrics hook error: %s", e)
+
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        text = '\n'.join(lines) + '\n'
+
+        self.stats['scrapes'] += 1
+        self.stats['last_render_seconds'] = time.perf_counter() - started
+        return text
+
+REGISTRY = Registry()
+
+class ProcessMetrics:
+    """プロセスの資源使用量（取得はinterval秒に1回まで）"""
+
+    def __init__(self, registry: Registry = REGISTRY, interval: float = 5.0):
+        self.interval = interval
+        self._updated = 0.0
+        self._process = psutil.Process() if psutil is not None else None
+        self._page_size = resource.getpagesize()
+
+        self.cpu = Gauge('process_cpu_seconds_total', 'ユーザー+システムCPU時間（秒）', registry=registry)
+        self.rss = Gauge('process_resident_memory_bytes', '常駐メモリ（バイト）', registry=registry)
+        self.vms = Gauge('process_virtual_memory_bytes', '仮想メモリ（バイト）', registry=registry)
+        self.fds = Gauge('process_open_fds', '開いているファイルディスクリプタ数', registry=registry)
+        self.threads = Gauge('process_threads', 'スレッド数', registry=registry)
+        self.start_time = Gauge('process_start_time_seconds', 'プロセス開始時刻（UNIX時間）', registry=registry)
+        self.start_time.set(self._start_time())
+
+        registry.add_hook(self.update)
+
+    def _start_time(self) -> float:
+        """プロセス開始時刻"""
+        if self._process is not None:
+            return self._process.create_time()
+        return time.time() - time.monotonic() + _MODULE_LOADED
+
+    def update(self, force: bool = False) -> None:
+        """資源使用量の更新"""
+        now = time.monotonic()
+        if not force and now - self._updated < self.interval:
+            return
+        self._updated = now
+
+        if self._process is not None:
+            with self._process.oneshot():
+                cpu = self._process.cpu_times()
+                memory = self._process.memory_info()
+                self.cpu.set(cpu.user + cpu.system)
+                self.rss.set(memory.rss)
+                self.vms.set(memory.vms)
+                self.threads.set(self._process.num_threads())
+                if hasattr(self._process, 'num_fds'):
+                    self.fds.set(self._process.num_fds())
+            return
+
+        # psutilが無い環境では resource と /proc で代用
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        self.cpu.set(usage.ru_utime + usage.ru_stime)
+        self.threads.set(threading.active_count())
+        try:
+            with open('/proc/self/statm', 'r') as f:
+                fields = f.read().split()
+            self.vms.set(int(fields[0]) * self._page_size)
+            self.rss.set(int(fields[1]) * self._page_size)
+            self.fds.set(len(os.listdir('/proc/self/fd')))
+        except (OSError, ValueError, IndexError):
+            self.rss.set(usage.ru_maxrss * 1024)
@@ -0,0 +1,341 @@
+"""
+バックグラウンド処理のスケジューラー
+1本のスレッドで動くasyncioイベントループ上で、定期実行・イベント駆動のタスクを管理する。
+ブロッキングする処理（外部コマンド・通信）はブロッキングタスクの数に合わせたスレッドプールで実行し、
+タスクごとに実行時間・予定時刻からの遅れ（ラグ）・タイムアウトを記録する
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from .metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+TASK_DURATION = Histogram(
+    'monitoring_scheduler_task_duration_seconds', 'スケジューラーのタスク実行時間（秒）', ['task'],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0)
+)
+TASK_LAG = Histogram(
+    'monitoring_scheduler_task_lag_seconds', '予定時刻から実行開始までの遅れ（秒）', ['task'],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+
+class _Task:
+    """登録されたタスク"""
+
+    def __init__(self, name: str, func: Callable[[], Any], interval: Optional[float],
+                 timeout: Optional[float], blocking: bool, initial_delay: float):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.timeout = timeout
+        self.blocking = blocking
+        self.initial_delay = initial_delay
+
+        self.handle: Optional[asyncio.Task] = None
+        self.wake: Optional[asyncio.Event] = None
+        self.triggered = False
+        self.overrun: Optional[Future] = None
+        self.running = False
+        self.next_run = None
+
+        self.stats = {
+            'runs': 0,
+            'errors': 0,
+            'timeouts': 0,
+            'skipped': 0,
+            'triggers': 0,
+            'total_duration': 0.0,
+            'last_duration': None,
+            'max_duration': 0.0,
+            'last_lag': None,
+            'max_lag': 0.0,
+            'last_run_at': None,
+            'last_error': None
+        }
+
+class Scheduler:
+    """定期実行・イベント駆動タスクを1本のスレッドで管理"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        config: {'max_workers': None, 'default_timeout': 60}
+        max_workers: ブロッキング処理を実行するスレッド数（Noneでブロッキングタスクの数、
+                     各タスクは同時に1つしか実行されないため、どのタスクも空きを待たずに実行できる）
+        default_timeout: timeout未指定のブロッキングタスクの打ち切り秒数（Noneで無制限）
+        """
+        config = config or {}
+        self.max_workers = config.get('max_workers')
+        self.default_timeout = config.get('default_timeout', 60)
+
+        self._tasks: Dict[str, _Task] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread = None
+        self._started = threading.Event()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_workers = 0
+
+    # ---------- 登録 ----------
+
+    def add_periodic(self, name: str, func: Callable[[], Any], interval: float,
+                     timeout: Optional[float] = None, blocking: bool = True, initial_delay: float = 0) -> None:
+        """
+        interval秒ごとに実行するタスクを登録
+        blocking=False のタスクはイベントループ上で直接呼ぶ（キャッシュの確認など数ミリ秒で終わる処理に限る）
+        trigger(name) で次の予定を待たずに実行できる
+        """
+        self._add(_Task(name, func, interval, self._timeout(timeout, blocking), blocking, initial_delay))
+
+    def add_trigger(self, name: str, func: Callable[[], Any],
+                    timeout: Optional[float] = None, blocking: bool = True) -> None:
+        """trigger(name) が呼ばれた時だけ実行するタスクを登録（実行前の複数回の呼び出しは1回にまとめる）"""
+        self._add(_Task(name, func, None, self._timeout(timeout, blocking), blocking, 0))
+
+    def _timeout(self, timeout: Optional[float], blocking: bool) -> Optional[float]:
+        if not blocking:
+            return None
+        return timeout if timeout is not None else self.default_timeout
+
+    def _add(self, task: _Task) -> None:
+        with self._lock:
+            if task.name in self._tasks:
+                raise ValueError(f"タスク名が重複しています: {task.name}")
+            self._tasks[task.name] = task
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._spawn, task)
+
+    def trigger(self, name: str) -> bool:
+        """タスクをすぐに実行（どのスレッドからでも呼べる）、タスクが無ければFalse"""
+        task = self._tasks.get(name)
+        if task is None:
+            return False
+        task.stats['triggers'] += 1
+        if self._loop is None or task.wake is None:
+            task.triggered = True
+        else:
+            self._loop.call_soon_threadsafe(task.wake.set)
+        return True
+
+    def cancel(self, name: str) -> bool:
+        """タスクの登録解除（実行中のブロッキング処理は完了まで続く）"""
+        with self._lock:
+            task = self._tasks.pop(name, None)
+        if task is None:
+            return False
+        if self._loop is not None and task.handle is not None:
+            self._loop.call_soon_threadsafe(task.handle.cancel)
+        return True
+
+    # ---------- 起動・停止 ----------
+
+    def start(self) -> None:
+        """スケジューラースレッド開始（起動済みなら何もしない）"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run_loop, name='scheduler', daemon=True)
+        self._thread.start()
+        self._started.wait(5)
+
+    def stop(self, timeout: float = 5) -> None:
+        """全タスクを取り消して停止（実行中のブロッキング処理は待たない）"""
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            loop.call_soon_threadsafe(self._cancel_all)
+        if self._thread:
+            self._thread.join(timeout)
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _worker_count(self) -> int:
+        """ワーカースレッド数（self._lock を取得して呼ぶ）"""
+        if self.max_workers:
+            return self.max_workers
+        return max(sum(1 for task in self._tasks.values() if task.blocking), 1)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """スレッドプール（ブロッキングタスクが増えていれば作り直す、実行中の処理は元のプールで最後まで続く）"""
+        with self._lock:
+            workers = self._worker_count()
+            if self._executor is None or self._executor_workers < workers:
+                previous = self._executor
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scheduler-worker')
+                self._executor_workers = workers
+                if previous is not None:
+                    previous.shutdown(wait=False)
+            return self._executor
+
+    def _run_loop(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        with self._lock:
+            tasks = list(self._tasks.values())
+        for task in tasks:
+            self._spawn(task)
+        loop.call_soon(self._started.set)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+            self._loop = None
+
+    def _spawn(self, task: _Task) -> None:
+        """タスクのコルーチン開始（イベントループ上で呼ぶ）"""
+        if task.handle is None and self._tasks.get(task.name) is task:
+            task.handle = self._loop.create_task(self._task_main(task), name=task.name)
+
+    def _cancel_all(self) -> None:
+        """全タスクを取り消し、終わったらループを止める（イベントループ上で呼ぶ）"""
+        # 登録解除済みで取り消し処理中のものも含めて全て待つ
+        handles = list(asyncio.all_tasks(self._loop))
+        for handle in handles:
+            handle.cancel()
+
+        async def finish():
+            await asyncio.gather(*handles, return_exceptions=True)
+            self._loop.stop()
+
+        self._loop.create_task(finish())
+
+    # ---------- 実行 ----------
+
+    async def _task_main(self, task: _Task) -> None:
+        """1タスクの予定管理（定期実行は予定時刻を基準にし、処理時間の分だけ周期がずれないようにする）"""
+        loop = asyncio.get_running_loop()
+        task.wake = asyncio.Event()
+        if task.triggered:
+            task.triggered = False
+            task.wake.set()
+        deadline = loop.time() + task.initial_delay
+
+        while True:
+            if task.interval is None:
+                task.next_run = None
+                await task.wake.wait()
+                deadline = loop.time()
+            else:
+                task.next_run = deadline
+                delay = deadline - loop.time()
+                if delay > 0 and not task.wake.is_set():
+                    try:
+                        await asyncio.wait_for(task.wake.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                if task.wake.is_set():
+                    # 呼び出しによる前倒し実行は、その時刻を予定時刻とみなす
+                    deadline = min(deadline, loop.time())
+            task.wake.clear()
+
+            await self._run_once(task, loop.time() - deadline)
+
+            if task.interval is not None:
+                # 実行が周期より長引いた場合はすぐに次を実行し、丸ごと過ぎた周期の分は取り戻さない
+                deadline += task.interval
+                missed = int((loop.time() - deadline) // task.interval)
+                if missed > 0:
+                    task.stats['skipped'] += missed
+                    deadline += missed * task.interval
+
+    async def _run_once(self, task: _Task, lag: float) -> None:
+        """1回の実行と計測"""
+        if task.overrun is not None and not task.overrun.done():
+            # 前回タイムアウトした処理がまだ終わっていなければ重ねて実行しない
+            task.stats['skipped'] += 1
+            return
+        task.overrun = None
+
+        lag = max(lag, 0.0)
+        task.running = True
+        task.stats['last_run_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        started = time.perf_counter()
+        try:
+            if task.blocking:
+                future = self._get_executor().submit(task.func)
+                wrapped = asyncio.wrap_future(future)
+                done, _ = await asyncio.wait({wrapped}, timeout=task.timeout)
+                if not done:
+                    task.overrun = future
+                    task.stats['timeouts'] += 1
+                    task.stats['last_error'] = f'{task.timeout}秒でタイムアウトしました'
+                    logger.warning("Scheduled task timed out (%s): %ss", task.name, task.timeout)
+                else:
+                    wrapped.result()
+                    task.stats['last_error'] = None
+            else:
+                result = task.func()
+                if asyncio.iscoroutine(result):
+                    await result
+                task.stats['last_error'] = None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            task.stats['errors'] += 1
+            task.stats['last_error'] = str(e)
+            logger.error("Scheduled task error (%s): %s", task.name, e)
+        finally:
+            task.running = False
+            duration = time.perf_counter() - started
+            task.stats['runs'] += 1
+            task.stats['total_duration'] += duration
+            task.stats['last_duration'] = duration
+            task.stats['max_duration'] = max(task.stats['max_duration'], duration)
+            task.stats['last_lag'] = lag
+            task.stats['max_lag'] = max(task.stats['max_lag'], lag)
+            TASK_DURATION.labels(task.name).observe(duration)
+            TASK_LAG.labels(task.name).observe(lag)
+
+    # ---------- 状態 ----------
+
+    @property
+    def running(self) -> bool:
+        """スケジューラースレッドが動いているか"""
+        return bool(self._thread and self._thread.is_alive())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """タスクごとの実行回数・実行時間・ラグ（秒）"""
+        loop = self._loop
+        now = loop.time() if loop is not None else None
+        with self._lock:
+            tasks = list(self._tasks.values())
+            workers = self._worker_count()
+
+        result = {}
+        for task in tasks:
+            stats = task.stats
+            runs = stats['runs']
+            result[task.name] = {
+                'type': 'periodic' if task.interval is not None else 'trigger',
+                'interval': task.interval,
+                'timeout': task.timeout,
+                'blocking': task.blocking,
+                'running': task.running,
+                'next_run_in': round(max(task.next_run - now, 0), 3)
+                if task.next_run is not None and now is not None else None,
+                'runs': runs,
+                'errors': stats['errors'],
+                'timeouts': stats['timeouts'],
+                'skipped': stats['skipped'],
+                'triggers': stats['triggers'],
+                'avg_duration': round(stats['total_duration'] / runs, 4) if runs else None,
+                'last_duration': round(stats['last_duration'], 4) if stats['last_duration'] is not None else None,
+                'max_duration': round(stats['max_duration'], 4),
+                'last_lag': round(stats['last_lag'], 4) if stats['last_lag'] is not None else None,
+                'max_lag': round(stats['max_lag'], 4),
+                'last_run_at': stats['last_run_at'],
+                'last_error': stats['last_error']
+            }
+
+        return {
+            'running': self.running,
+            'max_workers': workers,
+            'tasks': result
+        }
@@ -0,0 +1,234 @@
+"""
+本番用WSGIサーバー
+スレッド数を固定したワーカープールでリクエストを処理し、keep-alive・タイムアウト・
+シグナル受信時の安全な停止（新規受付停止 → 停止処理 → 処理中リクエストの完了待ち）に対応する
+"""
+
+import logging
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+logger = logging.getLogger(__name__)
+
+class _EmptyInput:
+    """本体の無いリクエスト用の入力（常に空）"""
+
+    def read(self, size: int = -1) -> bytes:
+        return b''
+
+    def readline(self, size: int = -1) -> bytes:
+        return b''
+
+class _RequestHandler(WSGIRequestHandler):
+    """接続ごとのタイムアウトとkeep-aliveを制御するハンドラ"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self) -> None:
+        super().setup()
+        self._handled = 0
+        self._idle = False
+        self._reusable = False
+
+    def handle_one_request(self) -> None:
+        # 2件目以降は次のリクエストを待つ間だけkeepalive_timeoutで切断する
+        self.connection.settimeout(
+            self.server.keepalive_timeout if self._handled else self.server.request_timeout
+        )
+        self._idle = self._handled > 0
+        self._handled += 1
+        self._reusable = False
+        super().handle_one_request()
+        if self.server.draining:
+            self.close_connection = True
+
+    def parse_request(self) -> bool:
+        self._idle = False
+        if not super().parse_request():
+            return False
+        # リクエスト本体の受信・応答の送信はrequest_timeoutで打ち切る
+        self.connection.settimeout(self.server.request_timeout)
+        # 本体付きのリクエストはアプリが読み残した分で次のリクエストが壊れるため、接続を再利用しない
+        has_body = self.headers.get('Transfer-Encoding') or self.headers.get('Content-Length', '0') != '0'
+        self._reusable = (self.server.keep_alive and not self.server.draining
+                          and not self.close_connection and not has_body)
+        return True
+
+    def log_error(self, format: str, *args: Any) -> None:
+        # keep-alive接続の待ち時間切れは通常の切断なので記録しない
+        if self._idle and format.startswith('Request timed out'):
+            return
+        super().log_error(format, *args)
+
+    def run_wsgi(self) -> None:
+        if not self._reusable:
+            return super().run_wsgi()
+        # werkzeugは応答後に受信済みデータを読み捨てるため、続けて届いた次のリクエストを
+        # 読まれないよう、処理中は入力を空にしておく（本体の無いリクエストのみ）
+        rfile = self.rfile
+        self.rfile = _EmptyInput()
+        try:
+            super().run_wsgi()
+        finally:
+            self.rfile = rfile
+
+    def send_header(self, keyword: str, value: str) -> None:
+        # werkzeugは常に Connection: close を送るため、再利用できる接続ではkeep-aliveに置き換える
+        if keyword.lower() == 'connection' and value.lower() == 'close' and self._reusable:
+            value = 'keep-alive'
+        super().send_header(keyword, value)
+
+class PooledWSGIServer(BaseWSGIServer):
+    """固定スレッド数のワーカープールで処理するWSGIサーバー"""
+
+    multithread = True
+
+    def __init__(self, host: str, port: int, app: Callable, threads: int = 8, backlog: int = 32,
+                 keep_alive: bool = True, keepalive_timeout: float = 5, request_timeout: float = 30):
+        """
+        threads: 同時に処理するリクエスト数（keep-alive中の接続もワーカーを1つ使う）
+        backlog: ワーカー待ちで保持する接続数（超えた分は503で即時に返す）
+        keepalive_timeout: keep-alive接続で次のリクエストを待つ秒数
+        request_timeout: リクエスト受信・応答送信が進まない場合に切断する秒数
+        """
+        self.request_queue_size = backlog
+        self.threads = threads
+        self.keep_alive = keep_alive
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+        self.draining = False
+
+        super().__init__(host, port, app, handler=_RequestHandler)
+
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='http-worker')
+        self._slots = threading.BoundedSemaphore(threads + backlog)
+        self._idle = threading.Condition()
+        self._inflight = 0
+
+        self.stats = {
+            'connections': 0,
+            'rejected': 0
+        }
+
+    def process_request(self, request: Any, client_address: Any) -> None:
+        """接続をワーカープールへ渡す（待ち行列が一杯なら503）"""
+        if not self._slots.acquire(blocking=False):
+            self.stats['rejected'] += 1
+            self._reject(request)
+            return
+
+        with self._idle:
+            self._inflight += 1
+        self.stats['connections'] += 1
+        self._executor.submit(self._process, request, client_address)
+
+    def _process(self, request: Any, client_address: Any) -> None:
+        """ワーカースレッドでの接続処理"""
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+            with self._idle:
+                self._inflight -= 1
+                self._idle.notify_all()
+
+    def _reject(self, request: Any) -> None:
+        """過負荷時の応答"""
+        try:
+            request.sendall(
+                b'HTTP/1.1 503 Service Unavailable\r\n'
+                b'Content-Length: 0\r\nRetry-After: 1\r\nConnection: close\r\n\r\n'
+            )
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    @property
+    def inflight(self) -> int:
+        """処理中の接続数"""
+        return self._inflight
+
+    def drain(self, timeout: float) -> int:
+        """処理中の接続が終わるまで待つ（残った接続数を返す）"""
+        self.draining = True
+        with self._idle:
+            self._idle.wait_for(lambda: self._inflight == 0, timeout)
+            remaining = self._inflight
+        self._executor.shutdown(wait=False)
+        return remaining
+
+    def get_stats(self) -> Dict[str, Any]:
+        """サーバー状態"""
+        return {
+            'threads': self.threads,
+            'backlog': self.request_queue_size,
+            'inflight': self._inflight,
+            'keep_alive': self.keep_alive,
+            **self.stats
+        }
+
+def serve(app: Callable, host: str, port: int, config: Optional[Dict[str, Any]] = None,
+          on_shutdown: Iterable[Callable[[], Any]] = ()) -> PooledWSGIServer:
+    """
+    SIGTERM / SIGINT を受けるまでリクエストを処理する
+    config: settings.app（threads / backlog / keep_alive / keepalive_timeout / request_timeout / shutdown_timeout）
+    on_shutdown: 新規受付を止めた後、処理中リクエストの完了を待つ前に呼ぶ停止処理
+    """
+    config = config or {}
+    server = PooledWSGIServer(
+        host, port, app,
+        threads=config.get('threads', 8),
+        backlog=config.get('backlog', 32),
+        keep_alive=config.get('keep_alive', True),
+        keepalive_timeout=config.get('keepalive_timeout', 5),
+        request_timeout=config.get('request_timeout', 30)
+    )
+
+    stopping = threading.Event()
+
+    def handle_signal(signum, frame):
+        if stopping.is_set():
+            return
+        stopping.set()
+        # shutdown()はserve_foreverの終了を待つため、別スレッドから呼ぶ
+        # （ログのロックをシグナルハンドラー内で取らないよう、ログ出力もそのスレッドで行う）
+        threading.Thread(target=shutdown, args=(signal.Signals(signum).name,), name='http-shutdown', daemon=True).start()
+
+    def shutdown(signame: str) -> None:
+        logger.info("停止シグナルを受信しました (%s)", signame)
+        server.shutdown()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    logger.info("本番サーバー起動: http://%s:%s (スレッド数: %d, keep-alive: %s)",
+                host, port, server.threads, '有効' if server.keep_alive else '無効')
+    try:
+        server.serve_forever()
+    finally:
+        started = time.monotonic()
+        server.draining = True
+        server.server_close()
+
+        for callback in on_shutdown:
+            try:
+                callback()
+            except Exception as e:
+                logger.error("停止処理エラー: %s", e)
+
+        remaining = server.drain(config.get('shutdown_timeout', 5))
+        elapsed = round(time.monotonic() - started, 2)
+        if remaining:
+            logger.warning("%d件の接続を待たずに停止します (%s秒)", remaining, elapsed)
+        else:
+            logger.info("サーバーを停止しました (%s秒)", elapsed)
+
+    return server
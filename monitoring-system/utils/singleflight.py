@@ -0,0 +1,198 @@
+"""
+同時呼び出しの集約（single-flight）
+同じキーの処理が実行中なら新しく実行せずにその結果を待って共有し、
+必要なら完了した結果を短時間だけ再利用する（速度テストの同時実行・状態確認の重複呼び出し対策）
+"""
+
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .metrics import Counter
+
+CALLS = Counter(
+    'monitoring_singleflight_calls_total',
+    '集約対象の呼び出し数（executed: 実行、shared: 実行中の結果を共有、cached: 直近の結果を再利用）',
+    ['group', 'result']
+)
+
+# 統計表示用の登録済みグループ
+GROUPS: Dict[str, 'SingleFlight'] = {}
+_groups_lock = threading.Lock()
+
+class _Call:
+    """実行中の1回の呼び出し"""
+
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """キーごとに同時実行を1回にまとめる"""
+
+    def __init__(self, name: str, ttl: float = 0, max_cached: int = 128):
+        """
+        name: 統計・メトリクスでのグループ名
+        ttl: 完了した結果を再利用する秒数（0なら実行中の呼び出しの共有のみ、例外は再利用しない）
+        max_cached: 再利用のために保持する結果の最大件数
+        """
+        self.name = name
+        self.ttl = ttl
+        self.max_cached = max_cached
+
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._results: Dict[Hashable, Tuple[float, Any]] = {}
+
+        self.stats = {
+            'executed': 0,
+            'shared': 0,
+            'cached': 0,
+            'errors': 0,
+            'timeouts': 0
+        }
+        self._counters = {result: CALLS.labels(name, result) for result in ('executed', 'shared', 'cached')}
+
+        with _groups_lock:
+            GROUPS[name] = self
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args: Any,
+           timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """func(*args, **kwargs) を実行して結果を返す（同じキーが実行中ならその結果、例外も共有する）"""
+        return self.do_ex(key, func, *args, timeout=timeout, **kwargs)[0]
+
+    def do_ex(self, key: Hashable, func: Callable[..., Any], *args: Any,
+              timeout: Optional[float] = None, **kwargs: Any) -> Tuple[Any, bool]:
+        """
+        do() と同じだが (結果, 自分で実行しなかったか) を返す
+        timeout: 他の呼び出しの完了を待つ最大秒数（超えるとTimeoutError、自分で実行する場合は無制限）
+        """
+        with self._lock:
+            cached = self._cached_locked(key)
+            if cached is not None:
+                self.stats['cached'] += 1
+                self._counters['cached'].inc()
+                return cached[1], True
+
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats['executed'] += 1
+            else:
+                self.stats['shared'] += 1
+
+        if leader:
+            self._counters['executed'].inc()
+            self._execute(key, call, func, args, kwargs)
+        else:
+            self._counters['shared'].inc()
+            if not call.done.wait(timeout):
+                with self._lock:
+                    self.stats['timeouts'] += 1
+                raise TimeoutError(f"{self.name}: {key} の完了待ちがタイムアウトしました")
+
+        if call.error is not None:
+            raise call.error
+        return call.value, not leader
+
+    def start(self, key: Hashable, func: Callable[..., Any], *args: Any, **kwargs: Any) -> bool:
+        """バックグラウンドスレッドで実行（同じキーが実行中なら何もせずFalse）"""
+        with self._lock:
+            if key in self._calls:
+                return False
+            call = self._calls[key] = _Call()
+            self.stats['executed'] += 1
+        self._counters['executed'].inc()
+        threading.Thread(
+            target=self._execute, args=(key, call, func, args, kwargs),
+            name=f'{self.name}-flight', daemon=True
+        ).start()
+        return True
+
+    def _execute(self, key: Hashable, call: _Call, func: Callable[..., Any],
+                 args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> None:
+        """実行して結果（例外も含む）を待機中の呼び出しに渡す"""
+        try:
+            call.value = func(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+                if call.error is not None:
+                    self.stats['errors'] += 1
+                elif self.ttl > 0:
+                    if len(self._results) >= self.max_cached:
+                        self._prune_locked()
+                    self._results[key] = (time.monotonic() + self.ttl, call.value)
+            call.done.set()
+
+    def _cached_locked(self, key: Hashable) -> Optional[Tuple[float, Any]]:
+        """期限内の結果（ロック保持中に呼ぶ）"""
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._results[key]
+            return None
+        return entry
+
+    def _prune_locked(self) -> None:
+        """期限切れの結果を削除し、それでも多ければ期限の近いものから削除（ロック保持中に呼ぶ）"""
+        now = time.monotonic()
+        for key in [key for key, (expires, _) in self._results.items() if expires <= now]:
+            del self._results[key]
+        while len(self._results) >= self.max_cached:
+            del self._results[min(self._results, key=lambda k: self._results[k][0])]
+
+    def in_flight(self, key: Hashable) -> bool:
+        """実行中か"""
+        with self._lock:
+            return key in self._calls
+
+    def forget(self, key: Hashable) -> None:
+        """再利用する結果を削除（次の呼び出しは新しく実行する、実行中の呼び出しはそのまま）"""
+        with self._lock:
+            self._results.pop(key, None)
+
+    def wrap(self, key: Optional[Callable[..., Hashable]] = None) -> Callable:
+        """
+        関数をこのグループで集約するデコレーター
+        key: 引数から集約のキーを作る関数（未指定なら位置引数・キーワード引数そのもの）
+        Flaskのルートには使わず、ルートから呼ぶデータ取得関数に使う（応答オブジェクトは共有できないため）
+        """
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                call_key = key(*args, **kwargs) if key else (func.__qualname__, args, tuple(sorted(kwargs.items())))
+                return self.do(call_key, func, *args, **kwargs)
+            wrapper.flight = self
+            return wrapper
+        return decorator
+
+    def get_stats(self) -> Dict[str, Any]:
+        """呼び出し数と集約率（実行せずに済んだ割合）"""
+        with self._lock:
+            stats = self.stats.copy()
+            in_flight = len(self._calls)
+            cached = len(self._results)
+        calls = stats['executed'] + stats['shared'] + stats['cached']
+        return {
+            'ttl': self.ttl,
+            'in_flight': in_flight,
+            'cached_results': cached,
+            'calls': calls,
+            'coalesce_rate': round((stats['shared'] + stats['cached']) / calls, 3) if calls else None,
+            **stats
+        }
+
+def get_singleflight_stats() -> Dict[str, Any]:
+    """全グループの統計"""
+    with _groups_lock:
+        groups = list(GROUPS.values())
+    return {group.name: group.get_stats() for group in groups}
@@ -0,0 +1,81 @@
+"""
+起動時間計測
+起動処理をフェーズごとに区切り、所要時間とメモリ（RSS）増加量を記録する
+"""
+
+import logging
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+def current_rss_kb() -> Optional[int]:
+    """現在の常駐メモリ（KB）"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() // 1024
+    except (OSError, ValueError, IndexError):
+        # /proc が無い環境ではピーク値で代用
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+class StartupProfiler:
+    """起動フェーズごとの時間・メモリ計測"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.started_rss_kb = current_rss_kb()
+        self.started_modules = len(sys.modules)
+        self.phases: List[Dict[str, Any]] = []
+        self.ready_seconds = None
+        self.ready_rss_kb = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """with内の処理を1フェーズとして計測"""
+        started = time.perf_counter()
+        rss_before = current_rss_kb()
+        modules_before = len(sys.modules)
+        try:
+            yield
+        finally:
+            rss_after = current_rss_kb()
+            self.phases.append({
+                'name': name,
+                'seconds': round(time.perf_counter() - started, 3),
+                'rss_delta_kb': rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+                'modules_loaded': len(sys.modules) - modules_before
+            })
+
+    def mark_ready(self) -> None:
+        """起動完了を記録"""
+        self.ready_seconds = round(time.perf_counter() - self.started_at, 3)
+        self.ready_rss_kb = current_rss_kb()
+
+    def report(self) -> Dict[str, Any]:
+        """起動レポート"""
+        return {
+            'phases': list(self.phases),
+            'ready_seconds': self.ready_seconds,
+            'rss_start_kb': self.started_rss_kb,
+            'rss_ready_kb': self.ready_rss_kb,
+            'rss_current_kb': current_rss_kb(),
+            'modules_at_start': self.started_modules,
+            'modules_loaded': len(sys.modules),
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+    def log_report(self) -> None:
+        """起動レポートをログに出力（1件にまとめる）"""
+        lines = ["起動時間:"]
+        for phase in self.phases:
+            rss = f"{phase['rss_delta_kb'] / 1024:+.1f}MB" if phase['rss_delta_kb'] is not None else '-'
+            lines.append(f"  - {phase['name']:<20} {phase['seconds']:>7.3f}秒  RSS {rss}")
+        if self.ready_seconds is not None:
+            rss = f"{self.ready_rss_kb / 1024:.1f}MB" if self.ready_rss_kb else '-'
+            lines.append(f"  - 合計: {self.ready_seconds}秒 (RSS {rss})")
+        logger.info('%s', '\n'.join(lines))
@@ -0,0 +1,313 @@
+"""
+リクエスト処理時間の計測
+WSGIミドルウェアとしてルートごとの処理時間・応答サイズ・処理中の件数を集計し、
+一定時間を超えたリクエストは処理中のスタックを標本として残して低速リクエストログに記録する
+"""
+
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from flask import Flask, request
+
+from .metrics import REGISTRY, Counter, Gauge, Histogram, Registry
+
+# 処理時間のバケット（1ミリ秒から倍々に約33秒まで）
+LATENCY_BUCKETS = tuple(0.001 * 2 ** i for i in range(16))
+
+# 応答サイズのバケット（256バイトから4倍ずつ4MBまで）
+SIZE_BUCKETS = tuple(256 * 4 ** i for i in range(8))
+
+# ステータスの種類のラベル
+STATUS_CLASSES = {1: '1xx', 2: '2xx', 3: '3xx', 4: '4xx', 5: '5xx'}
+
+# ルートに一致しなかったリクエストのラベル（パスをそのまま使うと系列が無制限に増えるため）
+UNMATCHED_ROUTE = '<unmatched>'
+
+def bucket_quantile(upper_bounds: Tuple[float, ...], counts: List[int], total: int, q: float) -> Optional[float]:
+    """バケットの件数から分位点を推定（該当バケットの上限値、+Infバケットならその手前の上限値）"""
+    if not total:
+        return None
+    rank = q * total
+    cumulative = 0
+    for bound, count in zip(upper_bounds, counts):
+        cumulative += count
+        if cumulative >= rank:
+            return bound
+    return upper_bounds[-1]
+
+class _InFlight:
+    """処理中のリクエスト"""
+
+    __slots__ = ('environ', 'thread_id', 'started', 'status', 'size', 'samples', 'next_sample', 'finished')
+
+    def __init__(self, environ: Dict[str, Any], thread_id: int, next_sample: float):
+        self.environ = environ
+        self.thread_id = thread_id
+        self.started = time.perf_counter()
+        self.status = None
+        self.size = None
+        self.samples = []
+        self.next_sample = next_sample
+        self.finished = False
+
+    @property
+    def route(self) -> str:
+        return self.environ.get('timing.route', UNMATCHED_ROUTE)
+
+class _TimedBody:
+    """応答本体の送信完了（close）までを処理時間に含めるためのラッパー"""
+
+    def __init__(self, body: Iterable[bytes], record: _InFlight, finish: Callable[[_InFlight], None]):
+        self._body = body
+        self._record = record
+        self._finish = finish
+
+    def __iter__(self) -> Iterator[bytes]:
+        record = self._record
+        if record.size is not None:
+            yield from self._body
+        else:
+            # Content-Lengthの無い応答だけ送信量を数える
+            size = 0
+            for chunk in self._body:
+                size += len(chunk)
+                yield chunk
+            record.size = size
+        # closeを呼ばないサーバーでも処理中のまま残らないよう、送信し終えた時点で集計する
+        self._finish(record)
+
+    def close(self) -> None:
+        try:
+            if hasattr(self._body, 'close'):
+                self._body.close()
+        finally:
+            self._finish(self._record)
+
+class RequestTimer:
+    """ルート別の処理時間計測（Flaskアプリの wsgi_app を置き換える）"""
+
+    def __init__(self, app: Flask, config: Optional[Dict[str, Any]] = None, registry: Registry = REGISTRY):
+        """
+        config: {'slow_threshold': 1.0, 'slow_log_size': 50, 'max_samples': 5,
+                 'sample_interval': 0.2, 'stack_depth': 12, 'exclude_paths': ['/api/events']}
+        exclude_paths: 計測しないパスの接頭辞（接続し続けるイベント配信など）
+        """
+        config = config or {}
+        self.slow_threshold = config.get('slow_threshold', 1.0)
+        self.max_samples = config.get('max_samples', 5)
+        self.sample_interval = config.get('sample_interval', 0.2)
+        self.stack_depth = config.get('stack_depth', 12)
+        self.exclude_paths = tuple(config.get('exclude_paths', ['/api/events']))
+        self.slow_log: deque = deque(maxlen=config.get('slow_log_size', 50))
+
+        self.duration = Histogram(
+            'monitoring_http_request_duration_seconds', 'リクエストの処理時間（応答の送信完了まで、秒）',
+            ['route', 'method'], buckets=LATENCY_BUCKETS, registry=registry
+        )
+        self.response_size = Histogram(
+            'monitoring_http_response_size_bytes', '応答本体のサイズ（圧縮後、バイト）',
+            ['route', 'method'], buckets=SIZE_BUCKETS, registry=registry
+        )
+        self.requests = Counter(
+            'monitoring_http_requests_total', 'リクエスト数（ステータスの種類別）',
+            ['route', 'method', 'status'], registry=registry
+        )
+        self.in_flight_gauge = Gauge('monitoring_http_requests_in_flight', '処理中のリクエスト数', registry=registry)
+        self.in_flight_gauge.set_function(lambda: len(self._in_flight))
+
+        self._in_flight: Dict[int, _InFlight] = {}
+        self._max_seconds: Dict[Tuple[str, str], float] = {}
+        self._series: Dict[Tuple[str, str], Tuple[Any, Any]] = {}
+        self._lock = threading.Lock()
+        self._pending = threading.Event()
+        self._stop_event = threading.Event()
+        self._sampler = None
+
+        self.wsgi_app = app.wsgi_app
+        app.wsgi_app = self
+        app.before_request(self._mark_route)
+
+    @staticmethod
+    def _mark_route() -> None:
+        """一致したルートのパターンを記録（/api/files/<filename> などはパターン単位で集計する）"""
+        if request.url_rule is not None:
+            request.environ['timing.route'] = request.url_rule.rule
+
+    # ---------- WSGI ----------
+
+    def __call__(self, environ: Dict[str, Any], start_response: Callable) -> Iterable[bytes]:
+        if environ.get('PATH_INFO', '').startswith(self.exclude_paths):
+            return self.wsgi_app(environ, start_response)
+
+        record = _InFlight(environ, threading.get_ident(), self.slow_threshold)
+
+        def timed_start_response(status: str, headers: List[Tuple[str, str]], exc_info: Any = None):
+            record.status = int(status[:3])
+            for name, value in headers:
+                if name.lower() == 'content-length':
+                    record.size = int(value)
+                    break
+            return start_response(status, headers, exc_info)
+
+        self._begin(record)
+        try:
+            body = self.wsgi_app(environ, timed_start_response)
+        except BaseException:
+            record.status = 500
+            self._finish(record)
+            raise
+        return _TimedBody(body, record, self._finish)
+
+    def _begin(self, record: _InFlight) -> None:
+        with self._lock:
+            self._in_flight[id(record)] = record
+        if self.max_samples and not self._pending.is_set():
+            self._pending.set()
+            if self._sampler is None:
+                self._start_sampler()
+
+    def _finish(self, record: _InFlight) -> None:
+        """計測結果の集計（1リクエストにつき1回）"""
+        if record.finished:
+            return
+        record.finished = True
+        elapsed = time.perf_counter() - record.started
+        with self._lock:
+            self._in_flight.pop(id(record), None)
+            key = (record.route, record.environ.get('REQUEST_METHOD', 'GET'))
+            if elapsed > self._max_seconds.get(key, 0):
+                self._max_seconds[key] = elapsed
+
+        status = record.status or 500
+        series = self._series.get(key)
+        if series is None:
+            series = self._series.setdefault(key, (self.duration.labels(*key), self.response_size.labels(*key)))
+        series[0].observe(elapsed)
+        series[1].observe(record.size or 0)
+        self.requests.labels(key[0], key[1], STATUS_CLASSES.get(status // 100, 'other')).inc()
+
+        if elapsed >= self.slow_threshold:
+            self.slow_log.append({
+                'route': key[0],
+                'method': key[1],
+                'path': record.environ.get('PATH_INFO', ''),
+                'query': record.environ.get('QUERY_STRING', ''),
+                'status': status,
+                'duration_ms': round(elapsed * 1000, 1),
+                'size': record.size,
+                'started_at': datetime.fromtimestamp(time.time() - elapsed).strftime('%Y-%m-%d %H:%M:%S'),
+                'samples': record.samples
+            })
+
+    # ---------- スタックの標本 ----------
+
+    def _start_sampler(self) -> None:
+        with self._lock:
+            if self._sampler is not None:
+                return
+            self._sampler = threading.Thread(target=self._sample_loop, name='request-sampler', daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        """標本取得スレッド停止"""
+        self._stop_event.set()
+        self._pending.set()
+
+    def _sample_loop(self) -> None:
+        """処理中のリクエストがある間だけ、閾値を超えたもののスタックを取得"""
+        while not self._stop_event.is_set():
+            self._pending.wait()
+            if self._stop_event.wait(self.sample_interval):
+                break
+            with self._lock:
+                records = list(self._in_flight.values())
+                if not records:
+                    self._pending.clear()
+                    continue
+
+            now = time.perf_counter()
+            frames = None
+            for record in records:
+                elapsed = now - record.started
+                if elapsed < record.next_sample or len(record.samples) >= self.max_samples:
+                    continue
+                if frames is None:
+                    frames = sys._current_frames()
+                frame = frames.get(record.thread_id)
+                if frame is None:
+                    continue
+                record.samples.append({
+                    'elapsed_ms': round(elapsed * 1000),
+                    'stack': self._format_stack(frame)
+                })
+                # 長いリクエストでも標本数が偏らないよう、取得間隔を倍々に広げる
+                record.next_sample = elapsed * 2
+            frames = None
+
+    def _format_stack(self, frame: Any) -> List[str]:
+        """内側のstack_depth個のフレーム（外側から順）"""
+        return [
+            f"{os.path.basename(entry.filename)}:{entry.lineno} {entry.name}"
+            for entry in traceback.extract_stack(frame, limit=self.stack_depth)
+        ]
+
+    # ---------- 統計 ----------
+
+    def get_stats(self, include_slow: bool = True) -> Dict[str, Any]:
+        """ルート別の処理時間・処理中のリクエスト・低速リクエストログ"""
+        sizes = self.response_size.series()
+        statuses = self.requests.series()
+        with self._lock:
+            max_seconds = dict(self._max_seconds)
+            in_flight = list(self._in_flight.values())
+
+        routes = []
+        for key, (counts, total, count) in self.duration.series().items():
+            if not count:
+                continue
+            errors = statuses.get(key + ('5xx',), 0)
+            routes.append({
+                'route': key[0],
+                'method': key[1],
+                'count': count,
+                'errors': int(errors),
+                'total_ms': round(total * 1000, 1),
+                'mean_ms': round(total / count * 1000, 1),
+                'p50_ms': self._quantile_ms(counts, count, 0.5),
+                'p90_ms': self._quantile_ms(counts, count, 0.9),
+                'p99_ms': self._quantile_ms(counts, count, 0.99),
+                'max_ms': round(max_seconds.get(key, 0) * 1000, 1),
+                'bytes': int(sizes.get(key, ([], 0, 0))[1])
+            })
+        routes.sort(key=lambda r: r['total_ms'], reverse=True)
+
+        now = time.perf_counter()
+        stats = {
+            'slow_threshold_ms': round(self.slow_threshold * 1000),
+            'routes': routes,
+            'in_flight': [
+                {
+                    'route': record.route,
+                    'method': record.environ.get('REQUEST_METHOD', 'GET'),
+                    'path': record.environ.get('PATH_INFO', ''),
+                    'elapsed_ms': round((now - record.started) * 1000)
+                }
+                for record in in_flight
+            ],
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        if include_slow:
+            stats['slow_requests'] = list(reversed(self.slow_log))
+        return stats
+
+    @staticmethod
+    def _quantile_ms(counts: List[int], count: int, q: float) -> Optional[float]:
+        """分位点（ミリ秒、バケット上限による推定値）"""
+        value = bucket_quantile(LATENCY_BUCKETS, counts, count, q)
+        return round(value * 1000, 1) if value is not None else None